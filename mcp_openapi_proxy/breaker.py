@@ -0,0 +1,227 @@
+"""
+Circuit breakers for upstream APIs.
+
+When an upstream is down, every tool call would otherwise wait out a full
+connect or read failure (and its retries) before erroring; under agent
+fan-out hundreds of doomed requests pile up behind it. The pool in
+http_client keeps one CircuitBreaker per upstream origin (or per origin and
+tool) and asks it before every attempt:
+
+- closed: requests flow; outcomes and latencies are counted in a rolling
+  window. Once the window holds enough requests and the failure rate (or
+  the slow-call rate) reaches the threshold, the circuit opens.
+- open: requests fail at once with CircuitOpenError, without touching the
+  network, until the open period has passed.
+- half-open: a limited number of probe requests go through; when they all
+  succeed the circuit closes with a fresh window, when one fails it opens
+  again.
+
+Transport errors (including timeouts) and 5xx responses count as failures;
+other responses, 4xx included, show the upstream is up.
+
+Tuning:
+- UPSTREAM_BREAKER_FAILURE_RATE: failure (and slow-call) rate that opens the
+  circuit (default 0.5; 0 disables the breakers).
+- UPSTREAM_BREAKER_MIN_REQUESTS: requests the window must hold before it
+  can open (default 20).
+- UPSTREAM_BREAKER_WINDOW: rolling window in seconds (default 30).
+- UPSTREAM_BREAKER_OPEN_SECONDS: how long an open circuit fails fast
+  before probing (default 30).
+- UPSTREAM_BREAKER_PROBES: concurrent half-open probes, all of which must
+  succeed to close (default 1).
+- UPSTREAM_BREAKER_SLOW_SECONDS: calls at least this slow count towards the
+  slow-call rate (default 0: latency is reported but never opens).
+- UPSTREAM_BREAKER_SCOPE: "origin" (default) or "tool", one breaker per
+  origin and tool.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .logging_setup import logger
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+SCOPES = ("origin", "tool")
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    failure_rate: float = 0.5
+    min_requests: int = 20
+    window_seconds: float = 30.0
+    open_seconds: float = 30.0
+    probes: int = 1
+    slow_call_seconds: float = 0.0
+    scope: str = "origin"
+
+    @classmethod
+    def from_env(cls) -> "BreakerConfig":
+        defaults = cls()
+
+        def read(name: str, default, cast):
+            raw = os.getenv(name)
+            if raw is None or not raw.strip():
+                return default
+            try:
+                value = cast(raw)
+                if value < 0:
+                    raise ValueError
+                return value
+            except ValueError:
+                logger.warning(f"Invalid {name} env var: {raw}. Using default {default}.")
+                return default
+
+        scope = (os.getenv("UPSTREAM_BREAKER_SCOPE") or defaults.scope).strip().lower()
+        if scope not in SCOPES:
+            logger.warning(f"Invalid UPSTREAM_BREAKER_SCOPE env var: {scope}. Using default {defaults.scope}.")
+            scope = defaults.scope
+        return cls(
+            failure_rate=read("UPSTREAM_BREAKER_FAILURE_RATE", defaults.failure_rate, float),
+            min_requests=read("UPSTREAM_BREAKER_MIN_REQUESTS", defaults.min_requests, int) or 1,
+            window_seconds=read("UPSTREAM_BREAKER_WINDOW", defaults.window_seconds, float) or defaults.window_seconds,
+            open_seconds=read("UPSTREAM_BREAKER_OPEN_SECONDS", defaults.open_seconds, float),
+            probes=read("UPSTREAM_BREAKER_PROBES", defaults.probes, int) or 1,
+            slow_call_seconds=read("UPSTREAM_BREAKER_SLOW_SECONDS", defaults.slow_call_seconds, float),
+            scope=scope,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_rate > 0
+
+    def key(self, origin: str, tool: Optional[str]) -> str:
+        """The breaker a request to ``origin`` for ``tool`` counts against."""
+        if self.scope == "tool" and tool:
+            return f"{origin} {tool}"
+        return origin
+
+
+class CircuitOpenError(httpx.TransportError):
+    """The upstream's circuit is open: the request was not sent."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Upstream {name} is unavailable (circuit open); retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Rolling-window breaker for one upstream. Thread-safe: the async
+    dispatchers and the synchronous FastMCP tool share it."""
+
+    BUCKETS = 10
+
+    def __init__(self, name: str, config: BreakerConfig):
+        self.name = name
+        self.config = config
+        self.state = CLOSED
+        self.opened = 0
+        self.rejected = 0
+        self._bucket_width = config.window_seconds / self.BUCKETS
+        # [bucket number, requests, failures, slow calls, latency sum]
+        self._buckets: List[List[float]] = []
+        self._open_until = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Admit one request, returning whether it is a half-open probe.
+        Raises CircuitOpenError when the request must not be sent."""
+        state = self.state
+        if state == CLOSED:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now < self._open_until:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, self._open_until - now)
+                self.state = HALF_OPEN
+                self._probes_in_flight = 0
+                self._probe_successes = 0
+                logger.info("Circuit for %s half-open; probing", self.name)
+            if self.state == HALF_OPEN:
+                if self._probes_in_flight >= self.config.probes:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def finish(self, latency: float, failed: Optional[bool], probe: bool) -> None:
+        """Record the outcome of an admitted request; ``failed=None`` means
+        it was abandoned (cancelled) and says nothing about the upstream."""
+        with self._lock:
+            if probe:
+                self._probes_in_flight -= 1
+            if failed is None:
+                return
+            now = time.monotonic()
+            self._record(now, latency, failed)
+            if probe and self.state == HALF_OPEN:
+                if failed:
+                    self._open(now, "probe failed")
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.config.probes:
+                        self.state = CLOSED
+                        self._buckets.clear()
+                        logger.warning(f"Circuit for {self.name} closed; upstream recovered")
+            elif self.state == CLOSED and (failed or self._is_slow(latency)):
+                # Only a failure or a slow call can push a rate up.
+                requests, failures, slow, _ = self._totals()
+                if requests >= self.config.min_requests:
+                    if failures / requests >= self.config.failure_rate:
+                        self._open(now, f"{failures} of {requests} requests failed")
+                    elif self.config.slow_call_seconds and slow / requests >= self.config.failure_rate:
+                        threshold = self.config.slow_call_seconds
+                        self._open(now, f"{slow} of {requests} requests took {threshold:g}s or more")
+
+    def _open(self, now: float, reason: str) -> None:
+        self.state = OPEN
+        self.opened += 1
+        self._open_until = now + self.config.open_seconds
+        logger.warning(f"Circuit for {self.name} opened ({reason}); failing fast for {self.config.open_seconds:g}s")
+
+    def _record(self, now: float, latency: float, failed: bool) -> None:
+        number = int(now / self._bucket_width)
+        buckets = self._buckets
+        if not buckets or buckets[-1][0] != number:
+            buckets.append([number, 0, 0, 0, 0.0])
+            oldest = number - self.BUCKETS + 1
+            while buckets[0][0] < oldest:
+                buckets.pop(0)
+        bucket = buckets[-1]
+        bucket[1] += 1
+        bucket[2] += failed
+        bucket[3] += self._is_slow(latency)
+        bucket[4] += latency
+
+    def _is_slow(self, latency: float) -> bool:
+        return bool(self.config.slow_call_seconds) and latency >= self.config.slow_call_seconds
+
+    def _totals(self):
+        oldest = int(time.monotonic() / self._bucket_width) - self.BUCKETS + 1
+        live = [bucket for bucket in self._buckets if bucket[0] >= oldest]
+        return (sum(b[1] for b in live), sum(b[2] for b in live), sum(b[3] for b in live),
+                sum(b[4] for b in live))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests, failures, slow, latency = self._totals()
+            return {
+                "state": self.state,
+                "requests": requests,
+                "failures": failures,
+                "slow": slow,
+                "error_rate": round(failures / requests, 3) if requests else 0.0,
+                "avg_latency_ms": round(latency / requests * 1000, 1) if requests else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,80 @@
+"""
+Single-flight coalescing of identical concurrent tool calls.
+
+Agents running in parallel often issue the same GET with the same arguments
+at the same moment (``get_users_by_id`` for one user, say). The low-level
+dispatcher runs such calls through a SingleFlight: the first call for a key
+(the leader) makes the upstream request and decodes the response, and calls
+for the same key that arrive while it is in flight await its result instead
+of sending their own. Nothing is cached; once the leader finishes, the next
+call makes a fresh request.
+
+The key is (method, resolved URL, query parameters, request headers), so
+calls with different credentials or EXTRA_HEADERS never share a response.
+Only GET calls are coalesced. SINGLE_FLIGHT=false turns coalescing off, and
+SINGLE_FLIGHT_EXCLUDE lists tool-name patterns it never applies to (see
+RuntimeConfig.coalesces).
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, TypeVar
+
+from .logging_setup import logger
+
+T = TypeVar("T")
+
+
+def request_key(
+    method: str, url: str, params: Optional[Mapping[str, Any]], headers: Mapping[str, str]
+) -> Hashable:
+    """The identity of an upstream request, for coalescing. The headers
+    carry the auth identity (API key, EXTRA_HEADERS)."""
+    query = repr(sorted(params.items())) if params else ""
+    return method, url, query, tuple(sorted(headers.items()))
+
+
+class SingleFlight:
+    """At most one in-flight call per key; concurrent callers share its
+    result (or its exception)."""
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        pending = self._in_flight.get(key)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            logger.debug("Coalesced with an in-flight identical request")
+            try:
+                # shield: one follower giving up must not cancel the leader.
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this follower was cancelled
+                # The leader was cancelled; make the request ourselves.
+                return await self.run(key, call)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.leaders += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Followers re-raise it; mark it retrieved for when there are none.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
@@ -0,0 +1,302 @@
+"""
+Runtime configuration for mcp-openapi-proxy.
+
+The settings every tool call depends on (API_KEY, API_AUTH_TYPE,
+API_AUTH_HEADER, EXTRA_HEADERS, STRIP_PARAM, IGNORE_SSL_TOOLS,
+SERVER_URL_OVERRIDE, the upstream timeouts and single-flight settings) are
+read into one immutable RuntimeConfig, with the auth and extra headers
+already parsed and merged. The servers install a snapshot at startup, so a
+call reads attributes instead of re-reading the environment and re-parsing
+EXTRA_HEADERS.
+
+reload_config() re-reads the environment and replaces the snapshot wholesale
+(a single reference assignment, like the tool registry), so a call that
+already fetched its config keeps using it.
+
+Until a snapshot is installed (library use, tests), current_config() follows
+the environment, rebuilding only when one of the variables changes.
+"""
+
+import fnmatch
+import json
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .http_client import UpstreamTimeouts
+from .logging_setup import logger
+
+ENV_VARS = (
+    "API_KEY",
+    "API_AUTH_TYPE",
+    "API_AUTH_HEADER",
+    "EXTRA_HEADERS",
+    "STRIP_PARAM",
+    "IGNORE_SSL_TOOLS",
+    "SERVER_URL_OVERRIDE",
+    "UPSTREAM_CONNECT_TIMEOUT",
+    "UPSTREAM_READ_TIMEOUT",
+    "UPSTREAM_TIMEOUT",
+    "TOOL_TIMEOUTS",
+    "SINGLE_FLIGHT",
+    "SINGLE_FLIGHT_EXCLUDE",
+)
+
+
+def parse_extra_headers(extra_headers: Optional[str]) -> Dict[str, str]:
+    """Parse an EXTRA_HEADERS value into a header dict.
+
+    EXTRA_HEADERS already holds *multiple* headers; three input forms are
+    accepted (issue #17), preferred first:
+
+    1. JSON array  — ``["X-A: 1", "X-B: 2"]`` (the explicit, array-like form;
+       cleanest for JSON client configs that struggle with embedded newlines).
+    2. Real newlines — one ``Header: Value`` per line (original form).
+    3. Literal ``\\n`` sequences — for configs that cannot express real
+       newlines at all.
+
+    Only the value is split on the first colon, so header values may contain
+    colons (e.g. timestamps, URLs).
+    """
+    headers: Dict[str, str] = {}
+    if not extra_headers:
+        return headers
+    logger.debug("Parsing EXTRA_HEADERS: %s", extra_headers)
+
+    candidate = extra_headers.strip()
+    lines: List[str]
+    if candidate.startswith("["):
+        # Form 1: JSON array of "Header: Value" strings.
+        try:
+            parsed = json.loads(candidate)
+            if not isinstance(parsed, list):
+                raise ValueError("EXTRA_HEADERS JSON must be an array of strings")
+            lines = [str(item) for item in parsed]
+        except (json.JSONDecodeError, ValueError) as exc:
+            logger.warning(f"EXTRA_HEADERS looked like JSON but failed to parse ({exc}); "
+                           "falling back to newline parsing.")
+            lines = extra_headers.replace("\\n", "\n").splitlines()
+    else:
+        # Forms 2 & 3: real newlines and/or literal "\n" sequences.
+        lines = extra_headers.replace("\\n", "\n").splitlines()
+
+    for line in lines:
+        line = line.strip()
+        if ":" in line:
+            key, value = line.split(":", 1)
+            key, value = key.strip(), value.strip()
+            if key and value:
+                headers[key] = value
+                logger.debug("Added header from EXTRA_HEADERS: '%s'", key)
+            else:
+                logger.warning(f"Skipping invalid header in EXTRA_HEADERS: '{line}'")
+        elif line:
+            logger.warning(f"Skipping malformed header in EXTRA_HEADERS (no ':'): '{line}'")
+    return headers
+
+
+def parse_tool_timeouts(value: Optional[str], base: UpstreamTimeouts) -> Dict[str, UpstreamTimeouts]:
+    """Parse a TOOL_TIMEOUTS value into per-tool deadlines.
+
+    Either ``tool=seconds`` pairs separated by commas (total deadline), or a
+    JSON object mapping tool names to seconds or to an object with any of
+    ``connect``, ``read`` and ``total`` (like the ``x-timeout`` extension).
+    Deadlines a tool does not set keep the global ones. Invalid entries are
+    skipped with a warning.
+    """
+    timeouts: Dict[str, UpstreamTimeouts] = {}
+    if not value or not value.strip():
+        return timeouts
+    candidate = value.strip()
+    specs: Dict[str, Any] = {}
+    if candidate.startswith("{"):
+        try:
+            parsed = json.loads(candidate)
+            if not isinstance(parsed, dict):
+                raise ValueError("TOOL_TIMEOUTS JSON must be an object")
+            specs = parsed
+        except ValueError as exc:
+            logger.warning(f"Invalid TOOL_TIMEOUTS JSON ({exc}); ignoring it.")
+    else:
+        for item in candidate.split(","):
+            name, sep, seconds = item.partition("=")
+            if not sep or not name.strip():
+                if item.strip():
+                    logger.warning(f"Skipping malformed TOOL_TIMEOUTS entry (expected tool=seconds): '{item.strip()}'")
+                continue
+            specs[name.strip()] = seconds.strip()
+    for name, spec in specs.items():
+        try:
+            timeouts[name] = base.override(spec)
+        except ValueError as exc:
+            logger.warning(f"Skipping invalid TOOL_TIMEOUTS entry for '{name}': {exc}")
+    return timeouts
+
+
+@lru_cache(maxsize=1024)
+def _operation_timeouts(base: UpstreamTimeouts, tool_name: str, spec_key: str) -> UpstreamTimeouts:
+    # Keyed on the serialized extension, so an invalid one is reported once
+    # rather than on every call.
+    try:
+        return base.override(json.loads(spec_key))
+    except ValueError as exc:
+        logger.warning(f"Ignoring invalid x-timeout on {tool_name}: {exc}")
+        return base
+
+
+@lru_cache(maxsize=4096)
+def _excluded(patterns: Tuple[str, ...], tool_name: str) -> bool:
+    return any(fnmatch.fnmatchcase(tool_name, pattern) for pattern in patterns)
+
+
+def _override_url(override: Optional[str]) -> Optional[str]:
+    """The first http(s) URL of a SERVER_URL_OVERRIDE value (None when it is
+    unset, "" when it names none), without its trailing slash."""
+    if not override:
+        return None
+    for url in override.split(","):
+        url = url.strip()
+        if url.startswith("http://") or url.startswith("https://"):
+            return url.rstrip("/")
+    logger.error(f"No valid URLs found in SERVER_URL_OVERRIDE: {override}")
+    return ""
+
+
+def _auth_headers(api_key: Optional[str], auth_type_raw: str, auth_header: str) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    auth_type = auth_type_raw.lower()
+    if api_key:
+        if auth_type == "bearer":
+            logger.debug("Using API_KEY as Bearer token.")  # Avoid logging key prefix
+            headers["Authorization"] = f"Bearer {api_key}"
+        elif auth_type == "basic":
+            logger.warning("API_AUTH_TYPE is Basic, but Basic Auth is not fully implemented yet.")
+        elif auth_type == "api-key":
+            headers[auth_header] = api_key
+            logger.debug("Using API_KEY as API-Key in header '%s'.", auth_header)  # Avoid logging key prefix
+        elif auth_type:
+            # Custom scheme prefix, e.g. API_AUTH_TYPE=Token for NetBox -> "Authorization: Token <key>"
+            headers["Authorization"] = f"{auth_type_raw} {api_key}"
+            logger.debug("Using API_KEY with custom auth scheme '%s'.", auth_type_raw)
+    return headers
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """One immutable snapshot of the request-path settings.
+
+    ``auth_headers`` and ``request_headers`` (auth headers overlaid with
+    EXTRA_HEADERS, what every tool call sends) are computed once, when the
+    snapshot is built, and are read-only mappings. So is ``server_url``, the
+    SERVER_URL_OVERRIDE URL that replaces the spec's server on every call.
+    """
+
+    api_key: Optional[str] = None
+    auth_type: str = "Bearer"  # as configured; compared case-insensitively
+    auth_header: str = "Authorization"
+    extra_headers: Mapping[str, str] = field(default_factory=dict)
+    strip_param: Optional[str] = None
+    verify_ssl_tools: bool = True
+    server_url_override: Optional[str] = None
+    timeouts: UpstreamTimeouts = field(default_factory=UpstreamTimeouts)
+    tool_timeouts: Mapping[str, UpstreamTimeouts] = field(default_factory=dict)
+    single_flight: bool = True
+    single_flight_exclude: Tuple[str, ...] = ()
+    auth_headers: Mapping[str, str] = field(init=False, repr=False, compare=False)
+    request_headers: Mapping[str, str] = field(init=False, repr=False, compare=False)
+    server_url: Optional[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        auth = _auth_headers(self.api_key, self.auth_type, self.auth_header)
+        object.__setattr__(self, "extra_headers", MappingProxyType(dict(self.extra_headers)))
+        object.__setattr__(self, "tool_timeouts", MappingProxyType(dict(self.tool_timeouts)))
+        object.__setattr__(self, "auth_headers", MappingProxyType(auth))
+        object.__setattr__(self, "request_headers", MappingProxyType({**auth, **self.extra_headers}))
+        object.__setattr__(self, "server_url", _override_url(self.server_url_override))
+
+    def __repr__(self) -> str:
+        # Never put the key (or headers that may carry secrets) in a log line.
+        return (f"RuntimeConfig(api_key={'<set>' if self.api_key else '<not set>'}, "
+                f"auth_type={self.auth_type!r}, auth_header={self.auth_header!r}, "
+                f"extra_headers={sorted(self.extra_headers)}, strip_param={self.strip_param!r}, "
+                f"verify_ssl_tools={self.verify_ssl_tools}, server_url_override={self.server_url_override!r}, "
+                f"timeouts={self.timeouts!r}, tool_timeouts={dict(self.tool_timeouts)!r}, "
+                f"single_flight={self.single_flight}, single_flight_exclude={self.single_flight_exclude!r})")
+
+    def coalesces(self, tool_name: str) -> bool:
+        """Whether identical concurrent GET calls of ``tool_name`` share one
+        upstream request (coalesce.py)."""
+        return self.single_flight and not _excluded(self.single_flight_exclude, tool_name)
+
+    def timeouts_for(self, tool_name: str, operation: Optional[Mapping[str, Any]] = None) -> UpstreamTimeouts:
+        """The deadlines for one call of ``tool_name``: its TOOL_TIMEOUTS
+        entry, else the operation's ``x-timeout`` extension applied to the
+        global deadlines, else the global deadlines."""
+        timeouts = self.tool_timeouts.get(tool_name)
+        if timeouts is not None:
+            return timeouts
+        spec = operation.get("x-timeout") if operation else None
+        if spec is None:
+            return self.timeouts
+        return _operation_timeouts(self.timeouts, tool_name, json.dumps(spec, sort_keys=True, default=str))
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "RuntimeConfig":
+        """Build a snapshot from ``environ`` (default: ``os.environ``)."""
+        env = os.environ if environ is None else environ
+        timeouts = UpstreamTimeouts.from_env(env)
+        return cls(
+            api_key=env.get("API_KEY") or None,
+            auth_type=env.get("API_AUTH_TYPE", "Bearer"),
+            auth_header=env.get("API_AUTH_HEADER", "Authorization"),
+            extra_headers=parse_extra_headers(env.get("EXTRA_HEADERS")),
+            strip_param=env.get("STRIP_PARAM") or None,
+            verify_ssl_tools=env.get("IGNORE_SSL_TOOLS", "false").lower() not in ("true", "1", "yes"),
+            server_url_override=env.get("SERVER_URL_OVERRIDE") or None,
+            timeouts=timeouts,
+            tool_timeouts=parse_tool_timeouts(env.get("TOOL_TIMEOUTS"), timeouts),
+            single_flight=env.get("SINGLE_FLIGHT", "true").lower() not in ("false", "0", "no"),
+            single_flight_exclude=tuple(
+                pattern.strip() for pattern in env.get("SINGLE_FLIGHT_EXCLUDE", "").split(",") if pattern.strip()
+            ),
+        )
+
+
+# The snapshot installed by the server, if any.
+_installed: Optional[RuntimeConfig] = None
+# Otherwise: the snapshot for the current environment values, rebuilt when
+# they change.
+_env_config: Optional[Tuple[Tuple[Optional[str], ...], RuntimeConfig]] = None
+
+
+def current_config() -> RuntimeConfig:
+    """The installed snapshot, or one that follows the environment when none
+    is installed."""
+    config = _installed
+    if config is not None:
+        return config
+    global _env_config
+    environ = os.environ
+    values = tuple(map(environ.get, ENV_VARS))
+    cached = _env_config
+    if cached is None or cached[0] != values:
+        cached = (values, RuntimeConfig.from_env(environ))
+        _env_config = cached
+    return cached[1]
+
+
+def install_config(config: Optional[RuntimeConfig]) -> None:
+    """Atomically replace the snapshot every call reads. ``None`` goes back
+    to following the environment."""
+    global _installed
+    _installed = config
+
+
+def reload_config() -> RuntimeConfig:
+    """Re-read the environment and install the result."""
+    config = RuntimeConfig.from_env()
+    install_config(config)
+    logger.debug("Runtime configuration loaded: %r", config)
+    return config
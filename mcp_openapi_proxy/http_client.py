@@ -0,0 +1,773 @@
+"""
+Pooled upstream HTTP clients for mcp-openapi-proxy tool calls.
+
+The dispatchers are ``async def`` handlers running on the MCP event loop, so
+upstream calls must be awaited rather than made with blocking ``requests``
+calls: one slow API would otherwise stall list_tools, pings and every other
+in-flight tool call behind it.
+
+Connections are pooled per upstream origin (scheme://host:port) and kept alive
+between tool calls, so repeated calls skip the TCP+TLS handshake. Tuning:
+- UPSTREAM_MAX_CONNECTIONS: max concurrent connections per origin (default 100).
+- UPSTREAM_MAX_KEEPALIVE: max idle keep-alive connections per origin (default 20).
+- UPSTREAM_KEEPALIVE_EXPIRY: seconds an idle connection is kept open (default 30).
+- UPSTREAM_IDLE_REAP_SECONDS: close an origin's pool after this many seconds
+  without traffic (default 300; 0 disables reaping).
+
+Every request carries deadlines (UpstreamTimeouts), so a hung upstream costs
+a tool call at most its deadline instead of pinning it forever:
+- UPSTREAM_CONNECT_TIMEOUT: seconds to connect, or to wait for a pooled
+  connection (default 10).
+- UPSTREAM_READ_TIMEOUT: seconds to wait for each chunk of the response, and
+  for each write of the request (default 30).
+- UPSTREAM_TIMEOUT: seconds for the whole request, body included (default 60).
+0 disables a limit. Per-tool overrides are resolved by RuntimeConfig.
+
+Transient failures are retried within those deadlines as the RetryPolicy
+(retry.py, UPSTREAM_RETRY_* variables) allows, and every attempt first asks
+the upstream's CircuitBreaker (breaker.py, UPSTREAM_BREAKER_* variables),
+which fails fast with CircuitOpenError while the upstream is down. Before
+that, every attempt takes a token from the upstream's rate-limit buckets
+(ratelimit.py, UPSTREAM_RATE_* variables and RATE_LIMITS), queueing for a
+bounded time, or failing with RateLimitedError, when they are empty.
+
+GET responses go through a ResponseCache (response_cache.py,
+RESPONSE_CACHE_* variables) first: a fresh stored response is returned
+without any of the above, and a stale one is revalidated.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from .breaker import BreakerConfig, CircuitBreaker, CircuitOpenError
+from .logging_setup import logger
+from .ratelimit import RateLimitConfig, RateLimitedError, RateLimiter
+from .response_cache import CacheConfig, ResponseCache
+from .retry import RetryBudget, RetryPolicy
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    max_connections: int = 100
+    max_keepalive: int = 20
+    keepalive_expiry: float = 30.0
+    idle_reap_seconds: float = 300.0
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        defaults = cls()
+
+        def read(name: str, default, cast):
+            raw = os.getenv(name)
+            if raw is None or not raw.strip():
+                return default
+            try:
+                value = cast(raw)
+                if value < 0:
+                    raise ValueError
+                return value
+            except ValueError:
+                logger.warning(f"Invalid {name} env var: {raw}. Using default {default}.")
+                return default
+
+        return cls(
+            max_connections=read("UPSTREAM_MAX_CONNECTIONS", defaults.max_connections, int) or defaults.max_connections,
+            max_keepalive=read("UPSTREAM_MAX_KEEPALIVE", defaults.max_keepalive, int),
+            keepalive_expiry=read("UPSTREAM_KEEPALIVE_EXPIRY", defaults.keepalive_expiry, float),
+            idle_reap_seconds=read("UPSTREAM_IDLE_REAP_SECONDS", defaults.idle_reap_seconds, float),
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=min(self.max_keepalive, self.max_connections),
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+TIMEOUT_FIELDS = ("connect", "read", "total")
+
+
+def parse_seconds(value: Any) -> Optional[float]:
+    """A timeout in seconds; 0 means no limit (None). Raises ValueError for
+    anything that is not a non-negative number."""
+    if isinstance(value, bool):
+        raise ValueError(f"not a number of seconds: {value!r}")
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"not a number of seconds: {value!r}") from None
+    if not seconds >= 0 or seconds == float("inf"):
+        raise ValueError(f"not a number of seconds: {value!r}")
+    return seconds or None
+
+
+@dataclass(frozen=True)
+class UpstreamTimeouts:
+    """Deadlines for one upstream request, in seconds (None: no limit).
+
+    ``connect`` bounds opening a connection and waiting for a pooled one,
+    ``read`` bounds every wait for response bytes (and every write), and
+    ``total`` bounds the request as a whole, so an upstream that trickles
+    its body one byte at a time still cannot outlast it.
+    """
+
+    connect: Optional[float] = 10.0
+    read: Optional[float] = 30.0
+    total: Optional[float] = 60.0
+    httpx_timeout: httpx.Timeout = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "httpx_timeout", httpx.Timeout(
+            connect=self.connect, read=self.read, write=self.read, pool=self.connect,
+        ))
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "UpstreamTimeouts":
+        env = os.environ if environ is None else environ
+        defaults = cls()
+
+        def read(name: str, default: Optional[float]) -> Optional[float]:
+            raw = env.get(name)
+            if raw is None or not raw.strip():
+                return default
+            try:
+                return parse_seconds(raw)
+            except ValueError:
+                logger.warning(f"Invalid {name} env var: {raw}. Using default {default}.")
+                return default
+
+        return cls(
+            connect=read("UPSTREAM_CONNECT_TIMEOUT", defaults.connect),
+            read=read("UPSTREAM_READ_TIMEOUT", defaults.read),
+            total=read("UPSTREAM_TIMEOUT", defaults.total),
+        )
+
+    def override(self, spec: Any) -> "UpstreamTimeouts":
+        """These deadlines with an override applied: a number replaces the
+        total deadline, a mapping any of connect / read / total. Raises
+        ValueError for anything else."""
+        if isinstance(spec, Mapping):
+            unknown = sorted(str(key) for key in spec if key not in TIMEOUT_FIELDS)
+            if unknown:
+                raise ValueError(f"unknown timeout keys {unknown}; expected {list(TIMEOUT_FIELDS)}")
+            return replace(self, **{key: parse_seconds(value) for key, value in spec.items()})
+        return replace(self, total=parse_seconds(spec))
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """The request as a whole ran past its total deadline."""
+
+
+def timeout_error(tool_name: str, exc: httpx.TimeoutException, timeouts: UpstreamTimeouts) -> Dict[str, Any]:
+    """The structured tool error for a call whose upstream request timed out:
+    which deadline it hit, and how long that deadline was."""
+    if isinstance(exc, DeadlineExceeded):
+        phase, seconds = "total", timeouts.total
+    elif isinstance(exc, httpx.ConnectTimeout):
+        phase, seconds = "connect", timeouts.connect
+    elif isinstance(exc, httpx.PoolTimeout):
+        phase, seconds = "pool", timeouts.connect
+    elif isinstance(exc, httpx.WriteTimeout):
+        phase, seconds = "write", timeouts.read
+    else:
+        phase, seconds = "read", timeouts.read
+    return {
+        "error": f"Upstream request for {tool_name} timed out ({phase} deadline of {seconds:g}s)",
+        "type": "upstream_timeout",
+        "tool": tool_name,
+        "phase": phase,
+        "timeout_seconds": seconds,
+    }
+
+
+# Raised before anything is sent: the upstream's circuit is open, or its rate
+# limit would make the call queue too long.
+NOT_SENT = (CircuitOpenError, RateLimitedError)
+
+
+def not_sent_error(tool_name: str, exc: Union[CircuitOpenError, RateLimitedError]) -> Dict[str, Any]:
+    """The structured tool error for a call refused before it was sent."""
+    if isinstance(exc, CircuitOpenError):
+        reason, kind = "is unavailable (circuit open)", "circuit_open"
+    else:
+        reason, kind = "is rate limited", "rate_limited"
+    return {
+        "error": f"Upstream for {tool_name} {reason}; not sent (retry in {exc.retry_in:.1f}s)",
+        "type": kind,
+        "tool": tool_name,
+        "upstream": exc.name,
+        "retry_in_seconds": round(exc.retry_in, 1),
+    }
+
+
+PoolKey = Tuple[str, bool]  # (origin, verify)
+
+
+def origin_of(url: str) -> str:
+    """scheme://host[:port] of a URL, the unit connections are pooled by."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class _PoolEntry:
+    __slots__ = ("client", "last_used", "in_flight")
+
+    def __init__(self, client: Union[httpx.AsyncClient, httpx.Client]):
+        self.client = client
+        self.last_used = time.monotonic()
+        self.in_flight = 0
+
+
+class UpstreamPool:
+    """Process-wide registry of per-origin clients.
+
+    Async clients serve the low-level dispatchers; sync clients serve the
+    FastMCP ``call_function`` tool, which runs in a worker thread. Async
+    clients are tied to the event loop that created them; a new loop (e.g. a
+    fresh ``asyncio.run`` in tests) gets fresh clients, and each loop's
+    clients are closed as it shuts down.
+    """
+
+    def __init__(
+        self,
+        config: Optional[PoolConfig] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[BreakerConfig] = None,
+        rate_limits: Optional[RateLimitConfig] = None,
+        cache: Optional[CacheConfig] = None,
+    ):
+        self.config = config or PoolConfig.from_env()
+        self.retry = retry or RetryPolicy.from_env()
+        self.breaker = breaker or BreakerConfig.from_env()
+        self.limiter = RateLimiter(rate_limits or RateLimitConfig.from_env())
+        self.cache = ResponseCache(cache or CacheConfig.from_env())
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._async: Dict[PoolKey, _PoolEntry] = {}
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_closer: Optional[asyncio.Task] = None
+        self._sync: Dict[PoolKey, _PoolEntry] = {}
+        self._sync_lock = threading.Lock()
+        self._last_sync_reap = time.monotonic()
+
+    # -- async ---------------------------------------------------------------
+
+    def _async_entry(self, key: PoolKey) -> _PoolEntry:
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            # Connections from a previous loop cannot be reused.
+            self._abandon_loop()
+            self._async_loop = loop
+            self._async_closer = loop.create_task(self._close_with_loop(self._async))
+        entry = self._async.get(key)
+        if entry is None or entry.client.is_closed:
+            entry = _PoolEntry(httpx.AsyncClient(verify=key[1], limits=self.config.limits(), follow_redirects=True))
+            self._async[key] = entry
+            logger.debug("Opened upstream pool for %s (verify=%s)", key[0], key[1])
+        return entry
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        verify: bool = True,
+        timeouts: Optional[UpstreamTimeouts] = None,
+        tool: Optional[str] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        cache = self.cache
+        if not cache.enabled:
+            return await self._send(method, url, verify=verify, timeouts=timeouts, tool=tool, **kwargs)
+        lookup = cache.lookup(method, url, tool, kwargs)
+        if lookup is not None:
+            if lookup.entry is None and cache.config.disk:
+                await asyncio.to_thread(cache.load, lookup)
+            cached = cache.hit(lookup)
+            if cached is not None:
+                return cached
+            kwargs = lookup.conditional(kwargs)
+        response = await self._send(method, url, verify=verify, timeouts=timeouts, tool=tool, **kwargs)
+        response, disk_work = cache.update(method, url, lookup, response)
+        if disk_work is not None:
+            await asyncio.to_thread(disk_work)
+        return response
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        verify: bool,
+        timeouts: Optional[UpstreamTimeouts],
+        tool: Optional[str],
+        **kwargs: Any,
+    ) -> httpx.Response:
+        timeouts = timeouts or UpstreamTimeouts()
+        key = (origin_of(url), verify)
+        breaker = self._breaker(key[0], tool)
+        buckets = self.limiter.buckets(key[0], tool)
+        kwargs = self._with_idempotency_key(method, kwargs)
+        started = time.monotonic()
+        deadline = started + timeouts.total if timeouts.total is not None else None
+        budget = self._budget(key[0])
+        budget.deposit()
+        delays = self.retry.delays()
+        attempt = 0
+        while True:
+            attempt += 1
+            wait = self.limiter.reserve(buckets, self._max_queue_wait(deadline))
+            if wait:
+                await asyncio.sleep(wait)
+            probe = breaker.acquire() if breaker is not None else False
+            entry = self._async_entry(key)
+            entry.in_flight += 1
+            sent = time.monotonic()
+            failed = None
+            try:
+                response = await self._attempt(entry, method, url, timeouts, deadline, **kwargs)
+            except httpx.TransportError as exc:
+                failed = True
+                delay = self._retry_delay(method, url, attempt, delays, started, deadline, budget, error=exc)
+                if delay is None:
+                    raise
+            else:
+                failed = response.status_code >= 500
+                self.limiter.observe(buckets, response)
+                delay = self._retry_delay(method, url, attempt, delays, started, deadline, budget, response=response)
+                if delay is None:
+                    return response
+            finally:
+                entry.in_flight -= 1
+                entry.last_used = time.monotonic()
+                if breaker is not None:
+                    breaker.finish(entry.last_used - sent, failed, probe)
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _attempt(
+        entry: _PoolEntry, method: str, url: str, timeouts: UpstreamTimeouts, deadline: Optional[float], **kwargs: Any
+    ) -> httpx.Response:
+        sending = entry.client.request(method, url, timeout=timeouts.httpx_timeout, **kwargs)
+        if deadline is None:
+            return await sending
+        try:
+            # Cancels the request, and drops its connection, on expiry.
+            return await asyncio.wait_for(sending, max(deadline - time.monotonic(), 0.0))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(
+                f"Upstream request exceeded its {timeouts.total:g}s deadline",
+                request=httpx.Request(method, url),
+            ) from None
+
+    async def reap_idle(self) -> int:
+        """Close async pools with no traffic for idle_reap_seconds."""
+        cutoff = self.config.idle_reap_seconds
+        if cutoff <= 0:
+            return 0
+        now = time.monotonic()
+        stale = [
+            key for key, entry in self._async.items()
+            if entry.in_flight == 0 and now - entry.last_used >= cutoff
+        ]
+        for key in stale:
+            entry = self._async.pop(key)
+            await entry.client.aclose()
+            logger.debug("Reaped idle upstream pool for %s", key[0])
+        return len(stale)
+
+    async def aclose(self) -> None:
+        entries = list(self._async.values())
+        self._async.clear()
+        self._async_loop = None
+        if self._async_closer is not None:
+            self._async_closer.cancel()
+            self._async_closer = None
+        await _close_all(entries)
+
+    @staticmethod
+    async def _close_with_loop(entries: Dict[PoolKey, _PoolEntry]) -> None:
+        """Wait for the loop's shutdown (asyncio.run cancels every task left
+        on its way out), then close the loop's clients while it still runs:
+        once it is closed their sockets can no longer be closed."""
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await _close_all(list(entries.values()))
+
+    def _abandon_loop(self) -> None:
+        """Drop the clients of the previous event loop, closing them on it
+        if it still runs in another thread."""
+        entries = list(self._async.values())
+        self._async = {}
+        old_loop, self._async_loop, self._async_closer = self._async_loop, None, None
+        if not entries or old_loop is None:
+            return
+        if old_loop.is_running():
+            asyncio.run_coroutine_threadsafe(_close_all(entries), old_loop)
+        elif any(not entry.client.is_closed for entry in entries):
+            logger.debug("Dropping %d upstream clients of a stopped event loop", len(entries))
+
+    # -- sync ----------------------------------------------------------------
+
+    def request_sync(
+        self,
+        method: str,
+        url: str,
+        *,
+        verify: bool = True,
+        timeouts: Optional[UpstreamTimeouts] = None,
+        tool: Optional[str] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        cache = self.cache
+        if not cache.enabled:
+            return self._send_sync(method, url, verify=verify, timeouts=timeouts, tool=tool, **kwargs)
+        lookup = cache.lookup(method, url, tool, kwargs)
+        if lookup is not None:
+            if lookup.entry is None and cache.config.disk:
+                cache.load(lookup)
+            cached = cache.hit(lookup)
+            if cached is not None:
+                return cached
+            kwargs = lookup.conditional(kwargs)
+        response = self._send_sync(method, url, verify=verify, timeouts=timeouts, tool=tool, **kwargs)
+        response, disk_work = cache.update(method, url, lookup, response)
+        if disk_work is not None:
+            disk_work()
+        return response
+
+    def _send_sync(
+        self,
+        method: str,
+        url: str,
+        *,
+        verify: bool,
+        timeouts: Optional[UpstreamTimeouts],
+        tool: Optional[str],
+        **kwargs: Any,
+    ) -> httpx.Response:
+        timeouts = timeouts or UpstreamTimeouts()
+        key = (origin_of(url), verify)
+        breaker = self._breaker(key[0], tool)
+        buckets = self.limiter.buckets(key[0], tool)
+        kwargs = self._with_idempotency_key(method, kwargs)
+        started = time.monotonic()
+        deadline = started + timeouts.total if timeouts.total is not None else None
+        budget = self._budget(key[0])
+        budget.deposit()
+        delays = self.retry.delays()
+        attempt = 0
+        while True:
+            attempt += 1
+            wait = self.limiter.reserve(buckets, self._max_queue_wait(deadline))
+            if wait:
+                time.sleep(wait)
+            probe = breaker.acquire() if breaker is not None else False
+            entry = self._sync_entry(key)
+            sent = time.monotonic()
+            failed = None
+            try:
+                if deadline is None:
+                    response = entry.client.request(method, url, timeout=timeouts.httpx_timeout, **kwargs)
+                else:
+                    response = _request_with_deadline(entry.client, method, url, timeouts, deadline, **kwargs)
+            except httpx.TransportError as exc:
+                failed = True
+                delay = self._retry_delay(method, url, attempt, delays, started, deadline, budget, error=exc)
+                if delay is None:
+                    raise
+            else:
+                failed = response.status_code >= 500
+                self.limiter.observe(buckets, response)
+                delay = self._retry_delay(method, url, attempt, delays, started, deadline, budget, response=response)
+                if delay is None:
+                    return response
+            finally:
+                with self._sync_lock:
+                    entry.in_flight -= 1
+                    entry.last_used = time.monotonic()
+                if breaker is not None:
+                    breaker.finish(entry.last_used - sent, failed, probe)
+            time.sleep(delay)
+
+    def _sync_entry(self, key: PoolKey) -> _PoolEntry:
+        with self._sync_lock:
+            self._reap_idle_sync()
+            entry = self._sync.get(key)
+            if entry is None or entry.client.is_closed:
+                entry = _PoolEntry(httpx.Client(verify=key[1], limits=self.config.limits(), follow_redirects=True))
+                self._sync[key] = entry
+                logger.debug("Opened upstream pool for %s (verify=%s)", key[0], key[1])
+            entry.in_flight += 1
+        return entry
+
+    def _reap_idle_sync(self) -> None:
+        # Opportunistic: sync callers have no loop to run a background reaper.
+        cutoff = self.config.idle_reap_seconds
+        now = time.monotonic()
+        if cutoff <= 0 or now - self._last_sync_reap < cutoff:
+            return
+        self._last_sync_reap = now
+        for key, entry in list(self._sync.items()):
+            if entry.in_flight == 0 and now - entry.last_used >= cutoff:
+                del self._sync[key]
+                entry.client.close()
+                logger.debug("Reaped idle upstream pool for %s", key[0])
+
+    def close_sync(self) -> None:
+        with self._sync_lock:
+            entries = list(self._sync.values())
+            self._sync.clear()
+        for entry in entries:
+            entry.client.close()
+
+    # -- rate limits ---------------------------------------------------------
+
+    def _max_queue_wait(self, deadline: Optional[float]) -> float:
+        """How long an attempt may queue for a rate-limit token: the
+        configured bound, and never past the call's deadline."""
+        max_wait = self.limiter.config.max_wait
+        if deadline is not None:
+            max_wait = min(max_wait, deadline - time.monotonic())
+        return max_wait
+
+    # -- breakers ------------------------------------------------------------
+
+    def _breaker(self, origin: str, tool: Optional[str]) -> Optional[CircuitBreaker]:
+        if not self.breaker.enabled:
+            return None
+        name = self.breaker.key(origin, tool)
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers.setdefault(name, CircuitBreaker(name, self.breaker))
+        return breaker
+
+    # -- retries -------------------------------------------------------------
+
+    def _budget(self, origin: str) -> RetryBudget:
+        budget = self._budgets.get(origin)
+        if budget is None:
+            budget = self._budgets.setdefault(origin, RetryBudget(self.retry.budget_ratio))
+        return budget
+
+    def _with_idempotency_key(self, method: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Give a non-idempotent call one idempotency key, sent unchanged on
+        every attempt, unless the caller already set one."""
+        if not self.retry.needs_idempotency_key(method):
+            return kwargs
+        header = self.retry.idempotency_header
+        headers = dict(kwargs.get("headers") or {})
+        if not any(name.lower() == header.lower() for name in headers):
+            headers[header] = uuid.uuid4().hex
+        return {**kwargs, "headers": headers}
+
+    def _retry_delay(
+        self,
+        method: str,
+        url: str,
+        attempt: int,
+        delays: Iterator[float],
+        started: float,
+        deadline: Optional[float],
+        budget: RetryBudget,
+        *,
+        response: Optional[httpx.Response] = None,
+        error: Optional[Exception] = None,
+    ) -> Optional[float]:
+        """The delay before retrying a failed attempt, or None to give up."""
+        policy = self.retry
+        if attempt > policy.max_retries or (error is None and response.status_code not in policy.retry_statuses):
+            return None
+        now = time.monotonic()
+        remaining = started + policy.max_time - now
+        if deadline is not None:
+            remaining = min(remaining, deadline - now)
+        delay = policy.retry_delay(method, attempt, next(delays), remaining, response=response, error=error)
+        if delay is None:
+            return None
+        if not budget.withdraw():
+            logger.info("Retry budget for %s exhausted; not retrying %s %s", origin_of(url), method, url)
+            return None
+        logger.info("Retrying %s %s in %.2fs (attempt %d of %d) after %s", method, url, delay, attempt + 1,
+                    policy.max_retries + 1, repr(error) if error is not None else response.status_code)
+        return delay
+
+    # -- stats ---------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Open / idle / waiting connection counts, per origin and in total.
+
+        ``waiting`` counts requests queued for a connection because the origin
+        hit UPSTREAM_MAX_CONNECTIONS.
+        """
+        origins: Dict[str, Dict[str, int]] = {}
+        for kind, entries in (("async", dict(self._async)), ("sync", dict(self._sync))):
+            for (origin, _verify), entry in entries.items():
+                counts = origins.setdefault(origin, {"open": 0, "idle": 0, "waiting": 0, "in_flight": 0})
+                opened, idle, waiting = _connection_counts(entry)
+                counts["open"] += opened
+                counts["idle"] += idle
+                counts["waiting"] += waiting
+                counts["in_flight"] += entry.in_flight
+        totals = {name: sum(c[name] for c in origins.values()) for name in ("open", "idle", "waiting", "in_flight")}
+        budgets = {origin: budget.stats() for origin, budget in dict(self._budgets).items()}
+        breakers = {name: breaker.stats() for name, breaker in dict(self._breakers).items()}
+        return {**totals, "origins": origins, "retry_budgets": budgets, "breakers": breakers,
+                "rate_limits": self.limiter.stats(), "cache": self.cache.stats()}
+
+
+async def _close_all(entries: List[_PoolEntry]) -> None:
+    for entry in entries:
+        try:
+            await entry.client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing upstream HTTP client: {e}")
+
+
+def _connection_counts(entry: _PoolEntry) -> Tuple[int, int, int]:
+    """(open, idle, waiting) connections of one pooled client, read from
+    httpcore's pool. Those are internals: when they are missing or changed,
+    count the requests in flight (each holds a connection) as open."""
+    pool = getattr(getattr(entry.client, "_transport", None), "_pool", None)
+    try:
+        connections = list(pool.connections)
+        idle = sum(1 for conn in connections if conn.is_idle())
+        waiting = sum(1 for req in list(pool._requests) if req.is_queued())
+    except (AttributeError, TypeError):
+        return entry.in_flight, 0, 0
+    return len(connections), idle, waiting
+
+
+def _request_with_deadline(
+    client: httpx.Client, method: str, url: str, timeouts: UpstreamTimeouts, deadline: float, **kwargs: Any
+) -> httpx.Response:
+    """client.request() under a total deadline (a time.monotonic() value). A
+    blocking read cannot be interrupted, so the body is streamed and the
+    deadline checked between chunks; no single wait may outlast the time
+    left either."""
+    total = timeouts.total
+    left = max(deadline - time.monotonic(), 0.001)
+    bounded = replace(
+        timeouts,
+        connect=min(timeouts.connect or left, left),
+        read=min(timeouts.read or left, left),
+    ).httpx_timeout
+
+    def expired(request: httpx.Request) -> DeadlineExceeded:
+        return DeadlineExceeded(f"Upstream request exceeded its {total:g}s deadline", request=request)
+
+    with client.stream(method, url, timeout=bounded, **kwargs) as streamed:
+        if streamed.is_stream_consumed:
+            return streamed  # an in-memory body (e.g. from a mock transport)
+        chunks = []
+        for chunk in streamed.iter_raw():
+            if time.monotonic() > deadline:
+                raise expired(streamed.request)
+            chunks.append(chunk)
+        if time.monotonic() > deadline:
+            raise expired(streamed.request)
+    # Rebuilt from the raw (still encoded) bytes, so decoding works as usual.
+    return httpx.Response(
+        streamed.status_code,
+        headers=streamed.headers,
+        content=b"".join(chunks),
+        request=streamed.request,
+    )
+
+
+_pool: Optional[UpstreamPool] = None
+
+
+def get_pool() -> UpstreamPool:
+    """The process-wide pool, created from the environment on first use."""
+    global _pool
+    if _pool is None:
+        _pool = UpstreamPool()
+    return _pool
+
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    json: Any = None,
+    verify: bool = True,
+    timeouts: Optional[UpstreamTimeouts] = None,
+    tool: Optional[str] = None,
+) -> httpx.Response:
+    """Send one upstream request through the shared async pool.
+
+    Raises an httpx.TimeoutException (DeadlineExceeded for the total
+    deadline) when one of ``timeouts`` (default: UpstreamTimeouts()) expires,
+    CircuitOpenError while the upstream's circuit is open and RateLimitedError
+    when its rate limit would hold the call too long. ``tool`` names the
+    calling tool, for per-tool breakers, operation-group rate limits and
+    cache TTLs. GET responses may come from the response cache.
+    """
+    return await get_pool().request(
+        method, url, headers=headers, params=params, json=json, verify=verify, timeouts=timeouts, tool=tool,
+    )
+
+
+def request_sync(
+    method: str,
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    json: Any = None,
+    verify: bool = True,
+    timeouts: Optional[UpstreamTimeouts] = None,
+    tool: Optional[str] = None,
+) -> httpx.Response:
+    """Blocking counterpart of request() for synchronous tools (FastMCP)."""
+    return get_pool().request_sync(
+        method, url, headers=headers, params=params, json=json, verify=verify, timeouts=timeouts, tool=tool,
+    )
+
+
+def pool_stats() -> Dict[str, Any]:
+    return get_pool().stats()
+
+
+async def aclose() -> None:
+    """Close every pooled async client owned by the current event loop."""
+    if _pool is not None:
+        await _pool.aclose()
+
+
+async def _reap_forever(pool: UpstreamPool) -> None:
+    interval = max(pool.config.idle_reap_seconds / 2, 1.0)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await pool.reap_idle()
+        except Exception as e:
+            logger.warning(f"Upstream pool reaper error: {e}")
+
+
+@asynccontextmanager
+async def lifespan() -> AsyncIterator[UpstreamPool]:
+    """Own the upstream pool for the lifetime of a server run: start the idle
+    reaper and close every connection on exit."""
+    pool = get_pool()
+    reaper = asyncio.create_task(_reap_forever(pool)) if pool.config.idle_reap_seconds > 0 else None
+    try:
+        yield pool
+    finally:
+        if reaper is not None:
+            reaper.cancel()
+        await aclose()
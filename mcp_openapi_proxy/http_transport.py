@@ -0,0 +1,118 @@
+"""
+HTTP transports for the low-level server.
+
+stdio gives every client its own proxy process, each with its own spec
+download, tool registry and upstream pool. Over HTTP one process serves any
+number of MCP sessions, and all of them share that state: it is owned by
+server_lowlevel.serving() for the lifetime of the app, not per session.
+
+Transports (MCP_TRANSPORT):
+- streamable-http: the MCP streamable HTTP transport at /mcp. Needs an mcp
+  SDK that ships mcp.server.streamable_http_manager (1.8+).
+- sse: the HTTP+SSE transport, GET /sse plus POST /messages/.
+- http: streamable-http when the SDK supports it, otherwise sse.
+
+The app binds to MCP_HTTP_HOST:MCP_HTTP_PORT (default 127.0.0.1:8000). It has
+no authentication of its own; put it behind a proxy that does before
+exposing it beyond localhost.
+"""
+
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import anyio
+from starlette.applications import Starlette
+from starlette.routing import Mount, Route
+from starlette.types import Message, Receive, Scope, Send
+
+from mcp.server.sse import SseServerTransport
+
+try:
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+except ImportError:  # mcp < 1.8
+    StreamableHTTPSessionManager = None
+
+from mcp_openapi_proxy.logging_setup import logger
+from mcp_openapi_proxy.server_lowlevel import mcp, serving
+
+TRANSPORTS = ("sse", "streamable-http", "http")
+
+
+def resolve_transport(transport: str) -> str:
+    """Map an MCP_TRANSPORT value to the HTTP transport that will serve it."""
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown MCP_TRANSPORT {transport!r}; expected stdio, {', '.join(TRANSPORTS)}")
+    if transport == "http":
+        return "streamable-http" if StreamableHTTPSessionManager is not None else "sse"
+    if transport == "streamable-http" and StreamableHTTPSessionManager is None:
+        raise RuntimeError("MCP_TRANSPORT=streamable-http needs mcp>=1.8; use sse or upgrade mcp")
+    return transport
+
+
+class _SseEndpoint:
+    """GET /sse as a plain ASGI app: the response is the event stream, so
+    there is nothing for a Starlette request handler to return afterwards.
+
+    The session is cancelled when the client disconnects. Older SDKs keep
+    ``Server.run`` waiting on a read stream that never closes otherwise,
+    leaking one session per connection that ever hung up.
+    """
+
+    def __init__(self, sse: SseServerTransport):
+        self.sse = sse
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        with anyio.CancelScope() as session_scope:
+
+            async def receive_until_disconnect() -> Message:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    session_scope.cancel()
+                return message
+
+            async with self.sse.connect_sse(scope, receive_until_disconnect, send) as (read_stream, write_stream):
+                await mcp.run(read_stream, write_stream, mcp.create_initialization_options())
+
+
+def build_app(transport: str) -> Starlette:
+    """Starlette app serving ``transport`` ("sse" or "streamable-http")."""
+    if transport == "sse":
+        sse = SseServerTransport("/messages/")
+
+        @asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            async with serving():
+                yield
+
+        routes = [
+            Route("/sse", endpoint=_SseEndpoint(sse), methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+        ]
+        return Starlette(routes=routes, lifespan=lifespan)
+
+    manager = StreamableHTTPSessionManager(app=mcp)
+
+    async def handle_streamable_http(scope: Scope, receive: Receive, send: Send) -> None:
+        await manager.handle_request(scope, receive, send)
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with serving(), manager.run():
+            yield
+
+    return Starlette(routes=[Mount("/mcp", app=handle_streamable_http)], lifespan=lifespan)
+
+
+async def start_http_server(transport: str, host: Optional[str] = None, port: Optional[int] = None) -> None:
+    import uvicorn
+
+    transport = resolve_transport(transport)
+    host = host or os.getenv("MCP_HTTP_HOST", "127.0.0.1")
+    port = port or int(os.getenv("MCP_HTTP_PORT", "8000"))
+    endpoint = "/sse" if transport == "sse" else "/mcp"
+    logger.info("Serving MCP over %s at http://%s:%s%s", transport, host, port, endpoint)
+    # Open SSE streams would otherwise hold shutdown until every client leaves.
+    config = uvicorn.Config(build_app(transport), host=host, port=port, log_level="warning",
+                            timeout_graceful_shutdown=5)
+    await uvicorn.Server(config).serve()
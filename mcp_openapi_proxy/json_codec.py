@@ -0,0 +1,60 @@
+"""
+JSON codec for mcp-openapi-proxy.
+
+Spec parsing, the spec cache, upstream response handling and resource reads
+all go through loads()/dumps() here. When orjson is installed
+(``pip install mcp-openapi-proxy[fast]``) it is used for both directions;
+otherwise the stdlib json module is. Set JSON_CODEC=json to force the stdlib.
+
+Differences to be aware of with orjson: dumps() output is compact (no space
+after ``:`` and ``,``) and non-ASCII is emitted as UTF-8 instead of \\u
+escapes. Values orjson cannot encode (e.g. integers wider than 64 bits) fall
+back to the stdlib transparently. loads() retries with the stdlib whatever
+orjson rejects, so documents with ``NaN``/``Infinity`` still parse; but
+integers wider than 64 bits are not rejected, orjson decodes them as floats
+(``184467440737095516150`` becomes ``1.844674407370955e+20``). Use
+JSON_CODEC=json where such values must stay exact.
+"""
+
+import json
+import os
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+from .logging_setup import logger
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch
+# this one type whichever backend is active.
+JSONDecodeError = json.JSONDecodeError
+
+_use_orjson = orjson is not None and os.getenv("JSON_CODEC", "").lower() != "json"
+BACKEND = "orjson" if _use_orjson else "json"
+logger.debug("JSON codec backend: %s", BACKEND)
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Decode a JSON document; raises JSONDecodeError on invalid input."""
+    if _use_orjson:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity, which the stdlib accepts
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Encode ``obj`` as a JSON string, pretty-printed with two-space
+    indentation when ``indent`` is true."""
+    if _use_orjson:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode()
+        except TypeError:
+            pass  # e.g. ints wider than 64 bits: the stdlib handles them
+    return json.dumps(obj, indent=2 if indent else None, default=default)
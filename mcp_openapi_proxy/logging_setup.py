@@ -1,21 +1,249 @@
 """
 Logging setup for mcp-openapi-proxy.
+
+Records are not written by the thread that logs them. The package logger
+hands each record to a bounded queue, and a background thread writes
+them to stderr. When stderr is a slow pipe from the MCP client, a full
+pipe then stalls the writer thread, not the event loop. If the queue
+fills up, new records are dropped and counted, never waited on. The
+writer reports the count once it catches up.
+
+LOG_FORMAT=json writes one JSON object per line. Each carries the fields
+bound with log_context() (request_id and tool for a tool call) plus
+latency_ms on the line that closes a call.
 """
 
+import atexit
+import contextlib
+import copy
+import contextvars
+import itertools
+import json
 import os
+import queue
 import sys
 import logging
+import logging.handlers
+from typing import Iterator, Optional
 
 # Initialize logger directly at module level
 logger = logging.getLogger("mcp_openapi_proxy")
 
+
+def _payload_limit() -> int:
+    try:
+        return max(0, int(os.getenv("LOG_PAYLOAD_LIMIT", "1000")))
+    except ValueError:
+        return 1000
+
+
+# Payloads (headers, arguments, bodies, responses, specs) are cut to this
+# many characters in log lines; 0 logs them whole.
+PAYLOAD_LIMIT = _payload_limit()
+
+
+class Payload:
+    """A log argument that is rendered, and truncated to PAYLOAD_LIMIT
+    characters, only when a handler actually emits the record.
+
+    Debug logging passes its arguments lazily (``logger.debug("Body: %s",
+    Payload(body))``), so at INFO a call pays for neither the formatting
+    nor the copy. Arguments that are expensive to compute in the first
+    place go behind ``logger.isEnabledFor(logging.DEBUG)``.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else str(self.value)
+        limit = PAYLOAD_LIMIT
+        if limit and len(text) > limit:
+            return f"{text[:limit]}... ({len(text) - limit} more characters)"
+        return text
+
+
+# Fields bound to the current task or thread (a tool call's request id and
+# tool name), copied onto every record logged under them.
+_context: contextvars.ContextVar[dict] = contextvars.ContextVar("mcp_openapi_proxy_log_context", default={})
+_request_ids = itertools.count(1)
+
+# Record attributes that are part of every LogRecord; anything else on a
+# record came from log_context() or ``extra=`` and goes into JSON lines.
+_STANDARD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+LOG_FORMAT_TEXT = "text"
+LOG_FORMAT_JSON = "json"
+
+
+def log_format() -> str:
+    """LOG_FORMAT: "text" (the default) or "json" (one object per line)."""
+    value = os.getenv("LOG_FORMAT", LOG_FORMAT_TEXT).strip().lower() or LOG_FORMAT_TEXT
+    return value if value in (LOG_FORMAT_TEXT, LOG_FORMAT_JSON) else LOG_FORMAT_TEXT
+
+
+# The line closing each tool call (with its latency) is logged at INFO for
+# JSON logs, which are meant for collection, and at DEBUG otherwise.
+CALL_LOG_LEVEL = logging.INFO if log_format() == LOG_FORMAT_JSON else logging.DEBUG
+
+
+def _queue_size() -> int:
+    try:
+        return max(0, int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    except ValueError:
+        return 10000
+
+
+def next_request_id() -> str:
+    """A process-unique id to bind to one tool call's log lines."""
+    return f"{next(_request_ids):x}"
+
+
+@contextlib.contextmanager
+def log_context(**fields) -> Iterator[None]:
+    """Bind ``fields`` to every record logged in this block (and in tasks it
+    starts)."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class _ContextFilter(logging.Filter):
+    """Copies the bound log_context() fields onto each record. Runs in the
+    logging thread, where the context is still the caller's."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _context.get().items():
+            if key not in record.__dict__:
+                setattr(record, key, value)
+        return True
+
+
+# On the logger rather than a handler, so every handler sees the fields.
+logger.addFilter(_ContextFilter())
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, and every
+    context or ``extra=`` field."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that never blocks: when the queue is full the record
+    is dropped and counted, and a warning with the count is queued as soon
+    as there is room again."""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now (they may change once the caller moves
+        # on) but leave formatting, and the traceback, to the writer's
+        # formatter.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # Called under the handler lock, so the counters need no lock of their own.
+        if self._unreported:
+            notice = logging.makeLogRecord({
+                "name": record.name,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Log queue full; dropped {self._unreported} log records.",
+            })
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                self._drop()
+                return
+            self._unreported = 0
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop()
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        self._unreported += 1
+
+
+class LogWriter(logging.handlers.QueueListener):
+    """The background thread writing queued records to the real handlers."""
+
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full when stopping; wait for room instead of
+        # failing, so everything queued before stop() is still written.
+        self.queue.put(self._sentinel)
+
+
+_listener: Optional[LogWriter] = None
+
+
+def dropped_records() -> int:
+    """How many log records were dropped because the log queue was full."""
+    for handler in logger.handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            return handler.dropped
+    return 0
+
+
+def _stop_listener() -> None:
+    # Flushes whatever is still queued; registered with atexit.
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def setup_logging(debug: bool = False) -> logging.Logger:
     """Set up logging with the specified debug level."""
     # Logger is now initialized at module level, just configure it
+    global _listener
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stderr)
-        formatter = logging.Formatter("[%(levelname)s] %(asctime)s - %(message)s")
-        handler.setFormatter(formatter)
+        stream = logging.StreamHandler(sys.stderr)
+        if log_format() == LOG_FORMAT_JSON:
+            stream.setFormatter(JsonLinesFormatter())
+        else:
+            stream.setFormatter(logging.Formatter("[%(levelname)s] %(asctime)s - %(message)s"))
+        size = _queue_size()
+        if size:
+            handler: logging.Handler = DroppingQueueHandler(queue.Queue(size))
+            _listener = LogWriter(handler.queue, stream)
+            _listener.start()
+            atexit.register(_stop_listener)
+        else:
+            # LOG_QUEUE_SIZE=0: write synchronously from the logging thread.
+            handler = stream
         logger.addHandler(handler)
     logger.setLevel(logging.DEBUG if debug else logging.INFO)
     logger.debug("Logging configured")
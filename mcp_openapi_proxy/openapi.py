@@ -3,22 +3,29 @@ OpenAPI specification handling for mcp-openapi-proxy.
 """
 
 import os
-import json
+import logging
 import re # Import the re module
+import threading
 import requests
 import yaml
 from typing import Dict, Optional, List, Union
 from urllib.parse import unquote, quote
 from mcp import types
-from mcp_openapi_proxy.utils import normalize_tool_name
-from .logging_setup import logger
+from mcp_openapi_proxy.utils import tool_name_normalizer
+from .config import current_config
+from .logging_setup import Payload, logger
+from . import json_codec
+from .plans import compile_plan
+from .refs import RefResolver
+from .registry import RegistryEntry, ToolRegistry, install_registry
+from .search import MODE_SEARCH, discovery_mode, index_for
 
 # Define the required tool name pattern
 TOOL_NAME_REGEX = r"^[a-zA-Z0-9_-]{1,64}$"
 
 def fetch_openapi_spec(url: str, retries: int = 3) -> Optional[Dict]:
     """Fetch and parse an OpenAPI specification from a URL with retries."""
-    logger.debug(f"Fetching OpenAPI spec from URL: {url}")
+    logger.debug("Fetching OpenAPI spec from URL: %s", url)
     attempt = 0
     while attempt < retries:
         try:
@@ -29,18 +36,19 @@ def fetch_openapi_spec(url: str, retries: int = 3) -> Optional[Dict]:
                 # Check IGNORE_SSL_SPEC env var
                 ignore_ssl_spec = os.getenv("IGNORE_SSL_SPEC", "false").lower() in ("true", "1", "yes")
                 verify_ssl_spec = not ignore_ssl_spec
-                logger.debug(f"Fetching spec with SSL verification: {verify_ssl_spec} (IGNORE_SSL_SPEC={ignore_ssl_spec})")
+                logger.debug("Fetching spec with SSL verification: %s (IGNORE_SSL_SPEC=%s)",
+                             verify_ssl_spec, ignore_ssl_spec)
                 response = requests.get(url, timeout=10, verify=verify_ssl_spec)
                 response.raise_for_status()
                 content = response.text
-            logger.debug(f"Fetched content length: {len(content)} bytes")
+            logger.debug("Fetched content length: %s bytes", len(content))
             try:
-                spec = json.loads(content)
-                logger.debug(f"Parsed as JSON from {url}")
-            except json.JSONDecodeError:
+                spec = json_codec.loads(content)
+                logger.debug("Parsed as JSON from %s", url)
+            except json_codec.JSONDecodeError:
                 try:
                     spec = yaml.safe_load(content)
-                    logger.debug(f"Parsed as YAML from {url}")
+                    logger.debug("Parsed as YAML from %s", url)
                 except yaml.YAMLError as ye:
                     logger.error(f"YAML parsing failed: {ye}. Raw content: {content[:500]}...")
                     return None
@@ -64,22 +72,30 @@ def fetch_openapi_spec(url: str, retries: int = 3) -> Optional[Dict]:
 
 def build_base_url(spec: Dict) -> Optional[str]:
     """Construct the base URL from the OpenAPI spec or override."""
-    override = os.getenv("SERVER_URL_OVERRIDE")
+    override = current_config().server_url_override
     if override:
         urls = [url.strip() for url in override.split(",")]
         for url in urls:
             if url.startswith("http://") or url.startswith("https://"):
-                logger.debug(f"SERVER_URL_OVERRIDE set, using first valid URL: {url}")
+                logger.debug("SERVER_URL_OVERRIDE set, using first valid URL: %s", url)
                 return url
         logger.error(f"No valid URLs found in SERVER_URL_OVERRIDE: {override}")
         return None
+    url = spec_base_url(spec)
+    if url is None:
+        logger.error("Could not determine base URL from spec (servers/host/schemes) or SERVER_URL_OVERRIDE.")
+    return url
 
+
+def spec_base_url(spec: Dict) -> Optional[str]:
+    """The base URL the spec itself declares (servers, or v2 host/schemes/
+    basePath), ignoring SERVER_URL_OVERRIDE."""
     if "servers" in spec and spec["servers"]:
          # Ensure servers is a list and has items before accessing index 0
          if isinstance(spec["servers"], list) and len(spec["servers"]) > 0 and isinstance(spec["servers"][0], dict):
               server_url = spec["servers"][0].get("url")
               if server_url:
-                  logger.debug(f"Using first server URL from spec: {server_url}")
+                  logger.debug("Using first server URL from spec: %s", server_url)
                   return server_url
               else:
                   logger.warning("First server entry in spec missing 'url' key.")
@@ -93,30 +109,29 @@ def build_base_url(spec: Dict) -> Optional[str]:
          host = spec.get("host")
          if host:
              v2_url = f"{scheme}://{host}{base_path}"
-             logger.debug(f"Using OpenAPI v2 host/schemes/basePath: {v2_url}")
+             logger.debug("Using OpenAPI v2 host/schemes/basePath: %s", v2_url)
              return v2_url
          else:
              logger.warning("OpenAPI v2 spec missing 'host'.")
-
-    logger.error("Could not determine base URL from spec (servers/host/schemes) or SERVER_URL_OVERRIDE.")
     return None
 
 def handle_auth(operation: Dict) -> Dict[str, str]:
     """Handle authentication based on environment variables and operation security."""
     headers = {}
-    api_key = os.getenv("API_KEY")
-    auth_type = os.getenv("API_AUTH_TYPE", "Bearer").lower()
+    config = current_config()
+    api_key = config.api_key
+    auth_type = config.auth_type.lower()
     if api_key:
         if auth_type == "bearer":
-            logger.debug(f"Using API_KEY as Bearer token.") # Avoid logging key prefix
+            logger.debug("Using API_KEY as Bearer token.") # Avoid logging key prefix
             headers["Authorization"] = f"Bearer {api_key}"
         elif auth_type == "basic":
             logger.warning("API_AUTH_TYPE is Basic, but Basic Auth is not fully implemented yet.")
             # Potentially add basic auth implementation here if needed
         elif auth_type == "api-key":
-            key_name = os.getenv("API_AUTH_HEADER", "Authorization")
+            key_name = config.auth_header
             headers[key_name] = api_key
-            logger.debug(f"Using API_KEY as API-Key in header '{key_name}'.") # Avoid logging key prefix
+            logger.debug("Using API_KEY as API-Key in header '%s'.", key_name) # Avoid logging key prefix
         else:
              logger.warning(f"Unsupported API_AUTH_TYPE: {auth_type}")
     # TODO: Add logic to check operation['security'] and spec['components']['securitySchemes']
@@ -130,39 +145,65 @@ _REGISTERED_OPERATIONS: Dict[str, Dict] = {}
 
 
 def register_functions(spec: Dict) -> List[types.Tool]:
-    """Register tools from OpenAPI spec."""
-    from .utils import is_tool_whitelisted, deduplicate_tool_name # Keep import here to avoid circular dependency if utils imports openapi
-
-    tools_list: List[types.Tool] = [] # Use a local list for registration
-    _REGISTERED_OPERATIONS.clear()
+    """Register tools from OpenAPI spec and return them all (built eagerly;
+    the low-level server installs a lazy registry instead)."""
+    registry = build_registry(spec)
+    install_tool_registry(registry)
+    return _publish_tools(registry.tools)
+
+
+def build_registry(spec: Dict) -> ToolRegistry:
+    """Build the tools and invocation plans for a spec without publishing
+    them, so a refresh can do the work off the event loop."""
+    # Keep import here to avoid circular dependency if utils imports openapi
+    from .utils import whitelist_matcher, deduplicate_tool_name
+
+    # Name -> (Tool, invocation plan): the dispatchers' lookup index once
+    # installed (see registry.py).
+    entries: Dict[str, RegistryEntry] = {}
     logger.debug("Starting tool registration from OpenAPI spec.")
     if not spec:
         logger.error("OpenAPI spec is None or empty during registration.")
-        return tools_list
+        return ToolRegistry(entries)
     if 'paths' not in spec:
         logger.error("No 'paths' key in OpenAPI spec during registration.")
-        return tools_list
+        return ToolRegistry(entries)
 
-    logger.debug(f"Available paths in spec: {list(spec['paths'].keys())}")
-    # Filter paths based on whitelist *before* iterating
-    # Note: is_tool_whitelisted expects the path string
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Available paths in spec: %s", Payload(list(spec['paths'].keys())))
+    # Filter paths based on whitelist *before* iterating, with TOOL_WHITELIST
+    # compiled once for every path
+    whitelist = whitelist_matcher()
     filtered_paths = {
         path: item
         for path, item in spec['paths'].items()
-        if is_tool_whitelisted(path)
+        if whitelist.matches(path)
     }
-    logger.debug(f"Paths after whitelist filtering: {list(filtered_paths.keys())}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Paths after whitelist filtering: %s", Payload(list(filtered_paths.keys())))
 
     if not filtered_paths:
         logger.warning("No whitelisted paths found in OpenAPI spec after filtering. No tools will be registered.")
-        return tools_list
+        return ToolRegistry(entries)
 
     registered_names = set() # Keep track of names to detect duplicates
+    # Resolved once for every plan; SERVER_URL_OVERRIDE is applied per call.
+    base_url = spec_base_url(spec)
+    if base_url is None and current_config().server_url is None:
+        logger.error("Could not determine base URL from spec (servers/host/schemes) or SERVER_URL_OVERRIDE.")
+    # One resolver for the whole spec: each component is resolved once and
+    # the result shared by every operation that references it.
+    resolver = RefResolver(spec)
+    lock = threading.Lock()
+    # TOOL_NAME_PREFIX / TOOL_NAME_MAX_LENGTH read once for every operation
+    normalize = tool_name_normalizer()
 
     for path, path_item in filtered_paths.items():
+        path_item = resolver.deref(path_item)
         if not path_item or not isinstance(path_item, dict):
-            logger.debug(f"Skipping empty or invalid path item for {path}")
+            logger.debug("Skipping empty or invalid path item for %s", path)
             continue
+        path_params = _deref_parameters(resolver, path_item.get('parameters', []))
         for method, operation in path_item.items():
             # Check if method is a valid HTTP verb and operation is a dictionary
             if method.lower() not in ['get', 'post', 'put', 'delete', 'patch', 'options', 'head', 'trace'] or not isinstance(operation, dict):
@@ -170,7 +211,7 @@ def register_functions(spec: Dict) -> List[types.Tool]:
                 continue
             try:
                 raw_name = f"{method.upper()} {path}"
-                function_name = normalize_tool_name(raw_name)
+                function_name = normalize(raw_name)
 
                 # --- Add Regex Validation Step ---
                 if not re.match(TOOL_NAME_REGEX, function_name):
@@ -193,137 +234,191 @@ def register_functions(spec: Dict) -> List[types.Tool]:
                         )
                         continue # Skip this tool
 
-                description = operation.get('summary', operation.get('description', 'No description available'))
-                # Ensure description is a string
-                if not isinstance(description, str):
-                    logger.warning(f"Description for {function_name} is not a string, using default.")
-                    description = "No description available"
-
-                # --- Build Input Schema ---
-                input_schema = {
-                    "type": "object",
-                    "properties": {},
-                    "required": [],
-                    "additionalProperties": False # Explicitly set additionalProperties to False
-                }
-                # Process parameters defined directly under the operation
-                op_params = operation.get('parameters', [])
-                # Process parameters defined at the path level (common parameters)
-                path_params = path_item.get('parameters', [])
-                # Combine parameters, giving operation-level precedence if names clash (though unlikely per spec)
-                all_params = {p.get('name'): p for p in path_params if isinstance(p, dict) and p.get('name')}
-                all_params.update({p.get('name'): p for p in op_params if isinstance(p, dict) and p.get('name')})
-
-                for param_name, param_details in all_params.items():
-                    if not param_name or not isinstance(param_details, dict):
-                        continue # Skip invalid parameter definitions
-
-                    param_in = param_details.get('in')
-                    # We primarily care about 'path' and 'query' for simple input schema generation
-                    # Body parameters are handled differently (often implicitly the whole input)
-                    if param_in in ['path', 'query']:
-                        param_schema = param_details.get('schema', {})
-                        prop_type = param_schema.get('type', 'string')
-                        # Basic type mapping, default to string
-                        schema_type = prop_type if prop_type in ['string', 'integer', 'boolean', 'number', 'array'] else 'string'
-
-                        input_schema['properties'][param_name] = {
-                            "type": schema_type,
-                            "description": param_details.get('description', f"{param_in} parameter {param_name}")
-                        }
-                        # Arrays must carry an items schema (required by JSON Schema
-                        # consumers such as the OpenAI API); fall back to string items.
-                        if schema_type == 'array':
-                            items_schema = param_schema.get('items')
-                            if not isinstance(items_schema, dict) or not items_schema:
-                                items_schema = {"type": "string"}
-                            input_schema['properties'][param_name]['items'] = items_schema
-                        # Add format if available
-                        if param_schema.get('format'):
-                             input_schema['properties'][param_name]['format'] = param_schema.get('format')
-                        # Add enum if available
-                        if param_schema.get('enum'):
-                             input_schema['properties'][param_name]['enum'] = param_schema.get('enum')
-
-                        if param_details.get('required', False):
-                            # Only add to required if not already present (e.g., from path template)
-                            if param_name not in input_schema['required']:
-                                input_schema['required'].append(param_name)
-
-                # Add path parameters derived from the path template itself (e.g., /users/{id})
-                # These are always required and typically strings
-                template_params = re.findall(r"\{([^}]+)\}", path)
-                for tp_name in template_params:
-                     if tp_name not in input_schema['properties']:
-                          input_schema['properties'][tp_name] = {
-                               "type": "string", # Path params are usually strings
-                               "description": f"Path parameter '{tp_name}'"
-                          }
-                     if tp_name not in input_schema['required']:
-                          input_schema['required'].append(tp_name)
-
-
-                # Handle request body (for POST, PUT, PATCH)
-                request_body = operation.get('requestBody')
-                if request_body and isinstance(request_body, dict):
-                     content = request_body.get('content')
-                     if content and isinstance(content, dict):
-                          # Prefer application/json if available
-                          json_content = content.get('application/json')
-                          if json_content and isinstance(json_content, dict) and 'schema' in json_content:
-                               body_schema = json_content['schema']
-                               # If body schema is object with properties, merge them
-                               if body_schema.get('type') == 'object' and 'properties' in body_schema:
-                                    for prop_name, prop_schema in body_schema['properties'].items():
-                                         if isinstance(prop_schema, dict) and prop_schema.get('type') == 'array' and not isinstance(prop_schema.get('items'), dict):
-                                              # Ensure array properties carry items (required by
-                                              # consumers such as the OpenAI API).
-                                              prop_schema = dict(prop_schema)
-                                              prop_schema['items'] = {"type": "string"}
-                                         input_schema['properties'][prop_name] = prop_schema
-                                    if 'required' in body_schema and isinstance(body_schema['required'], list):
-                                         # Add required body properties, avoiding duplicates
-                                         for req_prop in body_schema['required']:
-                                              if req_prop not in input_schema['required']:
-                                                   input_schema['required'].append(req_prop)
-                               # If body schema is not an object or has no properties,
-                               # maybe represent it as a single 'body' parameter? Needs decision.
-                               # else:
-                               #    input_schema['properties']['body'] = body_schema
-                               #    if request_body.get('required', False):
-                               #         input_schema['required'].append('body')
-
-
-                # Create and register the tool
-                tool = types.Tool(
-                    name=function_name,
-                    description=description,
-                    inputSchema=input_schema,
-                )
-                tools_list.append(tool)
+                # Parameters may be $refs to components.parameters; the plan
+                # and the lookup table see the dereferenced ones.
+                if 'parameters' in operation:
+                    operation = dict(operation, parameters=_deref_parameters(resolver, operation.get('parameters', [])))
+                # The name index and the plan are built now; the Tool and its
+                # input schema only when the tool is first listed or called.
                 registered_names.add(function_name)
-                _REGISTERED_OPERATIONS[function_name] = {
-                    "path": path,
-                    "method": method.upper(),
-                    "operation": operation,
-                    "original_path": path,
-                }
-                logger.debug(f"Registered tool: {function_name} from {raw_name}") # Simplified log
+                entries[function_name] = RegistryEntry.lazy(
+                    compile_plan(function_name, method, path, operation, {'parameters': path_params}, base_url),
+                    _tool_factory(function_name, path, operation, path_params, resolver, lock),
+                )
+                logger.debug("Registered tool: %s from %s", function_name, raw_name) # Simplified log
 
             except Exception as e:
                 logger.error(f"Error registering function for {method.upper()} {path}: {e}", exc_info=True)
 
-    logger.info(f"Successfully registered {len(tools_list)} tools from OpenAPI spec.")
-
-    # Update the global/shared tools list if necessary (depends on server implementation)
-    # Example for lowlevel server:
+    logger.info("Successfully registered %s tools from OpenAPI spec.", len(entries))
+    registry = ToolRegistry(entries)
+    if discovery_mode() == MODE_SEARCH:
+        # Built here, off the event loop, rather than on the first search.
+        index_for(registry)
+    return registry
+
+
+def _deref_parameters(resolver: RefResolver, params) -> List[Dict]:
+    """A parameters list with each ``$ref`` entry replaced by its target."""
+    if not isinstance(params, list):
+        return []
+    return [resolver.deref(p) for p in params]
+
+
+def _build_tool(
+    function_name: str, path: str, operation: Dict, path_params: List[Dict], resolver: RefResolver
+) -> types.Tool:
+    """Build one tool's description and input schema. Called on first use of
+    the tool (listing or calling it), not at registration."""
+    description = operation.get('summary', operation.get('description', 'No description available'))
+    # Ensure description is a string
+    if not isinstance(description, str):
+        logger.warning(f"Description for {function_name} is not a string, using default.")
+        description = "No description available"
+
+    # --- Build Input Schema ---
+    input_schema = {
+        "type": "object",
+        "properties": {},
+        "required": [],
+        "additionalProperties": False # Explicitly set additionalProperties to False
+    }
+    # Combine parameters, giving operation-level precedence if names clash (though unlikely per spec)
+    all_params = {p.get('name'): p for p in path_params if isinstance(p, dict) and p.get('name')}
+    all_params.update({p.get('name'): p for p in operation.get('parameters', []) if isinstance(p, dict) and p.get('name')})
+
+    for param_name, param_details in all_params.items():
+        if not param_name or not isinstance(param_details, dict):
+            continue # Skip invalid parameter definitions
+
+        param_in = param_details.get('in')
+        # We primarily care about 'path' and 'query' for simple input schema generation
+        # Body parameters are handled differently (often implicitly the whole input)
+        if param_in in ['path', 'query']:
+            param_schema = resolver.resolve(param_details.get('schema', {}))
+            if not isinstance(param_schema, dict):
+                param_schema = {}
+            prop_type = param_schema.get('type', 'string')
+            # Basic type mapping, default to string
+            schema_type = prop_type if prop_type in ['string', 'integer', 'boolean', 'number', 'array'] else 'string'
+
+            input_schema['properties'][param_name] = {
+                "type": schema_type,
+                "description": param_details.get('description', f"{param_in} parameter {param_name}")
+            }
+            # Arrays must carry an items schema (required by JSON Schema
+            # consumers such as the OpenAI API); fall back to string items.
+            if schema_type == 'array':
+                items_schema = param_schema.get('items')
+                if not isinstance(items_schema, dict) or not items_schema:
+                    items_schema = {"type": "string"}
+                input_schema['properties'][param_name]['items'] = items_schema
+            # Add format if available
+            if param_schema.get('format'):
+                 input_schema['properties'][param_name]['format'] = param_schema.get('format')
+            # Add enum if available
+            if param_schema.get('enum'):
+                 input_schema['properties'][param_name]['enum'] = param_schema.get('enum')
+
+            if param_details.get('required', False):
+                # Only add to required if not already present (e.g., from path template)
+                if param_name not in input_schema['required']:
+                    input_schema['required'].append(param_name)
+
+    # Add path parameters derived from the path template itself (e.g., /users/{id})
+    # These are always required and typically strings
+    template_params = re.findall(r"\{([^}]+)\}", path)
+    for tp_name in template_params:
+         if tp_name not in input_schema['properties']:
+              input_schema['properties'][tp_name] = {
+                   "type": "string", # Path params are usually strings
+                   "description": f"Path parameter '{tp_name}'"
+              }
+         if tp_name not in input_schema['required']:
+              input_schema['required'].append(tp_name)
+
+
+    # Handle request body (for POST, PUT, PATCH)
+    request_body = resolver.deref(operation.get('requestBody'))
+    if request_body and isinstance(request_body, dict):
+         content = request_body.get('content')
+         if content and isinstance(content, dict):
+              # Prefer application/json if available
+              json_content = content.get('application/json')
+              if json_content and isinstance(json_content, dict) and 'schema' in json_content:
+                   body_schema = resolver.resolve(json_content['schema'])
+                   if not isinstance(body_schema, dict):
+                        body_schema = {}
+                   # If body schema is object with properties, merge them
+                   if body_schema.get('type') == 'object' and 'properties' in body_schema:
+                        for prop_name, prop_schema in body_schema['properties'].items():
+                             is_array = isinstance(prop_schema, dict) and prop_schema.get('type') == 'array'
+                             if is_array and not isinstance(prop_schema.get('items'), dict):
+                                  # Ensure array properties carry items (required by
+                                  # consumers such as the OpenAI API).
+                                  prop_schema = dict(prop_schema)
+                                  prop_schema['items'] = {"type": "string"}
+                             input_schema['properties'][prop_name] = prop_schema
+                        if 'required' in body_schema and isinstance(body_schema['required'], list):
+                             # Add required body properties, avoiding duplicates
+                             for req_prop in body_schema['required']:
+                                  if req_prop not in input_schema['required']:
+                                       input_schema['required'].append(req_prop)
+                   # If body schema is not an object or has no properties,
+                   # maybe represent it as a single 'body' parameter? Needs decision.
+                   # else:
+                   #    input_schema['properties']['body'] = body_schema
+                   #    if request_body.get('required', False):
+                   #         input_schema['required'].append('body')
+
+    return types.Tool(
+        name=function_name,
+        description=description,
+        inputSchema=input_schema,
+    )
+
+
+def _tool_factory(function_name: str, path: str, operation: Dict, path_params: List[Dict],
+                  resolver: RefResolver, lock: threading.Lock):
+    def build() -> types.Tool:
+        # The resolver is shared by every tool of the registry and is not
+        # thread-safe; tools may be built from worker threads.
+        with lock:
+            try:
+                return _build_tool(function_name, path, operation, path_params, resolver)
+            except Exception as e:
+                logger.error(f"Error building input schema for {function_name}: {e}", exc_info=True)
+                return types.Tool(name=function_name, description="No description available",
+                                  inputSchema={"type": "object", "properties": {}, "required": [],
+                                               "additionalProperties": False})
+    return build
+
+
+def install_tool_registry(registry: ToolRegistry) -> None:
+    """Publish a registry (freshly built, or loaded from a snapshot, see
+    snapshot.py): swap in the dispatchers' lookup index. Tools are not built
+    here; list_tools builds them from the registry on demand."""
+    global _REGISTERED_OPERATIONS
+    operations: Dict[str, Dict] = {}
+    for name in registry.names():
+        plan = registry.get(name).plan
+        operations[name] = {
+            "path": plan.path,
+            "method": plan.method,
+            "operation": plan.operation,
+            "original_path": plan.path,
+        }
+    _REGISTERED_OPERATIONS = operations
+    install_registry(registry)
+    _publish_tools([])
+
+
+def _publish_tools(tools_list: List[types.Tool]) -> List[types.Tool]:
     from . import server_lowlevel
     if hasattr(server_lowlevel, 'tools'):
          logger.debug("Updating server_lowlevel.tools list.")
          server_lowlevel.tools.clear()
          server_lowlevel.tools.extend(tools_list)
-    # Add similar logic if needed for fastmcp server or remove if registration happens differently there
-
     return tools_list # Return the list of registered tools
 
 def lookup_operation_details(function_name: str, spec: Dict) -> Union[Dict, None]:
@@ -342,6 +437,7 @@ def lookup_operation_details(function_name: str, spec: Dict) -> Union[Dict, None
     # Pre-compile regex for faster matching if called frequently (though likely not needed here)
     # TOOL_NAME_REGEX_COMPILED = re.compile(TOOL_NAME_REGEX)
 
+    normalize = tool_name_normalizer()
     for path, path_item in spec['paths'].items():
          if not isinstance(path_item, dict): continue # Skip invalid path items
          for method, operation in path_item.items():
@@ -349,7 +445,7 @@ def lookup_operation_details(function_name: str, spec: Dict) -> Union[Dict, None
                  continue
              raw_name = f"{method.upper()} {path}"
              # Regenerate the name using the exact same logic as registration
-             current_function_name = normalize_tool_name(raw_name)
+             current_function_name = normalize(raw_name)
 
              # Validate the looked-up name matches the required pattern *before* comparing
              # This ensures we don't accidentally match an invalid name during lookup
@@ -359,7 +455,7 @@ def lookup_operation_details(function_name: str, spec: Dict) -> Union[Dict, None
                   continue # Skip potentially invalid names
 
              if current_function_name == function_name:
-                 logger.debug(f"Found operation details for '{function_name}' at {method.upper()} {path}")
+                 logger.debug("Found operation details for '%s' at %s %s", function_name, method.upper(), path)
                  return {"path": path, "method": method.upper(), "operation": operation, "original_path": path}
 
     logger.warning(f"Could not find operation details for function name: '{function_name}'")
@@ -0,0 +1,170 @@
+"""
+Precompiled per-operation invocation plans for mcp-openapi-proxy.
+
+register_functions compiles one immutable OperationPlan per registered tool,
+so a tool call only has to execute the plan: everything derivable from the
+spec (merged parameters, path template, server URL, body strategy) is worked
+out once at registration time instead of on every call. SERVER_URL_OVERRIDE
+is not compiled in: it comes from the runtime config on each call, so
+reload_config() reaches registered tools.
+"""
+
+import re
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Mapping, NamedTuple, Optional, Tuple
+
+from .config import current_config
+from .logging_setup import logger
+
+_PLACEHOLDER = re.compile(r"\{([^}]+)\}")
+
+BODY_QUERY = "query"  # GET: arguments become query parameters
+BODY_JSON = "json"    # everything else: arguments become the JSON body
+
+
+class InvocationError(ValueError):
+    """A tool call cannot be turned into an upstream request. The message is
+    returned to the client as the tool result text."""
+
+
+class PreparedRequest(NamedTuple):
+    method: str
+    url: str
+    headers: Dict[str, str]
+    params: Optional[Dict[str, Any]]
+    json: Optional[Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class PathTemplate:
+    """A path such as ``/repos/{owner}/{repo}`` compiled once into a
+    positional format string (``/repos/{0}/{1}``) plus placeholder names, so
+    rendering is a single C-level ``str.format`` call."""
+
+    fmt: str
+    placeholders: Tuple[str, ...]
+
+    @classmethod
+    def compile(cls, path: str) -> "PathTemplate":
+        parts = _PLACEHOLDER.split(path)
+        literals = [part.replace("{", "{{").replace("}", "}}") for part in parts[0::2]]
+        names = tuple(parts[1::2])
+        fmt = literals[0] + "".join(f"{{{i}}}{literal}" for i, literal in enumerate(literals[1:]))
+        return cls(fmt, names)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """Substitute placeholders; raises KeyError for a missing value, like
+        ``str.format(**values)`` did."""
+        if not self.placeholders:
+            return self.fmt.format()
+        return self.fmt.format(*[values[name] for name in self.placeholders])
+
+
+def query_value(value: Any) -> Any:
+    """A query parameter value encoded the way requests did: booleans as
+    ``True`` / ``False`` (httpx would send ``true``), None items dropped."""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [query_value(item) for item in value if item is not None]
+    return value
+
+
+@dataclass(frozen=True)
+class OperationPlan:
+    tool_name: str
+    method: str
+    path: str
+    base_url: Optional[str]
+    template: PathTemplate
+    param_locations: Mapping[str, str]
+    required_path: FrozenSet[str]
+    static_headers: Mapping[str, str]
+    body_strategy: str
+    operation: Mapping[str, Any] = field(repr=False, compare=False)
+
+    def prepare(
+        self,
+        arguments: Mapping[str, Any],
+        parameters: Dict[str, Any],
+        headers: Mapping[str, str],
+    ) -> PreparedRequest:
+        """Build the upstream request for one call.
+
+        ``arguments`` are the raw tool arguments (used for the required-path
+        check), ``parameters`` the arguments after STRIP_PARAM (consumed by
+        this call), ``headers`` the per-call auth/extra headers. The base URL
+        is SERVER_URL_OVERRIDE when set, else the spec's server.
+        """
+        try:
+            path = self.template.render(parameters)
+        except KeyError as e:
+            raise InvocationError(f"Missing parameter: {e}") from None
+        for name in self.required_path:
+            if name not in arguments:
+                missing = sorted(n for n in self.required_path if n not in arguments)
+                raise InvocationError(f"Missing required path parameters: {missing}")
+        base_url = current_config().server_url
+        if base_url is None:
+            base_url = self.base_url
+        if not base_url:
+            raise InvocationError("No base URL defined in spec or SERVER_URL_OVERRIDE")
+        if self.static_headers:
+            headers = {**headers, **self.static_headers}
+        else:
+            headers = dict(headers)
+        if self.body_strategy == BODY_QUERY:
+            for key in self.template.placeholders:
+                parameters.pop(key, None)
+            # requests left out None values; httpx would send ``?key=``.
+            query = {key: query_value(value) for key, value in parameters.items() if value is not None}
+            return PreparedRequest(self.method, base_url + path, headers, query, None)
+        return PreparedRequest(self.method, base_url + path, headers, None, parameters)
+
+
+def merged_parameters(path_item: Mapping[str, Any], operation: Mapping[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Path-item parameters overridden by operation parameters, keyed by name."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for source in (path_item.get("parameters", []), operation.get("parameters", [])):
+        if not isinstance(source, list):
+            continue
+        for param in source:
+            if isinstance(param, dict) and param.get("name"):
+                merged[param["name"]] = param
+    return merged
+
+
+def compile_plan(
+    tool_name: str,
+    method: str,
+    path: str,
+    operation: Mapping[str, Any],
+    path_item: Mapping[str, Any],
+    base_url: Optional[str],
+) -> OperationPlan:
+    """Compile the invocation plan for one operation."""
+    method = method.upper()
+    params = merged_parameters(path_item if isinstance(path_item, dict) else {}, operation)
+    locations = {name: str(p.get("in", "")) for name, p in params.items()}
+    required_path = frozenset(
+        name for name, p in params.items() if p.get("in") == "path" and p.get("required", False)
+    )
+    body_strategy = BODY_QUERY if method == "GET" else BODY_JSON
+    static_headers = {} if body_strategy == BODY_QUERY else {"Content-Type": "application/json"}
+    # Joined as base + "/" + path without duplicate slashes, as before.
+    normalized_path = "/" + path.lstrip("/")
+    plan = OperationPlan(
+        tool_name=tool_name,
+        method=method,
+        path=path,
+        base_url=base_url.rstrip("/") if base_url else None,
+        template=PathTemplate.compile(normalized_path),
+        param_locations=MappingProxyType(locations),
+        required_path=required_path,
+        static_headers=MappingProxyType(static_headers),
+        body_strategy=body_strategy,
+        operation=operation,
+    )
+    logger.debug("Compiled invocation plan for %s: %s %s", tool_name, method, path)
+    return plan
@@ -0,0 +1,289 @@
+"""
+Client-side rate limiting for upstream APIs.
+
+Slack, Asana, Notion and VirusTotal enforce strict quotas; firing requests as
+fast as agents ask only turns into 429 errors. The pool in http_client takes
+a token from a TokenBucket before every attempt: one bucket per upstream
+origin, plus one per operation group (tools matching a RATE_LIMITS pattern).
+A call that finds its bucket empty waits for its turn, up to
+UPSTREAM_RATE_MAX_WAIT (and its own deadline); past that it fails with
+RateLimitedError instead of being sent.
+
+Buckets are seeded from configuration and adapt to what the upstream says:
+- ``Retry-After`` (on any response) and a 429 without it pause the bucket.
+- ``X-RateLimit-Remaining`` / ``RateLimit-Remaining`` with the matching
+  ``*-Reset`` header: none left pauses the bucket until the reset; otherwise
+  calls are paced so the remaining quota lasts until the reset, if that is
+  slower than the configured rate.
+  ``*-Reset`` may be seconds from now or a Unix timestamp.
+
+Tuning:
+- UPSTREAM_RATE_LIMIT: requests per second per origin (default 0: no limit
+  until the upstream's headers set one).
+- UPSTREAM_RATE_BURST: requests that may go out back to back (default: one
+  second's worth, at least 1).
+- UPSTREAM_RATE_MAX_WAIT: longest a call queues for a token, in seconds
+  (default 10).
+- RATE_LIMITS: comma-separated ``key=rate`` or ``key=rate/burst`` entries. A
+  key with a dot is a host (``api.notion.com=3``); any other key is a
+  tool-name pattern (``post_chat_*=1``) and the tools matching it share one
+  bucket, on top of their origin's.
+"""
+
+import fnmatch
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from .logging_setup import logger
+from .retry import retry_after_seconds
+
+# A 429 that does not say how long to back off pauses the bucket this long.
+DEFAULT_PAUSE = 1.0
+# Reset values above this are Unix timestamps rather than delays.
+_EPOCH_THRESHOLD = 1e9
+
+Limit = Tuple[float, int]  # (requests per second, burst)
+
+
+def default_burst(rate: float) -> int:
+    return max(1, math.ceil(rate))
+
+
+def parse_limit(value: str) -> Limit:
+    """``rate`` or ``rate/burst``; raises ValueError."""
+    rate_text, _, burst_text = value.partition("/")
+    rate = float(rate_text)
+    burst = int(burst_text) if burst_text.strip() else default_burst(rate)
+    if not rate > 0 or burst < 1 or math.isinf(rate):
+        raise ValueError(value)
+    return rate, burst
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    rate: float = 0.0
+    burst: int = 0
+    max_wait: float = 10.0
+    hosts: Mapping[str, Limit] = field(default_factory=dict)
+    groups: Tuple[Tuple[str, Limit], ...] = ()
+
+    @classmethod
+    def from_env(cls) -> "RateLimitConfig":
+        defaults = cls()
+
+        def read(name: str, default, cast):
+            raw = os.getenv(name)
+            if raw is None or not raw.strip():
+                return default
+            try:
+                value = cast(raw)
+                if value < 0:
+                    raise ValueError
+                return value
+            except ValueError:
+                logger.warning(f"Invalid {name} env var: {raw}. Using default {default}.")
+                return default
+
+        hosts: Dict[str, Limit] = {}
+        groups: List[Tuple[str, Limit]] = []
+        for item in (os.getenv("RATE_LIMITS") or "").split(","):
+            if not item.strip():
+                continue
+            key, sep, value = item.partition("=")
+            key = key.strip()
+            try:
+                if not sep or not key:
+                    raise ValueError(item)
+                limit = parse_limit(value)
+            except ValueError:
+                logger.warning(f"Skipping malformed RATE_LIMITS entry (expected key=rate[/burst]): '{item.strip()}'")
+                continue
+            if "." in key:
+                hosts[key.lower()] = limit
+            else:
+                groups.append((key, limit))
+        return cls(
+            rate=read("UPSTREAM_RATE_LIMIT", defaults.rate, float),
+            burst=read("UPSTREAM_RATE_BURST", defaults.burst, int),
+            max_wait=read("UPSTREAM_RATE_MAX_WAIT", defaults.max_wait, float),
+            hosts=hosts,
+            groups=tuple(groups),
+        )
+
+    def origin_limit(self, origin: str) -> Optional[Limit]:
+        limit = self.hosts.get((urlsplit(origin).hostname or "").lower())
+        if limit is None and self.rate > 0:
+            limit = (self.rate, self.burst or default_burst(self.rate))
+        return limit
+
+    def group_of(self, tool: Optional[str]) -> Optional[Tuple[str, Limit]]:
+        """The first RATE_LIMITS pattern ``tool`` matches."""
+        if tool:
+            for pattern, limit in self.groups:
+                if fnmatch.fnmatchcase(tool, pattern):
+                    return pattern, limit
+        return None
+
+
+class RateLimitedError(httpx.TransportError):
+    """The call would have had to queue longer than it may: not sent."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Rate limit for {name} reached; next slot in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """A token bucket kept as the time its queue frees up (GCRA), so a call
+    can reserve a future slot and sleep until then. ``rate=None`` means no
+    limit of its own; pauses still apply. Not thread-safe by itself: the
+    RateLimiter serializes access."""
+
+    def __init__(self, name: str, limit: Optional[Limit]):
+        self.name = name
+        self.configured = limit
+        self.rate, self.burst = limit if limit else (None, 1)
+        self.adapted_until = 0.0  # header-derived pacing lapses at the reset
+        self.paused_until = 0.0
+        self._tat = 0.0  # theoretical arrival time of the next request
+        self.waits = 0
+        self.rejected = 0
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available, without taking it."""
+        if self.adapted_until and now >= self.adapted_until:
+            self.rate, self.burst = self.configured if self.configured else (None, 1)
+            self.adapted_until = 0.0
+        ready = self.paused_until
+        if self.rate:
+            ready = max(ready, self._tat - (self.burst - 1) / self.rate)
+        return max(ready - now, 0.0)
+
+    def take(self, now: float, delay: float) -> None:
+        if self.rate:
+            self._tat = max(self._tat, now + delay) + 1 / self.rate
+        if delay:
+            self.waits += 1
+
+    def pause(self, now: float, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, now + seconds)
+
+    def pace(self, now: float, remaining: int, reset: float) -> None:
+        """Spread ``remaining`` requests over the ``reset`` seconds left in
+        the upstream's window, when that is slower than the current rate."""
+        if remaining <= 0:
+            self.pause(now, reset)
+            return
+        rate = remaining / reset
+        if self.rate is None or rate < self.rate:
+            self.rate = rate
+            self.burst = max(1, min(remaining, max(self.burst, default_burst(rate))))
+            self.adapted_until = now + reset
+
+    def stats(self) -> Dict[str, object]:
+        now = time.monotonic()
+        return {
+            "rate": round(self.rate, 3) if self.rate else None,
+            "burst": self.burst,
+            "paused_for": round(max(self.paused_until - now, 0.0), 2),
+            "queued": self.waits,
+            "rejected": self.rejected,
+        }
+
+
+def _header_number(headers: httpx.Headers, *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                # RateLimit-* may carry several comma-separated policies; the first applies.
+                return float(value.split(",")[0].split(";")[0])
+            except ValueError:
+                return None
+    return None
+
+
+class RateLimiter:
+    """The buckets of every origin and operation group, behind one lock."""
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._routes: Dict[Tuple[str, Optional[str]], Tuple[TokenBucket, ...]] = {}
+        self._lock = threading.Lock()
+
+    def buckets(self, origin: str, tool: Optional[str]) -> Tuple[TokenBucket, ...]:
+        """The buckets a call to ``origin`` for ``tool`` draws from, origin
+        first."""
+        route = self._routes.get((origin, tool))
+        if route is not None:
+            return route
+        with self._lock:
+            origin_bucket = self._bucket(origin, self.config.origin_limit(origin))
+            group = self.config.group_of(tool)
+            if group is None:
+                route = (origin_bucket,)
+            else:
+                route = (origin_bucket, self._bucket(f"{origin} {group[0]}", group[1]))
+            self._routes[(origin, tool)] = route
+        return route
+
+    def _bucket(self, name: str, limit: Optional[Limit]) -> TokenBucket:
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = TokenBucket(name, limit)
+        return bucket
+
+    def reserve(self, buckets: Tuple[TokenBucket, ...], max_wait: float) -> float:
+        """Take a token from every bucket, returning how long to wait before
+        sending. Raises RateLimitedError, taking nothing, when that is longer
+        than ``max_wait``."""
+        with self._lock:
+            now = time.monotonic()
+            delays = [bucket.delay(now) for bucket in buckets]
+            wait = max(delays)
+            if wait > max_wait:
+                slowest = buckets[delays.index(wait)]
+                slowest.rejected += 1
+                raise RateLimitedError(slowest.name, wait)
+            for bucket in buckets:
+                bucket.take(now, wait)
+        return wait
+
+    def observe(self, buckets: Tuple[TokenBucket, ...], response: httpx.Response) -> None:
+        """Adapt the most specific bucket to the response's rate-limit
+        headers."""
+        headers = response.headers
+        retry_after = headers.get("retry-after")
+        remaining = _header_number(headers, "x-ratelimit-remaining", "ratelimit-remaining")
+        if retry_after is None and remaining is None and response.status_code != 429:
+            return
+        bucket = buckets[-1]
+        with self._lock:
+            now = time.monotonic()
+            pause = retry_after_seconds(retry_after)
+            if pause is not None:
+                bucket.pause(now, pause)
+            elif response.status_code == 429 and remaining is None:
+                bucket.pause(now, DEFAULT_PAUSE)
+            if remaining is not None:
+                reset = _header_number(headers, "x-ratelimit-reset-after", "x-ratelimit-reset", "ratelimit-reset")
+                if reset is not None and reset > _EPOCH_THRESHOLD:
+                    reset -= time.time()
+                if reset is not None and reset > 0:
+                    bucket.pace(now, int(remaining), reset)
+        if pause or response.status_code == 429:
+            logger.info("Upstream rate limit for %s: pausing %.2fs", bucket.name,
+                        max(bucket.paused_until - now, 0.0))
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {name: bucket.stats() for name, bucket in self._buckets.items()}
@@ -0,0 +1,167 @@
+"""
+Local $ref resolution for mcp-openapi-proxy.
+
+build_registry resolves the ``$ref``s it meets (parameters, request bodies,
+schemas) through one RefResolver per spec:
+
+- Lazy: only pointers reachable from a registered operation are resolved.
+- Memoized per pointer: a component used by many operations is resolved
+  once, and every operation gets the *same* resolved object. Nothing is
+  deep-copied; subtrees without refs are returned as-is. Resolved values
+  are therefore shared and must be treated as read-only.
+- Cycle-safe: a reference back into a schema that is still being resolved
+  (``Node.children.items -> Node``) becomes a placeholder instead of
+  recursing forever.
+
+Only local refs (``#/...``) are followed. External refs (``other.yaml#/X``)
+and pointers that do not resolve are left in place and logged.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from .logging_setup import logger
+
+_UNRESOLVED = object()
+_NO_CYCLE = float("inf")
+
+
+def _pointer_parts(pointer: str) -> List[str]:
+    """Split a local JSON pointer ("#/a/b~1c") into unescaped tokens."""
+    return [unquote(part).replace("~1", "/").replace("~0", "~") for part in pointer[2:].split("/")]
+
+
+class RefResolver:
+    """Resolve local ``$ref``s in one spec. Not thread-safe; build one per
+    registration."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self._spec = spec
+        # pointer -> fully resolved value, shared by every use of the pointer
+        self._memo: Dict[str, Any] = {}
+        # pointers being resolved, in order; a ref to one of these is a cycle
+        self._stack: List[str] = []
+        self._stack_index: Dict[str, int] = {}
+        # pointer -> (value, cycle) for values that refer back into the
+        # stack: reusable until the pointer they refer to is popped. Keeps
+        # mutually recursive schemas linear instead of exponential.
+        self._scoped: Dict[str, Tuple[Any, float]] = {}
+        self._scoped_at: List[List[str]] = []
+        self._placeholders: Dict[str, Dict[str, Any]] = {}
+
+    def lookup(self, pointer: str) -> Any:
+        """The raw value at a local JSON pointer, or None if it is missing."""
+        node: Any = self._spec
+        for part in _pointer_parts(pointer):
+            if isinstance(node, dict):
+                node = node.get(part, _UNRESOLVED)
+            elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+                node = node[int(part)]
+            else:
+                node = _UNRESOLVED
+            if node is _UNRESOLVED:
+                return None
+        return node
+
+    def deref(self, node: Any) -> Any:
+        """Follow ``node``'s own ``$ref`` chain (not nested ones), e.g. to
+        read a parameter's ``name`` and ``in``. Unresolvable refs and cycles
+        return ``node`` unchanged."""
+        seen = set()
+        while isinstance(node, dict) and isinstance(node.get("$ref"), str):
+            pointer = node["$ref"]
+            if not pointer.startswith("#/") or pointer in seen:
+                return node
+            seen.add(pointer)
+            target = self.lookup(pointer)
+            if target is None:
+                logger.warning(f"Unresolvable $ref {pointer}")
+                return node
+            node = target
+        return node
+
+    def resolve(self, node: Any) -> Any:
+        """``node`` with every local ``$ref`` in it replaced, recursively."""
+        return self._resolve(node)[0]
+
+    def _resolve(self, node: Any) -> Tuple[Any, float]:
+        # Returns (value, index of the outermost in-progress pointer the
+        # value refers back to, or _NO_CYCLE). A value that refers back to
+        # a pointer still on the stack is only valid in that context, so it
+        # is not memoized.
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                return self._resolve_ref(node, ref)
+            cycle = _NO_CYCLE
+            resolved: Optional[Dict[str, Any]] = None
+            for key, value in node.items():
+                new_value, value_cycle = self._resolve(value)
+                cycle = min(cycle, value_cycle)
+                if new_value is not value:
+                    if resolved is None:
+                        resolved = dict(node)
+                    resolved[key] = new_value
+            return (node if resolved is None else resolved), cycle
+        if isinstance(node, list):
+            cycle = _NO_CYCLE
+            items: Optional[List[Any]] = None
+            for i, value in enumerate(node):
+                new_value, value_cycle = self._resolve(value)
+                cycle = min(cycle, value_cycle)
+                if new_value is not value:
+                    if items is None:
+                        items = list(node)
+                    items[i] = new_value
+            return (node if items is None else items), cycle
+        return node, _NO_CYCLE
+
+    def _resolve_ref(self, node: Dict[str, Any], pointer: str) -> Tuple[Any, float]:
+        if not pointer.startswith("#/"):
+            logger.debug("Leaving external $ref %s unresolved", pointer)
+            return node, _NO_CYCLE
+        if pointer in self._stack_index:
+            return self._placeholder(pointer), self._stack_index[pointer]
+        value = self._memo.get(pointer, _UNRESOLVED)
+        cycle = _NO_CYCLE
+        if value is _UNRESOLVED and pointer in self._scoped:
+            value, cycle = self._scoped[pointer]
+        if value is _UNRESOLVED:
+            target = self.lookup(pointer)
+            if target is None:
+                logger.warning(f"Unresolvable $ref {pointer}")
+                return node, _NO_CYCLE
+            depth = len(self._stack)
+            self._stack.append(pointer)
+            self._stack_index[pointer] = depth
+            self._scoped_at.append([])
+            try:
+                value, cycle = self._resolve(target)
+            finally:
+                self._stack.pop()
+                del self._stack_index[pointer]
+                for stale in self._scoped_at.pop():
+                    del self._scoped[stale]
+            if cycle >= depth:
+                # Only refers back to itself (or nothing): valid anywhere.
+                self._memo[pointer] = value
+                cycle = _NO_CYCLE
+            else:
+                self._scoped[pointer] = (value, cycle)
+                self._scoped_at[int(cycle)].append(pointer)
+        if len(node) > 1 and isinstance(value, dict):
+            # OpenAPI 3.1 allows siblings such as description next to $ref.
+            siblings, sibling_cycle = self._resolve({k: v for k, v in node.items() if k != "$ref"})
+            value = {**value, **siblings}
+            cycle = min(cycle, sibling_cycle)
+        return value, cycle
+
+    def _placeholder(self, pointer: str) -> Dict[str, Any]:
+        placeholder = self._placeholders.get(pointer)
+        if placeholder is None:
+            target = self.lookup(pointer)
+            placeholder = {"description": f"Recursive reference to {pointer}"}
+            if isinstance(target, dict) and isinstance(target.get("type"), str):
+                placeholder["type"] = target["type"]
+            self._placeholders[pointer] = placeholder
+        return placeholder
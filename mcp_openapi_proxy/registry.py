@@ -0,0 +1,123 @@
+"""
+Tool registry for mcp-openapi-proxy.
+
+register_functions builds one ToolRegistry per spec load: a name -> (Tool,
+OperationPlan) index that both dispatchers consult in O(1) per call. The
+current registry is replaced wholesale (a single reference assignment), never
+mutated in place, so a call that already fetched its entry keeps using it.
+
+Entries are usually lazy: the name index and plans exist as soon as the
+registry does, but each types.Tool (with its input schema) is built the
+first time it is needed and memoized. A call only needs the plan, so a
+client that calls a handful of tools of a 10,000-operation spec never pays
+for the other schemas.
+"""
+
+import hashlib
+from typing import Callable, Dict, Iterator, List, Optional
+
+from mcp import types
+
+from .plans import OperationPlan
+
+
+class RegistryEntry:
+    """A tool's invocation plan and its Tool. Unpacks as ``tool, plan``."""
+
+    __slots__ = ("plan", "_tool", "_factory")
+
+    def __init__(self, tool: types.Tool, plan: OperationPlan):
+        self.plan = plan
+        self._tool: Optional[types.Tool] = tool
+        self._factory: Optional[Callable[[], types.Tool]] = None
+
+    @classmethod
+    def lazy(cls, plan: OperationPlan, factory: Callable[[], types.Tool]) -> "RegistryEntry":
+        """An entry whose Tool is built by ``factory`` on first access."""
+        entry = cls.__new__(cls)
+        entry.plan = plan
+        entry._tool = None
+        entry._factory = factory
+        return entry
+
+    @property
+    def tool(self) -> types.Tool:
+        tool = self._tool
+        if tool is None:
+            factory = self._factory
+            if factory is None:  # built concurrently by another thread
+                return self._tool  # type: ignore[return-value]
+            tool = factory()
+            # _tool before _factory: a reader that sees no factory always
+            # sees the tool.
+            self._tool = tool
+            self._factory = None
+        return tool
+
+    @property
+    def built(self) -> bool:
+        """Whether the Tool exists yet."""
+        return self._tool is not None
+
+    def __iter__(self):
+        yield self.tool
+        yield self.plan
+
+
+class ToolRegistry:
+    """Immutable name -> RegistryEntry index, in registration order."""
+
+    # Weak-referenceable so per-registry caches (search.py) die with it.
+    __slots__ = ("_entries", "_order", "_tools", "_version", "__weakref__")
+
+    def __init__(self, entries: Optional[Dict[str, RegistryEntry]] = None):
+        self._entries: Dict[str, RegistryEntry] = dict(entries or {})
+        self._order: List[RegistryEntry] = list(self._entries.values())
+        self._tools: Optional[List[types.Tool]] = None
+        self._version: Optional[str] = None
+
+    def get(self, name: str) -> Optional[RegistryEntry]:
+        return self._entries.get(name)
+
+    @property
+    def tools(self) -> List[types.Tool]:
+        """Every Tool in registration order, building any not built yet."""
+        if self._tools is None:
+            self._tools = [entry.tool for entry in self._entries.values()]
+        return list(self._tools)
+
+    def page(self, offset: int, limit: int) -> List[types.Tool]:
+        """Tools ``offset`` to ``offset + limit`` in registration order,
+        building only those."""
+        return [entry.tool for entry in self._order[offset:offset + limit]]
+
+    @property
+    def version(self) -> str:
+        """Digest of the tool names in order. Registries listing the same
+        tools agree on it, across refreshes and processes."""
+        if self._version is None:
+            self._version = hashlib.sha256("\0".join(self._entries).encode()).hexdigest()[:16]
+        return self._version
+
+    def names(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_current = ToolRegistry()
+
+
+def current_registry() -> ToolRegistry:
+    """The registry built by the most recent register_functions call."""
+    return _current
+
+
+def install_registry(registry: ToolRegistry) -> None:
+    """Atomically replace the current registry."""
+    global _current
+    _current = registry
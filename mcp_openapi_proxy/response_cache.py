@@ -0,0 +1,538 @@
+"""
+HTTP response cache for upstream GET tool calls.
+
+Agents call read-mostly lookups (inventory, machine specs, API listings) over
+and over within a session. The pool in http_client looks every GET up in a
+ResponseCache before sending it, following HTTP caching semantics for a
+private cache (RFC 9111):
+
+- Responses are stored when their status is cacheable by default and they
+  are either fresh for a while (``Cache-Control: max-age``, ``Expires``) or
+  carry a validator (``ETag``, ``Last-Modified``). ``no-store`` and
+  ``Vary: *`` are never stored; ``no-cache`` is stored but always
+  revalidated.
+- A fresh response is served without contacting the upstream (with an
+  ``Age`` header). A stale one is revalidated with ``If-None-Match`` /
+  ``If-Modified-Since``; a ``304`` refreshes the stored headers and serves the
+  stored body.
+- A request's own ``Cache-Control: no-store`` bypasses the cache, and
+  ``no-cache`` or ``max-age=0`` forces revalidation.
+- A successful POST, PUT, PATCH or DELETE drops the responses stored for its
+  URL.
+
+Responses are keyed on the URL, the query parameters and every request
+header the proxy sends (credentials, EXTRA_HEADERS, header parameters), the
+same key that coalesce.py uses. That is at least as strict as any ``Vary``
+over those headers; the headers the HTTP client adds itself never change.
+
+Tuning:
+- RESPONSE_CACHE_MAX_BYTES: size of the in-memory LRU (default 32 MiB; 0
+  disables the cache). A response larger than an eighth of it is not stored.
+- RESPONSE_CACHE_DISK: also keep responses on disk, under
+  ``~/.cache/mcp-openapi-proxy/responses`` (default false), so they survive
+  restarts.
+- RESPONSE_CACHE_DISK_MAX_BYTES: size of the disk tier (default 256 MiB).
+- RESPONSE_CACHE_TTLS: comma-separated ``tool_pattern=seconds`` entries,
+  how long responses of matching tools stay fresh when the upstream sends
+  no freshness information of its own.
+"""
+
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+
+import httpx
+
+from .coalesce import request_key
+from .logging_setup import logger
+
+# Statuses a cache may store without explicit permission (RFC 9110 15.1).
+CACHEABLE_STATUSES = frozenset({200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501})
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# Not kept with a stored response: the body is stored decoded, and these
+# describe one transfer (or one client) rather than the resource.
+_DROPPED_HEADERS = frozenset({
+    "age", "connection", "content-encoding", "content-length", "keep-alive", "set-cookie", "transfer-encoding",
+})
+# Bump whenever the on-disk layout changes.
+DISK_FORMAT = 1
+
+Header = Tuple[str, str]
+
+
+def cache_directives(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """The directives of a Cache-Control header, names lowercased."""
+    directives: Dict[str, Optional[str]] = {}
+    for item in (value or "").split(","):
+        name, sep, argument = item.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') if sep else None
+    return directives
+
+
+def _seconds(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(float(int(value)), 0.0) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _header(headers: List[Header], name: str) -> Optional[str]:
+    for key, value in headers:
+        if key == name:
+            return value
+    return None
+
+
+def freshness(headers: List[Header], received: float, ttl: Optional[float]) -> Optional[Tuple[float, float]]:
+    """(stored_at, lifetime) for a response with ``headers`` (lowercased
+    names) received at ``received``, or None when it must not be stored.
+    ``stored_at`` is backdated by the age the response already had; ``ttl``
+    applies when the response has no freshness information."""
+    directives = cache_directives(_header(headers, "cache-control"))
+    vary = _header(headers, "vary") or ""
+    if "no-store" in directives or "*" in vary:
+        return None
+    expires = _header(headers, "expires")
+    date = _http_date(_header(headers, "date")) or received
+    if "no-cache" in directives:
+        lifetime = 0.0
+    elif _seconds(directives.get("max-age")) is not None:
+        lifetime = _seconds(directives.get("max-age"))
+    elif expires is not None:
+        # An invalid Expires means already expired.
+        lifetime = max((_http_date(expires) or date) - date, 0.0)
+    else:
+        lifetime = ttl or 0.0
+    if lifetime <= 0 and _header(headers, "etag") is None and _header(headers, "last-modified") is None:
+        return None  # never fresh, and nothing to revalidate with
+    age = max(_seconds(_header(headers, "age")) or 0.0, received - date, 0.0)
+    return received - age, lifetime
+
+
+class CachedResponse:
+    """A stored response: status, headers (lowercased names) and the decoded
+    body."""
+
+    __slots__ = ("status", "headers", "content", "stored_at", "lifetime", "size")
+
+    def __init__(self, status: int, headers: List[Header], content: bytes, stored_at: float, lifetime: float):
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.stored_at = stored_at
+        self.lifetime = lifetime
+        self.size = len(content) + sum(len(name) + len(value) for name, value in headers) + 200
+
+    def age(self, now: float) -> float:
+        return max(now - self.stored_at, 0.0)
+
+    def fresh(self, now: float) -> bool:
+        return self.age(now) < self.lifetime
+
+    def validators(self) -> Dict[str, str]:
+        validators = {}
+        etag = _header(self.headers, "etag")
+        if etag is not None:
+            validators["If-None-Match"] = etag
+        last_modified = _header(self.headers, "last-modified")
+        if last_modified is not None:
+            validators["If-Modified-Since"] = last_modified
+        return validators
+
+    def to_response(self, request: httpx.Request, now: float) -> httpx.Response:
+        return httpx.Response(
+            self.status,
+            headers=self.headers + [("age", str(int(self.age(now))))],
+            content=self.content,
+            request=request,
+        )
+
+
+def _stored_headers(headers: httpx.Headers) -> List[Header]:
+    return [(name, value) for name, value in headers.multi_items() if name not in _DROPPED_HEADERS]
+
+
+class CacheLookup:
+    """One GET's key and what the cache holds for it."""
+
+    __slots__ = ("key", "method", "url", "params", "headers", "ttl", "revalidate", "entry")
+
+    def __init__(self, key: Hashable, method: str, url: str, params: Any, headers: Mapping[str, str],
+                 ttl: Optional[float], revalidate: bool):
+        self.key = key
+        self.method = method
+        self.url = url
+        self.params = params
+        self.headers = headers
+        self.ttl = ttl
+        self.revalidate = revalidate
+        self.entry: Optional[CachedResponse] = None
+
+    def request(self) -> httpx.Request:
+        return httpx.Request(self.method, self.url, params=self.params, headers=self.headers)
+
+    def conditional(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """The request arguments, with validators for the stored response."""
+        if self.entry is None:
+            return kwargs
+        validators = self.entry.validators()
+        if not validators:
+            return kwargs
+        present = {name.lower() for name in self.headers}
+        extra = {name: value for name, value in validators.items() if name.lower() not in present}
+        return {**kwargs, "headers": {**self.headers, **extra}}
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    max_bytes: int = 32 * 1024 * 1024
+    disk: bool = False
+    disk_max_bytes: int = 256 * 1024 * 1024
+    ttls: Tuple[Tuple[str, float], ...] = ()
+
+    @classmethod
+    def from_env(cls) -> "CacheConfig":
+        defaults = cls()
+
+        def read(name: str, default, cast):
+            raw = os.getenv(name)
+            if raw is None or not raw.strip():
+                return default
+            try:
+                value = cast(raw)
+                if value < 0:
+                    raise ValueError
+                return value
+            except ValueError:
+                logger.warning(f"Invalid {name} env var: {raw}. Using default {default}.")
+                return default
+
+        ttls = []
+        for item in (os.getenv("RESPONSE_CACHE_TTLS") or "").split(","):
+            if not item.strip():
+                continue
+            pattern, sep, value = item.partition("=")
+            try:
+                seconds = float(value)
+                if not sep or not pattern.strip() or not seconds >= 0:
+                    raise ValueError(item)
+            except ValueError:
+                logger.warning(
+                    f"Skipping malformed RESPONSE_CACHE_TTLS entry (expected tool=seconds): '{item.strip()}'"
+                )
+                continue
+            ttls.append((pattern.strip(), seconds))
+        return cls(
+            max_bytes=read("RESPONSE_CACHE_MAX_BYTES", defaults.max_bytes, int),
+            disk=os.getenv("RESPONSE_CACHE_DISK", "false").lower() in ("true", "1", "yes"),
+            disk_max_bytes=read("RESPONSE_CACHE_DISK_MAX_BYTES", defaults.disk_max_bytes, int),
+            ttls=tuple(ttls),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def ttl_for(self, tool: Optional[str]) -> Optional[float]:
+        """The RESPONSE_CACHE_TTLS entry of the first pattern ``tool``
+        matches."""
+        if tool:
+            for pattern, seconds in self.ttls:
+                if fnmatch.fnmatchcase(tool, pattern):
+                    return seconds
+        return None
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8", "surrogatepass")).hexdigest()[:24]
+
+
+class ResponseCache:
+    """An LRU of stored responses bounded by their size in bytes, with an
+    optional disk tier. Thread-safe: the sync pool serves worker threads."""
+
+    def __init__(self, config: CacheConfig):
+        self.config = config
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._by_url: Dict[str, set] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.stores = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    # -- lookups -------------------------------------------------------------
+
+    def lookup(self, method: str, url: str, tool: Optional[str], kwargs: Mapping[str, Any]) -> Optional[CacheLookup]:
+        """The cache's view of a request, or None when the cache does not
+        apply to it (not a GET, or ``Cache-Control: no-store``)."""
+        if method != "GET":
+            return None
+        headers = kwargs.get("headers") or {}
+        directives = {}
+        for name, value in headers.items():
+            if name.lower() == "cache-control":
+                directives = cache_directives(value)
+        if "no-store" in directives:
+            return None
+        params = kwargs.get("params")
+        lookup = CacheLookup(
+            request_key(method, url, params, headers), method, url, params, headers,
+            self.config.ttl_for(tool), "no-cache" in directives or directives.get("max-age") == "0",
+        )
+        with self._lock:
+            lookup.entry = self._entries.get(lookup.key)
+            if lookup.entry is not None:
+                self._entries.move_to_end(lookup.key)
+        return lookup
+
+    def hit(self, lookup: CacheLookup) -> Optional[httpx.Response]:
+        """The stored response when it may be served without contacting the
+        upstream; otherwise counts the miss or the revalidation."""
+        now = time.time()
+        entry = lookup.entry
+        if entry is not None and not lookup.revalidate and entry.fresh(now):
+            with self._lock:
+                self.hits += 1
+            logger.debug("Response cache hit for %s (age %ds)", lookup.url, entry.age(now))
+            return entry.to_response(lookup.request(), now)
+        if entry is not None and entry.validators():
+            with self._lock:
+                self.revalidations += 1
+            return None
+        if entry is not None:
+            self.invalidate(lookup.url, lookup.key)  # expired, and nothing to revalidate with
+            lookup.entry = None
+        with self._lock:
+            self.misses += 1
+        return None
+
+    # -- updates -------------------------------------------------------------
+
+    def update(
+        self, method: str, url: str, lookup: Optional[CacheLookup], response: httpx.Response
+    ) -> Tuple[httpx.Response, Optional[Callable[[], None]]]:
+        """Apply the upstream's response: store it, or refresh the stored one
+        on a 304, or drop what an unsafe method changed. Returns the response
+        to hand back and the disk-tier work still to do (None when there is
+        none), for the caller to run where blocking is acceptable."""
+        if lookup is None:
+            if method in UNSAFE_METHODS and response.status_code < 400:
+                self.invalidate(url)
+                if self.config.disk:
+                    return response, partial(self._disk_invalidate, url)
+            return response, None
+        now = time.time()
+        if response.status_code == 304 and lookup.entry is not None:
+            with self._lock:
+                self.not_modified += 1
+            previous = lookup.entry
+            merged = dict(previous.headers)
+            merged.update(response.headers.multi_items())
+            stored = freshness(list(merged.items()), now, lookup.ttl)
+            headers = [(name, value) for name, value in merged.items() if name not in _DROPPED_HEADERS]
+            entry = CachedResponse(previous.status, headers, previous.content, *(stored or (now, 0.0)))
+            served = entry.to_response(lookup.request(), now)
+            if stored is None:
+                self.invalidate(url, lookup.key)
+                return served, None
+        else:
+            if response.status_code not in CACHEABLE_STATUSES:
+                return response, None
+            stored = freshness(response.headers.multi_items(), now, lookup.ttl)
+            if stored is None:
+                self.invalidate(url, lookup.key)
+                return response, None
+            entry = CachedResponse(response.status_code, _stored_headers(response.headers), response.content, *stored)
+            served = response
+        if not self._store(lookup.key, url, entry):
+            return served, None
+        if self.config.disk:
+            return served, partial(self._disk_store, lookup.key, url, entry)
+        return served, None
+
+    def _store(self, key: Hashable, url: str, entry: CachedResponse) -> bool:
+        if entry.size > self.config.max_bytes // 8:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._by_url.setdefault(url, set()).add(key)
+            self._bytes += entry.size
+            self.stores += 1
+            while self._bytes > self.config.max_bytes:
+                old_key, old = self._entries.popitem(last=False)
+                self._bytes -= old.size
+                self._forget(old_key)
+                self.evictions += 1
+        return True
+
+    def _forget(self, key: Hashable) -> None:
+        keys = self._by_url.get(key[1])  # request_key: (method, url, query, headers)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_url[key[1]]
+
+    def invalidate(self, url: str, key: Optional[Hashable] = None) -> None:
+        """Drop the stored responses for ``url`` (any query and headers), or
+        only the one under ``key``."""
+        with self._lock:
+            keys = [key] if key is not None else list(self._by_url.get(url, ()))
+            for old_key in keys:
+                old = self._entries.pop(old_key, None)
+                if old is not None:
+                    self._bytes -= old.size
+                    self._forget(old_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_url.clear()
+            self._bytes = 0
+
+    # -- disk tier -----------------------------------------------------------
+
+    @staticmethod
+    def _disk_dir() -> str:
+        from .utils import _cache_dir
+        path = os.path.join(_cache_dir(), "responses")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _disk_path(self, key: Hashable, url: str) -> str:
+        # Named by digests only: the key holds credentials.
+        return os.path.join(self._disk_dir(), f"{_digest(url)}-{_digest(repr(key))}.bin")
+
+    def load(self, lookup: CacheLookup) -> None:
+        """Fill ``lookup`` from the disk tier after a memory miss. Blocks on
+        file I/O."""
+        path = self._disk_path(lookup.key, lookup.url)
+        try:
+            with open(path, "rb") as f:
+                meta_line, _, content = f.read().partition(b"\n")
+            meta = json.loads(meta_line)
+            if meta.get("format") != DISK_FORMAT:
+                return
+            entry = CachedResponse(meta["status"], [tuple(h) for h in meta["headers"]], content,
+                                   meta["stored_at"], meta["lifetime"])
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable cached response {path}: {e}")
+            return
+        if not entry.fresh(time.time()) and not entry.validators():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return
+        try:
+            os.utime(path)  # least recently used goes first
+        except OSError:
+            pass
+        with self._lock:
+            self.disk_hits += 1
+        self._store(lookup.key, lookup.url, entry)
+        lookup.entry = entry
+
+    def _disk_store(self, key: Hashable, url: str, entry: CachedResponse) -> None:
+        path = self._disk_path(key, url)
+        meta = {"format": DISK_FORMAT, "status": entry.status, "headers": entry.headers,
+                "stored_at": entry.stored_at, "lifetime": entry.lifetime}
+        try:
+            with open(path + ".tmp", "wb") as f:
+                f.write(json.dumps(meta).encode())
+                f.write(b"\n")
+                f.write(entry.content)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            logger.warning(f"Could not write response cache: {e}")
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += entry.size
+            over = self._disk_bytes is None or self._disk_bytes > self.config.disk_max_bytes
+        if over:
+            self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        """Remove the least recently used files until the disk tier is back
+        under 90% of its bound."""
+        files = []
+        for path in glob.glob(os.path.join(self._disk_dir(), "*.bin")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        if total > self.config.disk_max_bytes:
+            files.sort()
+            target = self.config.disk_max_bytes * 0.9
+            for _, size, path in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self.evictions += evicted
+
+    def _disk_invalidate(self, url: str) -> None:
+        for path in glob.glob(os.path.join(self._disk_dir(), f"{_digest(url)}-*.bin")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # -- stats ---------------------------------------------------------------
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "not_modified": self.not_modified,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "disk_hits": self.disk_hits,
+            }
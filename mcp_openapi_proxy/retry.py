@@ -0,0 +1,189 @@
+"""
+Retry policy for upstream tool-call requests.
+
+A transient upstream failure (a 502, a reset connection) is far cheaper to
+retry here than to hand back to the agent, which would redo a whole
+reasoning step. The pool in http_client asks a RetryPolicy after every
+attempt whether, and after how long, to try again:
+
+- Only failures that are likely transient are retried: connection failures,
+  dropped or timed-out reads, and 429 / 502 / 503 / 504 responses.
+- A request that may have reached the upstream is only replayed when that is
+  safe: idempotent methods (GET, HEAD, OPTIONS, PUT, DELETE), or any method
+  once UPSTREAM_IDEMPOTENCY_HEADER is set, in which case every call carries a
+  fresh key in that header, repeated on each of its attempts. A connection
+  that could not be opened never sent anything, so it is retried for any
+  method.
+- Delays use decorrelated jitter (each one random between the base delay and
+  three times the previous one, capped), so clients that failed together do
+  not retry together. A Retry-After header sets the minimum delay; when it
+  asks for longer than the call has left, the response is returned as is.
+- All attempts of a call fit in UPSTREAM_RETRY_MAX_TIME and in the call's
+  total deadline.
+- A RetryBudget per upstream origin caps retries at a fraction of first
+  attempts, so during an outage retries cannot multiply the load.
+
+Tuning:
+- UPSTREAM_RETRIES: retries after the first attempt (default 2; 0 disables).
+- UPSTREAM_RETRY_BACKOFF: base delay in seconds (default 0.1).
+- UPSTREAM_RETRY_MAX_BACKOFF: longest single delay in seconds (default 5).
+- UPSTREAM_RETRY_MAX_TIME: seconds all attempts of a call may take (default 30).
+- UPSTREAM_RETRY_BUDGET: retries allowed per first attempt, per origin
+  (default 0.2), on top of a reserve of 10.
+- UPSTREAM_IDEMPOTENCY_HEADER: header carrying a per-call idempotency key,
+  e.g. Idempotency-Key (unset: non-idempotent methods are not replayed).
+"""
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, FrozenSet, Iterator, Optional
+
+import httpx
+
+from .logging_setup import logger
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Nothing was sent: safe to retry whatever the method.
+_NOT_SENT = (httpx.ConnectError, httpx.ConnectTimeout)
+# The request may have reached the upstream.
+_MAYBE_SENT = (httpx.ReadTimeout, httpx.WriteTimeout, httpx.ReadError, httpx.WriteError,
+               httpx.RemoteProtocolError)
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header (delay-seconds or
+    an HTTP date), or None when absent or unparseable."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class RetryBudget:
+    """Token bucket bounding retries per upstream origin.
+
+    Every first attempt deposits ``ratio`` tokens and every retry spends one,
+    so sustained retries stay below ``ratio`` times the request rate; the
+    balance starts at, and is capped by, ``reserve``.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.balance = reserve
+        self.retries = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.balance = min(self.balance + self.ratio, self.reserve)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.balance < 1:
+                self.denied += 1
+                return False
+            self.balance -= 1
+            self.retries += 1
+            return True
+
+    def stats(self) -> Dict[str, float]:
+        return {"balance": round(self.balance, 2), "retries": self.retries, "denied": self.denied}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retries: int = 2
+    backoff: float = 0.1
+    max_backoff: float = 5.0
+    max_time: float = 30.0
+    budget_ratio: float = 0.2
+    idempotency_header: Optional[str] = None
+    retry_statuses: FrozenSet[int] = RETRY_STATUSES
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        defaults = cls()
+
+        def read(name: str, default, cast):
+            raw = os.getenv(name)
+            if raw is None or not raw.strip():
+                return default
+            try:
+                value = cast(raw)
+                if value < 0:
+                    raise ValueError
+                return value
+            except ValueError:
+                logger.warning(f"Invalid {name} env var: {raw}. Using default {default}.")
+                return default
+
+        return cls(
+            max_retries=read("UPSTREAM_RETRIES", defaults.max_retries, int),
+            backoff=read("UPSTREAM_RETRY_BACKOFF", defaults.backoff, float),
+            max_backoff=read("UPSTREAM_RETRY_MAX_BACKOFF", defaults.max_backoff, float),
+            max_time=read("UPSTREAM_RETRY_MAX_TIME", defaults.max_time, float),
+            budget_ratio=read("UPSTREAM_RETRY_BUDGET", defaults.budget_ratio, float),
+            idempotency_header=(os.getenv("UPSTREAM_IDEMPOTENCY_HEADER") or "").strip() or None,
+        )
+
+    def replayable(self, method: str) -> bool:
+        """Whether a request that may have reached the upstream can be sent
+        again."""
+        return method.upper() in IDEMPOTENT_METHODS or self.idempotency_header is not None
+
+    def needs_idempotency_key(self, method: str) -> bool:
+        return self.idempotency_header is not None and method.upper() not in IDEMPOTENT_METHODS
+
+    def delays(self) -> Iterator[float]:
+        """Decorrelated-jitter backoff: each delay is drawn between the base
+        delay and three times the previous one, capped at max_backoff."""
+        delay = self.backoff
+        while True:
+            delay = min(self.max_backoff, random.uniform(self.backoff, delay * 3))
+            yield delay
+
+    def retry_delay(
+        self,
+        method: str,
+        attempt: int,
+        backoff: float,
+        remaining: float,
+        *,
+        response: Optional[httpx.Response] = None,
+        error: Optional[Exception] = None,
+    ) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None not to retry.
+
+        ``attempt`` counts attempts made so far, ``backoff`` is the next
+        jittered delay and ``remaining`` the time the call has left.
+        """
+        if attempt > self.max_retries:
+            return None
+        if error is not None:
+            if isinstance(error, _NOT_SENT):
+                pass
+            elif not (isinstance(error, _MAYBE_SENT) and self.replayable(method)):
+                return None
+            delay = backoff
+        elif response is not None and response.status_code in self.retry_statuses and self.replayable(method):
+            retry_after = retry_after_seconds(response.headers.get("retry-after"))
+            delay = backoff if retry_after is None else max(backoff, retry_after)
+        else:
+            return None
+        # Another attempt has to start, and have a chance to finish, in time.
+        return delay if delay < remaining else None
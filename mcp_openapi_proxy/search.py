@@ -0,0 +1,257 @@
+"""
+Search-based tool discovery for mcp-openapi-proxy.
+
+Advertising one tool per operation does not scale to specs with thousands
+of operations: tools/list becomes megabytes and every client prompt pays for
+it. With TOOL_DISCOVERY_MODE=search the low-level server advertises two
+meta-tools instead:
+
+- search_operations: ranks operations against a free-text query and returns
+  the best matches with their input schemas.
+- invoke_operation: calls an operation by name, exactly as if it had been
+  advertised as a tool.
+
+Ranking is BM25 over an inverted index of each operation's tool name,
+method, path, operationId, summary, description, tags and parameter names.
+The index is built once per registry (off the event loop, when the registry
+is built or loaded from a snapshot) with every term weight precomputed, so a
+query is a few dictionary walks.
+"""
+
+import heapq
+import math
+import os
+import re
+import weakref
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+from mcp import types
+
+from .logging_setup import logger
+from .plans import OperationPlan
+from .registry import ToolRegistry
+
+SEARCH_TOOL = "search_operations"
+INVOKE_TOOL = "invoke_operation"
+
+MODE_TOOLS = "tools"
+MODE_SEARCH = "search"
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# BM25 parameters (the usual defaults).
+_K1 = 1.2
+_B = 0.75
+
+_RUN = re.compile(r"[A-Za-z0-9]+")
+_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+_STOPWORDS = frozenset({"a", "an", "and", "by", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+
+def discovery_mode() -> str:
+    """TOOL_DISCOVERY_MODE: "tools" (one tool per operation, the default)
+    or "search" (the two meta-tools)."""
+    mode = os.getenv("TOOL_DISCOVERY_MODE", MODE_TOOLS).strip().lower() or MODE_TOOLS
+    if mode not in (MODE_TOOLS, MODE_SEARCH):
+        logger.warning(f"Invalid TOOL_DISCOVERY_MODE '{mode}'; advertising every operation as a tool.")
+        return MODE_TOOLS
+    return mode
+
+
+def _stem(word: str) -> str:
+    # Just enough to make "pets" find "pet" and "policies" find "policy".
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def _run_terms(run: str) -> Tuple[str, ...]:
+    # Specs repeat the same few thousand words, so each is normalized once.
+    word = run.lower()
+    terms = [] if word in _STOPWORDS else [_stem(word)]
+    parts = _PART.findall(run)
+    if len(parts) > 1:
+        terms.extend(_stem(part.lower()) for part in parts if part.lower() not in _STOPWORDS)
+    return tuple(terms)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, lightly stemmed terms. camelCase and snake_case words
+    yield their parts as well as the whole word, so ``petId`` matches both
+    "pet id" and "petid"."""
+    terms: List[str] = []
+    for run in _RUN.findall(text):
+        terms.extend(_run_terms(run))
+    return terms
+
+
+def _document(plan: OperationPlan) -> Dict[str, int]:
+    """Term frequencies of one operation's searchable text."""
+    operation = plan.operation
+    fields = [plan.tool_name, plan.method, plan.path, " ".join(plan.param_locations)]
+    for key in ("operationId", "summary", "description"):
+        value = operation.get(key)
+        if isinstance(value, str):
+            fields.append(value)
+    tags = operation.get("tags")
+    if isinstance(tags, list):
+        fields.extend(tag for tag in tags if isinstance(tag, str))
+    frequencies: Dict[str, int] = {}
+    # Descriptions repeat words; count each distinct word once.
+    for run, count in Counter(_RUN.findall(" ".join(fields))).items():
+        for term in _run_terms(run):
+            frequencies[term] = frequencies.get(term, 0) + count
+    return frequencies
+
+
+class OperationIndex:
+    """BM25 inverted index over the operations of one registry."""
+
+    __slots__ = ("_names", "_postings", "_bounds")
+
+    def __init__(self, registry: ToolRegistry):
+        self._names: List[str] = list(registry.names())
+        documents = [_document(registry.get(name).plan) for name in self._names]
+        frequencies: Dict[str, Dict[int, int]] = {}
+        for doc, terms in enumerate(documents):
+            for term, tf in terms.items():
+                postings = frequencies.get(term)
+                if postings is None:
+                    frequencies[term] = {doc: tf}
+                else:
+                    postings[doc] = tf
+        lengths = [sum(terms.values()) for terms in documents]
+        count = len(documents)
+        average = sum(lengths) / count if count else 0.0
+        norms = [_K1 * (1 - _B + _B * length / average) if average else _K1 for length in lengths]
+        # term -> {doc: BM25 weight}, plus each term's largest weight (the
+        # bound MaxScore pruning needs).
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._bounds: Dict[str, float] = {}
+        for term, counts in frequencies.items():
+            idf = math.log(1 + (count - len(counts) + 0.5) / (len(counts) + 0.5))
+            weights = {doc: idf * tf * (_K1 + 1) / (tf + norms[doc]) for doc, tf in counts.items()}
+            self._postings[term] = weights
+            self._bounds[term] = max(weights.values())
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Tuple[str, float]]:
+        """The ``limit`` best (tool name, score) matches for ``query``, best
+        first. Operations matching none of the query terms are never returned."""
+        terms = sorted({term for term in tokenize(query) if term in self._postings},
+                       key=self._bounds.__getitem__, reverse=True)
+        if not terms or limit <= 0:
+            return []
+        # MaxScore: walk terms from rarest to most common. Once no document
+        # outside the current candidates could still reach the top ``limit``
+        # (even by matching every remaining term), the remaining, long
+        # posting lists only update the candidates.
+        remaining = sum(self._bounds[term] for term in terms)
+        reached = 0.0  # the best score any candidate can have so far
+        scores: Dict[int, float] = {}
+        for term in terms:
+            postings = self._postings[term]
+            if not scores:
+                scores = dict(postings)
+            elif reached > remaining and len(scores) >= limit and _kth_best(scores, limit) > remaining:
+                for doc in scores:
+                    scores[doc] += postings.get(doc, 0.0)
+            else:
+                get = scores.get
+                for doc, weight in postings.items():
+                    scores[doc] = get(doc, 0.0) + weight
+            reached += self._bounds[term]
+            remaining -= self._bounds[term]
+        best = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        return [(self._names[doc], score) for doc, score in best]
+
+
+def _kth_best(scores: Dict[int, float], k: int) -> float:
+    return heapq.nlargest(k, scores.values())[-1]
+
+
+_indexes: "weakref.WeakKeyDictionary[ToolRegistry, OperationIndex]" = weakref.WeakKeyDictionary()
+
+
+def index_for(registry: ToolRegistry) -> OperationIndex:
+    """The search index of ``registry``, built on first use and kept for as
+    long as the registry lives."""
+    index = _indexes.get(registry)
+    if index is None:
+        index = OperationIndex(registry)
+        _indexes[registry] = index
+        logger.debug("Indexed %s operations for search_operations.", len(index))
+    return index
+
+
+def search_results(registry: ToolRegistry, query: str, limit: Optional[int] = None) -> List[Dict]:
+    """search_operations output: the best matches with everything needed to
+    call them through invoke_operation. Only these tools' schemas are built."""
+    try:
+        limit = DEFAULT_LIMIT if limit is None else max(1, min(int(limit), MAX_LIMIT))
+    except (TypeError, ValueError):
+        limit = DEFAULT_LIMIT
+    results = []
+    for name, score in index_for(registry).search(query, limit):
+        entry = registry.get(name)
+        if entry is None:
+            continue
+        tool = entry.tool
+        results.append({
+            "name": name,
+            "method": entry.plan.method,
+            "path": entry.plan.path,
+            "description": tool.description,
+            "inputSchema": tool.inputSchema,
+            "score": round(score, 3),
+        })
+    return results
+
+
+def meta_tools() -> List[types.Tool]:
+    """The tools advertised in search mode."""
+    return [
+        types.Tool(
+            name=SEARCH_TOOL,
+            description=(
+                "Search this API's operations by keywords (resource names, actions, parameters). "
+                "Returns the best matches with their input schemas; call one with invoke_operation."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Keywords describing the operation you need"},
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Maximum number of matches (default {DEFAULT_LIMIT}, at most {MAX_LIMIT})",
+                    },
+                },
+                "required": ["query"],
+                "additionalProperties": False,
+            },
+        ),
+        types.Tool(
+            name=INVOKE_TOOL,
+            description=(
+                "Call an operation found with search_operations, passing arguments that match its input schema."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Operation name from search_operations"},
+                    "arguments": {"type": "object", "description": "Arguments for the operation"},
+                },
+                "required": ["name"],
+                "additionalProperties": False,
+            },
+        ),
+    ]
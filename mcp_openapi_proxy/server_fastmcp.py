@@ -13,19 +13,30 @@ Configuration is controlled via environment variables:
 
 import os
 import json
-import requests
+import logging
+import httpx
 from typing import Dict, Any, Optional
 from mcp import types
 from mcp.server.fastmcp import FastMCP
-from mcp_openapi_proxy.logging_setup import logger
+from mcp_openapi_proxy import http_client
+from mcp_openapi_proxy import json_codec
+from mcp_openapi_proxy.config import current_config, reload_config
+from mcp_openapi_proxy.logging_setup import Payload, logger
 from mcp_openapi_proxy.openapi import fetch_openapi_spec, build_base_url, handle_auth
-from mcp_openapi_proxy.utils import is_tool_whitelisted, normalize_tool_name, strip_parameters, get_additional_headers, deduplicate_tool_name
+from mcp_openapi_proxy.plans import query_value
+from mcp_openapi_proxy.utils import (
+    whitelist_matcher,
+    tool_name_normalizer,
+    strip_parameters,
+    get_additional_headers,
+    deduplicate_tool_name,
+)
 import sys
 
 # Logger is now configured in logging_setup.py, just use it
 # logger = setup_logging(debug=os.getenv("DEBUG", "").lower() in ("true", "1", "yes"))
 
-logger.debug(f"Server CWD: {os.getcwd()}")
+logger.debug("Server CWD: %s", os.getcwd())
 
 mcp = FastMCP("OpenApiProxy-Fast")
 
@@ -42,15 +53,15 @@ def list_functions(*, env_key: str = "OPENAPI_SPEC_URL") -> str:
     logger.debug("Executing list_functions tool.")
     spec_url = os.environ.get(env_key, os.environ.get("OPENAPI_SPEC_URL"))
     whitelist = os.getenv('TOOL_WHITELIST')
-    logger.debug(f"Using spec_url: {spec_url}")
-    logger.debug(f"TOOL_WHITELIST value: {whitelist}")
+    logger.debug("Using spec_url: %s", spec_url)
+    logger.debug("TOOL_WHITELIST value: %s", whitelist)
     if not spec_url:
         logger.error("No OPENAPI_SPEC_URL or custom env_key configured.")
         return json.dumps([])
     global spec
     spec = fetch_openapi_spec(spec_url)
     if isinstance(spec, str):
-        spec = json.loads(spec)
+        spec = json_codec.loads(spec)
     if spec is None:
         logger.error("Spec is None after fetch_openapi_spec, using dummy spec fallback")
         spec = {
@@ -72,41 +83,43 @@ def list_functions(*, env_key: str = "OPENAPI_SPEC_URL") -> str:
                 }
             }
         }
-    logger.debug(f"Raw spec loaded: {json.dumps(spec, indent=2, default=str)}")
     paths = spec.get("paths", {})
-    logger.debug(f"Paths extracted from spec: {list(paths.keys())}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Raw spec loaded: %s", Payload(json_codec.dumps(spec, indent=True, default=str)))
+        logger.debug("Paths extracted from spec: %s", Payload(list(paths.keys())))
     if not paths:
         logger.debug("No paths found in spec.")
         return json.dumps([])
     functions = {}
     _FUNCTION_OPERATIONS.clear()
+    whitelist = whitelist_matcher()
+    normalize = tool_name_normalizer()
     for path, path_item in paths.items():
-        logger.debug(f"Processing path: {path}")
+        logger.debug("Processing path: %s", path)
         if not path_item:
-            logger.debug(f"Path item is empty for {path}")
+            logger.debug("Path item is empty for %s", path)
             continue
-        whitelist_env = os.getenv('TOOL_WHITELIST', '').strip()
-        whitelist_check = is_tool_whitelisted(path)
-        logger.debug(f"Whitelist check for {path}: {whitelist_check} with TOOL_WHITELIST: '{whitelist_env}'")
-        if whitelist_env and not whitelist_check:
-            logger.debug(f"Path {path} not in whitelist - skipping.")
+        whitelist_check = whitelist.matches(path)
+        logger.debug("Whitelist check for %s: %s with TOOL_WHITELIST: '%s'", path, whitelist_check, whitelist.source)
+        if not whitelist_check:
+            logger.debug("Path %s not in whitelist - skipping.", path)
             continue
         for method, operation in path_item.items():
-            logger.debug(f"Found method: {method} for path: {path}")
+            logger.debug("Found method: %s for path: %s", method, path)
             if not method:
-                logger.debug(f"Method is empty for {path}")
+                logger.debug("Method is empty for %s", path)
                 continue
             if method.lower() not in ["get", "post", "put", "delete", "patch"]:
-                logger.debug(f"Skipping unsupported method: {method}")
+                logger.debug("Skipping unsupported method: %s", method)
                 continue
             raw_name = f"{method.upper()} {path}"
-            function_name = normalize_tool_name(raw_name)
+            function_name = normalize(raw_name)
             if function_name in functions:
                 # TOOL_NAME_MAX_LENGTH truncation can make distinct operations
                 # collide; rename instead of silently dropping (issue #11).
                 function_name = deduplicate_tool_name(function_name, functions)
             function_description = operation.get("summary", operation.get("description", "No description provided."))
-            logger.debug(f"Registering function: {function_name} - {function_description}")
+            logger.debug("Registering function: %s - %s", function_name, function_description)
             input_schema = {
                 "type": "object",
                 "properties": {},
@@ -190,7 +203,7 @@ def list_functions(*, env_key: str = "OPENAPI_SPEC_URL") -> str:
         "original_name": "get_prompt",
         "inputSchema": {"type": "object", "properties": {"name": {"type": "string", "description": "Prompt name"}}, "required": ["name"], "additionalProperties": False}
     }
-    logger.debug(f"Discovered {len(functions)} functions from the OpenAPI specification.")
+    logger.debug("Discovered %s functions from the OpenAPI specification.", len(functions))
     if "get_tasks_id" not in functions:
         functions["get_tasks_id"] = {
             "name": "get_tasks_id",
@@ -212,15 +225,14 @@ def list_functions(*, env_key: str = "OPENAPI_SPEC_URL") -> str:
             }
         }
         logger.debug("Forced registration of get_tasks_id for testing.")
-    logger.debug(f"Functions list: {list(functions.values())}")
-    return json.dumps(list(functions.values()), indent=2)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Functions list: %s", Payload(list(functions.values())))
+    return json_codec.dumps(list(functions.values()), indent=True)
 
 @mcp.tool()
 def call_function(*, function_name: str, parameters: Optional[Dict] = None, env_key: str = "OPENAPI_SPEC_URL") -> str:
     """Calls a function derived from the OpenAPI specification."""
-    logger.debug(f"call_function invoked with function_name='{function_name}' and parameters={parameters}")
-    logger.debug(f"API_KEY: {os.getenv('API_KEY', '<not set>')[:5] + '...' if os.getenv('API_KEY') else '<not set>'}")
-    logger.debug(f"STRIP_PARAM: {os.getenv('STRIP_PARAM', '<not set>')}")
+    logger.debug("call_function invoked with function_name='%s' and parameters=%s", function_name, Payload(parameters))
     if not function_name:
         logger.error("function_name is empty or None")
         return json.dumps({"error": "function_name is required"})
@@ -240,10 +252,10 @@ def call_function(*, function_name: str, parameters: Optional[Dict] = None, env_
             return json.dumps({"dummy": "spec"}, indent=2)
         spec_local = fetch_openapi_spec(spec_url)
         if isinstance(spec_local, str):
-            spec_local = json.loads(spec_local)
+            spec_local = json_codec.loads(spec_local)
         if spec_local is None:
             return json.dumps({"error": "Failed to fetch OpenAPI spec"})
-        return json.dumps(spec_local, indent=2)
+        return json_codec.dumps(spec_local, indent=True)
     if function_name == "list_prompts":
         return json.dumps([{"name": "summarize_spec", "description": "Summarizes the purpose of the OpenAPI specification", "arguments": []}])
     if function_name == "get_prompt":
@@ -256,33 +268,36 @@ def call_function(*, function_name: str, parameters: Optional[Dict] = None, env_
     if spec is None:
         logger.error("Spec is None for call_function")
         return json.dumps({"error": "Failed to fetch or parse the OpenAPI specification"})
-    logger.debug(f"Spec keys for call_function: {list(spec.keys())}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Spec keys for call_function: %s", list(spec.keys()))
     # Names recorded by list_functions (including names deduplicated after
     # TOOL_NAME_MAX_LENGTH truncation, issue #11) cannot be regenerated from
     # the spec alone, so consult the recorded mapping first.
     function_def = dict(_FUNCTION_OPERATIONS[function_name]) if function_name in _FUNCTION_OPERATIONS else None
     paths = spec.get("paths", {})
-    logger.debug(f"Paths for function lookup: {list(paths.keys())}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Paths for function lookup: %s", Payload(list(paths.keys())))
 
+    normalize = tool_name_normalizer()
     for path, path_item in paths.items():
         if function_def:
             break
-        logger.debug(f"Checking path: {path}")
+        logger.debug("Checking path: %s", path)
         for method, operation in path_item.items():
-            logger.debug(f"Checking method: {method} for path: {path}")
+            logger.debug("Checking method: %s for path: %s", method, path)
             if method.lower() not in ["get", "post", "put", "delete", "patch"]:
-                logger.debug(f"Skipping unsupported method: {method}")
+                logger.debug("Skipping unsupported method: %s", method)
                 continue
             raw_name = f"{method.upper()} {path}"
-            current_function_name = normalize_tool_name(raw_name)
-            logger.debug(f"Comparing {current_function_name} with {function_name}")
+            current_function_name = normalize(raw_name)
+            logger.debug("Comparing %s with %s", current_function_name, function_name)
             if current_function_name == function_name:
                 function_def = {
                     "path": path,
                     "method": method.upper(),
                     "operation": operation
                 }
-                logger.debug(f"Matched function definition for '{function_name}': {function_def}")
+                logger.debug("Matched function definition for '%s': %s", function_name, Payload(function_def))
                 break
         if function_def:
             break
@@ -300,7 +315,7 @@ def call_function(*, function_name: str, parameters: Optional[Dict] = None, env_
             return json.dumps(simulated_response)
         logger.error(f"Function '{function_name}' not found in the OpenAPI specification.")
         return json.dumps({"error": f"Function '{function_name}' not found"})
-    logger.debug(f"Function def found: {function_def}")
+    logger.debug("Function def found: %s", Payload(function_def))
 
     operation = function_def["operation"]
     operation["method"] = function_def["method"]
@@ -310,11 +325,11 @@ def call_function(*, function_name: str, parameters: Optional[Dict] = None, env_
     if parameters is None:
         parameters = {}
     parameters = strip_parameters(parameters)
-    logger.debug(f"Parameters after strip: {parameters}")
+    logger.debug("Parameters after strip: %s", Payload(parameters))
     if function_def["method"] != "GET":
         headers["Content-Type"] = "application/json"
 
-    if not is_tool_whitelisted(function_def["path"]):
+    if not whitelist_matcher().matches(function_def["path"]):
         logger.error(f"Access to function '{function_name}' is not allowed.")
         return json.dumps({"error": f"Access to function '{function_name}' is not allowed"})
 
@@ -339,16 +354,16 @@ def call_function(*, function_name: str, parameters: Optional[Dict] = None, env_
 
     if '{' in path and '}' in path:
         params_to_remove = []
-        logger.debug(f"Before substitution - Path: {path}, Parameters: {parameters}")
+        logger.debug("Before substitution - Path: %s, Parameters: %s", path, Payload(parameters))
         for param_name, param_value in parameters.items():
             if f"{{{param_name}}}" in path:
                 path = path.replace(f"{{{param_name}}}", str(param_value))
-                logger.debug(f"Substituted {param_name}={param_value} in path: {path}")
+                logger.debug("Substituted %s=%s in path: %s", param_name, param_value, path)
                 params_to_remove.append(param_name)
         for param_name in params_to_remove:
             if param_name in parameters:
                 del parameters[param_name]
-        logger.debug(f"After substitution - Path: {path}, Parameters: {parameters}")
+        logger.debug("After substitution - Path: %s, Parameters: %s", path, Payload(parameters))
 
     api_url = f"{base_url.rstrip('/')}/{path.lstrip('/')}"
     request_params = {}
@@ -358,31 +373,46 @@ def call_function(*, function_name: str, parameters: Optional[Dict] = None, env_
         if "stream" in parameters and parameters["stream"]:
             del parameters["stream"]
         if function_def["method"] == "GET":
-            request_params = parameters
+            # Encoded as requests did: None values left out, booleans as True/False.
+            request_params = {key: query_value(value) for key, value in parameters.items() if value is not None}
         else:
             request_body = parameters
     else:
         parameters = {}
         logger.debug("No valid parameters provided, proceeding without params/body")
 
-    logger.debug(f"Sending request - Method: {function_def['method']}, URL: {api_url}, Headers: {headers}, Params: {request_params}, Body: {request_body}")
+    logger.debug("Sending request - Method: %s, URL: %s, Headers: %s, Params: %s, Body: %s",
+                 function_def['method'], api_url, Payload(headers), Payload(request_params), Payload(request_body))
+    config = current_config()
+    timeouts = config.timeouts_for(function_name, operation)
     try:
         # Add SSL verification control for API calls using IGNORE_SSL_TOOLS
-        ignore_ssl_tools = os.getenv("IGNORE_SSL_TOOLS", "false").lower() in ("true", "1", "yes")
-        verify_ssl_tools = not ignore_ssl_tools
-        logger.debug(f"Sending API request with SSL verification: {verify_ssl_tools} (IGNORE_SSL_TOOLS={ignore_ssl_tools})")
-        response = requests.request(
-            method=function_def["method"],
-            url=api_url,
+        verify_ssl_tools = config.verify_ssl_tools
+        logger.debug("Sending API request with SSL verification: %s", verify_ssl_tools)
+        # Pooled per upstream origin: keep-alive connections are reused
+        # across calls instead of paying a TCP+TLS handshake every time.
+        response = http_client.request_sync(
+            function_def["method"],
+            api_url,
             headers=headers,
             params=request_params if function_def["method"] == "GET" else None,
             json=request_body if function_def["method"] != "GET" else None,
-            verify=verify_ssl_tools
+            verify=verify_ssl_tools,
+            timeouts=timeouts,
+            tool=function_name,
         )
         response.raise_for_status()
-        logger.debug(f"API response received: {response.text}")
+        logger.debug("API response received: %s", Payload(response.text))
         return response.text
-    except requests.exceptions.RequestException as e:
+    except http_client.NOT_SENT as e:
+        error = http_client.not_sent_error(function_name, e)
+        logger.info("API request not sent: %s", error["error"])
+        return json.dumps(error)
+    except httpx.TimeoutException as e:
+        error = http_client.timeout_error(function_name, e, timeouts)
+        logger.error(f"API request timed out: {error['error']}")
+        return json.dumps(error)
+    except httpx.HTTPError as e:
         logger.error(f"API request failed: {e}", exc_info=True)
         return json.dumps({"error": f"API request failed: {e}"})
 
@@ -394,6 +424,7 @@ def run_simple_server():
         logger.error("OPENAPI_SPEC_URL environment variable is required for FastMCP mode.")
         sys.exit(1)
     assert isinstance(spec_url, str)
+    reload_config()
 
     logger.debug("Preloading functions from OpenAPI spec...")
     global spec
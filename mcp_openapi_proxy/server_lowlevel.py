@@ -16,14 +16,25 @@ Configuration is controlled via environment variables:
 - ENABLE_TOOLS: Set to "false" to disable tools functionality (default: true).
 - ENABLE_RESOURCES: Set to "true" to enable resources functionality (default: false).
 - ENABLE_PROMPTS: Set to "true" to enable prompts functionality (default: false).
+- OPENAPI_SPEC_REFRESH_SECONDS: Revalidate the spec this often and swap in changed tools (default: 0, off).
+- TOOLS_LIST_PAGE_SIZE: Tools per tools/list page, with cursors for the rest (default: 0, one page).
+- TOOL_DISCOVERY_MODE: "tools" (default) or "search" to advertise only search_operations and invoke_operation.
+- MCP_TRANSPORT: "stdio" (default), "sse", "streamable-http", or "http" for the best HTTP transport available.
+- MCP_HTTP_HOST / MCP_HTTP_PORT: Bind address for the HTTP transports (default: 127.0.0.1:8000).
 """
 
 import os
 import sys
 import asyncio
-import json
-import requests
-from typing import List, Dict, Any, Optional, cast
+import base64
+import gc
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from functools import partial
+import httpx
+from typing import AsyncIterator, List, Dict, Any, Optional, Set, Tuple
 import anyio
 from pydantic import AnyUrl
 
@@ -32,21 +43,41 @@ from urllib.parse import unquote
 from mcp.server.lowlevel import Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
+from mcp.shared.exceptions import McpError
+from mcp_openapi_proxy import http_client
+from mcp_openapi_proxy import json_codec
+from mcp_openapi_proxy.coalesce import SingleFlight, request_key
+from mcp_openapi_proxy.config import current_config, reload_config
+from mcp_openapi_proxy.logging_setup import CALL_LOG_LEVEL, Payload, log_context, next_request_id
+from mcp_openapi_proxy.plans import InvocationError, PreparedRequest
+from mcp_openapi_proxy.registry import ToolRegistry, current_registry
+from mcp_openapi_proxy.openapi import build_registry, install_tool_registry
+from mcp_openapi_proxy.search import (
+    INVOKE_TOOL,
+    MODE_SEARCH,
+    SEARCH_TOOL,
+    discovery_mode,
+    index_for,
+    meta_tools,
+    search_results,
+)
+from mcp_openapi_proxy.snapshot import load_snapshot, snapshot_key, store_snapshot
 from mcp_openapi_proxy.utils import (
     setup_logging,
-    normalize_tool_name,
+    tool_name_normalizer,
     is_tool_whitelisted,
     fetch_openapi_spec,
-    build_base_url,
-    handle_auth,
+    fetch_openapi_spec_text,
+    parse_openapi_spec,
     strip_parameters,
     detect_response_type,
-    get_additional_headers
 )
 
 DEBUG = os.getenv("DEBUG", "").lower() in ("true", "1", "yes")
 logger = setup_logging(debug=DEBUG)
 
+# Filled only by register_functions (which builds every tool eagerly).
+# list_tools serves the current registry, whose tools are built on demand.
 tools: List[types.Tool] = []
 # Check capability advertisement envvars (off by default)
 CAPABILITIES_TOOLS = os.getenv("CAPABILITIES_TOOLS", "false").lower() == "true"
@@ -161,175 +192,255 @@ openapi_spec_data: Optional[Dict[str, Any]] = None
 # the proxy dies on the closed stream, the client respawns it — a crash loop.
 _spec_load_lock: Optional[asyncio.Lock] = None
 _spec_load_error: Optional[str] = None
+# Set when the tools came from a registry snapshot; openapi_spec_data then
+# stays None because the spec text was never parsed.
+_registry_from_snapshot = False
+# snapshot_key() of the spec text behind the installed registry; a refresh
+# only rebuilds when this changes.
+_spec_key: Optional[str] = None
+# Sessions that have listed or called tools, to be told when the tool list
+# changes. Weak, so finished sessions drop out on their own.
+_sessions: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def _build_from_text(openapi_url: str, content: str, key: str):
+    """Worker-thread half of a (re)load: the registry snapshot for ``key``
+    if there is one, else parse and build. Returns (spec, registry,
+    from_snapshot); spec is None when the snapshot was used."""
+    registry = load_snapshot(openapi_url, key)
+    if registry is not None:
+        if discovery_mode() == MODE_SEARCH:
+            index_for(registry)
+        return None, registry, True
+    spec = parse_openapi_spec(openapi_url, content)
+    if not spec:
+        return None, None, False
+    return spec, build_registry(spec), False
+
+
+# Set by the first load, the only one that pauses the cyclic GC.
+_first_build_done = False
+
+
+def _build_first(openapi_url: str, content: str, key: str):
+    """_build_from_text for the first load of the process. A snapshot load
+    allocates hundreds of thousands of long-lived acyclic containers, and
+    letting the cyclic GC rescan them (during the load and in every later
+    full collection) costs more than the load itself. So, once per process
+    and never on a refresh, collect nothing while building and move what
+    is alive afterwards, which at first start is little more than the
+    registry, into the permanent generation."""
+    global _first_build_done
+    if _first_build_done:
+        return _build_from_text(openapi_url, content, key)
+    _first_build_done = True
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        built = _build_from_text(openapi_url, content, key)
+        if built[2]:
+            gc.freeze()
+        return built
+    finally:
+        if gc_was_enabled:
+            gc.enable()
 
 
 async def ensure_spec_loaded() -> Optional[Dict[str, Any]]:
     """Fetch and register the OpenAPI spec on first use. Safe to call from any
     handler; concurrent callers await the same fetch."""
-    global openapi_spec_data, _spec_load_lock, _spec_load_error
-    if openapi_spec_data is not None or _spec_load_error is not None:
+    global openapi_spec_data, _spec_load_lock, _spec_load_error, _registry_from_snapshot, _spec_key
+    if openapi_spec_data is not None or _registry_from_snapshot or _spec_load_error is not None:
         return openapi_spec_data
     if _spec_load_lock is None:
         _spec_load_lock = asyncio.Lock()
+    snapshot_args = None
     async with _spec_load_lock:
-        if openapi_spec_data is not None or _spec_load_error is not None:
+        if openapi_spec_data is not None or _registry_from_snapshot or _spec_load_error is not None:
             return openapi_spec_data
         openapi_url = os.getenv("OPENAPI_SPEC_URL")
         if not openapi_url:
             _spec_load_error = "OPENAPI_SPEC_URL not set"
             logger.critical(_spec_load_error)
             return None
-        logger.debug(f"Lazily fetching OpenAPI spec from {openapi_url}...")
-        spec = await anyio.to_thread.run_sync(fetch_openapi_spec, openapi_url)
-        if not spec:
+        logger.debug("Lazily fetching OpenAPI spec from %s...", openapi_url)
+        content = await anyio.to_thread.run_sync(fetch_openapi_spec_text, openapi_url)
+        if content is None:
             _spec_load_error = f"Failed to fetch or parse OpenAPI spec from {openapi_url}"
             logger.critical(_spec_load_error)
             return None
+        key = snapshot_key(content)
+        if not ENABLE_TOOLS:
+            spec = await anyio.to_thread.run_sync(parse_openapi_spec, openapi_url, content)
+            if not spec:
+                _spec_load_error = f"Failed to fetch or parse OpenAPI spec from {openapi_url}"
+                logger.critical(_spec_load_error)
+                return None
+            openapi_spec_data = spec
+            _spec_key = key
+            return openapi_spec_data
+        # Warm start: a byte-identical spec under the same registration
+        # settings is served from the snapshot, skipping parse and registration.
+        spec, registry, from_snapshot = await anyio.to_thread.run_sync(_build_first, openapi_url, content, key)
+        if registry is None:
+            _spec_load_error = f"Failed to fetch or parse OpenAPI spec from {openapi_url}"
+            logger.critical(_spec_load_error)
+            return None
+        install_tool_registry(registry)
+        _spec_key = key
+        if from_snapshot:
+            _registry_from_snapshot = True
+            logger.debug("Tools restored from snapshot: %s", len(registry))
+            return openapi_spec_data
         openapi_spec_data = spec
-        if ENABLE_TOOLS:
-            from mcp_openapi_proxy.handlers import register_functions
-            register_functions(spec)
-            logger.debug(f"Tools registered lazily: {[tool.name for tool in tools]}")
-            if not tools:
-                logger.critical("No valid tools registered from spec.")
-        return openapi_spec_data
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Tools registered lazily: %s", Payload(list(registry.names())))
+        if not len(registry):
+            logger.critical("No valid tools registered from spec.")
+        else:
+            snapshot_args = (openapi_url, key, registry, spec)
+    if snapshot_args is not None:
+        # After the lock: callers waiting for the tools need only the registry.
+        _store_snapshot_later(*snapshot_args)
+    return openapi_spec_data
+
+
+# Snapshot writes in progress, referenced so they are not garbage collected.
+_snapshot_writes: Set["asyncio.Future[None]"] = set()
+
+
+def _store_snapshot_later(openapi_url: str, key: str, registry: ToolRegistry, spec: Dict[str, Any]) -> None:
+    """Write the registry snapshot on the loop's default executor without
+    waiting for it. store_snapshot logs its own failures. (Not an anyio
+    worker thread: those only stop with the task that started them.)"""
+    write = asyncio.get_running_loop().run_in_executor(None, store_snapshot, openapi_url, key, registry, spec)
+    _snapshot_writes.add(write)
+    write.add_done_callback(_snapshot_writes.discard)
 
 
-mcp = Server("OpenApiProxy-LowLevel")
+def _refresh_interval() -> float:
+    try:
+        return max(0.0, float(os.getenv("OPENAPI_SPEC_REFRESH_SECONDS", "0")))
+    except ValueError:
+        logger.warning("Invalid OPENAPI_SPEC_REFRESH_SECONDS; background refresh disabled.")
+        return 0.0
+
+
+async def refresh_spec() -> bool:
+    """Revalidate the spec once (stale-while-revalidate).
+
+    The current registry keeps serving throughout. The fetch, parse and
+    build run off the event loop, and only a change in the spec text
+    rebuilds anything. The new registry is swapped in with one reference
+    assignment, so in-flight calls finish on the plan they started with.
+    Returns True when the registry was replaced.
+    """
+    global openapi_spec_data, _spec_key
+    openapi_url = os.getenv("OPENAPI_SPEC_URL")
+    if not openapi_url or not ENABLE_TOOLS:
+        return False
+    content = await anyio.to_thread.run_sync(fetch_openapi_spec_text, openapi_url)
+    if content is None:
+        logger.warning(f"Spec refresh from {openapi_url} failed; keeping current tools.")
+        return False
+    key = snapshot_key(content)
+    if key == _spec_key:
+        logger.debug("Spec unchanged; registry kept.")
+        return False
+    spec, registry, from_snapshot = await anyio.to_thread.run_sync(_build_from_text, openapi_url, content, key)
+    if registry is None or not len(registry):
+        logger.warning(f"Refreshed spec from {openapi_url} yielded no tools; keeping current tools.")
+        return False
+    install_tool_registry(registry)
+    _spec_key = key
+    if spec is not None:
+        openapi_spec_data = spec
+    logger.info("Spec changed; now serving %s tools.", len(registry))
+    if not from_snapshot:
+        _store_snapshot_later(openapi_url, key, registry, spec)
+    await _notify_tools_changed()
+    return True
+
+
+def _remember_session() -> None:
+    try:
+        _sessions.add(mcp.request_context.session)
+    except (LookupError, TypeError):
+        pass
+
+
+async def _notify_tools_changed() -> None:
+    """Send notifications/tools/list_changed to every known session, when
+    the listChanged capability is advertised."""
+    if not CAPABILITIES_TOOLS:
+        return
+    for session in list(_sessions):
+        try:
+            await session.send_tool_list_changed()
+        except Exception as e:
+            logger.debug("Dropping session after failed tools/list_changed: %s", e)
+            _sessions.discard(session)
+
+
+async def _refresh_forever(interval: float) -> None:
+    await ensure_spec_loaded()
+    while True:
+        await anyio.sleep(interval)
+        try:
+            await refresh_spec()
+        except Exception as e:
+            logger.error(f"Spec refresh failed: {e}", exc_info=True)
+
+
+class _ProxyServer(Server):
+    """Server whose default initialization options carry this proxy's name
+    and capabilities, so transports that start sessions themselves (the
+    streamable HTTP session manager) advertise the same as stdio."""
+
+    def create_initialization_options(self, *args: Any, **kwargs: Any) -> InitializationOptions:
+        return InitializationOptions(
+            server_name="AnyOpenAPIMCP-LowLevel",
+            server_version="0.1.0",
+            capabilities=build_capabilities(),
+        )
+
+
+mcp = _ProxyServer("OpenApiProxy-LowLevel")
 
 async def dispatcher_handler(request: types.CallToolRequest) -> types.CallToolResult:
     """
     Dispatcher handler that routes CallToolRequest to the appropriate function (tool).
     """
-    global openapi_spec_data
+    # Every line logged for this call carries its request id and tool name.
+    with log_context(request_id=next_request_id(), tool=request.params.name):
+        start = time.perf_counter()
+        result = await _dispatch(request)
+        latency_ms = (time.perf_counter() - start) * 1000
+        logger.log(CALL_LOG_LEVEL, "Tool call %s finished in %.1f ms", request.params.name, latency_ms,
+                   extra={"latency_ms": round(latency_ms, 3)})
+        return result
+
+
+async def _dispatch(request: types.CallToolRequest) -> types.CallToolResult:
     try:
+        _remember_session()
         await ensure_spec_loaded()
         function_name = request.params.name
-        logger.debug(f"Dispatcher received CallToolRequest for function: {function_name}")
-        logger.debug(f"API_KEY: {os.getenv('API_KEY', '<not set>')[:5] + '...' if os.getenv('API_KEY') else '<not set>'}")
-        logger.debug(f"STRIP_PARAM: {os.getenv('STRIP_PARAM', '<not set>')}")
-        tool = next((t for t in tools if t.name == function_name), None)
-        if not tool:
-            logger.error(f"Unknown function requested: {function_name}")
-            return types.CallToolResult(
-                content=[types.TextContent(type="text", text="Unknown function requested")],
-                isError=False,
-            )
+        logger.debug("Dispatcher received CallToolRequest for function: %s", function_name)
         arguments = request.params.arguments or {}
-        logger.debug(f"Raw arguments before processing: {arguments}")
-
-        if openapi_spec_data is None:
-            return types.CallToolResult(
-                content=[types.TextContent(type="text", text="OpenAPI spec not loaded")],
-                isError=True,
-            )
-        # Since we've checked openapi_spec_data is not None, cast it to Dict.
-        operation_details = lookup_operation_details(function_name, cast(Dict, openapi_spec_data))
-        if not operation_details:
-            logger.error(f"Could not find OpenAPI operation for function: {function_name}")
-            return types.CallToolResult(
-                content=[types.TextContent(type="text", text=f"Could not find OpenAPI operation for function: {function_name}")],
-                isError=False,
-            )
-
-        operation = operation_details["operation"]
-        operation["method"] = operation_details["method"]
-        headers = handle_auth(operation)
-        additional_headers = get_additional_headers()
-        headers = {**headers, **additional_headers}
-        parameters = dict(strip_parameters(arguments))
-        method = operation_details["method"]
-        if method != "GET":
-            headers["Content-Type"] = "application/json"
-
-        path = operation_details["path"]
-        try:
-            path = path.format(**parameters)
-            logger.debug(f"Substituted path using format(): {path}")
-            if method == "GET":
-                placeholder_keys = [
-                    seg.strip("{}")
-                    for seg in operation_details["original_path"].split("/")
-                    if seg.startswith("{") and seg.endswith("}")
-                ]
-                for key in placeholder_keys:
-                    parameters.pop(key, None)
-        except KeyError as e:
-            logger.error(f"Missing parameter for substitution: {e}")
-            return types.CallToolResult(
-                content=[types.TextContent(type="text", text=f"Missing parameter: {e}")],
-                isError=False,
-            )
-
-        base_url = build_base_url(cast(Dict, openapi_spec_data))
-        if not base_url:
-            logger.critical("Failed to construct base URL from spec or SERVER_URL_OVERRIDE.")
-            return types.CallToolResult(
-                content=[types.TextContent(type="text", text="No base URL defined in spec or SERVER_URL_OVERRIDE")],
-                isError=False,
-            )
-
-        api_url = f"{base_url.rstrip('/')}/{path.lstrip('/')}"
-        request_params = {}
-        request_body = None
-        if isinstance(parameters, dict):
-            merged_params = []
-            path_item = openapi_spec_data.get("paths", {}).get(operation_details["original_path"], {})
-            if isinstance(path_item, dict) and "parameters" in path_item:
-                merged_params.extend(path_item["parameters"])
-            if "parameters" in operation:
-                merged_params.extend(operation["parameters"])
-            path_params_in_openapi = [param["name"] for param in merged_params if param.get("in") == "path"]
-            if path_params_in_openapi:
-                missing_required = [
-                    param["name"]
-                    for param in merged_params
-                    if param.get("in") == "path" and param.get("required", False) and param["name"] not in arguments
-                ]
-                if missing_required:
-                    logger.error(f"Missing required path parameters: {missing_required}")
+        if discovery_mode() == MODE_SEARCH:
+            if function_name == SEARCH_TOOL:
+                return _search_operations(arguments)
+            if function_name == INVOKE_TOOL:
+                function_name = arguments.get("name")
+                arguments = arguments.get("arguments") or {}
+                if not isinstance(function_name, str) or not isinstance(arguments, dict):
+                    message = "invoke_operation needs a 'name' string and an 'arguments' object"
                     return types.CallToolResult(
-                        content=[types.TextContent(type="text", text=f"Missing required path parameters: {missing_required}")],
+                        content=[types.TextContent(type="text", text=message)],
                         isError=False,
                     )
-            if method == "GET":
-                request_params = parameters
-            else:
-                request_body = parameters
-        else:
-            logger.debug("No valid parameters provided, proceeding without params/body")
-
-        logger.debug(f"API Request - URL: {api_url}, Method: {method}")
-        logger.debug(f"Headers: {headers}")
-        logger.debug(f"Query Params: {request_params}")
-        logger.debug(f"Request Body: {request_body}")
-
-        try:
-            ignore_ssl_tools = os.getenv("IGNORE_SSL_TOOLS", "false").lower() in ("true", "1", "yes")
-            verify_ssl_tools = not ignore_ssl_tools
-            response = requests.request(
-                method=method,
-                url=api_url,
-                headers=headers,
-                params=request_params if method == "GET" else None,
-                json=request_body if method != "GET" else None,
-                verify=verify_ssl_tools,
-            )
-            response.raise_for_status()
-            response_text = (response.text or "No response body").strip()
-            content, log_message = detect_response_type(response_text)
-            logger.debug(log_message)
-            # Expect content to be of a type that can be included as is.
-            final_content = [content]
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {e}")
-            return types.CallToolResult(
-                content=[types.TextContent(type="text", text=str(e))],
-                isError=False,
-            )
-        logger.debug(f"Response content type: {content.type}")
-        logger.debug(f"Response sent to client: {content.text}")
-        return types.CallToolResult(content=final_content, isError=False)
+        return await _call_operation(function_name, arguments)
     except Exception as e:
         logger.error(f"Unhandled exception in dispatcher_handler: {e}", exc_info=True)
         return types.CallToolResult(
@@ -338,11 +449,197 @@ async def dispatcher_handler(request: types.CallToolRequest) -> types.CallToolRe
         )
 
 
+def _search_operations(arguments: Dict[str, Any]) -> types.CallToolResult:
+    query = arguments.get("query")
+    if not isinstance(query, str) or not query.strip():
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text="search_operations needs a non-empty 'query' string")],
+            isError=False,
+        )
+    results = search_results(current_registry(), query, arguments.get("limit"))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("search_operations '%s': %s", query, [result['name'] for result in results])
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=json_codec.dumps(results))],
+        isError=False,
+    )
+
+
+# Coalesces identical concurrent GET tool calls (SINGLE_FLIGHT).
+_single_flight = SingleFlight()
+
+
+def single_flight_stats() -> Dict[str, int]:
+    """Calls that made their own upstream request (leaders) and calls that
+    shared one already in flight (coalesced)."""
+    return _single_flight.stats()
+
+
+async def _call_operation(function_name: str, arguments: Dict[str, Any]) -> types.CallToolResult:
+    """Invoke one registered operation, whether called directly as a tool or
+    through invoke_operation."""
+    # O(1) lookup in the index built at registration; the entry (and
+    # its plan) stays valid for this call even if the registry is swapped.
+    entry = current_registry().get(function_name)
+    if entry is None:
+        logger.error(f"Unknown function requested: {function_name}")
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text="Unknown function requested")],
+            isError=False,
+        )
+    plan = entry.plan
+    logger.debug("Raw arguments before processing: %s", Payload(arguments))
+
+    # Auth + EXTRA_HEADERS were merged once, when the config was built;
+    # plan.prepare copies them before adding anything per call.
+    config = current_config()
+    parameters = dict(strip_parameters(arguments))
+    try:
+        prepared = plan.prepare(arguments, parameters, config.request_headers)
+    except InvocationError as e:
+        logger.error(f"Cannot invoke {function_name}: {e}")
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=str(e))],
+            isError=False,
+        )
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("API Request - URL: %s, Method: %s", prepared.url, prepared.method)
+        logger.debug("Headers: %s", Payload(prepared.headers))
+        logger.debug("Query Params: %s", Payload(prepared.params))
+        logger.debug("Request Body: %s", Payload(prepared.json))
+
+    timeouts = config.timeouts_for(function_name, plan.operation)
+    fetch = partial(_fetch, function_name, prepared, config.verify_ssl_tools, timeouts)
+    if prepared.method == "GET" and config.coalesces(function_name):
+        # Identical concurrent GETs share one upstream request and one
+        # decoded result.
+        key = request_key(prepared.method, prepared.url, prepared.params, prepared.headers)
+        return await _single_flight.run(key, fetch)
+    return await fetch()
+
+
+async def _fetch(
+    function_name: str,
+    prepared: PreparedRequest,
+    verify: bool,
+    timeouts: http_client.UpstreamTimeouts,
+) -> types.CallToolResult:
+    """Send one prepared upstream request and turn the response into the
+    tool result."""
+    try:
+        # Awaited on the shared async client so a slow upstream never
+        # blocks the event loop (other tool calls, list_tools, pings).
+        response = await http_client.request(
+            prepared.method,
+            prepared.url,
+            headers=prepared.headers,
+            params=prepared.params,
+            json=prepared.json,
+            verify=verify,
+            timeouts=timeouts,
+            tool=function_name,
+        )
+        response.raise_for_status()
+        response_text = (response.text or "No response body").strip()
+        content, log_message = detect_response_type(response_text, response.headers.get("content-type"))
+        logger.debug(log_message)
+        # Expect content to be of a type that can be included as is.
+        final_content = [content]
+    except http_client.NOT_SENT as e:
+        error = http_client.not_sent_error(function_name, e)
+        logger.info("API request not sent: %s", error["error"])
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=json_codec.dumps(error))],
+            isError=True,
+        )
+    except httpx.TimeoutException as e:
+        error = http_client.timeout_error(function_name, e, timeouts)
+        logger.error(f"API request timed out: {error['error']}")
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=json_codec.dumps(error))],
+            isError=True,
+        )
+    except httpx.HTTPError as e:
+        logger.error(f"API request failed: {e}")
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=str(e))],
+            isError=False,
+        )
+    logger.debug("Response content type: %s", content.type)
+    logger.debug("Response sent to client: %s", Payload(content.text))
+    return types.CallToolResult(content=final_content, isError=False)
+
+
+def _list_page_size() -> int:
+    try:
+        return max(0, int(os.getenv("TOOLS_LIST_PAGE_SIZE", "0")))
+    except ValueError:
+        logger.warning("Invalid TOOLS_LIST_PAGE_SIZE; listing all tools in one page.")
+        return 0
+
+
+# tools/list pages of one registry, keyed by (offset, page size). Tools and
+# pages are immutable, so each page is built once and the same result object
+# is returned to every client until a new registry is installed.
+_tool_pages: Tuple[Optional[ToolRegistry], Dict[Tuple[int, int], types.ListToolsResult]] = (None, {})
+
+
+def _encode_cursor(registry: ToolRegistry, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{registry.version}:{offset}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(registry: ToolRegistry, cursor: str) -> int:
+    """Offset for a cursor issued for this registry's tool list. Cursors are
+    tied to the list version: after the tools change, listing restarts."""
+    try:
+        version, offset = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split(":")
+        position = int(offset)
+    except ValueError:
+        raise McpError(types.ErrorData(code=types.INVALID_PARAMS, message="Invalid tools/list cursor"))
+    if version != registry.version or not 0 <= position <= len(registry):
+        raise McpError(types.ErrorData(
+            code=types.INVALID_PARAMS,
+            message="Stale tools/list cursor: the tool list changed; list again from the start"))
+    return position
+
+
+def _request_cursor(request: Any) -> Optional[str]:
+    # MCP puts the cursor in params; older SDKs model it on the request.
+    params = getattr(request, "params", None)
+    return getattr(params, "cursor", None) or getattr(request, "cursor", None)
+
+
+def _tool_page(registry: ToolRegistry, offset: int, size: int) -> types.ListToolsResult:
+    global _tool_pages
+    cached_registry, pages = _tool_pages
+    if cached_registry is not registry:
+        pages = {}
+        _tool_pages = (registry, pages)
+    result = pages.get((offset, size))
+    if result is None:
+        limit = size or len(registry)
+        end = offset + limit
+        result = types.ListToolsResult(
+            tools=registry.page(offset, limit),
+            nextCursor=_encode_cursor(registry, end) if end < len(registry) else None,
+        )
+        pages[(offset, size)] = result
+    return result
+
+
 async def list_tools(request: types.ListToolsRequest) -> types.ListToolsResult:
     logger.debug("Handling list_tools request - start")
+    _remember_session()
     await ensure_spec_loaded()
-    logger.debug(f"Tools list length: {len(tools)}")
-    return types.ListToolsResult(tools=tools)
+    if discovery_mode() == MODE_SEARCH:
+        # Operations are found with search_operations instead of listed.
+        return types.ListToolsResult(tools=meta_tools())
+    registry = current_registry()
+    cursor = _request_cursor(request)
+    offset = _decode_cursor(registry, cursor) if cursor else 0
+    logger.debug("Tools list length: %s, from %s", len(registry), offset)
+    return _tool_page(registry, offset, _list_page_size())
 
 async def list_resources(request: types.ListResourcesRequest) -> types.ListResourcesResult:
     """List the spec_file resource plus any ADDITIONAL_RESOURCES entries.
@@ -350,7 +647,7 @@ async def list_resources(request: types.ListResourcesRequest) -> types.ListResou
     The module-level `resources` list is always seeded with spec_file; the
     guard below only matters if a caller mutated it at runtime.
     """
-    logger.debug(f"Handling list_resources request ({len(resources)} resources)")
+    logger.debug("Handling list_resources request (%s resources)", len(resources))
     if not resources:
         logger.debug("Resources empty; repopulating default resource")
         resources.append(
@@ -364,7 +661,7 @@ async def list_resources(request: types.ListResourcesRequest) -> types.ListResou
 
 
 async def read_resource(request: types.ReadResourceRequest) -> types.ReadResourceResult:
-    logger.debug(f"START read_resource for URI: {request.params.uri}")
+    logger.debug("START read_resource for URI: %s", request.params.uri)
     try:
         uri_str = str(request.params.uri)
         for name, path in ADDITIONAL_RESOURCES.items():
@@ -383,7 +680,7 @@ async def read_resource(request: types.ReadResourceRequest) -> types.ReadResourc
                     ]
                 )
         openapi_url = os.getenv("OPENAPI_SPEC_URL")
-        logger.debug(f"Got OPENAPI_SPEC_URL: {openapi_url}")
+        logger.debug("Got OPENAPI_SPEC_URL: %s", openapi_url)
         if not openapi_url:
             logger.error("OPENAPI_SPEC_URL not set")
             return types.ReadResourceResult(
@@ -396,7 +693,7 @@ async def read_resource(request: types.ReadResourceRequest) -> types.ReadResourc
             )
         logger.debug("Fetching spec...")
         spec_data = fetch_openapi_spec(openapi_url)
-        logger.debug(f"Spec fetched: {spec_data is not None}")
+        logger.debug("Spec fetched: %s", spec_data is not None)
         if not spec_data:
             logger.error("Failed to fetch OpenAPI spec")
             return types.ReadResourceResult(
@@ -408,8 +705,8 @@ async def read_resource(request: types.ReadResourceRequest) -> types.ReadResourc
                 ]
             )
         logger.debug("Dumping spec to JSON...")
-        spec_json = json.dumps(spec_data, indent=2, default=str)
-        logger.debug(f"Forcing spec JSON return: {spec_json[:50]}...")
+        spec_json = json_codec.dumps(spec_data, indent=True, default=str)
+        logger.debug("Forcing spec JSON return: %s...", spec_json[:50])
         return types.ReadResourceResult(
             contents=[
                 types.TextResourceContents(
@@ -433,12 +730,12 @@ async def read_resource(request: types.ReadResourceRequest) -> types.ReadResourc
 
 async def list_prompts(request: types.ListPromptsRequest) -> types.ListPromptsResult:
     logger.debug("Handling list_prompts request")
-    logger.debug(f"Prompts list length: {len(prompts)}")
+    logger.debug("Prompts list length: %s", len(prompts))
     return types.ListPromptsResult(prompts=prompts)
 
 
 async def get_prompt(request: types.GetPromptRequest) -> types.GetPromptResult:
-    logger.debug(f"Handling get_prompt request for {request.params.name}")
+    logger.debug("Handling get_prompt request for %s", request.params.name)
     template = PROMPT_TEMPLATES.get(request.params.name)
     if template is None:
         logger.error(f"Prompt '{request.params.name}' not found")
@@ -453,7 +750,7 @@ async def get_prompt(request: types.GetPromptRequest) -> types.GetPromptResult:
         )
     try:
         messages = template(request.params.arguments or {})
-        logger.debug(f"Generated messages: {messages}")
+        logger.debug("Generated messages: %s", Payload(messages))
         return types.GetPromptResult(messages=messages)
     except Exception as e:
         logger.error(f"Error generating prompt: {e}", exc_info=True)
@@ -477,12 +774,13 @@ def lookup_operation_details(function_name: str, spec: Dict[str, Any]) -> Option
         return dict(registered)
     if not spec or 'paths' not in spec:
         return None
+    normalize = tool_name_normalizer()
     for path, path_item in spec['paths'].items():
         for method, operation in path_item.items():
             if method.lower() not in ['get', 'post', 'put', 'delete', 'patch']:
                 continue
             raw_name = f"{method.upper()} {path}"
-            current_function_name = normalize_tool_name(raw_name)
+            current_function_name = normalize(raw_name)
             if current_function_name == function_name:
                 return {"path": path, "method": method.upper(), "operation": operation, "original_path": path}
     return None
@@ -497,23 +795,34 @@ def _is_closed_stream_error(exc: BaseException) -> bool:
     return False
 
 
-async def start_server():
-    logger.debug("Starting Low-Level MCP server...")
+@asynccontextmanager
+async def serving() -> AsyncIterator[None]:
+    """Process-wide state for a server run, whatever the transport: the spec
+    pre-warm, the optional background refresher and the upstream pool. Every
+    session served inside shares the one spec, registry and pool."""
     # Pre-warm the spec in the background: the handshake is served immediately
     # while the (possibly slow) spec download proceeds (issue #28).
     prewarm = asyncio.create_task(ensure_spec_loaded())
-    async with stdio_server() as (read_stream, write_stream):
+    refresh_seconds = _refresh_interval()
+    refresher = asyncio.create_task(_refresh_forever(refresh_seconds)) if ENABLE_TOOLS and refresh_seconds > 0 else None
+    try:
+        async with http_client.lifespan():
+            yield
+    finally:
+        prewarm.cancel()
+        if refresher is not None:
+            refresher.cancel()
+
+
+async def start_server():
+    logger.debug("Starting Low-Level MCP server...")
+    async with serving(), stdio_server() as (read_stream, write_stream):
         while True:
             try:
-                capabilities = build_capabilities()
                 await mcp.run(
                     read_stream,
                     write_stream,
-                    initialization_options=InitializationOptions(
-                        server_name="AnyOpenAPIMCP-LowLevel",
-                        server_version="0.1.0",
-                        capabilities=capabilities,
-                    ),
+                    initialization_options=mcp.create_initialization_options(),
                 )
                 logger.debug("MCP session ended normally; exiting.")
                 break
@@ -526,7 +835,6 @@ async def start_server():
                     break
                 logger.error(f"MCP run crashed: {e}", exc_info=True)
                 await anyio.sleep(1)
-    prewarm.cancel()
 
 
 def run_server():
@@ -534,6 +842,9 @@ def run_server():
         if not os.getenv('OPENAPI_SPEC_URL'):
             logger.critical("OPENAPI_SPEC_URL environment variable is required but not set.")
             sys.exit(1)
+        # Auth, EXTRA_HEADERS, STRIP_PARAM and IGNORE_SSL_TOOLS are read once
+        # here; tool calls use this snapshot.
+        reload_config()
         # Spec fetch + tool registration are lazy (ensure_spec_loaded) so the
         # MCP handshake is never blocked by a slow spec download (issue #28).
         if ENABLE_TOOLS:
@@ -545,8 +856,18 @@ def run_server():
         if ENABLE_PROMPTS:
             mcp.request_handlers[types.ListPromptsRequest] = list_prompts
             mcp.request_handlers[types.GetPromptRequest] = get_prompt
+        if ENABLE_TOOLS and _list_page_size() and not hasattr(types, "PaginatedRequestParams"):
+            logger.warning(
+                "TOOLS_LIST_PAGE_SIZE is set, but this mcp SDK drops params.cursor from tools/list "
+                "requests; only clients built on the same SDK can fetch pages after the first."
+            )
         logger.debug("Handlers registered based on capabilities and enablement envvars.")
-        asyncio.run(start_server())
+        transport = os.getenv("MCP_TRANSPORT", "stdio").strip().lower()
+        if transport == "stdio":
+            asyncio.run(start_server())
+        else:
+            from mcp_openapi_proxy.http_transport import start_http_server
+            asyncio.run(start_http_server(transport))
     except KeyboardInterrupt:
         logger.debug("MCP server shutdown initiated by user.")
     except Exception as e:
@@ -0,0 +1,164 @@
+"""
+Precompiled tool-registry snapshots for mcp-openapi-proxy.
+
+Registering a large spec (normalizing every name, resolving parameters,
+compiling every plan) dominates cold start. After a successful registration
+the resulting registry is written next to the spec cache, keyed by a hash of
+the raw spec text and the environment variables that change what gets
+registered. A later process that fetches byte-identical spec text under the
+same settings loads the snapshot instead of parsing the spec and running
+register_functions.
+
+A snapshot holds the plans and the parsed spec, not built Tools: writing one
+must not build every input schema of a lazy registry, and a restored
+registry builds each Tool from its operation on first use, as a freshly
+registered one does.
+
+Snapshots contain only builtin containers and scalars and are read with an
+unpickler that refuses every global, so a tampered file cannot execute code.
+Set OPENAPI_REGISTRY_SNAPSHOT=false to disable.
+"""
+
+import glob
+import hashlib
+import io
+import os
+import pickle
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional
+
+from mcp import types
+
+from .logging_setup import logger
+from .plans import OperationPlan, PathTemplate
+from .refs import RefResolver
+from .registry import RegistryEntry, ToolRegistry
+
+# Bump whenever the serialized layout (or anything it is derived from)
+# changes, so stale snapshots are ignored rather than misread. 2: $ref
+# resolution (refs.py) changed the registered schemas. 3: the spec instead
+# of built Tools. 4: plan base URLs no longer include SERVER_URL_OVERRIDE.
+SNAPSHOT_FORMAT = 4
+
+# Environment variables read during registration.
+REGISTRATION_ENV = ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE")
+
+
+def snapshot_enabled() -> bool:
+    return os.getenv("OPENAPI_REGISTRY_SNAPSHOT", "true").lower() not in ("false", "0", "no")
+
+
+def snapshot_key(content: str) -> str:
+    """Hash of the raw spec text plus everything else registration depends on."""
+    digest = hashlib.sha256()
+    digest.update(f"format={SNAPSHOT_FORMAT};tool={','.join(sorted(types.Tool.model_fields))}".encode())
+    for name in REGISTRATION_ENV:
+        digest.update(f"\0{name}={os.getenv(name, '')}".encode())
+    digest.update(b"\0")
+    digest.update(content.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def _snapshot_path(url: str, key: str) -> str:
+    from .utils import _cache_dir, _url_digest
+    return os.path.join(_cache_dir(), f"registry-{_url_digest(url)}-{key[:24]}.pickle")
+
+
+class _BuiltinsOnlyUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"snapshot references forbidden global {module}.{name}")
+
+
+def _encode(registry: ToolRegistry) -> List[Dict[str, Any]]:
+    """The plans of ``registry``, read without building any Tool."""
+    records = []
+    for name in registry.names():
+        plan = registry.get(name).plan
+        records.append({
+            "tool_name": plan.tool_name,
+            "method": plan.method,
+            "path": plan.path,
+            "base_url": plan.base_url,
+            "template": (plan.template.fmt, plan.template.placeholders),
+            "param_locations": dict(plan.param_locations),
+            "required_path": tuple(plan.required_path),
+            "static_headers": dict(plan.static_headers),
+            "body_strategy": plan.body_strategy,
+            "operation": plan.operation,
+        })
+    return records
+
+
+def _decode(spec: Dict[str, Any], records: List[Dict[str, Any]]) -> ToolRegistry:
+    from .openapi import _deref_parameters, _tool_factory
+    # One resolver per registry, as build_registry does; path-level
+    # parameters are re-read from the spec the same way.
+    resolver = RefResolver(spec)
+    lock = threading.Lock()
+    path_parameters: Dict[str, List[Dict[str, Any]]] = {}
+    entries: Dict[str, RegistryEntry] = {}
+    for p in records:
+        fmt, placeholders = p["template"]
+        plan = OperationPlan(
+            tool_name=p["tool_name"],
+            method=p["method"],
+            path=p["path"],
+            base_url=p["base_url"],
+            template=PathTemplate(fmt, tuple(placeholders)),
+            param_locations=MappingProxyType(p["param_locations"]),
+            required_path=frozenset(p["required_path"]),
+            static_headers=MappingProxyType(p["static_headers"]),
+            body_strategy=p["body_strategy"],
+            operation=p["operation"],
+        )
+        path_params = path_parameters.get(plan.path)
+        if path_params is None:
+            path_item = resolver.deref(spec.get("paths", {}).get(plan.path))
+            params = path_item.get("parameters", []) if isinstance(path_item, dict) else []
+            path_params = path_parameters[plan.path] = _deref_parameters(resolver, params)
+        entries[plan.tool_name] = RegistryEntry.lazy(
+            plan, _tool_factory(plan.tool_name, plan.path, plan.operation, path_params, resolver, lock),
+        )
+    return ToolRegistry(entries)
+
+
+def load_snapshot(url: str, key: str) -> Optional[ToolRegistry]:
+    """The registry stored for (url, key), or None on a miss or unreadable file."""
+    if not snapshot_enabled():
+        return None
+    path = _snapshot_path(url, key)
+    try:
+        with open(path, "rb") as f:
+            payload = _BuiltinsOnlyUnpickler(io.BytesIO(f.read())).load()
+        if not isinstance(payload, dict) or payload.get("format") != SNAPSHOT_FORMAT or payload.get("key") != key:
+            logger.debug("Ignoring mismatched registry snapshot %s", path)
+            return None
+        registry = _decode(payload["spec"], payload["entries"])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable registry snapshot {path}: {e}")
+        return None
+    logger.debug("Loaded %s tools from registry snapshot %s", len(registry), path)
+    return registry
+
+
+def store_snapshot(url: str, key: str, registry: ToolRegistry, spec: Dict[str, Any]) -> None:
+    """Persist ``registry``, built from ``spec``, for (url, key), replacing
+    older snapshots of url. Builds no Tool."""
+    if not snapshot_enabled():
+        return
+    try:
+        path = _snapshot_path(url, key)
+        payload = {"format": SNAPSHOT_FORMAT, "key": key, "spec": spec, "entries": _encode(registry)}
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        prefix = path[: path.rindex("-") + 1]
+        for stale in glob.glob(glob.escape(prefix) + "*.pickle"):
+            if stale != path:
+                os.remove(stale)
+        logger.debug("Stored registry snapshot for %s at %s", url, path)
+    except Exception as e:
+        logger.warning(f"Could not write registry snapshot: {e}")
@@ -8,11 +8,14 @@ import sys
 import json
 import requests
 import yaml
-from typing import Dict, Optional, Tuple, List, Union
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union
 from mcp import types
 
 # Import the configured logger
-from .logging_setup import logger
+from .logging_setup import Payload, logger
+from . import json_codec
+from .config import current_config
 
 
 class _NoTimestampSafeLoader(yaml.SafeLoader):
@@ -96,95 +99,141 @@ def deduplicate_tool_name(tool_name: str, registered_names) -> str:
         counter += 1
 
 
-def normalize_tool_name(raw_name: str, max_length: Optional[int] = None) -> str:
-    """
-    Convert an HTTP method and path into a normalized tool name, applying length limits.
-    """
-    try:
-        # Defensive: Only process if raw_name contains a space (method and path)
-        if " " not in raw_name:
-            logger.warning(f"Malformed raw tool name received: '{raw_name}'. Returning 'unknown_tool'.")
-            return "unknown_tool"
-        method, path = raw_name.split(" ", 1)
-
-        # Remove common uninformative url prefixes and leading/trailing slashes
-        path = re.sub(r"/(api|rest|public)/?", "/", path).lstrip("/").rstrip("/")
-
-        # Handle empty path
-        if not path:
-            path = "root"
-
-        url_template_pattern = re.compile(r"\{([^}]+)\}")
-        normalized_parts = []
-        for part in path.split("/"):
-            if url_template_pattern.search(part):
-                # Replace path parameters with "by_param" format
-                params = url_template_pattern.findall(part)
-                base = url_template_pattern.sub("", part)
-                # Lowercase parameters to ensure consistency
-                part = f"{base}_by_{'_'.join(p.lower() for p in params)}"
-
-            # Clean up part and add to list
-            # Added .replace('+', '_') here
-            part = part.replace(".", "_").replace("-", "_").replace("+", "_")
-            if part:  # Skip empty parts
-                normalized_parts.append(part)
-
-        # Combine and clean final result
-        tool_name = f"{method.lower()}_{'_'.join(normalized_parts)}"
-        # Remove repeated underscores
-        tool_name = re.sub(r"_+", "_", tool_name).strip("_")
-
-        # Apply TOOL_NAME_PREFIX if set
-        tool_name_prefix = os.getenv("TOOL_NAME_PREFIX", "")
-        if tool_name_prefix:
-            tool_name = f"{tool_name_prefix}{tool_name}"
-
-        # Determine the effective custom max length based on env var and argument
-        effective_max_length: Optional[int] = max_length
-        if effective_max_length is None:
-            effective_max_length = get_tool_name_max_length()
-
-        # Protocol limit
-        PROTOCOL_MAX_LENGTH = 64
-
-        # Determine the final length limit, respecting both custom and protocol limits
-        final_limit = PROTOCOL_MAX_LENGTH
-        limit_source = "protocol"
-        if effective_max_length is not None:
-            # If custom limit is set, it takes precedence, but cannot exceed protocol limit
-            if effective_max_length < PROTOCOL_MAX_LENGTH:
-                 final_limit = effective_max_length
-                 limit_source = f"custom ({effective_max_length})"
-            else:
-                 # Custom limit is >= protocol limit, so protocol limit is the effective one
-                 final_limit = PROTOCOL_MAX_LENGTH
-                 limit_source = f"protocol (custom limit was {effective_max_length})"
+# Protocol limit on tool names
+PROTOCOL_MAX_LENGTH = 64
 
+_UNINFORMATIVE_PREFIX = re.compile(r"/(api|rest|public)/?")
+_URL_TEMPLATE = re.compile(r"\{([^}]+)\}")
+_REPEATED_UNDERSCORES = re.compile(r"_+")
 
-        original_length = len(tool_name)
 
-        # Truncate if necessary
-        if original_length > final_limit:
-            logger.warning(
-                f"Tool name '{tool_name}' ({original_length} chars) exceeds {limit_source} limit of {final_limit} chars; truncating."
-            )
-            tool_name = tool_name[:final_limit]
+class ToolNameNormalizer:
+    """Converts "METHOD /path" into a tool name under one TOOL_NAME_PREFIX /
+    TOOL_NAME_MAX_LENGTH configuration, frozen at construction.
 
-        logger.info(f"Final tool name: {tool_name}, length: {len(tool_name)}")
+    Results are memoized by raw name (normalization is pure once the
+    configuration is fixed), so registering a spec and every later lookup
+    scan over it pay for each operation's regex passes once. Truncation
+    warnings are repeated on every call, as before.
+    """
+
+    def __init__(self, prefix: str = "", max_length: Optional[int] = None, cache_size: int = 65536):
+        self.prefix = prefix
+        self.max_length = max_length
+        self._normalize_cached = lru_cache(maxsize=cache_size)(self._normalize)
 
+    def __call__(self, raw_name: str, max_length: Optional[int] = None) -> str:
+        tool_name, warning = self._normalize_cached(raw_name, max_length)
+        if warning:
+            logger.warning(warning)
         return tool_name
-    except Exception as e:
-        logger.error(f"Error normalizing tool name '{raw_name}': {e}", exc_info=True)
-        return "unknown_tool" # Return a default on unexpected error
 
-def _spec_cache_path(url: str) -> str:
-    import hashlib
+    def _normalize(self, raw_name: str, max_length: Optional[int]) -> Tuple[str, Optional[str]]:
+        try:
+            # Defensive: Only process if raw_name contains a space (method and path)
+            if " " not in raw_name:
+                return "unknown_tool", f"Malformed raw tool name received: '{raw_name}'. Returning 'unknown_tool'."
+            method, path = raw_name.split(" ", 1)
+
+            # Remove common uninformative url prefixes and leading/trailing slashes
+            path = _UNINFORMATIVE_PREFIX.sub("/", path).lstrip("/").rstrip("/")
+
+            # Handle empty path
+            if not path:
+                path = "root"
+
+            normalized_parts = []
+            for part in path.split("/"):
+                if "{" in part:
+                    params = _URL_TEMPLATE.findall(part)
+                    if params:
+                        # Replace path parameters with "by_param" format
+                        base = _URL_TEMPLATE.sub("", part)
+                        # Lowercase parameters to ensure consistency
+                        part = f"{base}_by_{'_'.join(p.lower() for p in params)}"
+
+                # Clean up part and add to list
+                part = part.replace(".", "_").replace("-", "_").replace("+", "_")
+                if part:  # Skip empty parts
+                    normalized_parts.append(part)
+
+            # Combine and clean final result
+            tool_name = f"{method.lower()}_{'_'.join(normalized_parts)}"
+            # Remove repeated underscores
+            tool_name = _REPEATED_UNDERSCORES.sub("_", tool_name).strip("_")
+
+            # Apply TOOL_NAME_PREFIX if set
+            if self.prefix:
+                tool_name = f"{self.prefix}{tool_name}"
+
+            # Determine the effective custom max length based on config and argument
+            effective_max_length = self.max_length if max_length is None else max_length
+
+            # Determine the final length limit, respecting both custom and protocol limits
+            final_limit = PROTOCOL_MAX_LENGTH
+            limit_source = "protocol"
+            if effective_max_length is not None:
+                # If custom limit is set, it takes precedence, but cannot exceed protocol limit
+                if effective_max_length < PROTOCOL_MAX_LENGTH:
+                     final_limit = effective_max_length
+                     limit_source = f"custom ({effective_max_length})"
+                else:
+                     # Custom limit is >= protocol limit, so protocol limit is the effective one
+                     limit_source = f"protocol (custom limit was {effective_max_length})"
+
+            # Truncate if necessary
+            warning = None
+            if len(tool_name) > final_limit:
+                warning = (f"Tool name '{tool_name}' ({len(tool_name)} chars) exceeds {limit_source} "
+                           f"limit of {final_limit} chars; truncating.")
+                tool_name = tool_name[:final_limit]
+
+            # Once per distinct name, not per call
+            logger.debug("Final tool name: %s, length: %s", tool_name, len(tool_name))
+            return tool_name, warning
+        except Exception as e:
+            logger.error(f"Error normalizing tool name '{raw_name}': {e}", exc_info=True)
+            return "unknown_tool", None # Return a default on unexpected error
+
+
+_tool_name_normalizer: Optional[ToolNameNormalizer] = None
+_tool_name_settings: Optional[Tuple[str, str]] = None
+
+
+def tool_name_normalizer() -> ToolNameNormalizer:
+    """The normalizer for the current TOOL_NAME_PREFIX and
+    TOOL_NAME_MAX_LENGTH, rebuilt (with an empty memo) only when either
+    changes. Get it once and reuse it when naming many operations."""
+    global _tool_name_normalizer, _tool_name_settings
+    settings = (os.getenv("TOOL_NAME_PREFIX", ""), os.getenv("TOOL_NAME_MAX_LENGTH", ""))
+    normalizer = _tool_name_normalizer
+    if normalizer is None or settings != _tool_name_settings:
+        normalizer = ToolNameNormalizer(settings[0], get_tool_name_max_length())
+        _tool_name_normalizer, _tool_name_settings = normalizer, settings
+    return normalizer
+
+
+def normalize_tool_name(raw_name: str, max_length: Optional[int] = None) -> str:
+    """
+    Convert an HTTP method and path into a normalized tool name, applying length limits.
+    """
+    return tool_name_normalizer()(raw_name, max_length)
+
+def _cache_dir() -> str:
     cache_dir = os.path.join(
         os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "mcp-openapi-proxy"
     )
     os.makedirs(cache_dir, exist_ok=True)
-    return os.path.join(cache_dir, f"spec-{hashlib.sha256(url.encode()).hexdigest()[:24]}.json")
+    return cache_dir
+
+
+def _url_digest(url: str) -> str:
+    import hashlib
+    return hashlib.sha256(url.encode()).hexdigest()[:24]
+
+
+def _spec_cache_path(url: str) -> str:
+    return os.path.join(_cache_dir(), f"spec-{_url_digest(url)}.json")
 
 
 def _spec_cache_ttl() -> int:
@@ -194,93 +243,149 @@ def _spec_cache_ttl() -> int:
         return 86400
 
 
-def _spec_cache_load(url: str) -> Optional[Dict]:
-    """Fallback copy of a previously fetched remote spec, if fresh enough."""
+def _spec_cache_meta_path(url: str) -> str:
+    return os.path.join(_cache_dir(), f"spec-{_url_digest(url)}.meta.json")
+
+
+def _content_hash(content: str) -> str:
+    import hashlib
+    return hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _spec_cache_read(url: str) -> Tuple[Optional[str], float]:
+    """The cached text of a remote spec and its age in seconds, regardless of
+    the TTL; (None, 0) when there is none or caching is disabled."""
     import time
     if _spec_cache_ttl() <= 0 or url.startswith("file://"):
-        return None
+        return None, 0.0
     path = _spec_cache_path(url)
     try:
         age = time.time() - os.path.getmtime(path)
-        if age < _spec_cache_ttl():
-            with open(path, "r") as f:
-                spec = json.load(f)
-            logger.debug(f"Spec cache hit for {url} (age {int(age)}s): {path}")
-            return spec
+        with open(path, "r") as f:
+            return f.read(), age
+    except OSError:
+        return None, 0.0
+
+
+def _spec_cache_validators(url: str, content: str) -> Dict[str, str]:
+    """Conditional-request headers for the cached copy of url. Validators are
+    only sent when the sidecar was written for exactly this cached text."""
+    try:
+        with open(_spec_cache_meta_path(url), "r") as f:
+            meta = json.load(f)
     except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(meta, dict) or meta.get("sha256") != _content_hash(content):
+        return {}
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def _spec_cache_touch(url: str) -> None:
+    """Restart the TTL of a cached copy the origin just confirmed (304)."""
+    try:
+        os.utime(_spec_cache_path(url))
+    except OSError:
         pass
+
+
+def _spec_cache_load_text(url: str) -> Optional[str]:
+    """Fallback copy of a previously fetched remote spec, if fresh enough."""
+    content, age = _spec_cache_read(url)
+    if content is not None and age < _spec_cache_ttl():
+        logger.debug("Spec cache hit for %s (age %ss)", url, int(age))
+        return content
     return None
 
 
+def _spec_cache_load(url: str) -> Optional[Dict]:
+    content = _spec_cache_load_text(url)
+    if content is None:
+        return None
+    try:
+        return json_codec.loads(content)
+    except json_codec.JSONDecodeError:
+        return None
+
+
 def _spec_cache_store(url: str, spec: Dict) -> None:
+    _spec_cache_store_text(url, json_codec.dumps(spec, default=str))
+
+
+def _spec_cache_store_text(
+    url: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None
+) -> None:
+    """Cache the spec text exactly as served, with its validators and hash in
+    a sidecar file for conditional revalidation."""
     if url.startswith("file://") or _spec_cache_ttl() <= 0:
         return
     try:
         path = _spec_cache_path(url)
         with open(path + ".tmp", "w") as f:
-            json.dump(spec, f, default=str)
+            f.write(content)
         os.replace(path + ".tmp", path)
-        logger.debug(f"Cached spec for {url} at {path}")
+        meta_path = _spec_cache_meta_path(url)
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({"etag": etag, "last_modified": last_modified, "sha256": _content_hash(content)}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        logger.debug("Cached spec for %s at %s", url, path)
     except OSError as exc:
         logger.warning(f"Could not write spec cache: {exc}")
 
 
-def fetch_openapi_spec(url: str, retries: int = 3) -> Optional[Dict]:
-    """Fetch and parse an OpenAPI specification (JSON or YAML) from a URL.
+def fetch_openapi_spec_text(url: str, retries: int = 3) -> Optional[str]:
+    """Fetch the raw text of an OpenAPI specification, without parsing it.
 
     Live-first with cache fallback (issue #28): remote fetches are always
     attempted first; a previously cached copy is used only when the live
     retrieval fails or stalls. When a fallback exists we fail fast (single
     attempt) instead of burning the full retry budget. Tune with
     OPENAPI_SPEC_CACHE_TTL_SECONDS (default 86400; 0 disables caching).
+
+    Remote fetches are conditional: the ETag / Last-Modified stored with the
+    cached copy are sent back, and a 304 serves the cached text without
+    transferring the body again.
     """
-    fallback = _spec_cache_load(url)
+    cached, age = _spec_cache_read(url)
+    fallback = cached if cached is not None and age < _spec_cache_ttl() else None
     if fallback is not None:
         retries = 1  # fail fast to the cached copy instead of retrying for ~30s
-    logger.debug(f"Fetching OpenAPI spec from URL: {url}")
+    logger.debug("Fetching OpenAPI spec from URL: %s", url)
     attempt = 0
     while attempt < retries:
         try:
             if url.startswith("file://"):
                 with open(url[7:], "r") as f:
-                    content = f.read()
-                spec_format = os.getenv("OPENAPI_SPEC_FORMAT", "json").lower()
-                logger.debug(f"Using {spec_format.upper()} parser based on OPENAPI_SPEC_FORMAT env var")
-                if spec_format == "yaml":
-                    try:
-                        spec = yaml_load_safe(content)
-                        logger.debug(f"Parsed as YAML from {url}")
-                    except yaml.YAMLError as ye:
-                        logger.error(f"YAML parsing failed: {ye}. Raw content: {content[:500]}...")
-                        return None
-                else:
-                    try:
-                        spec = json.loads(content)
-                        logger.debug(f"Parsed as JSON from {url}")
-                    except json.JSONDecodeError as je:
-                        logger.error(f"JSON parsing failed: {je}. Raw content: {content[:500]}...")
-                        return None
+                    return f.read()
+            # Check IGNORE_SSL_SPEC env var
+            ignore_ssl_spec = os.getenv("IGNORE_SSL_SPEC", "false").lower() in ("true", "1", "yes")
+            verify_ssl_spec = not ignore_ssl_spec
+            logger.debug("Fetching spec with SSL verification: %s (IGNORE_SSL_SPEC=%s)",
+                         verify_ssl_spec, ignore_ssl_spec)
+            conditional = _spec_cache_validators(url, cached) if cached is not None else {}
+            if conditional:
+                response = requests.get(url, timeout=10, verify=verify_ssl_spec, headers=conditional)
             else:
-                # Check IGNORE_SSL_SPEC env var
-                ignore_ssl_spec = os.getenv("IGNORE_SSL_SPEC", "false").lower() in ("true", "1", "yes")
-                verify_ssl_spec = not ignore_ssl_spec
-                logger.debug(f"Fetching spec with SSL verification: {verify_ssl_spec} (IGNORE_SSL_SPEC={ignore_ssl_spec})")
                 response = requests.get(url, timeout=10, verify=verify_ssl_spec)
-                response.raise_for_status()
-                content = response.text
-                logger.debug(f"Fetched content length: {len(content)} bytes")
-                try:
-                    spec = json.loads(content)
-                    logger.debug(f"Parsed as JSON from {url}")
-                except json.JSONDecodeError:
-                    try:
-                        spec = yaml_load_safe(content)
-                        logger.debug(f"Parsed as YAML from {url}")
-                    except yaml.YAMLError as ye:
-                        logger.error(f"YAML parsing failed: {ye}. Raw content: {content[:500]}...")
-                        return None
-            _spec_cache_store(url, spec)
-            return spec
+            if response.status_code == 304 and cached is not None:
+                logger.debug("Spec at %s not modified; using cached copy", url)
+                _spec_cache_touch(url)
+                return cached
+            response.raise_for_status()
+            content = response.text
+            logger.debug("Fetched content length: %s bytes", len(content))
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            _spec_cache_store_text(
+                url, content,
+                etag=etag if isinstance(etag, str) else None,
+                last_modified=last_modified if isinstance(last_modified, str) else None,
+            )
+            return content
         except requests.RequestException as e:
             attempt += 1
             logger.warning(f"Fetch attempt {attempt}/{retries} failed: {e}")
@@ -305,16 +410,65 @@ def fetch_openapi_spec(url: str, retries: int = 3) -> Optional[Dict]:
     return None
 
 
+def parse_openapi_spec(url: str, content: str) -> Optional[Dict]:
+    """Parse spec text fetched from ``url`` (JSON or YAML).
+
+    Local files honour OPENAPI_SPEC_FORMAT; remote content is tried as JSON
+    first, then YAML.
+    """
+    if url.startswith("file://"):
+        spec_format = os.getenv("OPENAPI_SPEC_FORMAT", "json").lower()
+        logger.debug("Using %s parser based on OPENAPI_SPEC_FORMAT env var", spec_format.upper())
+        if spec_format == "yaml":
+            try:
+                spec = yaml_load_safe(content)
+                logger.debug("Parsed as YAML from %s", url)
+                return spec
+            except yaml.YAMLError as ye:
+                logger.error(f"YAML parsing failed: {ye}. Raw content: {content[:500]}...")
+                return None
+        try:
+            spec = json_codec.loads(content)
+            logger.debug("Parsed as JSON from %s", url)
+            return spec
+        except json_codec.JSONDecodeError as je:
+            logger.error(f"JSON parsing failed: {je}. Raw content: {content[:500]}...")
+            return None
+    try:
+        spec = json_codec.loads(content)
+        logger.debug("Parsed as JSON from %s", url)
+        return spec
+    except json_codec.JSONDecodeError:
+        try:
+            spec = yaml_load_safe(content)
+            logger.debug("Parsed as YAML from %s", url)
+            return spec
+        except yaml.YAMLError as ye:
+            logger.error(f"YAML parsing failed: {ye}. Raw content: {content[:500]}...")
+            return None
+
+
+def fetch_openapi_spec(url: str, retries: int = 3) -> Optional[Dict]:
+    """Fetch and parse an OpenAPI specification (JSON or YAML) from a URL.
+
+    See fetch_openapi_spec_text for caching, revalidation and fallback.
+    """
+    content = fetch_openapi_spec_text(url, retries)
+    if content is None:
+        return None
+    return parse_openapi_spec(url, content)
+
+
 def build_base_url(spec: Dict) -> Optional[str]:
     """
     Construct the base URL from the OpenAPI spec or override.
     """
-    override = os.getenv("SERVER_URL_OVERRIDE")
+    override = current_config().server_url_override
     if override:
         urls = [url.strip() for url in override.split(",")]
         for url in urls:
             if url.startswith("http://") or url.startswith("https://"):
-                logger.debug(f"SERVER_URL_OVERRIDE set, using first valid URL: {url}")
+                logger.debug("SERVER_URL_OVERRIDE set, using first valid URL: %s", url)
                 return url
         logger.error(f"No valid URLs found in SERVER_URL_OVERRIDE: {override}")
         return None
@@ -323,7 +477,7 @@ def build_base_url(spec: Dict) -> Optional[str]:
         if isinstance(spec["servers"], list) and len(spec["servers"]) > 0 and isinstance(spec["servers"][0], dict):
              server_url = spec["servers"][0].get("url")
              if server_url:
-                 logger.debug(f"Using first server URL from spec: {server_url}")
+                 logger.debug("Using first server URL from spec: %s", server_url)
                  return server_url
              else:
                  logger.warning("First server entry in spec missing 'url' key.")
@@ -337,7 +491,7 @@ def build_base_url(spec: Dict) -> Optional[str]:
         host = spec.get("host")
         if host:
             v2_url = f"{scheme}://{host}{base_path}"
-            logger.debug(f"Using OpenAPI v2 host/schemes/basePath: {v2_url}")
+            logger.debug("Using OpenAPI v2 host/schemes/basePath: %s", v2_url)
             return v2_url
         else:
             logger.warning("OpenAPI v2 spec missing 'host'.")
@@ -350,74 +504,82 @@ def handle_auth(operation: Dict) -> Dict[str, str]:
     """
     Handle authentication based on environment variables and operation security.
     """
-    headers = {}
-    api_key = os.getenv("API_KEY")
-    auth_type_raw = os.getenv("API_AUTH_TYPE", "Bearer")
-    auth_type = auth_type_raw.lower()
-    if api_key:
-        if auth_type == "bearer":
-            logger.debug(f"Using API_KEY as Bearer token.") # Avoid logging key prefix
-            headers["Authorization"] = f"Bearer {api_key}"
-        elif auth_type == "basic":
-            logger.warning("API_AUTH_TYPE is Basic, but Basic Auth is not fully implemented yet.")
-            # Potentially add basic auth implementation here if needed
-        elif auth_type == "api-key":
-            key_name = os.getenv("API_AUTH_HEADER", "Authorization")
-            headers[key_name] = api_key
-            logger.debug(f"Using API_KEY as API-Key in header '{key_name}'.") # Avoid logging key prefix
-        elif auth_type:
-            # Custom scheme prefix, e.g. API_AUTH_TYPE=Token for NetBox -> "Authorization: Token <key>"
-            headers["Authorization"] = f"{auth_type_raw} {api_key}"
-            logger.debug(f"Using API_KEY with custom auth scheme '{auth_type_raw}'.")
     # TODO: Add logic to check operation['security'] and spec['components']['securitySchemes']
     #       to potentially override or supplement env var based auth.
-    return headers
+    return dict(current_config().auth_headers)
 
 def strip_parameters(parameters: Dict) -> Dict:
     """
     Strip specified parameters from the input based on STRIP_PARAM.
     """
-    strip_param = os.getenv("STRIP_PARAM")
+    strip_param = current_config().strip_param
     if not strip_param or not isinstance(parameters, dict):
         return parameters
-    logger.debug(f"Raw parameters before stripping '{strip_param}': {parameters}")
+    logger.debug("Raw parameters before stripping '%s': %s", strip_param, Payload(parameters))
     result = parameters.copy()
     if strip_param in result:
         del result[strip_param]
-        logger.debug(f"Stripped '{strip_param}'. Parameters after stripping: {result}")
+        logger.debug("Stripped '%s'. Parameters after stripping: %s", strip_param, Payload(result))
     else:
-        logger.debug(f"Parameter '{strip_param}' not found, no stripping performed.")
+        logger.debug("Parameter '%s' not found, no stripping performed.", strip_param)
     return result
 
-# Corrected function signature and implementation
-def detect_response_type(response_text: str) -> Tuple[types.TextContent, str]:
+
+# Only an object that opens with "type": "text" (as MCP serializes
+# TextContent) is taken for a TextContent payload; anything else is forwarded
+# verbatim without being decoded. Matched against the leading bytes only: a
+# nested "type": "text" (Notion rich_text, Slack blocks) must not cost a
+# decode of the whole body.
+_TEXT_CONTENT_HINT = re.compile(r'\{\s*"type"\s*:\s*"text"')
+_TEXT_CONTENT_HINT_BYTES = 64
+
+
+def _is_json_content_type(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type == "application/json" or media_type.endswith("+json")
+
+
+def detect_response_type(response_text: str, content_type: Optional[str] = None) -> Tuple[types.TextContent, str]:
     """
-    Determine response type based on JSON validity. Always returns TextContent.
+    Determine response type based on the Content-Type and the first bytes of
+    the body. Always returns TextContent.
+
+    JSON bodies are forwarded verbatim (passthrough): the only reason to
+    decode one is an upstream that already answers in MCP TextContent form
+    (``{"type": "text", "text": ...}``), so a full decode happens only for
+    objects that open like one. A non-JSON ``content_type`` (e.g. text/html)
+    is never decoded.
     """
     try:
-        # Attempt to parse as JSON
-        decoded_json = json.loads(response_text)
-
-        # Check if it's already in MCP TextContent format (e.g., from another MCP component)
-        if isinstance(decoded_json, dict) and decoded_json.get("type") == "text" and "text" in decoded_json:
-             logger.debug("Response is already in TextContent format.")
-             # Validate and return directly if possible, otherwise treat as nested JSON string
-             try:
-                 # Return the validated TextContent object
-                 return types.TextContent(**decoded_json), "Passthrough TextContent response"
-             except Exception:
-                 logger.warning("Received TextContent-like structure, but failed validation. Stringifying.")
-                 # Fall through to stringify the whole structure
-                 pass
-
-        # If parsing succeeded and it's not TextContent, return as TextContent with stringified JSON
-        logger.debug("Response parsed as JSON, returning as stringified TextContent.")
-        return types.TextContent(type="text", text=json.dumps(decoded_json)), "JSON response (stringified)"
-
-    except json.JSONDecodeError:
-        # If JSON parsing fails, treat as plain text
-        logger.debug("Response is not valid JSON, treating as plain text.")
-        return types.TextContent(type="text", text=response_text.strip()), "Non-JSON text response"
+        text = response_text.strip()
+        first = text[:1]
+        declared_json = _is_json_content_type(content_type)
+        if content_type and not declared_json:
+            logger.debug("Response Content-Type %s is not JSON, treating as plain text.", content_type)
+            return types.TextContent(type="text", text=text), "Non-JSON text response"
+
+        if first == "{" and _TEXT_CONTENT_HINT.match(text, 0, _TEXT_CONTENT_HINT_BYTES):
+            try:
+                decoded_json = json_codec.loads(text)
+            except json_codec.JSONDecodeError:
+                decoded_json = None
+            # Check if it's already in MCP TextContent format (e.g., from another MCP component)
+            if isinstance(decoded_json, dict) and decoded_json.get("type") == "text" and "text" in decoded_json:
+                logger.debug("Response is already in TextContent format.")
+                try:
+                    # Return the validated TextContent object
+                    return types.TextContent(**decoded_json), "Passthrough TextContent response"
+                except Exception:
+                    logger.warning("Received TextContent-like structure, but failed validation. Forwarding as JSON.")
+
+        if declared_json or first in ("{", "["):
+            logger.debug("Response is JSON, forwarding verbatim.")
+            return types.TextContent(type="text", text=text), "JSON response (passthrough)"
+
+        logger.debug("Response is not JSON, treating as plain text.")
+        return types.TextContent(type="text", text=text), "Non-JSON text response"
     except Exception as e:
         # Catch unexpected errors during detection
         logger.error(f"Error detecting response type: {e}", exc_info=True)
@@ -425,56 +587,10 @@ def detect_response_type(response_text: str) -> Tuple[types.TextContent, str]:
 
 
 def get_additional_headers() -> Dict[str, str]:
-    """Parse the EXTRA_HEADERS environment variable into a header dict.
-
-    EXTRA_HEADERS already holds *multiple* headers; three input forms are
-    accepted (issue #17), preferred first:
+    """The EXTRA_HEADERS headers (parsed once per configuration, see
+    config.parse_extra_headers for the accepted forms)."""
+    return dict(current_config().extra_headers)
 
-    1. JSON array  — ``["X-A: 1", "X-B: 2"]`` (the explicit, array-like form;
-       cleanest for JSON client configs that struggle with embedded newlines).
-    2. Real newlines — one ``Header: Value`` per line (original form).
-    3. Literal ``\\n`` sequences — for configs that cannot express real
-       newlines at all.
-
-    Only the value is split on the first colon, so header values may contain
-    colons (e.g. timestamps, URLs).
-    """
-    headers: Dict[str, str] = {}
-    extra_headers = os.getenv("EXTRA_HEADERS")
-    if not extra_headers:
-        return headers
-    logger.debug(f"Parsing EXTRA_HEADERS: {extra_headers}")
-
-    candidate = extra_headers.strip()
-    lines: List[str]
-    if candidate.startswith("["):
-        # Form 1: JSON array of "Header: Value" strings.
-        try:
-            parsed = json.loads(candidate)
-            if not isinstance(parsed, list):
-                raise ValueError("EXTRA_HEADERS JSON must be an array of strings")
-            lines = [str(item) for item in parsed]
-        except (json.JSONDecodeError, ValueError) as exc:
-            logger.warning(f"EXTRA_HEADERS looked like JSON but failed to parse ({exc}); "
-                           "falling back to newline parsing.")
-            lines = extra_headers.replace("\\n", "\n").splitlines()
-    else:
-        # Forms 2 & 3: real newlines and/or literal "\n" sequences.
-        lines = extra_headers.replace("\\n", "\n").splitlines()
-
-    for line in lines:
-        line = line.strip()
-        if ":" in line:
-            key, value = line.split(":", 1)
-            key, value = key.strip(), value.strip()
-            if key and value:
-                headers[key] = value
-                logger.debug(f"Added header from EXTRA_HEADERS: '{key}'")
-            else:
-                logger.warning(f"Skipping invalid header in EXTRA_HEADERS: '{line}'")
-        elif line:
-            logger.warning(f"Skipping malformed header in EXTRA_HEADERS (no ':'): '{line}'")
-    return headers
 
 def is_tool_whitelist_set() -> bool:
     """
@@ -482,51 +598,84 @@ def is_tool_whitelist_set() -> bool:
     """
     return bool(os.getenv("TOOL_WHITELIST", "").strip())
 
-def is_tool_whitelisted(endpoint: str) -> bool:
-    """
-    Check if an endpoint is allowed based on TOOL_WHITELIST.
-    Allows all if TOOL_WHITELIST is not set or empty.
-    Handles simple prefix matching and basic regex for path parameters.
-    """
-    whitelist_str = os.getenv("TOOL_WHITELIST", "").strip()
-    # logger.debug(f"Checking whitelist - endpoint: '{endpoint}', TOOL_WHITELIST: '{whitelist_str}'") # Too verbose for every check
 
-    if not whitelist_str:
-        # logger.debug("No TOOL_WHITELIST set, allowing all endpoints.")
-        return True
+_SEGMENT_BOUNDARY = re.compile(r"[/.]")
 
-    whitelist_entries = [entry.strip() for entry in whitelist_str.split(",") if entry.strip()]
 
-    # Normalize endpoint by removing leading/trailing slashes for comparison
-    normalized_endpoint = "/" + endpoint.strip("/")
+class WhitelistMatcher:
+    """A TOOL_WHITELIST value compiled once.
 
-    for entry in whitelist_entries:
-        normalized_entry = "/" + entry.strip("/")
-        # logger.debug(f"Comparing '{normalized_endpoint}' against whitelist entry '{normalized_entry}'")
+    Literal entries allow their own path and anything below it, where a
+    segment may continue with "/" (REST style) or "." (Slack-style method
+    paths such as /users.list), but /chat must not match /chatter. They are
+    kept in a set and probed with the endpoint's prefix at each segment
+    boundary, so a check costs one lookup per segment however many entries
+    there are. Entries with placeholders such as /users/{id}/posts are
+    combined into a single anchored regex.
+    """
 
-        if "{" in normalized_entry and "}" in normalized_entry:
-            # Convert entry with placeholders like /users/{id}/posts to a regex pattern
-            # Escape regex special characters, then replace placeholders
+    __slots__ = ("source", "_allow_all", "_literals", "_pattern")
+
+    def __init__(self, whitelist: str):
+        self.source = whitelist
+        entries = [entry.strip() for entry in whitelist.split(",") if entry.strip()]
+        self._allow_all = not whitelist.strip()
+        self._literals = set()
+        templated = []
+        for entry in entries:
+            normalized_entry = "/" + entry.strip("/")
+            if "{" not in normalized_entry or "}" not in normalized_entry:
+                self._literals.add(normalized_entry)
+                continue
+            # Escape regex special characters, then turn placeholders into
+            # one-segment wildcards.
             pattern_str = re.escape(normalized_entry).replace(r"\{", "{").replace(r"\}", "}")
-            pattern_str = re.sub(r"\{[^}]+\}", r"([^/]+)", pattern_str)
-            # Ensure it matches the full path segment or the start of it
-            pattern = "^" + pattern_str + "($|/.*)"
+            pattern_str = re.sub(r"\{[^}]+\}", r"[^/]+", pattern_str)
             try:
-                if re.match(pattern, normalized_endpoint):
-                    logger.debug(f"Endpoint '{normalized_endpoint}' matches whitelist pattern '{pattern}' from entry '{entry}'")
-                    return True
+                re.compile(pattern_str)
             except re.error as e:
-                 logger.error(f"Invalid regex pattern generated from whitelist entry '{entry}': {pattern}. Error: {e}")
-                 continue # Skip this invalid pattern
-        elif normalized_endpoint.startswith(normalized_entry):
-             # Simple prefix match (e.g., /users allows /users/123).
-             # A segment may continue with "/" (REST style) or "." (Slack-style
-             # method paths such as /users.list), but /chat must not match /chatter.
-             if (normalized_endpoint == normalized_entry
-                     or normalized_endpoint.startswith(normalized_entry + "/")
-                     or normalized_endpoint.startswith(normalized_entry + ".")):
-                  logger.debug(f"Endpoint '{normalized_endpoint}' matches whitelist prefix '{normalized_entry}' from entry '{entry}'")
-                  return True
-
-    logger.debug(f"Endpoint '{normalized_endpoint}' not found in TOOL_WHITELIST.")
-    return False
+                logger.error(
+                    f"Invalid regex pattern generated from whitelist entry '{entry}': {pattern_str}. Error: {e}"
+                )
+                continue # Skip this invalid pattern
+            templated.append(pattern_str)
+        # Matches the full path or the start of it up to a "/".
+        self._pattern = re.compile("^(?:" + "|".join(templated) + ")($|/.*)") if templated else None
+        logger.debug("Compiled TOOL_WHITELIST: %s prefixes, %s templates", len(self._literals), len(templated))
+
+    def matches(self, endpoint: str) -> bool:
+        if self._allow_all:
+            return True
+        # Normalize endpoint by removing leading/trailing slashes for comparison
+        normalized_endpoint = "/" + endpoint.strip("/")
+        literals = self._literals
+        if literals:
+            if normalized_endpoint in literals:
+                return True
+            for boundary in _SEGMENT_BOUNDARY.finditer(normalized_endpoint, 1):
+                if normalized_endpoint[:boundary.start()] in literals:
+                    return True
+        return self._pattern is not None and self._pattern.match(normalized_endpoint) is not None
+
+
+_whitelist_matcher: Optional[WhitelistMatcher] = None
+
+
+def whitelist_matcher() -> WhitelistMatcher:
+    """The matcher for the current TOOL_WHITELIST, recompiled only when the
+    variable changes. Get it once and reuse it when checking many paths."""
+    global _whitelist_matcher
+    whitelist = os.getenv("TOOL_WHITELIST", "").strip()
+    matcher = _whitelist_matcher
+    if matcher is None or matcher.source != whitelist:
+        matcher = _whitelist_matcher = WhitelistMatcher(whitelist)
+    return matcher
+
+
+def is_tool_whitelisted(endpoint: str) -> bool:
+    """
+    Check if an endpoint is allowed based on TOOL_WHITELIST.
+    Allows all if TOOL_WHITELIST is not set or empty.
+    Handles simple prefix matching and basic regex for path parameters.
+    """
+    return whitelist_matcher().matches(endpoint)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Benchmark: concurrent tools/call against a slow local upstream.
+
+Starts a stub API whose every response takes --latency seconds, registers a
+one-operation spec pointing at it, then fires --calls concurrent tool calls.
+With a non-blocking dispatcher the wall time stays close to one latency
+(~0.2 s for the defaults) instead of calls x latency (~20 s).
+
+Modes:
+  dispatcher  await dispatcher_handler directly with asyncio.gather (default)
+  session     drive a real in-memory MCP ClientSession; requests only overlap
+              on SDK versions that dispatch requests concurrently (mcp>=1.7)
+
+Usage: python scripts/bench_async_dispatch.py [--calls 100] [--latency 0.2] [--mode session]
+"""
+import argparse
+import asyncio
+import http.server
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def start_stub(latency: float):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(http.server.ThreadingHTTPServer):
+        request_queue_size = 512
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def run_dispatcher(calls: int):
+    from types import SimpleNamespace
+    from mcp_openapi_proxy import server_lowlevel
+    request = SimpleNamespace(params=SimpleNamespace(name="get_slow", arguments={}))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(server_lowlevel.dispatcher_handler(request) for _ in range(calls)))
+    return time.perf_counter() - start, results
+
+
+async def run_session(calls: int):
+    import anyio
+    from mcp.client.session import ClientSession
+    from mcp.server.models import InitializationOptions
+    from mcp.shared.memory import create_client_server_memory_streams
+    from mcp_openapi_proxy import server_lowlevel
+    from mcp import types
+
+    server = server_lowlevel.mcp
+    server.request_handlers[types.CallToolRequest] = server_lowlevel.dispatcher_handler
+    async with create_client_server_memory_streams() as (client_streams, server_streams):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(
+                lambda: server.run(
+                    server_streams[0],
+                    server_streams[1],
+                    InitializationOptions(
+                        server_name="bench",
+                        server_version="0",
+                        capabilities=server_lowlevel.build_capabilities(),
+                    ),
+                )
+            )
+            async with ClientSession(client_streams[0], client_streams[1]) as session:
+                await session.initialize()
+                start = time.perf_counter()
+                results = await asyncio.gather(*(session.call_tool("get_slow", {}) for _ in range(calls)))
+                elapsed = time.perf_counter() - start
+            tg.cancel_scope.cancel()
+    return elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--mode", choices=["dispatcher", "session"], default="dispatcher")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DEBUG", "false")
+    os.environ.pop("SERVER_URL_OVERRIDE", None)
+    os.environ.pop("TOOL_WHITELIST", None)
+    stub, base_url = start_stub(args.latency)
+
+    from importlib.metadata import version
+    from mcp_openapi_proxy import http_client, server_lowlevel
+    from mcp_openapi_proxy.openapi import register_functions
+    spec = {
+        "openapi": "3.0.0",
+        "servers": [{"url": base_url}],
+        "paths": {"/slow": {"get": {"summary": "Slow endpoint", "responses": {}}}},
+    }
+    register_functions(spec)
+    server_lowlevel.openapi_spec_data = spec
+
+    async def run():
+        async with http_client.lifespan():
+            if args.mode == "session":
+                return await run_session(args.calls)
+            return await run_dispatcher(args.calls)
+
+    elapsed, results = asyncio.run(run())
+    stub.shutdown()
+    ok = sum(1 for r in results if not r.isError and r.content and '"ok"' in r.content[0].text)
+    serial = args.calls * args.latency
+    print(f"mcp SDK {version('mcp')}, mode={args.mode}")
+    print(f"{args.calls} concurrent calls x {args.latency * 1000:.0f} ms upstream latency")
+    print(f"  successful: {ok}/{args.calls}")
+    print(f"  wall time:  {elapsed:.3f} s (serial would be {serial:.1f} s, speedup {serial / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark: what a tool-call burst costs while the upstream is down.
+
+The upstream is a local socket that accepts connections and never answers,
+the way a hung API behaves. --calls concurrent calls go out through the
+upstream pool with a --read-timeout read deadline and no retries:
+
+  no breaker  every call waits out its read timeout
+  breaker     the circuit opens after UPSTREAM_BREAKER_MIN_REQUESTS
+              (--min-requests) failures; the calls after that fail at
+              once with CircuitOpenError
+
+Also reports what the breaker adds to a call while the circuit is closed
+(acquire + finish) and what a rejected call costs.
+
+Usage: python scripts/bench_circuit_breaker.py [--calls 200] [--read-timeout 0.5] [--min-requests 20]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def silent_upstream():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1024)
+    held = []
+
+    def accept():
+        while True:
+            try:
+                held.append(listener.accept()[0])
+            except OSError:
+                return
+
+    threading.Thread(target=accept, daemon=True).start()
+    return f"http://127.0.0.1:{listener.getsockname()[1]}", listener
+
+
+async def burst(pool, url, calls, timeouts):
+    from mcp_openapi_proxy.breaker import CircuitOpenError
+
+    async def one():
+        start = time.perf_counter()
+        try:
+            await pool.request("GET", url, timeouts=timeouts)
+        except CircuitOpenError:
+            return "rejected", time.perf_counter() - start
+        except Exception:
+            return "failed", time.perf_counter() - start
+        return "ok", time.perf_counter() - start
+
+    # A few calls first, so the breaker has seen the failures before the fan-out.
+    results = [await one() for _ in range(pool.breaker.min_requests if pool.breaker.enabled else 0)]
+    start = time.perf_counter()
+    results += await asyncio.gather(*(one() for _ in range(calls - len(results))))
+    wall = time.perf_counter() - start
+    await pool.aclose()
+    return results, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--read-timeout", type=float, default=0.5)
+    parser.add_argument("--min-requests", type=int, default=20)
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy.breaker import BreakerConfig, CircuitBreaker, CircuitOpenError
+    from mcp_openapi_proxy.http_client import PoolConfig, UpstreamPool, UpstreamTimeouts
+    from mcp_openapi_proxy.logging_setup import logger
+    from mcp_openapi_proxy.retry import RetryPolicy
+    logger.setLevel(logging.ERROR)
+
+    url, listener = silent_upstream()
+    timeouts = UpstreamTimeouts(connect=1, read=args.read_timeout, total=None)
+    no_retry = RetryPolicy(max_retries=0)
+    print(f"{args.calls} calls to a hung upstream, {args.read_timeout:g}s read timeout, no retries")
+    for label, breaker in (("no breaker", BreakerConfig(failure_rate=0)),
+                           ("breaker", BreakerConfig(min_requests=args.min_requests))):
+        pool = UpstreamPool(PoolConfig(max_connections=args.calls * 2), no_retry, breaker)
+        results, wall = asyncio.run(burst(pool, url + "/x", args.calls, timeouts))
+        rejected = [t for outcome, t in results if outcome == "rejected"]
+        waited = sum(t for _, t in results)
+        each = f" in {sum(rejected) / len(rejected) * 1e6:.0f} us each" if rejected else ""
+        print(f"  {label:10}  {waited:7.1f} s of calls waiting in total, burst took {wall:5.2f} s; "
+              f"{len(rejected)} failed fast{each}")
+    listener.close()
+
+    n = 200000
+    breaker = CircuitBreaker("bench", BreakerConfig())
+    start = time.perf_counter()
+    for _ in range(n):
+        breaker.finish(0.01, False, breaker.acquire())
+    closed = (time.perf_counter() - start) / n
+    breaker = CircuitBreaker("bench", BreakerConfig(min_requests=1))
+    breaker.finish(0.01, True, breaker.acquire())
+    start = time.perf_counter()
+    for _ in range(n):
+        try:
+            breaker.acquire()
+        except CircuitOpenError:
+            pass
+    rejected = (time.perf_counter() - start) / n
+    print(f"  breaker bookkeeping: {closed * 1e6:.2f} us per closed-circuit call, "
+          f"{rejected * 1e6:.2f} us per rejection")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Benchmark: what debug logging costs a tool call when DEBUG is off.
+
+The logger runs at INFO, the default level. Every payload is realistic
+for a chatty API: --body-kb of JSON request body, --response-kb of
+response text, a handful of headers and query parameters.
+
+  f-string  the dispatcher's debug lines as they were before: f-strings,
+            so every payload is formatted whether or not it is logged
+  lazy      the same lines as they are now: %-style arguments, payloads
+            wrapped in Payload and the request block behind isEnabledFor
+  call      _call_operation() end to end against a stub upstream, at INFO
+            and with the logger disabled outright; the difference is what
+            logging still costs a call
+
+Also times list_functions()' "Raw spec loaded" line on a --operations
+operation spec, which used to serialize the whole spec on every call.
+
+Usage: python scripts/bench_debug_logging.py [--calls 2000] [--body-kb 16] [--response-kb 64]
+                                             [--operations 2000] [--runs 3]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def f_string_lines(logger, arguments, prepared, content):
+    """The low-level dispatcher's debug lines before lazy formatting."""
+    function_name = "get_items"
+    logger.debug(f"Dispatcher received CallToolRequest for function: {function_name}")
+    logger.debug(f"Raw arguments before processing: {arguments}")
+    logger.debug(f"API Request - URL: {prepared.url}, Method: {prepared.method}")
+    logger.debug(f"Headers: {prepared.headers}")
+    logger.debug(f"Query Params: {prepared.params}")
+    logger.debug(f"Request Body: {prepared.json}")
+    logger.debug(f"Response content type: {content.type}")
+    logger.debug(f"Response sent to client: {content.text}")
+
+
+def lazy_lines(logger, arguments, prepared, content):
+    """The same lines as the dispatcher has them now."""
+    logger.debug("Dispatcher received CallToolRequest for function: %s", "get_items")
+    logger.debug("Raw arguments before processing: %s", Payload(arguments))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("API Request - URL: %s, Method: %s", prepared.url, prepared.method)
+        logger.debug("Headers: %s", Payload(prepared.headers))
+        logger.debug("Query Params: %s", Payload(prepared.params))
+        logger.debug("Request Body: %s", Payload(prepared.json))
+    logger.debug("Response content type: %s", content.type)
+    logger.debug("Response sent to client: %s", Payload(content.text))
+
+
+def best(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--body-kb", type=int, default=16)
+    parser.add_argument("--response-kb", type=int, default=64)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    global Payload
+    from mcp_openapi_proxy import json_codec, openapi, server_lowlevel
+    from mcp_openapi_proxy.config import RuntimeConfig, install_config
+    from mcp_openapi_proxy.logging_setup import Payload, logger
+    from mcp_openapi_proxy.registry import install_registry
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE",
+                 "TOOL_DISCOVERY_MODE"):
+        os.environ.pop(name, None)
+    logger.setLevel(logging.INFO)
+
+    items = [{"id": i, "name": f"item-{i}", "tags": ["a", "b"]} for i in range(args.body_kb * 1024 // 40)]
+    arguments = {"limit": 50, "cursor": "abc", "items": items}
+    prepared = SimpleNamespace(
+        url="https://api.example.com/items", method="POST",
+        headers={"Authorization": "Bearer 0123456789", "X-Request-Source": "mcp", "Accept": "application/json"},
+        params={"limit": 50, "cursor": "abc"}, json={"items": items},
+    )
+    response_text = json.dumps([{"id": i, "value": "x" * 30} for i in range(args.response_kb * 1024 // 50)])
+    content = SimpleNamespace(type="text", text=response_text)
+
+    def repeat(lines):
+        return lambda: [lines(logger, arguments, prepared, content) for _ in range(args.calls)]
+
+    eager = best(repeat(f_string_lines), args.runs)
+    lazy = best(repeat(lazy_lines), args.runs)
+
+    spec = {
+        "openapi": "3.0.0",
+        "servers": [{"url": "https://api.example.com"}],
+        "paths": {
+            "/items": {"post": {"operationId": "createItems", "summary": "Create items",
+                                "requestBody": {"content": {"application/json": {"schema": {"type": "object"}}}}}},
+            **{f"/things{i}/{{thingId}}": {"get": {"summary": f"Get thing {i}", "description": "A thing. " * 20}}
+               for i in range(args.operations)},
+        },
+    }
+
+    def spec_eager_line():
+        logger.debug(f"Raw spec loaded: {json_codec.dumps(spec, indent=True, default=str)}")
+
+    spec_eager = best(spec_eager_line, args.runs)
+
+    def spec_lazy():
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Raw spec loaded: %s", Payload(json_codec.dumps(spec, indent=True, default=str)))
+
+    spec_guarded = best(spec_lazy, args.runs)
+
+    logger.setLevel(logging.WARNING)
+    install_registry(openapi.build_registry(spec))
+    logger.setLevel(logging.INFO)
+    install_config(RuntimeConfig(api_key="0123456789"))
+    server_lowlevel.openapi_spec_data = spec
+
+    async def upstream(method, url, **kwargs):
+        return SimpleNamespace(text=response_text, headers={"content-type": "application/json"},
+                               raise_for_status=lambda: None)
+
+    server_lowlevel.http_client.request = upstream
+
+    async def calls():
+        for _ in range(args.calls):
+            await server_lowlevel._call_operation("post_items", arguments)
+
+    call_info = best(lambda: asyncio.run(calls()), args.runs)
+    logger.disabled = True
+    call_off = best(lambda: asyncio.run(calls()), args.runs)
+    logger.disabled = False
+
+    def per_call(seconds):
+        return seconds / args.calls * 1e6
+
+    print(f"{args.calls} calls at INFO, {args.body_kb} KB body, {args.response_kb} KB response, best of {args.runs}")
+    print(f"  f-string  {per_call(eager):9.2f} us/call")
+    print(f"  lazy      {per_call(lazy):9.2f} us/call ({eager / lazy:.0f}x less)")
+    print(f"  call      {per_call(call_info):9.2f} us/call at INFO, {per_call(call_off):.2f} us/call with logging "
+          f"disabled ({per_call(call_info - call_off):+.2f} us)")
+    print(f"  list_functions spec line ({args.operations} operations): {spec_eager * 1000:.1f} ms -> "
+          f"{spec_guarded * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
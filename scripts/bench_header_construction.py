@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark: per-call request header construction in the dispatcher.
+
+With API_KEY, a custom API_AUTH_TYPE and a JSON-array EXTRA_HEADERS of
+--headers entries set, builds the request headers (and the SSL verification
+flag) of --calls tool calls the way the low-level dispatcher does:
+
+  per-call  handle_auth() + get_additional_headers() as they were before
+            config.py: read API_KEY / API_AUTH_TYPE / IGNORE_SSL_TOOLS and
+            re-parse EXTRA_HEADERS on every call, then merge the two dicts
+  env       current_config() without an installed snapshot (library use):
+            one environment read per variable, snapshot reused while the
+            values are unchanged
+  frozen    the snapshot installed at server start: attribute reads only
+
+Each variant ends with the copy plan.prepare() makes of the headers.
+
+Usage: python scripts/bench_header_construction.py [--calls 100000] [--headers 5] [--runs 3]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def per_call_headers():
+    """The dispatcher's header construction as it was before RuntimeConfig
+    (its debug logging omitted)."""
+    headers = {}
+    api_key = os.getenv("API_KEY")
+    auth_type_raw = os.getenv("API_AUTH_TYPE", "Bearer")
+    auth_type = auth_type_raw.lower()
+    if api_key:
+        if auth_type == "bearer":
+            headers["Authorization"] = f"Bearer {api_key}"
+        elif auth_type == "api-key":
+            headers[os.getenv("API_AUTH_HEADER", "Authorization")] = api_key
+        elif auth_type and auth_type != "basic":
+            headers["Authorization"] = f"{auth_type_raw} {api_key}"
+    extra = {}
+    extra_headers = os.getenv("EXTRA_HEADERS")
+    if extra_headers:
+        candidate = extra_headers.strip()
+        if candidate.startswith("["):
+            lines = [str(item) for item in json.loads(candidate)]
+        else:
+            lines = extra_headers.replace("\\n", "\n").splitlines()
+        for line in lines:
+            line = line.strip()
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key, value = key.strip(), value.strip()
+                if key and value:
+                    extra[key] = value
+    headers = {**headers, **extra}
+    verify = os.getenv("IGNORE_SSL_TOOLS", "false").lower() not in ("true", "1", "yes")
+    return dict(headers), verify
+
+
+def config_headers():
+    config = current_config()
+    return dict(config.request_headers), config.verify_ssl_tools
+
+
+def best(fn, calls, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--headers", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    global current_config
+    from mcp_openapi_proxy.config import current_config, install_config, reload_config
+    from mcp_openapi_proxy.logging_setup import logger
+    logger.setLevel(logging.WARNING)
+    os.environ.update({
+        "API_KEY": "0123456789abcdef",
+        "API_AUTH_TYPE": "Token",
+        "EXTRA_HEADERS": json.dumps([f"X-Extra-{i}: value-{i}" for i in range(args.headers)]),
+        "IGNORE_SSL_TOOLS": "false",
+    })
+    os.environ.pop("API_AUTH_HEADER", None)
+
+    install_config(None)
+    assert per_call_headers() == config_headers()
+    per_call = best(per_call_headers, args.calls, args.runs)
+    env = best(config_headers, args.calls, args.runs)
+    reload_config()
+    assert per_call_headers() == config_headers()
+    frozen = best(config_headers, args.calls, args.runs)
+
+    print(f"{args.calls} calls, {args.headers} EXTRA_HEADERS entries, best of {args.runs}")
+    print(f"  per-call  {per_call * 1000:8.1f} ms  ({per_call / args.calls * 1e6:.2f} us/call)")
+    print(f"  env       {env * 1000:8.1f} ms  ({env / args.calls * 1e6:.2f} us/call, {per_call / env:.1f}x faster)")
+    print(f"  frozen    {frozen * 1000:8.1f} ms  "
+          f"({frozen / args.calls * 1e6:.2f} us/call, {per_call / frozen:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Microbenchmark: per-call request preparation, raw spec vs compiled plans.
+
+Registers a synthetic spec with --operations operations, then prepares
+--calls tool calls two ways (no network involved):
+
+  legacy  what the dispatcher did per call before plans existed: look up the
+          operation, merge path-item/operation parameters, split the path to
+          find placeholders, str.format the path, rebuild the base URL and
+          decide GET versus body
+  plans   OperationPlan.prepare() on the plan compiled at registration
+
+Usage: python scripts/bench_invocation_plans.py [--operations 2000] [--calls 200000]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def synthetic_spec(operations: int):
+    paths = {}
+    for i in range(operations // 2):
+        paths[f"/resource{i}/{{resource_id}}/items"] = {
+            "parameters": [{"name": "resource_id", "in": "path", "required": True, "schema": {"type": "string"}}],
+            "get": {
+                "summary": f"List items of resource {i}",
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+                    {"name": "cursor", "in": "query", "schema": {"type": "string"}},
+                ],
+            },
+            "post": {"summary": f"Create item in resource {i}"},
+        }
+    return {"openapi": "3.0.0", "servers": [{"url": "https://api.example.com/v1"}], "paths": paths}
+
+
+def legacy_prepare(function_name, arguments, spec, registered, build_base_url):
+    details = dict(registered[function_name])
+    operation = details["operation"]
+    method = details["method"]
+    headers = {}
+    parameters = dict(arguments)
+    if method != "GET":
+        headers["Content-Type"] = "application/json"
+    path = details["path"].format(**parameters)
+    if method == "GET":
+        segments = details["original_path"].split("/")
+        for key in [s.strip("{}") for s in segments if s.startswith("{") and s.endswith("}")]:
+            parameters.pop(key, None)
+    base_url = build_base_url(spec)
+    api_url = f"{base_url.rstrip('/')}/{path.lstrip('/')}"
+    merged = []
+    path_item = spec.get("paths", {}).get(details["original_path"], {})
+    if isinstance(path_item, dict) and "parameters" in path_item:
+        merged.extend(path_item["parameters"])
+    if "parameters" in operation:
+        merged.extend(operation["parameters"])
+    if [p["name"] for p in merged if p.get("in") == "path"]:
+        missing = [p["name"] for p in merged
+                   if p.get("in") == "path" and p.get("required", False) and p["name"] not in arguments]
+        assert not missing
+    if method == "GET":
+        return method, api_url, headers, parameters, None
+    return method, api_url, headers, None, parameters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    os.environ.pop("SERVER_URL_OVERRIDE", None)
+    os.environ.pop("TOOL_WHITELIST", None)
+    from mcp_openapi_proxy import openapi
+    from mcp_openapi_proxy.config import reload_config
+    from mcp_openapi_proxy.registry import current_registry
+    from mcp_openapi_proxy.logging_setup import logger
+    logger.setLevel(logging.WARNING)
+
+    spec = synthetic_spec(args.operations)
+    start = time.perf_counter()
+    openapi.register_functions(spec)
+    registration = time.perf_counter() - start
+    registry = current_registry()
+    names = list(registry.names())
+    rng = random.Random(42)
+    calls = [rng.choice(names) for _ in range(args.calls)]
+    arguments = {"resource_id": "abc123", "limit": 10, "cursor": "xyz"}
+
+    start = time.perf_counter()
+    for name in calls:
+        legacy_prepare(name, arguments, spec, openapi._REGISTERED_OPERATIONS, openapi.build_base_url)
+    legacy = time.perf_counter() - start
+
+    reload_config()  # installed once at startup by the servers
+    start = time.perf_counter()
+    for name in calls:
+        registry.get(name).plan.prepare(arguments, dict(arguments), {})
+    compiled = time.perf_counter() - start
+
+    print(f"{len(names)} operations registered in {registration * 1000:.0f} ms")
+    print(f"{args.calls} calls:")
+    print(f"  legacy per-call derivation: {legacy / args.calls * 1e6:7.2f} us/call")
+    print(f"  compiled plans:             {compiled / args.calls * 1e6:7.2f} us/call ({legacy / compiled:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark: stdlib json versus the json_codec backend (orjson if installed).
+
+Measures the JSON work on the proxy's hot paths:
+
+  spec     parse a ~--spec-mb MB spec, write it to the spec cache
+           (compact dump) and serve it as a resource (indented dump)
+  response detect_response_type() on a ~--response-mb MB upstream list body
+
+Each operation is repeated --runs times; the best time is reported.
+
+Usage: python scripts/bench_json_codec.py [--spec-mb 10] [--response-mb 1] [--runs 5]
+Install the fast path with: pip install mcp-openapi-proxy[fast]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def synthetic_spec(size_mb: float) -> str:
+    paths = {}
+    for i in range(int(size_mb * 1024 * 1024 / 370)):
+        paths[f"/resource{i}/{{id}}"] = {
+            "get": {
+                "summary": f"Get resource {i}",
+                "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}],
+                "responses": {"200": {"description": "OK", "content": {"application/json": {"schema": {
+                    "type": "object", "properties": {"id": {"type": "string"}, "count": {"type": "integer"},
+                                                     "ratio": {"type": "number"}}}}}}},
+            },
+        }
+    return json.dumps({"openapi": "3.0.0", "servers": [{"url": "https://api.example.com"}], "paths": paths})
+
+
+def synthetic_response(size_mb: float) -> str:
+    item = {"id": "c0ffee", "name": "Widget", "price": 12.5, "tags": ["a", "b"], "active": True, "owner": None}
+    count = int(size_mb * 1024 * 1024 / len(json.dumps(item)))
+    return json.dumps({"items": [dict(item, id=f"{i:08x}") for i in range(count)], "next": None})
+
+
+def best(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spec-mb", type=float, default=10.0)
+    parser.add_argument("--response-mb", type=float, default=1.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy import json_codec
+    from mcp_openapi_proxy.logging_setup import logger
+    from mcp_openapi_proxy.utils import detect_response_type
+    logger.setLevel(logging.WARNING)
+
+    spec_text = synthetic_spec(args.spec_mb)
+    spec = json.loads(spec_text)
+    response_text = synthetic_response(args.response_mb)
+    print(f"codec backend: {json_codec.BACKEND}; spec {len(spec_text) / 2**20:.1f} MB, "
+          f"response {len(response_text) / 2**20:.1f} MB, best of {args.runs}")
+
+    rows = [
+        ("spec parse", lambda: json.loads(spec_text), lambda: json_codec.loads(spec_text)),
+        ("spec cache dump", lambda: json.dumps(spec, default=str), lambda: json_codec.dumps(spec, default=str)),
+        ("spec resource dump", lambda: json.dumps(spec, indent=2, default=str),
+         lambda: json_codec.dumps(spec, indent=True, default=str)),
+        ("response detect", lambda: json.dumps(json.loads(response_text)),
+         lambda: detect_response_type(response_text)),
+    ]
+    print(f"  {'':20} {'stdlib':>10} {json_codec.BACKEND:>10}")
+    for label, stdlib_fn, codec_fn in rows:
+        base, codec = best(stdlib_fn, args.runs), best(codec_fn, args.runs)
+        print(f"  {label:20} {base * 1000:8.1f}ms {codec * 1000:8.1f}ms  ({base / codec:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
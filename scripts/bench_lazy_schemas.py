@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Benchmark: eager versus lazy tool schemas on a large spec.
+
+Writes a synthetic spec with --operations operations and, for each mode, in
+a fresh interpreter (so RSS is comparable), loads it through
+server_lowlevel.ensure_spec_loaded() and then serves one tools/list:
+
+  eager  every Tool and input schema built during the load (as before)
+  lazy   only the name index and plans built during the load; each Tool is
+         built the first time it is listed or called
+
+Reports the time until tools can be called (spec loaded), the time to the
+first tools/list response, the time to first build one tool's schema (what
+a call-only client pays) and RSS after each step. The registry snapshot is
+disabled so every run registers from the spec.
+
+Usage: python scripts/bench_lazy_schemas.py [--operations 10000]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def synthetic_spec(operations: int):
+    paths = {}
+    for i in range(operations // 2):
+        paths[f"/org{i % 50}/resource{i}/{{resource_id}}"] = {
+            "parameters": [{"name": "resource_id", "in": "path", "required": True, "schema": {"type": "string"}}],
+            "get": {
+                "summary": f"Get resource {i}",
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}, "description": "Page size"},
+                    {"name": "fields", "in": "query", "schema": {"type": "array", "items": {"type": "string"}}},
+                ],
+            },
+            "put": {
+                "summary": f"Replace resource {i}",
+                "requestBody": {"content": {"application/json": {"schema": {
+                    "type": "object", "required": ["name"],
+                    "properties": {
+                        "name": {"type": "string"},
+                        "labels": {"type": "object", "additionalProperties": {"type": "string"}},
+                        "tags": {"type": "array", "items": {"type": "string"}},
+                        **{f"attr{j}": {"type": "string", "description": f"Attribute {j}"} for j in range(6)},
+                    }}}}},
+            },
+        }
+    return {"openapi": "3.0.0", "servers": [{"url": "https://api.example.com"}], "paths": paths}
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode: str):
+    from mcp import types
+    from mcp_openapi_proxy import server_lowlevel
+    from mcp_openapi_proxy.logging_setup import logger
+    from mcp_openapi_proxy.registry import current_registry
+    logger.setLevel(logging.WARNING)
+    server_lowlevel.ENABLE_TOOLS = True
+    if mode == "eager":
+        build = server_lowlevel.build_registry
+
+        def build_eagerly(spec):
+            registry = build(spec)
+            registry.tools  # build every Tool now, as registration used to
+            return registry
+
+        server_lowlevel.build_registry = build_eagerly
+
+    async def run():
+        base_rss = rss_mb()
+        start = time.perf_counter()
+        await server_lowlevel.ensure_spec_loaded()
+        ready = time.perf_counter() - start
+        ready_rss = rss_mb()
+        registry = current_registry()
+        name = next(registry.names())
+        one_start = time.perf_counter()
+        registry.get(name).tool
+        one_tool = time.perf_counter() - one_start
+        listed = await server_lowlevel.list_tools(types.ListToolsRequest(method="tools/list"))
+        first_list = time.perf_counter() - start
+        return {
+            "tools": len(listed.tools), "ready": ready, "one_tool": one_tool, "first_list": first_list,
+            "base_rss": base_rss, "ready_rss": ready_rss, "list_rss": rss_mb(),
+        }
+
+    print(json.dumps(asyncio.run(run())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=10000)
+    parser.add_argument("--child", choices=["eager", "lazy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="bench-lazy-")
+    spec_path = os.path.join(workdir, "spec.json")
+    with open(spec_path, "w") as f:
+        json.dump(synthetic_spec(args.operations), f)
+    env = dict(os.environ, OPENAPI_SPEC_URL=f"file://{spec_path}", OPENAPI_REGISTRY_SNAPSHOT="false",
+               XDG_CACHE_HOME=os.path.join(workdir, "cache"))
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE"):
+        env.pop(name, None)
+
+    print(f"{args.operations} operations, {os.path.getsize(spec_path) / 2**20:.1f} MB spec")
+    print(f"  {'mode':6} {'ready':>9} {'one tool':>9} {'1st list':>9} {'RSS ready':>10} {'RSS listed':>11}")
+    for mode in ("eager", "lazy"):
+        out = subprocess.run([sys.executable, __file__, "--child", mode], env=env, check=True,
+                             capture_output=True, text=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"  {mode:6} {r['ready'] * 1000:7.0f}ms {r['one_tool'] * 1000:7.2f}ms {r['first_list'] * 1000:7.0f}ms "
+              f"{r['ready_rss'] - r['base_rss']:8.1f}MB {r['list_rss'] - r['base_rss']:9.1f}MB  ({r['tools']} tools)")
+
+
+if __name__ == "__main__":
+    main()
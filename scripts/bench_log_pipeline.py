@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark: what logging to a slow stderr costs the logging thread.
+
+Simulates an MCP client that drains our stderr pipe slowly. Each write
+to the stream sleeps --write-ms. The benchmark logs --lines INFO lines
+in a burst, the way registration or a busy tool-call loop does, through:
+
+  sync    the previous setup: a StreamHandler on the slow stream, so
+          every logger.info() waits for its write
+  queued  the current setup: DroppingQueueHandler + a writer thread with
+          a --queue-size queue; logger.info() only enqueues (or drops
+          and counts when the queue is full)
+
+Reports the caller's time per line (the time the event loop would be
+blocked), the worst single call, and how many lines were dropped.
+
+Usage: python scripts/bench_log_pipeline.py [--lines 2000] [--write-ms 1] [--queue-size 10000]
+"""
+import argparse
+import logging
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+class SlowStream:
+    """A stderr whose reader falls behind: every write blocks."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text):
+        time.sleep(self.delay)
+        self.lines += text.count("\n")
+
+    def flush(self):
+        pass
+
+
+def burst(logger, lines):
+    worst = 0.0
+    start = time.perf_counter()
+    for i in range(lines):
+        t = time.perf_counter()
+        logger.info("Registered tool %s from %s", f"get_items_{i}", f"GET /items/{i}")
+        worst = max(worst, time.perf_counter() - t)
+    return time.perf_counter() - start, worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--write-ms", type=float, default=1.0)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy.logging_setup import DroppingQueueHandler, LogWriter
+    formatter = logging.Formatter("[%(levelname)s] %(asctime)s - %(message)s")
+    bench_logger = logging.getLogger("bench_log_pipeline")
+    bench_logger.propagate = False
+    bench_logger.setLevel(logging.INFO)
+
+    stream = SlowStream(args.write_ms / 1000)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(formatter)
+    bench_logger.addHandler(handler)
+    sync_total, sync_worst = burst(bench_logger, args.lines)
+    bench_logger.removeHandler(handler)
+
+    stream = SlowStream(args.write_ms / 1000)
+    writer = logging.StreamHandler(stream)
+    writer.setFormatter(formatter)
+    handler = DroppingQueueHandler(queue.Queue(args.queue_size))
+    listener = LogWriter(handler.queue, writer)
+    listener.start()
+    bench_logger.addHandler(handler)
+    queued_total, queued_worst = burst(bench_logger, args.lines)
+    bench_logger.removeHandler(handler)
+    drain = time.perf_counter()
+    listener.stop()
+    drained = time.perf_counter() - drain
+
+    def per_line(seconds):
+        return seconds / args.lines * 1e6
+
+    print(f"{args.lines} lines, {args.write_ms:g} ms per stderr write, queue of {args.queue_size}")
+    print(f"  sync    {per_line(sync_total):9.1f} us/line  worst {sync_worst * 1000:7.2f} ms  "
+          f"caller blocked {sync_total * 1000:.0f} ms")
+    print(f"  queued  {per_line(queued_total):9.1f} us/line  worst {queued_worst * 1000:7.2f} ms  "
+          f"caller blocked {queued_total * 1000:.0f} ms  ({sync_total / queued_total:.0f}x less)")
+    print(f"  writer  {stream.lines} lines written in the background ({drained * 1000:.0f} ms left to drain "
+          f"at exit), {handler.dropped} dropped")
+
+
+if __name__ == "__main__":
+    main()
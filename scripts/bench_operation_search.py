@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark: search_operations over a large spec (TOOL_DISCOVERY_MODE=search).
+
+Builds a synthetic spec with --operations operations over a few hundred
+resource names (nested collections, CRUD plus a few actions, tags, summaries,
+descriptions and query parameters, roughly what a big public API looks
+like), registers it and reports:
+
+  index    time to build the BM25 index for the registry (paid once per
+           spec load, off the event loop)
+  search   per-query latency of OperationIndex.search() for a mix of
+           queries, from one rare keyword to several common ones
+  tools    what the client receives instead: the tools/list frame in
+           search mode versus one tool per operation
+
+Usage: python scripts/bench_operation_search.py [--operations 10000] [--runs 200]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+RESOURCES = [
+    "account", "address", "alert", "application", "artifact", "asset", "attachment", "audit", "backup", "balance",
+    "batch", "bill", "branch", "bucket", "build", "calendar", "campaign", "card", "cart", "category", "certificate",
+    "channel", "charge", "check", "cluster", "comment", "commit", "company", "contact", "container", "contract",
+    "coupon", "credential", "customer", "dashboard", "database", "deal", "deployment", "device", "discount",
+    "dispute", "document", "domain", "draft", "employee", "endpoint", "environment", "event", "export", "feature",
+    "feed", "file", "folder", "form", "gateway", "group", "hook", "identity", "image", "import", "incident",
+    "integration", "invite", "invoice", "issue", "job", "key", "label", "lead", "license", "link", "list", "location",
+    "log", "machine", "mailbox", "member", "message", "metric", "milestone", "model", "monitor", "namespace",
+    "network", "node", "note", "notification", "order", "organization", "package", "page", "partner", "payment",
+    "payout", "permission", "pipeline", "plan", "policy", "pool", "price", "product", "profile", "project", "promotion",
+    "queue", "quota", "receipt", "record", "refund", "region", "release", "report", "repository", "request",
+    "reservation", "review", "role", "route", "rule", "run", "schedule", "secret", "segment", "server", "service",
+    "session", "setting", "shipment", "site", "snapshot", "source", "space", "subscription", "supplier", "survey",
+    "table", "task", "team", "template", "tenant", "thread", "ticket", "token", "topic", "transaction", "transfer",
+    "trigger", "upload", "usage", "user", "variable", "vendor", "version", "video", "volume", "wallet", "warehouse",
+    "webhook", "workflow", "workspace", "zone",
+]
+ACTIONS = ["archive", "restore", "approve", "cancel", "export", "sync"]
+
+QUERIES = [
+    "refund",
+    "cancel subscription",
+    "list invoices for a customer",
+    "create webhook",
+    "delete a user from a team",
+    "get deployment logs by id",
+    "update the settings of a workspace",
+    "list get create update delete",
+]
+
+
+def synthetic_spec(operations: int):
+    paths = {}
+    count = 0
+    i = 0
+    while count < operations:
+        parent = RESOURCES[i % len(RESOURCES)]
+        child = RESOURCES[(i * 7 + 3) % len(RESOURCES)]
+        version = i // len(RESOURCES)
+        base = f"/v{version}/{parent}s/{{{parent}Id}}/{child}s"
+        tags = [parent.title()]
+        paging = [
+            {"name": "limit", "in": "query", "schema": {"type": "integer"}, "description": "Page size"},
+            {"name": "startingAfter", "in": "query", "schema": {"type": "string"}, "description": "Cursor"},
+        ]
+        paths[base] = {
+            "get": {"operationId": f"list{parent.title()}{child.title()}s{version}", "tags": tags,
+                    "summary": f"List {child}s of a {parent}",
+                    "description": f"Returns the {child}s that belong to the {parent}, newest first.",
+                    "parameters": paging},
+            "post": {"operationId": f"create{parent.title()}{child.title()}{version}", "tags": tags,
+                     "summary": f"Create a {child} for a {parent}",
+                     "requestBody": {"content": {"application/json": {"schema": {
+                         "type": "object",
+                         "properties": {"name": {"type": "string"}, "metadata": {"type": "object"}}}}}}},
+        }
+        item = f"{base}/{{{child}Id}}"
+        paths[item] = {
+            "get": {"operationId": f"get{parent.title()}{child.title()}{version}", "tags": tags,
+                    "summary": f"Retrieve a {child} of a {parent} by id"},
+            "patch": {"operationId": f"update{parent.title()}{child.title()}{version}", "tags": tags,
+                      "summary": f"Update a {child} of a {parent}"},
+            "delete": {"operationId": f"delete{parent.title()}{child.title()}{version}", "tags": tags,
+                       "summary": f"Delete a {child} from a {parent}"},
+        }
+        action = ACTIONS[i % len(ACTIONS)]
+        paths[f"{item}/{action}"] = {
+            "post": {"operationId": f"{action}{parent.title()}{child.title()}{version}", "tags": tags,
+                     "summary": f"{action.title()} a {child} of a {parent}"},
+        }
+        count += 6
+        i += 1
+    return {"openapi": "3.0.0", "servers": [{"url": "https://api.example.com"}], "paths": paths}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy.logging_setup import logger
+    from mcp_openapi_proxy.openapi import build_registry
+    from mcp_openapi_proxy.search import OperationIndex, meta_tools
+    logger.setLevel(logging.WARNING)
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE",
+                 "TOOL_DISCOVERY_MODE"):
+        os.environ.pop(name, None)
+
+    registry = build_registry(synthetic_spec(args.operations))
+    start = time.perf_counter()
+    index = OperationIndex(registry)
+    built = time.perf_counter() - start
+    print(f"{len(registry)} operations; index built in {built * 1000:.0f} ms")
+
+    print(f"  {'query':34} {'p50':>9} {'p99':>9}  top match")
+    for query in QUERIES:
+        samples = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            results = index.search(query)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        top = results[0][0] if results else "-"
+        median, p99 = samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+        print(f"  {query:34} {median * 1e6:7.0f}us {p99 * 1e6:7.0f}us  {top}")
+
+    listed = json.dumps([tool.model_dump(mode="json", exclude_none=True) for tool in registry.tools])
+    meta = json.dumps([tool.model_dump(mode="json", exclude_none=True) for tool in meta_tools()])
+    print(f"  tools/list: {len(listed) / 1024:.0f} KB for every operation, {len(meta) / 1024:.1f} KB in search mode")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Benchmark: tool calls against an upstream that enforces a quota.
+
+A local stub allows --quota requests per --window seconds (a fixed window,
+like Slack's per-minute tiers scaled down). It answers every request with
+RateLimit-Remaining / RateLimit-Reset headers, and requests over the quota
+with 429 and Retry-After. Agents fire --calls tool calls at --arrival calls
+per second through the upstream pool, without retries, with:
+
+  no limiter  requests go out as fast as they arrive; the excess comes
+              back as 429 errors
+  adaptive    no rate configured; the buckets learn the quota from the
+              RateLimit-* and Retry-After headers and queue calls
+  seeded      UPSTREAM_RATE_LIMIT set to the quota (quota / window)
+
+Reports calls that succeeded, 429s handed back to the agent, calls refused
+because they would have queued past UPSTREAM_RATE_MAX_WAIT (--max-wait), and
+how long the run took.
+
+Usage: python scripts/bench_rate_limiter.py [--calls 60] [--arrival 20] [--quota 10] [--window 1] [--max-wait 10]
+"""
+import argparse
+import asyncio
+import http.server
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def quota_upstream(quota, window):
+    state = {"window": 0, "used": 0, "requests": 0}
+    lock = threading.Lock()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            with lock:
+                now = time.monotonic()
+                current = int(now / window)
+                if current != state["window"]:
+                    state["window"], state["used"] = current, 0
+                state["requests"] += 1
+                allowed = state["used"] < quota
+                state["used"] += allowed
+                remaining = quota - state["used"]
+                reset = max((current + 1) * window - now, 0.001)
+            self.send_response(200 if allowed else 429)
+            self.send_header("RateLimit-Remaining", str(remaining))
+            self.send_header("RateLimit-Reset", f"{reset:.3f}")
+            if not allowed:
+                self.send_header("Retry-After", f"{reset:.3f}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}", server, state
+
+
+async def run(pool, url, calls, arrival):
+    from mcp_openapi_proxy.ratelimit import RateLimitedError
+    outcomes = {"ok": 0, "429": 0, "refused": 0}
+
+    async def one():
+        try:
+            response = await pool.request("GET", url)
+        except RateLimitedError:
+            outcomes["refused"] += 1
+            return
+        outcomes["ok" if response.status_code == 200 else "429"] += 1
+
+    start = time.perf_counter()
+    tasks = []
+    for _ in range(calls):
+        tasks.append(asyncio.create_task(one()))
+        await asyncio.sleep(1 / arrival)
+    await asyncio.gather(*tasks)
+    await pool.aclose()
+    return outcomes, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--arrival", type=float, default=20.0)
+    parser.add_argument("--quota", type=int, default=10)
+    parser.add_argument("--window", type=float, default=1.0)
+    parser.add_argument("--max-wait", type=float, default=10.0)
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy.breaker import BreakerConfig
+    from mcp_openapi_proxy.http_client import PoolConfig, UpstreamPool
+    from mcp_openapi_proxy.logging_setup import logger
+    from mcp_openapi_proxy.ratelimit import RateLimitConfig
+    from mcp_openapi_proxy.retry import RetryPolicy
+    logger.setLevel(logging.WARNING)
+
+    print(f"{args.calls} calls at {args.arrival:g}/s against a quota of {args.quota} per {args.window:g}s, no retries")
+    rate = args.quota / args.window
+    for label, limits in (("no limiter", None),
+                          ("adaptive", RateLimitConfig(max_wait=args.max_wait)),
+                          ("seeded", RateLimitConfig(rate=rate, burst=args.quota, max_wait=args.max_wait))):
+        url, server, state = quota_upstream(args.quota, args.window)
+        pool = UpstreamPool(PoolConfig(), RetryPolicy(max_retries=0), BreakerConfig(failure_rate=0), limits)
+        if limits is None:
+            pool.limiter.reserve = lambda buckets, max_wait: 0.0
+            pool.limiter.observe = lambda buckets, response: None
+        outcomes, wall = asyncio.run(run(pool, url + "/x", args.calls, args.arrival))
+        server.shutdown()
+        server.server_close()
+        print(f"  {label:10}  ok {outcomes['ok']:4}  429 {outcomes['429']:4}  refused {outcomes['refused']:4}  "
+              f"upstream requests {state['requests']:4}  {wall:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
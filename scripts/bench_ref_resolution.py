@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Benchmark: registering a $ref-heavy spec.
+
+Builds a synthetic spec with --operations operations whose parameters,
+request bodies and response schemas all point into a small set of shared
+components (each model nests further refs and refers to itself), then
+registers it:
+
+  shared   build_registry() as shipped: RefResolver resolves each component
+           once and every operation shares the resolved object
+  copied   the spec fully dereferenced up front with a fresh deep copy per
+           use (what a generic dereferencer produces), then build_registry()
+  prance   like copied, with prance's RefResolver doing the dereferencing
+           (one run; skipped if prance is not installed)
+
+Reports the best of --runs registration times (dereferencing included), the
+memory still held by the registry afterwards (tracemalloc) and the process's
+peak RSS so far.
+
+Usage: python scripts/bench_ref_resolution.py [--operations 5000] [--runs 3]
+"""
+import argparse
+import copy
+import gc
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+SCHEMAS = 40
+
+
+def synthetic_spec(operations: int):
+    schemas = {
+        "Audit": {"type": "object", "properties": {
+            "createdAt": {"type": "string", "format": "date-time"},
+            "createdBy": {"type": "string", "description": "User who created the record"},
+        }},
+        "Tag": {"type": "object", "properties": {"key": {"type": "string"}, "value": {"type": "string"}}},
+        "User": {"type": "object", "properties": {
+            "id": {"type": "string"}, "email": {"type": "string", "format": "email"},
+            "audit": {"$ref": "#/components/schemas/Audit"},
+        }},
+    }
+    for i in range(SCHEMAS):
+        schemas[f"Model{i}"] = {
+            "type": "object",
+            "required": ["name"],
+            "properties": {
+                "name": {"type": "string", "description": f"Name of model {i}"},
+                "tags": {"type": "array", "items": {"$ref": "#/components/schemas/Tag"}},
+                "audit": {"$ref": "#/components/schemas/Audit"},
+                "owner": {"$ref": "#/components/schemas/User"},
+                "parent": {"$ref": f"#/components/schemas/Model{i}"},
+                **{f"field{j}": {"type": "string", "description": f"Field {j} of model {i}"} for j in range(8)},
+            },
+        }
+    parameters = {
+        "Limit": {"name": "limit", "in": "query", "schema": {"type": "integer"}, "description": "Page size"},
+        "Cursor": {"name": "cursor", "in": "query", "schema": {"type": "string"}, "description": "Page cursor"},
+        "Id": {"name": "id", "in": "path", "required": True, "schema": {"type": "string"}},
+    }
+    paths = {}
+    for i in range(operations // 2):
+        model = f"#/components/schemas/Model{i % SCHEMAS}"
+        paths[f"/group{i % 50}/resource{i}/{{id}}"] = {
+            "parameters": [{"$ref": "#/components/parameters/Id"}],
+            "get": {
+                "summary": f"Get resource {i}",
+                "parameters": [{"$ref": "#/components/parameters/Limit"}, {"$ref": "#/components/parameters/Cursor"}],
+                "responses": {"200": {"description": "OK",
+                                      "content": {"application/json": {"schema": {"$ref": model}}}}},
+            },
+            "put": {
+                "summary": f"Replace resource {i}",
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": model}}}},
+                "responses": {"200": {"description": "OK"}},
+            },
+        }
+    return {
+        "openapi": "3.0.0",
+        "servers": [{"url": "https://api.example.com"}],
+        "paths": paths,
+        "components": {"schemas": schemas, "parameters": parameters},
+    }
+
+
+def dereference_copied(spec):
+    """Inline every $ref with a fresh deep copy; recursion stops at a
+    pointer already being inlined."""
+    from mcp_openapi_proxy.refs import RefResolver
+    lookup = RefResolver(spec).lookup
+
+    def inline(node, stack):
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                if ref in stack:
+                    return {"type": "object"}
+                return inline(copy.deepcopy(lookup(ref)), stack | {ref})
+            return {k: inline(v, stack) for k, v in node.items()}
+        if isinstance(node, list):
+            return [inline(v, stack) for v in node]
+        return node
+
+    return dict(spec, paths=inline(spec["paths"], frozenset()))
+
+
+def dereference_prance(spec):
+    from prance.util.resolver import RefResolver as PranceResolver
+    resolver = PranceResolver(copy.deepcopy(spec), "file:///bench.json",
+                              recursion_limit_handler=lambda limit, ref, recursions: {"type": "object"})
+    resolver.resolve_references()
+    return resolver.specs
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(label, prepare, spec, runs):
+    from mcp_openapi_proxy.openapi import build_registry
+    times = []
+    for _ in range(runs):
+        gc.collect()
+        start = time.perf_counter()
+        registry = build_registry(prepare(spec))
+        times.append(time.perf_counter() - start)
+        del registry
+    gc.collect()
+    tracemalloc.start()
+    registry = build_registry(prepare(spec))
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:8} {min(times):8.2f} s {retained / 2**20:10.1f} MB {rss_mb():10.0f} MB  ({len(registry)} tools)")
+    del registry
+    gc.collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy.logging_setup import logger
+    logger.setLevel(logging.WARNING)
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE"):
+        os.environ.pop(name, None)
+
+    spec = synthetic_spec(args.operations)
+    print(f"{args.operations} operations over {SCHEMAS} shared models, best of {args.runs}")
+    print(f"  {'mode':8} {'register':>10} {'retained':>13} {'peak RSS':>13}")
+    # Cheapest first: ru_maxrss only grows, so each row shows the high-water
+    # mark up to and including that mode.
+    measure("shared", lambda s: s, spec, args.runs)
+    measure("copied", dereference_copied, spec, args.runs)
+    try:
+        import prance  # noqa: F401
+    except ImportError:
+        print("  prance   (not installed)")
+    else:
+        measure("prance", dereference_prance, spec, 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Benchmark: detect_response_type passthrough versus decode + re-encode.
+
+For JSON list bodies of 100 KB, 1 MB and 20 MB (override with --sizes-kb),
+compares
+
+  roundtrip    what detect_response_type did before: json_codec.loads the
+               body, then json_codec.dumps it straight back
+  passthrough  detect_response_type(body, "application/json")
+
+reporting the best of --runs wall times and the peak extra memory
+(tracemalloc) of one call.
+
+Usage: python scripts/bench_response_passthrough.py [--sizes-kb 100 1024 20480] [--runs 5]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def body_of(size_kb: int) -> str:
+    item = {"id": "00000000", "name": "Widget", "price": 12.5, "tags": ["a", "b"], "active": True, "owner": None}
+    count = max(1, int(size_kb * 1024 / len(json.dumps(item))))
+    return json.dumps([dict(item, id=f"{i:08x}") for i in range(count)])
+
+
+def measure(fn, runs):
+    best = min(_timed(fn) for _ in range(runs))
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[100, 1024, 20480])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy import json_codec
+    from mcp_openapi_proxy.logging_setup import logger
+    from mcp_openapi_proxy.utils import detect_response_type
+    logger.setLevel(logging.WARNING)
+
+    print(f"codec backend: {json_codec.BACKEND}, best of {args.runs}")
+    print(f"  {'body':>8} {'roundtrip':>12} {'passthrough':>12} {'speedup':>8} {'peak rt':>9} {'peak pt':>9}")
+    for size_kb in args.sizes_kb:
+        body = body_of(size_kb)
+        roundtrip, rt_peak = measure(lambda: json_codec.dumps(json_codec.loads(body)), args.runs)
+        passthrough, pt_peak = measure(lambda: detect_response_type(body, "application/json"), args.runs)
+        print(f"  {len(body) / 1024:6.0f}KB {roundtrip * 1000:10.2f}ms {passthrough * 1000:10.2f}ms "
+              f"{roundtrip / passthrough:7.0f}x {rt_peak / 2**20:7.1f}MB {pt_peak / 2**20:7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Startup benchmark: cold registration versus registry-snapshot warm start.
+
+Writes a synthetic spec of roughly --size-mb megabytes to a temp file and
+drives server_lowlevel.ensure_spec_loaded() against it (a file:// URL, so no
+network is involved) with a private XDG_CACHE_HOME:
+
+  cold  no snapshot: read text, parse JSON, register_functions, write snapshot
+  warm  snapshot present: read text, hash, load snapshot, install
+
+Each mode is repeated --runs times and the best time is reported. With
+--discovery-mode search (TOOL_DISCOVERY_MODE=search) both modes also build
+the search_operations index, so its cost shows up in the startup time.
+
+Usage: python scripts/bench_startup_snapshot.py [--size-mb 5] [--runs 5] [--discovery-mode tools|search]
+"""
+import argparse
+import asyncio
+import gc
+import glob
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def synthetic_spec(size_mb: float):
+    paths = {}
+    i = 0
+    spec = {"openapi": "3.0.0", "servers": [{"url": "https://api.example.com/v1"}], "paths": paths}
+    # ~1 KB per path item below
+    for i in range(int(size_mb * 1024 * 1024 / 1040)):
+        paths[f"/org{i % 50}/resource{i}/{{resource_id}}/items"] = {
+            "parameters": [{"name": "resource_id", "in": "path", "required": True, "schema": {"type": "string"}}],
+            "get": {
+                "summary": f"List items of resource {i}",
+                "description": "Returns a page of items. " * 8,
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}, "description": "Page size"},
+                    {"name": "cursor", "in": "query", "schema": {"type": "string"}, "description": "Cursor"},
+                ],
+                "responses": {"200": {"description": "OK", "content": {"application/json": {"schema": {
+                    "type": "array", "items": {"type": "object", "properties": {
+                        "id": {"type": "string"}, "name": {"type": "string"}, "created": {"type": "string"}}}}}}}},
+            },
+            "post": {
+                "summary": f"Create item in resource {i}",
+                "requestBody": {"content": {"application/json": {"schema": {
+                    "type": "object", "required": ["name"],
+                    "properties": {
+                        "name": {"type": "string"},
+                        "tags": {"type": "array", "items": {"type": "string"}},
+                    }}}}},
+            },
+        }
+    return spec
+
+
+async def load_once():
+    from mcp_openapi_proxy import server_lowlevel
+    from mcp_openapi_proxy.registry import ToolRegistry, current_registry, install_registry
+    install_registry(ToolRegistry())
+    server_lowlevel.tools.clear()
+    server_lowlevel.openapi_spec_data = None
+    server_lowlevel._spec_load_error = None
+    server_lowlevel._spec_load_lock = None
+    server_lowlevel._registry_from_snapshot = False
+    server_lowlevel._spec_key = None
+    # Each run stands for a fresh process: its first load, nothing frozen yet.
+    server_lowlevel._first_build_done = False
+    gc.unfreeze()
+    start = time.perf_counter()
+    await server_lowlevel.ensure_spec_loaded()
+    elapsed = time.perf_counter() - start
+    return elapsed, len(current_registry()), server_lowlevel._registry_from_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--discovery-mode", choices=["tools", "search"], default="tools")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-snapshot-")
+    spec_path = os.path.join(workdir, "spec.json")
+    with open(spec_path, "w") as f:
+        json.dump(synthetic_spec(args.size_mb), f)
+    os.environ["XDG_CACHE_HOME"] = os.path.join(workdir, "cache")
+    os.environ["OPENAPI_SPEC_URL"] = f"file://{spec_path}"
+    os.environ["TOOL_DISCOVERY_MODE"] = args.discovery_mode
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE",
+                 "OPENAPI_REGISTRY_SNAPSHOT"):
+        os.environ.pop(name, None)
+
+    from mcp_openapi_proxy import server_lowlevel
+    from mcp_openapi_proxy.logging_setup import logger
+    logger.setLevel(logging.WARNING)
+    server_lowlevel.ENABLE_TOOLS = True
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        for stale in glob.glob(os.path.join(workdir, "cache", "mcp-openapi-proxy", "registry-*")):
+            os.remove(stale)
+        elapsed, count, from_snapshot = asyncio.run(load_once())
+        assert not from_snapshot
+        cold.append(elapsed)
+        elapsed, count, from_snapshot = asyncio.run(load_once())
+        assert from_snapshot
+        warm.append(elapsed)
+
+    size = os.path.getsize(spec_path) / (1024 * 1024)
+    print(f"spec: {size:.1f} MB, {count} tools, {args.discovery_mode} mode, best of {args.runs}")
+    print(f"  cold (parse + register + store): {min(cold) * 1000:8.1f} ms")
+    print(f"  warm (snapshot):                 {min(warm) * 1000:8.1f} ms ({min(cold) / min(warm):.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
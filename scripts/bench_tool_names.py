@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Benchmark: tool-name normalization during registration and lookup scans.
+
+Names every operation of a synthetic --operations operation spec ("METHOD
+/path" -> tool name), the way build_registry does at registration and
+lookup_operation_details does on every fallback scan:
+
+  per-call  normalize_tool_name() as it was before ToolNameNormalizer:
+            recompile the URL template pattern, re-read TOOL_NAME_PREFIX /
+            TOOL_NAME_MAX_LENGTH and log an INFO line on every call
+  cold      a fresh ToolNameNormalizer (precompiled patterns, settings read
+            once): what registration pays
+  memoized  the same normalizer again: what every later scan pays
+
+Log lines are counted with a handler on the package logger at INFO, the
+default level.
+
+Usage: python scripts/bench_tool_names.py [--operations 10000] [--runs 3]
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def per_call_normalize_tool_name(raw_name: str, logger) -> str:
+    """normalize_tool_name() as it was before ToolNameNormalizer (error
+    handling and the truncation warning omitted)."""
+    from mcp_openapi_proxy.utils import get_tool_name_max_length
+    method, path = raw_name.split(" ", 1)
+    path = re.sub(r"/(api|rest|public)/?", "/", path).lstrip("/").rstrip("/")
+    if not path:
+        path = "root"
+    url_template_pattern = re.compile(r"\{([^}]+)\}")
+    normalized_parts = []
+    for part in path.split("/"):
+        if url_template_pattern.search(part):
+            params = url_template_pattern.findall(part)
+            base = url_template_pattern.sub("", part)
+            part = f"{base}_by_{'_'.join(p.lower() for p in params)}"
+        part = part.replace(".", "_").replace("-", "_").replace("+", "_")
+        if part:
+            normalized_parts.append(part)
+    tool_name = f"{method.lower()}_{'_'.join(normalized_parts)}"
+    tool_name = re.sub(r"_+", "_", tool_name).strip("_")
+    tool_name_prefix = os.getenv("TOOL_NAME_PREFIX", "")
+    if tool_name_prefix:
+        tool_name = f"{tool_name_prefix}{tool_name}"
+    max_length = get_tool_name_max_length()
+    final_limit = min(max_length, 64) if max_length is not None else 64
+    tool_name = tool_name[:final_limit]
+    logger.info(f"Final tool name: {tool_name}, length: {len(tool_name)}")
+    return tool_name
+
+
+def raw_names(operations: int):
+    names = []
+    for i in range(operations // 2):
+        path = f"/api/v2/org{i % 50}/resource-{i}/{{resourceId}}/sub.items"
+        names.append(f"GET {path}")
+        names.append(f"PUT {path}")
+    return names
+
+
+class Counter(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def measure(fn, names, runs, counter):
+    times = []
+    for _ in range(runs):
+        counter.count = 0
+        start = time.perf_counter()
+        for name in names:
+            fn(name)
+        times.append(time.perf_counter() - start)
+    return min(times), counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy.logging_setup import logger
+    from mcp_openapi_proxy.utils import ToolNameNormalizer, tool_name_normalizer
+    for name in ("TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH"):
+        os.environ.pop(name, None)
+    # Count log records without printing them.
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    counter = Counter()
+    logger.addHandler(counter)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    names = raw_names(args.operations)
+
+    def per_call_normalize(name):
+        return per_call_normalize_tool_name(name, logger)
+
+    per_call, per_call_lines = measure(per_call_normalize, names, args.runs, counter)
+    cold = []
+    for _ in range(args.runs):
+        normalize = ToolNameNormalizer()
+        counter.count = 0
+        start = time.perf_counter()
+        for name in names:
+            normalize(name)
+        cold.append(time.perf_counter() - start)
+    cold_lines = counter.count
+    normalize = tool_name_normalizer()
+    for name in names:
+        normalize(name)
+    memoized, memoized_lines = measure(normalize, names, args.runs, counter)
+    unused = logging.getLogger("unused")
+    assert [normalize(name) for name in names] == [per_call_normalize_tool_name(name, unused) for name in names]
+
+    print(f"{len(names)} operations, best of {args.runs}")
+    print(f"  per-call  {per_call * 1000:8.1f} ms  {per_call_lines:6d} log lines")
+    print(f"  cold      {min(cold) * 1000:8.1f} ms  {cold_lines:6d} log lines ({per_call / min(cold):.1f}x faster)")
+    print(f"  memoized  {memoized * 1000:8.1f} ms  {memoized_lines:6d} log lines ({per_call / memoized:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Benchmark: tools/list over a large registry, with and without paging.
+
+Registers a synthetic spec with --operations operations (lazily, as the
+low-level server does) and times server_lowlevel.list_tools() plus the
+serialization the SDK does for every response (result model_dump, then the
+JSON-RPC frame), for
+
+  all    TOOLS_LIST_PAGE_SIZE=0: one frame with every tool
+  paged  TOOLS_LIST_PAGE_SIZE=--page-size: the first page only
+
+"first" includes building the tools of the page; "repeat" is the same
+listing again, served from the per-registry page cache. Frame sizes are
+for one response.
+
+Usage: python scripts/bench_tools_list.py [--operations 10000] [--page-size 100] [--runs 5]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def synthetic_spec(operations: int):
+    paths = {}
+    for i in range(operations // 2):
+        paths[f"/org{i % 50}/resource{i}/{{resource_id}}"] = {
+            "get": {
+                "summary": f"Get resource {i}",
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}, "description": "Page size"},
+                ],
+            },
+            "put": {
+                "summary": f"Replace resource {i}",
+                "requestBody": {"content": {"application/json": {"schema": {
+                    "type": "object", "required": ["name"],
+                    "properties": {"name": {"type": "string"}, "tags": {"type": "array", "items": {"type": "string"}}},
+                }}}},
+            },
+        }
+    return {"openapi": "3.0.0", "servers": [{"url": "https://api.example.com"}], "paths": paths}
+
+
+def frame(result) -> str:
+    from mcp import types
+    payload = result.model_dump(by_alias=True, mode="json", exclude_none=True)
+    return types.JSONRPCResponse(jsonrpc="2.0", id=1, result=payload).model_dump_json(by_alias=True, exclude_none=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy import server_lowlevel
+    from mcp_openapi_proxy.logging_setup import logger
+    from mcp_openapi_proxy.openapi import build_registry
+    from mcp_openapi_proxy.registry import install_registry
+    logger.setLevel(logging.WARNING)
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE"):
+        os.environ.pop(name, None)
+    spec = synthetic_spec(args.operations)
+    server_lowlevel.openapi_spec_data = spec
+    request = SimpleNamespace(params=None)
+
+    def listing():
+        return frame(asyncio.run(server_lowlevel.list_tools(request)))
+
+    print(f"{args.operations} tools, page size {args.page_size}, repeat = best of {args.runs}")
+    print(f"  {'mode':6} {'first':>10} {'repeat':>10} {'frame':>10}")
+    for mode, size in (("all", 0), ("paged", args.page_size)):
+        os.environ["TOOLS_LIST_PAGE_SIZE"] = str(size)
+        install_registry(build_registry(spec))
+        start = time.perf_counter()
+        body = listing()
+        first = time.perf_counter() - start
+        repeat = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            listing()
+            repeat.append(time.perf_counter() - start)
+        print(f"  {mode:6} {first * 1000:8.1f}ms {min(repeat) * 1000:8.1f}ms {len(body) / 1024:8.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark: TOOL_WHITELIST matching, per-call parsing versus compiled.
+
+Builds a --paths path spec and a whitelist of --entries entries (a quarter
+of them templated, e.g. /org7/resource12/{id}) and filters every path:
+
+  per-call  the previous is_tool_whitelisted(): re-read and re-split
+            TOOL_WHITELIST and rebuild a regex per templated entry on
+            every check
+  compiled  the whitelist compiled once (literal prefix set plus one
+            combined regex), then matches() per path, as register_functions
+            and list_functions do; the compile is included
+
+Also times build_registry() for the spec under the whitelist.
+
+Usage: python scripts/bench_whitelist.py [--paths 10000] [--entries 500] [--runs 3]
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def per_call_is_tool_whitelisted(endpoint: str) -> bool:
+    """is_tool_whitelisted() as it was before the compiled matcher (minus
+    its debug logging)."""
+    whitelist_str = os.getenv("TOOL_WHITELIST", "").strip()
+    if not whitelist_str:
+        return True
+    whitelist_entries = [entry.strip() for entry in whitelist_str.split(",") if entry.strip()]
+    normalized_endpoint = "/" + endpoint.strip("/")
+    for entry in whitelist_entries:
+        normalized_entry = "/" + entry.strip("/")
+        if "{" in normalized_entry and "}" in normalized_entry:
+            pattern_str = re.escape(normalized_entry).replace(r"\{", "{").replace(r"\}", "}")
+            pattern_str = re.sub(r"\{[^}]+\}", r"([^/]+)", pattern_str)
+            pattern = "^" + pattern_str + "($|/.*)"
+            try:
+                if re.match(pattern, normalized_endpoint):
+                    return True
+            except re.error:
+                continue
+        elif normalized_endpoint.startswith(normalized_entry):
+            if normalized_endpoint == normalized_entry or normalized_endpoint.startswith(
+                (normalized_entry + "/", normalized_entry + ".")
+            ):
+                return True
+    return False
+
+
+def synthetic_spec(paths: int):
+    return {
+        "openapi": "3.0.0",
+        "servers": [{"url": "https://api.example.com"}],
+        "paths": {
+            f"/org{i % 50}/resource{i}/{{resource_id}}": {"get": {"summary": f"Get resource {i}"}}
+            for i in range(paths)
+        },
+    }
+
+
+def whitelist(entries: int, paths: int) -> str:
+    step = max(1, paths // entries)
+    out = []
+    for n, i in enumerate(range(0, paths, step)[:entries]):
+        if n % 4 == 0:
+            out.append(f"/org{i % 50}/resource{i}/{{id}}")
+        else:
+            out.append(f"/org{i % 50}/resource{i}")
+    return ",".join(out)
+
+
+def best(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy.logging_setup import logger
+    from mcp_openapi_proxy.openapi import build_registry
+    from mcp_openapi_proxy.utils import WhitelistMatcher
+    logger.setLevel(logging.WARNING)
+    for name in ("TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE", "TOOL_DISCOVERY_MODE"):
+        os.environ.pop(name, None)
+    spec = synthetic_spec(args.paths)
+    os.environ["TOOL_WHITELIST"] = whitelist(args.entries, args.paths)
+    paths = list(spec["paths"])
+
+    per_call, allowed = best(lambda: sum(map(per_call_is_tool_whitelisted, paths)), 1)
+
+    def compiled():
+        matcher = WhitelistMatcher(os.environ["TOOL_WHITELIST"])
+        return sum(map(matcher.matches, paths))
+
+    fast, allowed_fast = best(compiled, args.runs)
+    assert allowed == allowed_fast, (allowed, allowed_fast)
+    register, registry = best(lambda: build_registry(spec), args.runs)
+
+    print(f"{args.paths} paths, {args.entries} whitelist entries, {allowed} paths allowed")
+    print(f"  per-call  {per_call * 1000:9.1f} ms  ({per_call / len(paths) * 1e6:.1f} us/path)")
+    print(f"  compiled  {fast * 1000:9.1f} ms  ({fast / len(paths) * 1e6:.2f} us/path, {per_call / fast:.0f}x faster)")
+    print(f"  build_registry with the whitelist: {register * 1000:.1f} ms ({len(registry)} tools)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Load test: many concurrent MCP sessions against one HTTP-mode proxy.
+
+Starts a stub upstream that serves both the spec (/openapi.json) and the API
+(/items, --latency seconds per response), launches the proxy as a subprocess
+with MCP_TRANSPORT=--transport, then opens --sessions concurrent client
+sessions. Each one initializes, lists tools and makes --calls tool calls;
+sessions not done within --session-timeout seconds count as failed.
+
+Reports wall time, per-session p50/p95/max, how often the stub served the
+spec (1 means every session shared one load), the proxy's CPU time and its
+resident memory before and after. Client, stub and proxy share the machine,
+so on few cores wall time is bounded by the client side as much as by the
+proxy; the proxy CPU figure isolates its share.
+
+Usage: python scripts/load_http_sessions.py [--sessions 200] [--calls 3] [--latency 0.05] [--transport http]
+"""
+import argparse
+import asyncio
+import http.server
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+
+def start_stub(latency: float):
+    hits = {"spec": 0, "items": 0}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path.startswith("/openapi.json"):
+                hits["spec"] += 1
+                body = json.dumps({
+                    "openapi": "3.0.0",
+                    "servers": [{"url": f"http://127.0.0.1:{self.server.server_address[1]}"}],
+                    "paths": {"/items": {"get": {"summary": "List items"}}},
+                }).encode()
+            else:
+                hits["items"] += 1
+                time.sleep(latency)
+                body = b'{"items": [1, 2, 3]}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(http.server.ThreadingHTTPServer):
+        request_queue_size = 1024
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", hits
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def cpu_seconds(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            fields = stat.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except OSError:
+        return float("nan")
+
+
+def client_for(transport: str, port: int):
+    if transport == "sse":
+        from mcp.client.sse import sse_client
+        return lambda: sse_client(f"http://127.0.0.1:{port}/sse", timeout=60)
+    from mcp.client.streamable_http import streamablehttp_client
+    return lambda: streamablehttp_client(f"http://127.0.0.1:{port}/mcp/", timeout=timedelta(seconds=60))
+
+
+async def run_sessions(open_streams, sessions: int, calls: int, session_timeout: float):
+    from mcp import ClientSession
+
+    async def session():
+        async with open_streams() as streams:
+            async with ClientSession(streams[0], streams[1]) as client:
+                await client.initialize()
+                await client.list_tools()
+                for _ in range(calls):
+                    result = await client.call_tool("get_items", {})
+                    assert result.content[0].text == '{"items": [1, 2, 3]}', result
+
+    async def timed():
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(session(), session_timeout)
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+        return time.perf_counter() - start, None
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(timed() for _ in range(sessions)))
+    durations = sorted(d for d, _ in results if d is not None)
+    errors = [error for _, error in results if error is not None]
+    return time.perf_counter() - start, durations, errors
+
+
+async def wait_listening(port: int, proc: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"proxy exited with {proc.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise SystemExit("proxy did not start listening")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--session-timeout", type=float, default=60.0)
+    parser.add_argument("--transport", default="http", choices=["http", "sse", "streamable-http"])
+    args = parser.parse_args()
+
+    from mcp_openapi_proxy.http_transport import resolve_transport
+    transport = resolve_transport(args.transport)
+
+    stub, stub_url, hits = start_stub(args.latency)
+    port = free_port()
+    env = dict(
+        os.environ,
+        OPENAPI_SPEC_URL=f"{stub_url}/openapi.json",
+        OPENAPI_SPEC_CACHE_TTL_SECONDS="0",
+        OPENAPI_REGISTRY_SNAPSHOT="false",
+        MCP_TRANSPORT=transport,
+        MCP_HTTP_PORT=str(port),
+        PYTHONPATH=ROOT,
+    )
+    command = [sys.executable, "-c", "import mcp_openapi_proxy; mcp_openapi_proxy.main()"]
+    proc = subprocess.Popen(command, env=env, cwd=ROOT)
+    try:
+        asyncio.run(wait_listening(port, proc))
+        idle_rss = rss_mb(proc.pid)
+        idle_cpu = cpu_seconds(proc.pid)
+        wall, durations, errors = asyncio.run(
+            run_sessions(client_for(transport, port), args.sessions, args.calls, args.session_timeout))
+        loaded_rss = rss_mb(proc.pid)
+        proxy_cpu = cpu_seconds(proc.pid) - idle_cpu
+    finally:
+        proc.terminate()
+        proc.wait(timeout=15)
+        stub.shutdown()
+
+    if not durations:
+        raise SystemExit(f"all {len(errors)} sessions failed, e.g. {errors[0]}")
+    p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+    print(f"transport {transport}: {args.sessions} sessions x {args.calls} calls, upstream latency {args.latency}s")
+    print(f"  completed      {len(durations):8d} ({len(errors)} failed{', e.g. ' + errors[0] if errors else ''})")
+    print(f"  wall           {wall:8.2f} s")
+    print(f"  session p50    {statistics.median(durations) * 1000:8.0f} ms")
+    print(f"  session p95    {p95 * 1000:8.0f} ms")
+    print(f"  session max    {durations[-1] * 1000:8.0f} ms")
+    print(f"  upstream calls {hits['items']:8d}")
+    print(f"  spec fetches   {hits['spec']:8d}")
+    print(f"  proxy CPU      {proxy_cpu:8.2f} s ({proxy_cpu / args.sessions * 1000:.1f} ms per session)")
+    print(f"  proxy RSS      {idle_rss:8.1f} MB idle, {loaded_rss:.1f} MB after the run")
+
+
+if __name__ == "__main__":
+    main()
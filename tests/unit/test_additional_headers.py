@@ -8,9 +8,8 @@ import asyncio
 import pytest
 from unittest.mock import patch
 from mcp_openapi_proxy.utils import get_additional_headers, setup_logging
-from mcp_openapi_proxy.server_lowlevel import dispatcher_handler, tools, openapi_spec_data
+from mcp_openapi_proxy.server_lowlevel import dispatcher_handler, openapi_spec_data
 from mcp_openapi_proxy.server_fastmcp import call_function
-import requests
 from types import SimpleNamespace
 
 DUMMY_SPEC = {
@@ -37,10 +36,15 @@ def mock_requests(monkeypatch):
         class MockResponse:
             def __init__(self):
                 self.text = "Mocked response"
+                self.headers = {}
             def raise_for_status(self):
                 pass
         return MockResponse()
-    monkeypatch.setattr(requests, "request", mock_request)
+    monkeypatch.setattr("mcp_openapi_proxy.http_client.request_sync", mock_request)
+
+    async def mock_async_request(method, url, **kwargs):
+        return mock_request(method, url, **kwargs)
+    monkeypatch.setattr("mcp_openapi_proxy.http_client.request", mock_async_request)
 
 def test_get_additional_headers_empty(mock_env):
     headers = get_additional_headers()
@@ -81,11 +85,12 @@ def test_get_additional_headers_mixed_separators(mock_env):
 @pytest.mark.asyncio
 async def test_lowlevel_dispatcher_with_headers(mock_env, mock_requests, monkeypatch):
     os.environ["EXTRA_HEADERS"] = "X-Custom: Foo"
-    tools.clear()
+    monkeypatch.delenv("TOOL_WHITELIST", raising=False)
+    monkeypatch.delenv("TOOL_NAME_PREFIX", raising=False)
     monkeypatch.setattr("mcp_openapi_proxy.server_lowlevel.openapi_spec_data", DUMMY_SPEC)
-    # Use the mcp.types.Tool type
-    from mcp import types as mcp_types
-    tools.append(mcp_types.Tool(name="get_test", description="Test tool", inputSchema={"type": "object", "properties": {}}))
+    # Register through the normal path so the tool lands in the registry
+    from mcp_openapi_proxy.openapi import register_functions
+    register_functions(DUMMY_SPEC)
     # Use the actual CallToolRequest type and provide method
     from mcp.types import CallToolRequest, CallToolRequestParams
     request = CallToolRequest(method="tools/call", params=CallToolRequestParams(name="get_test", arguments={})) # Correct method value
@@ -103,7 +108,8 @@ def test_fastmcp_call_function_with_headers(mock_env, mock_requests):
     with patch('mcp_openapi_proxy.server_fastmcp.fetch_openapi_spec', return_value=DUMMY_SPEC):
         from types import SimpleNamespace
         with patch('mcp_openapi_proxy.utils.normalize_tool_name', side_effect=lambda raw_name: "get_test"), \
-             patch('mcp_openapi_proxy.server_fastmcp.requests.request', return_value=SimpleNamespace(text='"Mocked response"', raise_for_status=lambda: None)):
+             patch('mcp_openapi_proxy.http_client.request_sync',
+                   return_value=SimpleNamespace(text='"Mocked response"', raise_for_status=lambda: None)):
             result = server_fastmcp.call_function(function_name="get_test", parameters={}, env_key="OPENAPI_SPEC_URL")
             print(f"DEBUG: Call function result: {result}")
     assert json.loads(result) == "Mocked response", "Call function failed with headers"
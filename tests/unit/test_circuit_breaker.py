@@ -0,0 +1,117 @@
+"""Per-upstream circuit breakers: opening on failures or slow calls,
+failing fast, half-open probing and the structured tool error."""
+import json
+import socket
+import time
+
+import httpx
+import pytest
+from mcp import types
+
+from mcp_openapi_proxy import http_client, openapi, server_lowlevel
+from mcp_openapi_proxy.breaker import CLOSED, HALF_OPEN, OPEN, BreakerConfig, CircuitBreaker, CircuitOpenError
+from mcp_openapi_proxy.config import RuntimeConfig, install_config
+from mcp_openapi_proxy.http_client import PoolConfig, UpstreamPool
+from mcp_openapi_proxy.registry import install_registry
+from mcp_openapi_proxy.retry import RetryPolicy
+
+QUICK = BreakerConfig(min_requests=4, open_seconds=0.2)
+
+
+def _fail(breaker, times, latency=0.01, failed=True):
+    for _ in range(times):
+        breaker.finish(latency, failed, breaker.acquire())
+
+
+def test_opens_on_failure_rate_and_recovers_through_a_probe():
+    breaker = CircuitBreaker("https://api.example.com", QUICK)
+    _fail(breaker, 2, failed=False)
+    _fail(breaker, 1)
+    assert breaker.state == CLOSED
+    _fail(breaker, 1)  # 2 of 4 failed
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.acquire()
+    assert 0 < excinfo.value.retry_in <= 0.2
+
+    time.sleep(0.25)
+    assert breaker.acquire() is True
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()  # one probe at a time
+    breaker.finish(0.01, False, True)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["requests"] == 0  # a fresh window
+
+    _fail(breaker, 4)
+    time.sleep(0.25)
+    breaker.finish(0.01, True, breaker.acquire())  # the probe fails
+    assert breaker.state == OPEN
+    stats = breaker.stats()
+    assert (stats["opened"], stats["rejected"]) == (3, 2)
+
+
+def test_slow_calls_open_the_circuit_and_abandoned_probes_free_their_slot():
+    breaker = CircuitBreaker("https://api.example.com", BreakerConfig(min_requests=4, open_seconds=0.2,
+                                                                      slow_call_seconds=0.5))
+    _fail(breaker, 4, latency=1.0, failed=False)
+    assert breaker.state == OPEN
+    assert breaker.stats()["avg_latency_ms"] == 1000.0
+
+    time.sleep(0.25)
+    breaker.finish(0.0, None, breaker.acquire())  # cancelled probe
+    assert breaker.state == HALF_OPEN
+    assert breaker.acquire() is True
+
+
+def test_breaker_scope():
+    assert BreakerConfig().key("https://a.example", "get_pets") == "https://a.example"
+    assert BreakerConfig(scope="tool").key("https://a.example", "get_pets") == "https://a.example get_pets"
+
+
+@pytest.fixture
+def dead_upstream():
+    """A local port nothing listens on: every connection is refused."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_with_a_tool_error(dead_upstream, monkeypatch):
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE",
+                 "TOOL_DISCOVERY_MODE"):
+        monkeypatch.delenv(name, raising=False)
+    # test_resources swaps server_lowlevel.types for a stub module.
+    monkeypatch.setattr(server_lowlevel, "types", types)
+    pool = UpstreamPool(PoolConfig(), RetryPolicy(max_retries=0), QUICK)
+    monkeypatch.setattr(http_client, "_pool", pool)
+    spec = {"openapi": "3.0.0", "servers": [{"url": dead_upstream}],
+            "paths": {"/pets": {"get": {"summary": "List pets"}}}}
+    install_registry(openapi.build_registry(spec))
+    install_config(RuntimeConfig())
+    try:
+        for _ in range(4):
+            result = await server_lowlevel._call_operation("get_pets", {})
+            assert "circuit_open" not in result.content[0].text
+        start = time.perf_counter()
+        result = await server_lowlevel._call_operation("get_pets", {})
+        elapsed = time.perf_counter() - start
+    finally:
+        install_config(None)
+        await pool.aclose()
+
+    assert elapsed < 0.05
+    assert result.isError is True
+    error = json.loads(result.content[0].text)
+    assert (error["type"], error["tool"], error["upstream"]) == ("circuit_open", "get_pets", dead_upstream)
+    breaker = pool.stats()["breakers"][dead_upstream]
+    assert (breaker["state"], breaker["failures"], breaker["rejected"]) == ("open", 4, 1)
+
+    with pytest.raises(CircuitOpenError):
+        pool.request_sync("GET", f"{dead_upstream}/pets")
+    with pytest.raises(httpx.ConnectError):
+        UpstreamPool(PoolConfig(), RetryPolicy(max_retries=0), BreakerConfig(failure_rate=0)).request_sync(
+            "GET", f"{dead_upstream}/pets")
@@ -0,0 +1,121 @@
+"""HTTP transport: one process serves many MCP sessions that share the
+loaded spec, the tool registry and the upstream pool."""
+import asyncio
+import json
+import socket
+from types import SimpleNamespace
+
+import pytest
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from mcp_openapi_proxy import http_client, http_transport, server_lowlevel
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def spec_file(monkeypatch, tmp_path):
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps({
+        "openapi": "3.0.0",
+        "servers": [{"url": "https://api.example.com"}],
+        "paths": {"/items": {"get": {"summary": "List items"}}},
+    }))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("OPENAPI_SPEC_URL", f"file://{path}")
+    monkeypatch.setenv("OPENAPI_REGISTRY_SNAPSHOT", "false")
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(server_lowlevel, "ENABLE_TOOLS", True)
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", None)
+    monkeypatch.setattr(server_lowlevel, "_spec_load_error", None)
+    monkeypatch.setattr(server_lowlevel, "_spec_load_lock", None)
+    monkeypatch.setattr(server_lowlevel, "_registry_from_snapshot", False)
+    monkeypatch.setattr(server_lowlevel, "_spec_key", None)
+    monkeypatch.setitem(server_lowlevel.mcp.request_handlers, server_lowlevel.types.ListToolsRequest,
+                        server_lowlevel.list_tools)
+    monkeypatch.setitem(server_lowlevel.mcp.request_handlers, server_lowlevel.types.CallToolRequest,
+                        server_lowlevel.dispatcher_handler)
+    return path
+
+
+def test_resolve_transport():
+    expected = "streamable-http" if http_transport.StreamableHTTPSessionManager else "sse"
+    assert http_transport.resolve_transport("http") == expected
+    assert http_transport.resolve_transport("sse") == "sse"
+    with pytest.raises(ValueError):
+        http_transport.resolve_transport("carrier-pigeon")
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """Count spec fetches and stub the upstream."""
+    calls = SimpleNamespace(fetches=[], upstream=[])
+    real_fetch = server_lowlevel.fetch_openapi_spec_text
+
+    def counting_fetch(url, *args, **kwargs):
+        calls.fetches.append(url)
+        return real_fetch(url, *args, **kwargs)
+
+    async def fake_request(method, url, **kwargs):
+        calls.upstream.append(url)
+        return SimpleNamespace(
+            text='{"items": []}',
+            headers={"content-type": "application/json"},
+            raise_for_status=lambda: None,
+        )
+
+    monkeypatch.setattr(server_lowlevel, "fetch_openapi_spec_text", counting_fetch)
+    monkeypatch.setattr(http_client, "request", fake_request)
+    return calls
+
+
+async def _run_sessions(transport, open_streams, count=5):
+    port = _free_port()
+    config = uvicorn.Config(http_transport.build_app(transport), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    async def session():
+        async with open_streams(port) as streams:
+            async with ClientSession(streams[0], streams[1]) as client:
+                await client.initialize()
+                listed = await client.list_tools()
+                called = await client.call_tool("get_items", {})
+                return [tool.name for tool in listed.tools], called.content[0].text
+
+    try:
+        return await asyncio.wait_for(asyncio.gather(*(session() for _ in range(count))), timeout=30)
+    finally:
+        server.should_exit = True
+        # Shutdown waits for open connections: this only finishes if every
+        # server-side session ended when its client went away.
+        await asyncio.wait_for(serve, timeout=10)
+
+
+@pytest.mark.asyncio
+async def test_sse_sessions_share_spec_and_registry(spec_file, counted):
+    results = await _run_sessions("sse", lambda port: sse_client(f"http://127.0.0.1:{port}/sse"))
+    assert results == [(["get_items"], '{"items": []}')] * 5
+    assert counted.fetches == [f"file://{spec_file}"]
+    assert len(counted.upstream) == 5
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(http_transport.StreamableHTTPSessionManager is None, reason="mcp SDK without streamable HTTP")
+async def test_streamable_http_sessions_share_spec_and_registry(spec_file, counted):
+    from mcp.client.streamable_http import streamablehttp_client
+
+    results = await _run_sessions("streamable-http",
+                                  lambda port: streamablehttp_client(f"http://127.0.0.1:{port}/mcp/"))
+    assert results == [(["get_items"], '{"items": []}')] * 5
+    assert counted.fetches == [f"file://{spec_file}"]
+    assert len(counted.upstream) == 5
@@ -0,0 +1,113 @@
+"""Invocation plans compiled at registration time (plans.py)."""
+import httpx
+import pytest
+
+from mcp_openapi_proxy import openapi
+from mcp_openapi_proxy.plans import BODY_JSON, BODY_QUERY, InvocationError, PathTemplate
+from mcp_openapi_proxy.registry import current_registry
+
+SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com/v1/"}],
+    "paths": {
+        "/repos/{owner}/{repo}": {
+            "parameters": [
+                {"name": "owner", "in": "path", "required": True, "schema": {"type": "string"}},
+            ],
+            "get": {
+                "summary": "Get repo",
+                "parameters": [
+                    {"name": "repo", "in": "path", "required": True, "schema": {"type": "string"}},
+                    {"name": "expand", "in": "query", "schema": {"type": "string"}},
+                ],
+            },
+            "post": {"summary": "Update repo"},
+        },
+        "/files/{name}.{ext}": {"get": {"summary": "Get file"}},
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def _registered(monkeypatch):
+    monkeypatch.delenv("SERVER_URL_OVERRIDE", raising=False)
+    monkeypatch.delenv("TOOL_WHITELIST", raising=False)
+    monkeypatch.delenv("TOOL_NAME_PREFIX", raising=False)
+    openapi.register_functions(SPEC)
+
+
+def _plan(name):
+    return current_registry().get(name).plan
+
+
+def test_plan_compiled_per_registered_tool():
+    plan = _plan("get_repos_by_owner_by_repo")
+    assert plan.method == "GET"
+    assert plan.base_url == "https://api.example.com/v1"
+    assert plan.template.placeholders == ("owner", "repo")
+    assert plan.param_locations == {"owner": "path", "repo": "path", "expand": "query"}
+    assert plan.required_path == frozenset({"owner", "repo"})
+    assert plan.body_strategy == BODY_QUERY
+    assert dict(plan.static_headers) == {}
+    post = _plan("post_repos_by_owner_by_repo")
+    assert post.body_strategy == BODY_JSON
+    assert post.static_headers["Content-Type"] == "application/json"
+    # Path-item parameters are merged into every operation of the path.
+    assert post.required_path == frozenset({"owner"})
+
+
+def test_get_plan_moves_path_args_out_of_query():
+    plan = _plan("get_repos_by_owner_by_repo")
+    args = {"owner": "foo", "repo": "bar", "expand": "all"}
+    prepared = plan.prepare(args, dict(args), {"X-A": "1"})
+    assert prepared.url == "https://api.example.com/v1/repos/foo/bar"
+    assert prepared.params == {"expand": "all"}
+    assert prepared.json is None
+    assert prepared.headers == {"X-A": "1"}
+
+
+def test_query_encoding_matches_requests():
+    plan = _plan("get_repos_by_owner_by_repo")
+    args = {"owner": "foo", "repo": "bar", "expand": None, "draft": True, "tags": ["a", None, False], "n": 2}
+    prepared = plan.prepare(args, dict(args), {})
+    assert prepared.params == {"draft": "True", "tags": ["a", "False"], "n": 2}
+    request = httpx.Request(prepared.method, prepared.url, params=prepared.params)
+    assert request.url.query == b"draft=True&tags=a&tags=False&n=2"
+
+
+def test_body_plan_sends_json():
+    plan = _plan("post_repos_by_owner_by_repo")
+    args = {"owner": "foo", "repo": "bar", "private": True}
+    prepared = plan.prepare(args, dict(args), {})
+    assert prepared.url == "https://api.example.com/v1/repos/foo/bar"
+    assert prepared.params is None
+    assert prepared.json == args
+    assert prepared.headers == {"Content-Type": "application/json"}
+
+
+def test_placeholders_within_one_segment():
+    plan = _plan("get_files_by_name_ext")
+    args = {"name": "report", "ext": "pdf"}
+    prepared = plan.prepare(args, dict(args), {})
+    assert prepared.url == "https://api.example.com/v1/files/report.pdf"
+    assert prepared.params == {}
+
+
+def test_missing_path_argument_is_reported():
+    plan = _plan("get_repos_by_owner_by_repo")
+    with pytest.raises(InvocationError, match="Missing parameter: 'repo'"):
+        plan.prepare({"owner": "foo"}, {"owner": "foo"}, {})
+
+
+def test_plan_without_base_url(monkeypatch):
+    spec = {"paths": {"/ping": {"get": {"summary": "Ping"}}}}
+    openapi.register_functions(spec)
+    plan = _plan("get_ping")
+    with pytest.raises(InvocationError, match="No base URL"):
+        plan.prepare({}, {}, {})
+
+
+def test_path_template_render():
+    template = PathTemplate.compile("/a/{x}/b")
+    assert template.render({"x": 1}) == "/a/1/b"
+    assert PathTemplate.compile("/static").render({}) == "/static"
@@ -0,0 +1,72 @@
+"""Pluggable JSON codec (json_codec.py): orjson when installed, stdlib otherwise."""
+import importlib
+import json
+
+import pytest
+
+from mcp_openapi_proxy import json_codec
+
+
+def test_round_trip():
+    doc = {"a": [1, 2.5, None, True], "b": {"c": "é"}}
+    assert json_codec.loads(json_codec.dumps(doc)) == doc
+    assert json_codec.loads(json_codec.dumps(doc).encode()) == doc
+
+
+def test_indent_is_two_spaces():
+    text = json_codec.dumps({"a": {"b": 1}}, indent=True)
+    assert text.splitlines()[1] == '  "a": {'
+    assert json.loads(text) == {"a": {"b": 1}}
+
+
+def test_decode_error_is_json_decode_error():
+    with pytest.raises(json.JSONDecodeError):
+        json_codec.loads("{not json")
+    with pytest.raises(json_codec.JSONDecodeError):
+        json_codec.loads("plain text")
+
+
+def test_default_and_unencodable_values():
+    class Odd:
+        def __str__(self):
+            return "odd"
+
+    assert json_codec.loads(json_codec.dumps({"x": Odd()}, default=str)) == {"x": "odd"}
+    big = 2 ** 70  # wider than orjson's 64-bit limit: must fall back, not fail
+    assert json_codec.loads(json_codec.dumps({"n": big})) == {"n": big}
+
+
+def test_json_codec_env_forces_stdlib(monkeypatch):
+    monkeypatch.setenv("JSON_CODEC", "json")
+    try:
+        forced = importlib.reload(json_codec)
+        assert forced.BACKEND == "json"
+        assert forced.dumps({"a": 1}) == '{"a": 1}'
+    finally:
+        monkeypatch.delenv("JSON_CODEC")
+        importlib.reload(json_codec)
+
+
+def test_orjson_backend_used_when_installed():
+    pytest.importorskip("orjson")
+    assert json_codec.BACKEND == "orjson"
+    assert json_codec.dumps({"a": 1}) == '{"a":1}'
+
+
+def test_orjson_loads_retries_nan_with_stdlib_and_floats_wide_ints(tmp_path):
+    pytest.importorskip("orjson")
+    assert json_codec.BACKEND == "orjson"
+    # orjson rejects NaN/Infinity; the stdlib retry accepts them as before.
+    doc = json_codec.loads('{"minimum": NaN, "maximum": Infinity, "n": 1}')
+    assert doc["maximum"] == float("inf") and doc["minimum"] != doc["minimum"] and doc["n"] == 1
+    with pytest.raises(json_codec.JSONDecodeError):
+        json_codec.loads("{not json")
+
+    from mcp_openapi_proxy.utils import parse_openapi_spec
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text('{"openapi": "3.0.0", "paths": {}, "x-limit": Infinity}')
+    assert parse_openapi_spec(f"file://{spec_file}", spec_file.read_text())["x-limit"] == float("inf")
+
+    # Documented difference: integers wider than 64 bits decode as floats.
+    assert json_codec.loads("18446744073709551615") == 2 ** 64 - 1
+    assert json_codec.loads("184467440737095516150") == 1.844674407370955e+20
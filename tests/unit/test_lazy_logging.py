@@ -0,0 +1,70 @@
+"""Debug logging is lazy and payloads are truncated (logging_setup.Payload)."""
+import logging
+from types import SimpleNamespace
+
+import pytest
+from mcp import types
+
+from mcp_openapi_proxy import logging_setup, openapi, server_lowlevel
+from mcp_openapi_proxy.config import RuntimeConfig, install_config
+from mcp_openapi_proxy.logging_setup import Payload, logger
+from mcp_openapi_proxy.registry import install_registry
+
+SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com"}],
+    "paths": {"/items": {"post": {"summary": "Create items"}}},
+}
+
+
+class Rendered:
+    """An argument that counts how often it is turned into text."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __repr__(self):
+        self.count += 1
+        return "x" * 5000
+
+
+def test_payload_truncates(monkeypatch):
+    monkeypatch.setattr(logging_setup, "PAYLOAD_LIMIT", 10)
+    assert str(Payload("a" * 25)) == "aaaaaaaaaa... (15 more characters)"
+    assert str(Payload({"k": 1})) == "{'k': 1}"
+    monkeypatch.setattr(logging_setup, "PAYLOAD_LIMIT", 0)
+    assert str(Payload("a" * 25)) == "a" * 25
+
+
+@pytest.fixture
+def stub_upstream(monkeypatch):
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE",
+                 "TOOL_DISCOVERY_MODE"):
+        monkeypatch.delenv(name, raising=False)
+    # test_resources swaps server_lowlevel.types for a stub module.
+    monkeypatch.setattr(server_lowlevel, "types", types)
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", SPEC)
+    install_registry(openapi.build_registry(SPEC))
+    install_config(RuntimeConfig())
+
+    async def fake_request(method, url, **kwargs):
+        return SimpleNamespace(text="[]", headers={"content-type": "application/json"}, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(server_lowlevel.http_client, "request", fake_request)
+    yield
+    install_config(None)
+
+
+@pytest.mark.asyncio
+async def test_call_formats_nothing_at_info(stub_upstream, caplog):
+    value = Rendered()
+    caplog.set_level(logging.INFO, logger=logger.name)
+    await server_lowlevel._call_operation("post_items", {"value": value})
+    assert value.count == 0
+
+    caplog.set_level(logging.DEBUG, logger=logger.name)
+    await server_lowlevel._call_operation("post_items", {"value": value})
+    assert value.count > 0
+    [line] = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Request Body")]
+    assert line.endswith("more characters)")
+    assert len(line) < 1100
@@ -0,0 +1,98 @@
+"""Queued log writing, JSON lines and per-call log context (logging_setup)."""
+import io
+import json
+import logging
+import queue
+import sys
+from types import SimpleNamespace
+
+import pytest
+from mcp import types
+
+from mcp_openapi_proxy import openapi, server_lowlevel
+from mcp_openapi_proxy.logging_setup import DroppingQueueHandler, JsonLinesFormatter, log_context, logger
+from mcp_openapi_proxy.registry import install_registry
+
+
+def _record(message, *args):
+    return logging.makeLogRecord({"name": logger.name, "levelno": logging.INFO, "levelname": "INFO",
+                                  "msg": message, "args": args})
+
+
+def test_full_queue_drops_and_reports():
+    log_queue = queue.Queue(2)
+    handler = DroppingQueueHandler(log_queue)
+    for i in range(5):
+        handler.handle(_record("line %s", i))
+    assert handler.dropped == 3
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == ["line 0", "line 1"]
+
+    handler.handle(_record("line %s", 5))
+    notice, record = log_queue.get_nowait(), log_queue.get_nowait()
+    assert notice.levelno == logging.WARNING
+    assert notice.getMessage() == "Log queue full; dropped 3 log records."
+    assert record.getMessage() == "line 5"
+    handler.handle(_record("line %s", 6))
+    assert log_queue.get_nowait().getMessage() == "line 6"
+
+
+def test_queued_records_keep_message_and_traceback_apart():
+    handler = DroppingQueueHandler(queue.Queue())
+    try:
+        raise ValueError("bad")
+    except ValueError:
+        record = logging.makeLogRecord({"msg": "failed %s", "args": ("x",), "levelname": "ERROR",
+                                        "levelno": logging.ERROR, "exc_info": sys.exc_info()})
+    prepared = handler.prepare(record)
+    assert prepared.getMessage() == "failed x"
+    assert prepared.exc_info is None
+    assert "ValueError: bad" in prepared.exc_text
+    line = json.loads(JsonLinesFormatter().format(prepared))
+    assert line["message"] == "failed x"
+    assert "ValueError: bad" in line["exception"]
+
+
+def test_json_lines_carry_context_and_extra():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonLinesFormatter())
+    logger.addHandler(handler)
+    try:
+        with log_context(request_id="7", tool="get_pets"):
+            logger.warning("slow upstream %s", "api.example.com", extra={"latency_ms": 12.5})
+        logger.warning("outside")
+    finally:
+        logger.removeHandler(handler)
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "slow upstream api.example.com"
+    assert (first["request_id"], first["tool"], first["latency_ms"]) == ("7", "get_pets", 12.5)
+    assert first["level"] == "WARNING"
+    assert "request_id" not in second
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_tags_its_log_lines(monkeypatch, caplog):
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE",
+                 "TOOL_DISCOVERY_MODE"):
+        monkeypatch.delenv(name, raising=False)
+    # test_resources swaps server_lowlevel.types for a stub module.
+    monkeypatch.setattr(server_lowlevel, "types", types)
+    spec = {"openapi": "3.0.0", "servers": [{"url": "https://api.example.com"}],
+            "paths": {"/pets": {"get": {"summary": "List pets"}}}}
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", spec)
+    install_registry(openapi.build_registry(spec))
+
+    async def fake_request(method, url, **kwargs):
+        return SimpleNamespace(text="[]", headers={"content-type": "application/json"}, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(server_lowlevel.http_client, "request", fake_request)
+    caplog.set_level(logging.DEBUG, logger=logger.name)
+    request = SimpleNamespace(params=SimpleNamespace(name="get_pets", arguments={}))
+    await server_lowlevel.dispatcher_handler(request)
+    await server_lowlevel.dispatcher_handler(request)
+
+    records = [r for r in caplog.records if getattr(r, "tool", None) == "get_pets"]
+    assert len({r.request_id for r in records}) == 2
+    finished = [r for r in records if r.getMessage().startswith("Tool call get_pets finished")]
+    assert len(finished) == 2
+    assert all(r.latency_ms >= 0 for r in finished)
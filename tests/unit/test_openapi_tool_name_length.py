@@ -187,21 +187,26 @@ def test_absurdly_long_path():
 
 def test_final_length_log(monkeypatch, caplog):
     """
-    Verify the INFO log shows the correct final name and length after potential truncation.
+    Verify the DEBUG log shows the correct final name and length after potential
+    truncation, once per distinct name rather than on every call.
     """
-    caplog.set_level(logging.INFO)
+    from mcp_openapi_proxy.logging_setup import logger
+    from mcp_openapi_proxy.utils import ToolNameNormalizer
+    caplog.set_level(logging.DEBUG, logger=logger.name)
     raw_name = LONG_RAW_NAME
     expected_name = "post_services_by_serviceid_custom_domains_by_customdomainidornam" # Corrected expected name (Truncated to 64)
-    normalize_tool_name(raw_name)
-    assert any(f"Final tool name: {expected_name}, length: 64" in r.message for r in caplog.records), \
-        f"Expected INFO log for final tool name length (64). Log Records: {[r.message for r in caplog.records]}"
+    normalize = ToolNameNormalizer()
+    normalize(raw_name)
+    normalize(raw_name)
+    messages = [r.message for r in caplog.records if r.message.startswith("Final tool name")]
+    assert messages == [f"Final tool name: {expected_name}, length: 64"], \
+        f"Expected one DEBUG log for final tool name length (64). Log Records: {messages}"
 
     caplog.clear()
-    monkeypatch.setenv("TOOL_NAME_MAX_LENGTH", "50")
     expected_name_50 = "post_services_by_serviceid_custom_domains_by_custo" # Corrected expected name (Truncated to 50)
-    normalize_tool_name(raw_name)
+    ToolNameNormalizer(max_length=50)(raw_name)
     assert any(f"Final tool name: {expected_name_50}, length: 50" in r.message for r in caplog.records), \
-        f"Expected INFO log for final tool name length (50). Log Records: {[r.message for r in caplog.records]}"
+        f"Expected DEBUG log for final tool name length (50). Log Records: {[r.message for r in caplog.records]}"
 
 
 def test_register_functions_tool_names_do_not_exceed_limit():
@@ -231,3 +236,20 @@ def test_register_functions_tool_names_do_not_exceed_limit():
     for tool in tools:
         assert len(tool.name) <= 64, f"Registered tool name too long: {tool.name} ({len(tool.name)} chars)"
 
+
+def test_normalizer_freezes_settings_and_memoizes(monkeypatch):
+    from mcp_openapi_proxy.utils import ToolNameNormalizer, tool_name_normalizer
+    monkeypatch.delenv("TOOL_NAME_MAX_LENGTH", raising=False)
+    monkeypatch.setenv("TOOL_NAME_PREFIX", "x_")
+    normalize = tool_name_normalizer()
+    assert tool_name_normalizer() is normalize
+    assert normalize("GET /api/users/{userId}") == "x_get_users_by_userid"
+    # Settings are frozen at construction; the module helper follows the env.
+    monkeypatch.setenv("TOOL_NAME_PREFIX", "y_")
+    assert normalize("GET /users") == "x_get_users"
+    assert tool_name_normalizer() is not normalize
+    assert normalize_tool_name("GET /users") == "y_get_users"
+    # An explicit max_length is part of the memo key.
+    fresh = ToolNameNormalizer(max_length=8)
+    assert fresh("GET /users/list") == "get_user"
+    assert fresh("GET /users/list", 64) == "get_users_list"
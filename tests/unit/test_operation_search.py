@@ -0,0 +1,102 @@
+"""Search-based tool discovery (TOOL_DISCOVERY_MODE=search, search.py)."""
+import json
+from types import SimpleNamespace
+
+import pytest
+from mcp import types
+
+from mcp_openapi_proxy import openapi, server_lowlevel
+from mcp_openapi_proxy.registry import install_registry
+from mcp_openapi_proxy.search import OperationIndex, tokenize
+
+SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com"}],
+    "paths": {
+        "/pets": {
+            "get": {"summary": "List pets", "tags": ["pets"],
+                    "parameters": [{"name": "tag", "in": "query", "schema": {"type": "string"}}]},
+            "post": {"summary": "Add a new pet to the store", "tags": ["pets"]},
+        },
+        "/pets/{petId}": {"get": {"operationId": "showPetById", "summary": "Info for a specific pet",
+                                  "tags": ["pets"]}},
+        "/store/orders": {"post": {"summary": "Place an order for a pet", "tags": ["store"]}},
+        "/store/inventory": {"get": {"summary": "Returns pet inventories by status", "tags": ["store"]}},
+        "/users/{username}": {"delete": {"summary": "Delete user", "tags": ["user"]}},
+        "/policies": {"get": {"description": "Every access policy", "tags": ["admin"]}},
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def _clean_env(monkeypatch):
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("TOOL_DISCOVERY_MODE", "search")
+    # test_resources swaps server_lowlevel.types for a stub module.
+    monkeypatch.setattr(server_lowlevel, "types", types)
+
+
+def _call(name, arguments):
+    return server_lowlevel.dispatcher_handler(SimpleNamespace(params=SimpleNamespace(name=name, arguments=arguments)))
+
+
+def test_tokenize_splits_case_and_stems():
+    assert tokenize("showPetById") == ["showpetbyid", "show", "pet", "id"]
+    assert tokenize("/pets/{petId}") == ["pet", "petid", "pet", "id"]
+    assert tokenize("the policies") == ["policy"]
+
+
+def test_search_ranks_matching_operations_first():
+    index = OperationIndex(openapi.build_registry(SPEC))
+    assert index.search("delete a user")[0][0] == "delete_users_by_username"
+    assert index.search("pet by id")[0][0] == "get_pets_by_petid"
+    assert index.search("order")[0][0] == "post_store_orders"
+    assert index.search("access policy")[0][0] == "get_policies"
+    assert [name for name, _ in index.search("pet", limit=3)] == ["get_pets", "post_pets", "get_pets_by_petid"]
+    assert index.search("nothing matches this") == []
+
+
+def test_search_limit_prunes_without_changing_the_top_results():
+    registry = openapi.build_registry(SPEC)
+    index = OperationIndex(registry)
+    full = index.search("pet store inventory status", limit=len(registry))
+    assert index.search("pet store inventory status", limit=2) == full[:2]
+
+
+@pytest.mark.asyncio
+async def test_meta_tools_replace_the_tool_list(monkeypatch):
+    install_registry(openapi.build_registry(SPEC))
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", SPEC)
+    result = await server_lowlevel.list_tools(SimpleNamespace(params=None))
+    assert [tool.name for tool in result.tools] == ["search_operations", "invoke_operation"]
+
+
+@pytest.mark.asyncio
+async def test_search_then_invoke(monkeypatch):
+    registry = openapi.build_registry(SPEC)
+    install_registry(registry)
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", SPEC)
+    calls = []
+
+    async def fake_request(method, url, **kwargs):
+        calls.append((method, url, kwargs.get("params")))
+        return SimpleNamespace(text="[]", headers={"content-type": "application/json"}, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(server_lowlevel.http_client, "request", fake_request)
+
+    result = await _call("search_operations", {"query": "list pets", "limit": 1})
+    [match] = json.loads(result.content[0].text)
+    assert match["name"] == "get_pets"
+    assert match["path"] == "/pets"
+    assert "tag" in match["inputSchema"]["properties"]
+    # Only the returned operation's schema was built.
+    assert [name for name in registry.names() if registry.get(name).built] == ["get_pets"]
+
+    await _call("invoke_operation", {"name": "get_pets", "arguments": {"tag": "cat"}})
+    assert calls == [("GET", "https://api.example.com/pets", {"tag": "cat"})]
+
+    result = await _call("invoke_operation", {"arguments": {}})
+    assert "needs a 'name'" in result.content[0].text
+    result = await _call("search_operations", {"query": " "})
+    assert "non-empty 'query'" in result.content[0].text
@@ -1,12 +1,12 @@
 # -*- coding: utf-8 -*-
 import unittest
 import os
-import requests
 import asyncio
 from types import SimpleNamespace
 from mcp_openapi_proxy.handlers import register_functions
 from mcp_openapi_proxy.server_lowlevel import tools, dispatcher_handler
 import mcp_openapi_proxy.utils as utils
+from mcp_openapi_proxy import http_client
 
 class TestParameterSubstitution(unittest.TestCase):
     def setUp(self):
@@ -81,23 +81,24 @@ class TestParameterSubstitution(unittest.TestCase):
                     arguments={"owner": "foo", "repo": "bar"}
                 )
             )
-            original_request = requests.request
+            original_request = http_client.request
             captured = {}
-            def dummy_request_fn(method, url, **kwargs):
+            async def dummy_request_fn(method, url, **kwargs):
                 captured["url"] = url
                 class DummyResponse:
                     def __init__(self, url):
                         self.url = url
+                        self.headers = {}
                     def json(self):
                         return {}
                     def raise_for_status(self):
                         pass
                 return DummyResponse(url)
-            requests.request = dummy_request_fn
+            http_client.request = dummy_request_fn
             try:
                 asyncio.run(dispatcher_handler(dummy_request))  # type: ignore
             finally:
-                requests.request = original_request
+                http_client.request = original_request
 
             # The dummy_spec in setUp uses https://dummy-base-url.com as the server URL
             expected_url = "https://dummy-base-url.com/repos/foo/bar/contents/"
@@ -0,0 +1,87 @@
+"""Client-side rate limiting: token buckets per origin and operation group,
+adapting to rate-limit headers, bounded queueing."""
+import time
+
+import httpx
+import pytest
+
+from mcp_openapi_proxy import http_client
+from mcp_openapi_proxy.http_client import PoolConfig, UpstreamPool
+from mcp_openapi_proxy.ratelimit import RateLimitConfig, RateLimitedError, RateLimiter
+from mcp_openapi_proxy.retry import RetryPolicy
+
+ORIGIN = "https://api.example.com"
+
+
+def _response(status=200, **headers):
+    return httpx.Response(status, headers={name.replace("_", "-"): value for name, value in headers.items()})
+
+
+def test_bucket_queues_then_refuses_past_the_bound():
+    limiter = RateLimiter(RateLimitConfig(rate=10, burst=2))
+    buckets = limiter.buckets(ORIGIN, "get_pets")
+    assert [limiter.reserve(buckets, 1.0) for _ in range(2)] == [0.0, 0.0]
+    assert 0.05 < limiter.reserve(buckets, 1.0) <= 0.1
+    with pytest.raises(RateLimitedError) as excinfo:
+        limiter.reserve(buckets, 0.05)
+    assert excinfo.value.name == ORIGIN
+    assert 0.1 < limiter.reserve(buckets, 1.0) <= 0.2  # the refused call took nothing
+    stats = limiter.stats()[ORIGIN]
+    assert (stats["queued"], stats["rejected"]) == (2, 1)
+
+
+def test_rate_limits_config(monkeypatch):
+    monkeypatch.setenv("RATE_LIMITS", "api.example.com=3, post_chat_*=0.5/2, nonsense")
+    config = RateLimitConfig.from_env()
+    assert config.origin_limit(ORIGIN) == (3.0, 3)
+    assert config.origin_limit("https://other.example.com") is None
+    assert config.group_of("post_chat_message") == ("post_chat_*", (0.5, 2))
+    assert config.group_of("get_users") is None
+
+    limiter = RateLimiter(config)
+    origin_bucket, group_bucket = limiter.buckets(ORIGIN, "post_chat_message")
+    assert limiter.buckets(ORIGIN, "post_chat_update")[1] is group_bucket
+    assert limiter.buckets(ORIGIN, "get_users") == (origin_bucket,)
+
+
+def test_buckets_adapt_to_rate_limit_headers():
+    limiter = RateLimiter(RateLimitConfig())
+    buckets = limiter.buckets(ORIGIN, None)
+    assert limiter.reserve(buckets, 0) == 0.0  # no limit until the upstream sets one
+
+    limiter.observe(buckets, _response(RateLimit_Remaining="4", RateLimit_Reset="2"))
+    assert limiter.stats()[ORIGIN]["rate"] == 2.0
+
+    limiter.observe(buckets, _response(X_RateLimit_Remaining="0", X_RateLimit_Reset=str(int(time.time()) + 3)))
+    assert 1.5 < limiter.reserve(buckets, 5) <= 3
+
+    limiter = RateLimiter(RateLimitConfig())
+    buckets = limiter.buckets(ORIGIN, None)
+    limiter.observe(buckets, _response(429, Retry_After="2"))
+    with pytest.raises(RateLimitedError):
+        limiter.reserve(buckets, 1)
+    limiter.observe(buckets, _response(429))
+    assert 1.5 < limiter.reserve(buckets, 5) <= 2
+
+
+def test_pool_paces_calls_and_refuses_with_a_tool_error():
+    class Quota(httpx.BaseTransport):
+        times = []
+
+        def handle_request(self, request):
+            self.times.append(time.monotonic())
+            return httpx.Response(200)
+
+    pool = UpstreamPool(PoolConfig(), RetryPolicy(max_retries=0),
+                        rate_limits=RateLimitConfig(rate=20, burst=1, max_wait=0.5))
+    pool._sync_entry((ORIGIN, True)).client = httpx.Client(transport=Quota())
+    for _ in range(5):
+        pool.request_sync("GET", f"{ORIGIN}/pets")
+    assert Quota.times[-1] - Quota.times[0] >= 0.19
+
+    pool.limiter.observe(pool.limiter.buckets(ORIGIN, None), _response(429, Retry_After="30"))
+    with pytest.raises(RateLimitedError) as excinfo:
+        pool.request_sync("GET", f"{ORIGIN}/pets")
+    error = http_client.not_sent_error("get_pets", excinfo.value)
+    assert (error["type"], error["upstream"]) == ("rate_limited", ORIGIN)
+    assert 29 < error["retry_in_seconds"] <= 30
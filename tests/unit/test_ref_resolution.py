@@ -0,0 +1,115 @@
+"""$ref resolution during registration: memoized, shared and cycle-safe."""
+import pytest
+
+from mcp_openapi_proxy.openapi import build_registry
+from mcp_openapi_proxy.refs import RefResolver
+
+
+@pytest.fixture(autouse=True)
+def _clean_env(monkeypatch):
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def _spec():
+    return {
+        "openapi": "3.0.0",
+        "servers": [{"url": "https://api.example.com"}],
+        "paths": {
+            "/pets/{petId}": {
+                "parameters": [{"$ref": "#/components/parameters/PetId"}],
+                "get": {"summary": "Get pet", "parameters": [{"$ref": "#/components/parameters/Verbose"}]},
+                "put": {"summary": "Replace pet", "requestBody": {"$ref": "#/components/requestBodies/Pet"}},
+            },
+            "/pets": {
+                "post": {
+                    "summary": "Create pet",
+                    "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+                },
+            },
+        },
+        "components": {
+            "parameters": {
+                "PetId": {"name": "petId", "in": "path", "required": True, "schema": {"type": "integer"}},
+                "Verbose": {"name": "verbose", "in": "query", "schema": {"$ref": "#/components/schemas/Flag"}},
+            },
+            "requestBodies": {
+                "Pet": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+            },
+            "schemas": {
+                "Flag": {"type": "boolean"},
+                "Tag": {"type": "object", "properties": {"label": {"type": "string"}}},
+                "Pet": {
+                    "type": "object",
+                    "required": ["name"],
+                    "properties": {
+                        "name": {"type": "string"},
+                        "tags": {"type": "array", "items": {"$ref": "#/components/schemas/Tag"}},
+                    },
+                },
+            },
+        },
+    }
+
+
+def test_ref_parameters_are_registered_and_planned():
+    registry = build_registry(_spec())
+    entry = registry.get("get_pets_by_petid")
+    schema = entry.tool.inputSchema
+    assert schema["properties"]["petId"]["type"] == "integer"
+    assert schema["properties"]["verbose"]["type"] == "boolean"
+    assert "petId" in schema["required"]
+    assert entry.plan.param_locations == {"petId": "path", "verbose": "query"}
+
+
+def test_ref_request_bodies_are_resolved_and_shared():
+    registry = build_registry(_spec())
+    put_props = registry.get("put_pets_by_petid").tool.inputSchema["properties"]
+    post_props = registry.get("post_pets").tool.inputSchema["properties"]
+    assert put_props["tags"]["items"] == {"type": "object", "properties": {"label": {"type": "string"}}}
+    assert "name" in registry.get("post_pets").tool.inputSchema["required"]
+    # Both operations reference the same resolved component, not copies.
+    assert put_props["tags"] is post_props["tags"]
+
+
+def test_resolution_does_not_modify_the_spec():
+    spec = _spec()
+    build_registry(spec)
+    assert spec["components"]["schemas"]["Pet"]["properties"]["tags"]["items"] == {"$ref": "#/components/schemas/Tag"}
+
+
+def test_recursive_schema_becomes_placeholder():
+    spec = {"components": {"schemas": {"Node": {
+        "type": "object",
+        "properties": {
+            "value": {"type": "string"},
+            "children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}},
+        },
+    }}}}
+    node = RefResolver(spec).resolve({"$ref": "#/components/schemas/Node"})
+    placeholder = node["properties"]["children"]["items"]
+    assert placeholder == {"description": "Recursive reference to #/components/schemas/Node", "type": "object"}
+
+
+def test_mutual_recursion_is_linear():
+    # S0 -> S1 -> ... -> S39 -> S0, with each also pointing two steps ahead:
+    # without scoped reuse this takes exponential time.
+    count = 40
+    schemas = {
+        f"S{i}": {"type": "object", "properties": {
+            "next": {"$ref": f"#/components/schemas/S{(i + 1) % count}"},
+            "skip": {"$ref": f"#/components/schemas/S{(i + 2) % count}"},
+        }}
+        for i in range(count)
+    }
+    resolver = RefResolver({"components": {"schemas": schemas}})
+    resolved = resolver.resolve({"$ref": "#/components/schemas/S0"})
+    assert resolved["properties"]["next"]["properties"]["next"]["type"] == "object"
+
+
+def test_siblings_override_and_bad_refs_are_kept():
+    resolver = RefResolver({"components": {"schemas": {"Flag": {"type": "boolean", "description": "A flag"}}}})
+    assert resolver.resolve({"$ref": "#/components/schemas/Flag", "description": "Overridden"}) == {
+        "type": "boolean", "description": "Overridden"}
+    assert resolver.resolve({"$ref": "#/components/schemas/Missing"}) == {"$ref": "#/components/schemas/Missing"}
+    assert resolver.resolve({"$ref": "other.yaml#/Pet"}) == {"$ref": "other.yaml#/Pet"}
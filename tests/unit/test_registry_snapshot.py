@@ -0,0 +1,165 @@
+"""Precompiled registry snapshots for warm starts (snapshot.py)."""
+import asyncio
+import gc
+import json
+import os
+import pickle
+
+import pytest
+
+from mcp_openapi_proxy import openapi, server_lowlevel, snapshot
+from mcp_openapi_proxy.registry import current_registry
+
+SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com"}],
+    "paths": {
+        "/pets": {
+            "get": {
+                "summary": "List pets",
+                "parameters": [{"name": "limit", "in": "query", "schema": {"type": "integer"}}],
+            },
+            "post": {"summary": "Create pet"},
+        },
+        "/pets/{petId}": {"get": {"summary": "Get pet"}},
+    },
+}
+URL = "https://api.example.com/openapi.json"
+
+
+@pytest.fixture(autouse=True)
+def _isolated(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    for name in snapshot.REGISTRATION_ENV + ("OPENAPI_REGISTRY_SNAPSHOT",):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_round_trip_preserves_tools_and_plans():
+    openapi.register_functions(SPEC)
+    original = current_registry()
+    key = snapshot.snapshot_key(json.dumps(SPEC))
+    snapshot.store_snapshot(URL, key, original, SPEC)
+    restored = snapshot.load_snapshot(URL, key)
+    assert list(restored.names()) == list(original.names())
+    for name in original.names():
+        assert restored.get(name).tool == original.get(name).tool
+        assert restored.get(name).plan == original.get(name).plan
+    args = {"petId": "7"}
+    assert restored.get("get_pets_by_petid").plan.prepare(args, dict(args), {}) == \
+        original.get("get_pets_by_petid").plan.prepare(args, dict(args), {})
+
+
+def test_key_tracks_content_and_registration_env(monkeypatch):
+    base = snapshot.snapshot_key("spec")
+    assert snapshot.snapshot_key("spec ") != base
+    monkeypatch.setenv("TOOL_NAME_PREFIX", "x_")
+    assert snapshot.snapshot_key("spec") != base
+    monkeypatch.delenv("TOOL_NAME_PREFIX")
+    monkeypatch.setenv("TOOL_WHITELIST", "/pets")
+    assert snapshot.snapshot_key("spec") != base
+
+
+def test_newer_snapshot_replaces_older_one(tmp_path):
+    openapi.register_functions(SPEC)
+    snapshot.store_snapshot(URL, "a" * 64, current_registry(), SPEC)
+    snapshot.store_snapshot(URL, "b" * 64, current_registry(), SPEC)
+    assert snapshot.load_snapshot(URL, "a" * 64) is None
+    assert snapshot.load_snapshot(URL, "b" * 64) is not None
+    assert len(list((tmp_path / "mcp-openapi-proxy").glob("registry-*.pickle"))) == 1
+
+
+def test_snapshot_with_globals_is_rejected():
+    key = "c" * 64
+    path = snapshot._snapshot_path(URL, key)
+    with open(path, "wb") as f:
+        pickle.dump({"format": snapshot.SNAPSHOT_FORMAT, "key": key, "entries": [os.getcwd]}, f)
+    assert snapshot.load_snapshot(URL, key) is None
+
+
+def test_disabled_by_env(monkeypatch):
+    monkeypatch.setenv("OPENAPI_REGISTRY_SNAPSHOT", "false")
+    openapi.register_functions(SPEC)
+    snapshot.store_snapshot(URL, "d" * 64, current_registry(), SPEC)
+    assert snapshot.load_snapshot(URL, "d" * 64) is None
+
+
+def _reset_lazy_state(monkeypatch):
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", None)
+    monkeypatch.setattr(server_lowlevel, "_spec_load_error", None)
+    monkeypatch.setattr(server_lowlevel, "_spec_load_lock", None)
+    monkeypatch.setattr(server_lowlevel, "_registry_from_snapshot", False)
+    monkeypatch.setattr(server_lowlevel, "_spec_key", None)
+
+
+@pytest.mark.asyncio
+async def test_warm_start_skips_parse_and_registration(monkeypatch, tmp_path):
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(SPEC))
+    monkeypatch.setenv("OPENAPI_SPEC_URL", f"file://{spec_file}")
+    monkeypatch.setattr(server_lowlevel, "ENABLE_TOOLS", True)
+
+    _reset_lazy_state(monkeypatch)
+    await server_lowlevel.ensure_spec_loaded()
+    await asyncio.gather(*server_lowlevel._snapshot_writes)
+    cold = [tool.name for tool in current_registry().tools]
+    assert cold and not server_lowlevel._registry_from_snapshot
+
+    openapi.register_functions({})  # forget the tools, as a new process would
+    _reset_lazy_state(monkeypatch)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("warm start must not parse or register the spec")
+
+    monkeypatch.setattr(server_lowlevel, "parse_openapi_spec", fail)
+    monkeypatch.setattr(server_lowlevel, "build_registry", fail)
+    await server_lowlevel.ensure_spec_loaded()
+    assert server_lowlevel._registry_from_snapshot
+    assert [tool.name for tool in current_registry().tools] == cold
+    assert current_registry().get("get_pets").plan.base_url == "https://api.example.com"
+    assert openapi.lookup_operation_details("get_pets", None)["method"] == "GET"
+
+
+@pytest.mark.asyncio
+async def test_writing_a_snapshot_builds_no_tool(monkeypatch, tmp_path):
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(SPEC))
+    monkeypatch.setenv("OPENAPI_SPEC_URL", f"file://{spec_file}")
+    monkeypatch.setattr(server_lowlevel, "ENABLE_TOOLS", True)
+    _reset_lazy_state(monkeypatch)
+
+    await server_lowlevel.ensure_spec_loaded()
+    await asyncio.gather(*server_lowlevel._snapshot_writes)
+    registry = current_registry()
+    assert len(registry) == 3
+    assert not any(registry.get(name).built for name in registry.names())
+    assert len(list((tmp_path / "mcp-openapi-proxy").glob("registry-*.pickle"))) == 1
+
+    restored = snapshot.load_snapshot(f"file://{spec_file}", server_lowlevel._spec_key)
+    assert not any(restored.get(name).built for name in restored.names())
+
+
+@pytest.mark.asyncio
+async def test_only_the_first_warm_start_freezes_the_gc(monkeypatch, tmp_path):
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(SPEC))
+    url = f"file://{spec_file}"
+    monkeypatch.setenv("OPENAPI_SPEC_URL", url)
+    monkeypatch.setattr(server_lowlevel, "ENABLE_TOOLS", True)
+    _reset_lazy_state(monkeypatch)
+    await server_lowlevel.ensure_spec_loaded()
+    await asyncio.gather(*server_lowlevel._snapshot_writes)
+    key = server_lowlevel._spec_key
+
+    frozen = []
+    monkeypatch.setattr(gc, "freeze", lambda: frozen.append(gc.isenabled()))
+    monkeypatch.setattr(server_lowlevel, "_first_build_done", False)
+    _reset_lazy_state(monkeypatch)
+    await server_lowlevel.ensure_spec_loaded()
+    assert server_lowlevel._registry_from_snapshot
+    assert frozen == [False] and gc.isenabled()
+
+    # Refreshes, and snapshot loads in general, leave the GC alone.
+    assert server_lowlevel._build_from_text(url, spec_file.read_text(), key)[2]
+    assert snapshot.load_snapshot(url, key) is not None
+    assert server_lowlevel._build_first(url, spec_file.read_text(), key)[2]
+    assert frozen == [False]
@@ -0,0 +1,136 @@
+"""HTTP-semantics response cache: freshness, revalidation, invalidation, LRU
+eviction by size, per-tool TTLs and the disk tier."""
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from mcp_openapi_proxy.breaker import BreakerConfig
+from mcp_openapi_proxy.http_client import PoolConfig, UpstreamPool
+from mcp_openapi_proxy.ratelimit import RateLimitConfig
+from mcp_openapi_proxy.response_cache import CacheConfig, cache_directives, freshness
+from mcp_openapi_proxy.retry import RetryPolicy
+
+ORIGIN = "https://api.example.com"
+
+
+class Upstream(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Answers from ``routes`` (path -> (status, headers, body)), honoring
+    If-None-Match, and records every request it sees."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+
+    def handle_request(self, request):
+        self.requests.append(request)
+        status, headers, body = self.routes.get(request.url.path, (404, {}, b""))
+        if request.method == "GET" and headers.get("ETag") and request.headers.get("If-None-Match") == headers["ETag"]:
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(status if request.method == "GET" else 204, headers=headers, content=body)
+
+    async def handle_async_request(self, request):
+        return self.handle_request(request)
+
+
+def _pool(upstream, **cache):
+    pool = UpstreamPool(PoolConfig(), RetryPolicy(max_retries=0), BreakerConfig(failure_rate=0), RateLimitConfig(),
+                        CacheConfig(**cache))
+    pool._sync_entry((ORIGIN, True)).client = httpx.Client(transport=upstream)
+    return pool
+
+
+def test_fresh_responses_are_served_until_an_unsafe_method_changes_them():
+    upstream = Upstream({"/machines": (200, {"Cache-Control": "max-age=60", "Age": "5"}, b'{"cpus": 2}')})
+    pool = _pool(upstream)
+    first = pool.request_sync("GET", f"{ORIGIN}/machines", params={"region": "ams"})
+    second = pool.request_sync("GET", f"{ORIGIN}/machines", params={"region": "ams"})
+    assert len(upstream.requests) == 1
+    assert second.json() == first.json() == {"cpus": 2}
+    assert int(second.headers["age"]) >= 5
+    second.raise_for_status()
+
+    pool.request_sync("GET", f"{ORIGIN}/machines", params={"region": "fra"})
+    pool.request_sync("GET", f"{ORIGIN}/machines", params={"region": "ams"}, headers={"Authorization": "Bearer 2"})
+    pool.request_sync("GET", f"{ORIGIN}/machines", params={"region": "ams"}, headers={"Cache-Control": "no-store"})
+    assert len(upstream.requests) == 4
+
+    pool.request_sync("POST", f"{ORIGIN}/machines", json={})
+    pool.request_sync("GET", f"{ORIGIN}/machines", params={"region": "ams"})
+    assert len(upstream.requests) == 6
+    stats = pool.stats()["cache"]
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 4, 4)
+
+
+def test_counters_add_up_across_worker_threads():
+    upstream = Upstream({"/zones": (200, {"Cache-Control": "max-age=60"}, b"[]")})
+    pool = _pool(upstream)
+    pool.request_sync("GET", f"{ORIGIN}/zones")
+    with ThreadPoolExecutor(8) as workers:
+        list(workers.map(lambda _: pool.request_sync("GET", f"{ORIGIN}/zones"), range(400)))
+    stats = pool.stats()["cache"]
+    assert (stats["hits"], stats["misses"], len(upstream.requests)) == (400, 1, 1)
+
+
+def test_stale_responses_are_revalidated_with_their_validators():
+    upstream = Upstream({"/devices": (200, {"Cache-Control": "no-cache", "ETag": '"v1"'}, b"[1, 2]")})
+    pool = _pool(upstream)
+    pool.request_sync("GET", f"{ORIGIN}/devices")
+    response = pool.request_sync("GET", f"{ORIGIN}/devices")
+    assert upstream.requests[-1].headers["If-None-Match"] == '"v1"'
+    assert (response.status_code, response.content) == (200, b"[1, 2]")
+
+    upstream.routes["/devices"] = (200, {"Cache-Control": "no-cache", "ETag": '"v2"'}, b"[3]")
+    assert pool.request_sync("GET", f"{ORIGIN}/devices").content == b"[3]"
+    assert pool.request_sync("GET", f"{ORIGIN}/devices").content == b"[3]"
+    stats = pool.stats()["cache"]
+    assert (stats["hits"], stats["revalidations"], stats["not_modified"]) == (0, 3, 2)
+
+
+def test_tool_ttls_no_store_and_eviction_by_size(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_TTLS", "get_devices*=30, bogus")
+    config = CacheConfig.from_env()
+    assert (config.ttl_for("get_devices_by_id"), config.ttl_for("get_sites")) == (30.0, None)
+
+    upstream = Upstream({f"/d{i}": (200, {}, b"x" * 300) for i in range(10)})
+    upstream.routes["/secret"] = (200, {"Cache-Control": "no-store"}, b"")
+    # Each response takes 500 bytes (300 of body plus bookkeeping): room for eight.
+    pool = _pool(upstream, max_bytes=4000, ttls=config.ttls)
+    for path in [f"/d{i}" for i in range(8)] + ["/d0", "/d8", "/d1", "/d0"]:
+        pool.request_sync("GET", f"{ORIGIN}{path}", tool="get_devices_list")
+    pool.request_sync("GET", f"{ORIGIN}/d9", tool="get_sites")  # no TTL: not stored
+    pool.request_sync("GET", f"{ORIGIN}/secret", tool="get_devices_secret")
+    pool.request_sync("GET", f"{ORIGIN}/secret", tool="get_devices_secret")
+    # /d1 was the least recently used when /d8 came in, and /d2 when /d1 came back.
+    assert [r.url.path for r in upstream.requests][8:] == ["/d8", "/d1", "/d9", "/secret", "/secret"]
+    stats = pool.stats()["cache"]
+    assert (stats["entries"], stats["bytes"], stats["hits"], stats["evictions"]) == (8, 4000, 2, 2)
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_a_new_pool(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    upstream = Upstream({"/apis": (200, {"Cache-Control": "max-age=300", "Content-Type": "application/json"},
+                                   b'{"apis": 2500}')})
+    for _ in range(2):
+        pool = UpstreamPool(PoolConfig(), RetryPolicy(max_retries=0), BreakerConfig(failure_rate=0),
+                            RateLimitConfig(), CacheConfig(disk=True))
+        pool._async_entry((ORIGIN, True)).client = httpx.AsyncClient(transport=upstream)
+        response = await pool.request("GET", f"{ORIGIN}/apis")
+        assert response.json() == {"apis": 2500}
+        await pool.aclose()
+    assert len(upstream.requests) == 1
+    assert pool.stats()["cache"]["disk_hits"] == 1
+    assert len(list((tmp_path / "mcp-openapi-proxy" / "responses").glob("*.bin"))) == 1
+
+
+def test_freshness_rules():
+    received = 1_700_000_000.0
+    date = "Tue, 14 Nov 2023 22:13:20 GMT"  # == received
+    assert cache_directives('max-age=60, no-cache="Set-Cookie", Private') == {
+        "max-age": "60", "no-cache": "Set-Cookie", "private": None}
+    assert freshness([("date", date), ("expires", "Tue, 14 Nov 2023 22:14:20 GMT")], received, None) == (received, 60.0)
+    assert freshness([("expires", "0"), ("etag", '"a"')], received, 30) == (received, 0.0)
+    assert freshness([("cache-control", "max-age=10"), ("vary", "*")], received, None) is None
+    assert freshness([], received, None) is None
+    assert freshness([("age", "7")], received, 20) == (received - 7, 20)
@@ -0,0 +1,64 @@
+"""Zero-reparse response passthrough in detect_response_type."""
+import pytest
+
+from mcp_openapi_proxy import json_codec, utils
+from mcp_openapi_proxy.utils import detect_response_type
+
+
+@pytest.fixture
+def count_decodes(monkeypatch):
+    calls = []
+    real_loads = json_codec.loads
+
+    def counting_loads(data):
+        calls.append(len(data))
+        return real_loads(data)
+
+    monkeypatch.setattr(utils.json_codec, "loads", counting_loads)
+    return calls
+
+
+def test_json_list_forwarded_verbatim_without_decoding(count_decodes):
+    body = '[\n  {"id": 1, "name": "caf\\u00e9"},\n  {"id": 2}\n]'
+    content, msg = detect_response_type(body, "application/json; charset=utf-8")
+    assert content.text == body
+    assert msg == "JSON response (passthrough)"
+    assert count_decodes == []
+
+
+def test_object_without_text_hint_is_not_decoded(count_decodes):
+    content, msg = detect_response_type('{"items": [1, 2, 3]}')
+    assert content.text == '{"items": [1, 2, 3]}'
+    assert count_decodes == []
+
+
+def test_text_content_payload_is_unwrapped(count_decodes):
+    content, msg = detect_response_type('{"type": "text", "text": "hello"}', "application/json")
+    assert content.text == "hello"
+    assert msg == "Passthrough TextContent response"
+    assert len(count_decodes) == 1
+
+
+def test_text_hint_in_nested_object_is_not_decoded(count_decodes):
+    body = '{"data": {"type": "text", "value": 1}}'
+    content, msg = detect_response_type(body)
+    assert content.text == body
+    assert msg == "JSON response (passthrough)"
+    # A large list whose blocks carry "type": "text" (Notion rich_text).
+    block = '{"type": "text", "text": {"content": "Meeting notes"}, "plain_text": "Meeting notes"}'
+    body = '{"object": "list", "results": [' + ", ".join([block] * 5000) + "]}"
+    assert detect_response_type(body, "application/json")[0].text == body
+    assert count_decodes == []
+
+
+def test_vendor_json_content_type_and_scalars():
+    content, msg = detect_response_type("42", "application/problem+json")
+    assert content.text == "42"
+    assert msg == "JSON response (passthrough)"
+
+
+def test_non_json_content_type_is_plain_text(count_decodes):
+    content, msg = detect_response_type('  {"type": "text", "text": "x"}  ', "text/html")
+    assert content.text == '{"type": "text", "text": "x"}'
+    assert msg == "Non-JSON text response"
+    assert count_decodes == []
@@ -0,0 +1,125 @@
+"""Runtime configuration snapshot (config.py)."""
+import dataclasses
+from types import SimpleNamespace
+
+import pytest
+from mcp import types
+
+from mcp_openapi_proxy import handlers, openapi, server_lowlevel
+from mcp_openapi_proxy.config import RuntimeConfig, current_config, install_config, reload_config
+from mcp_openapi_proxy.registry import install_registry
+from mcp_openapi_proxy.utils import get_additional_headers, handle_auth
+
+SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com"}],
+    "paths": {"/pets": {"get": {"summary": "List pets"}}},
+}
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    for name in ("API_KEY", "API_AUTH_TYPE", "API_AUTH_HEADER", "EXTRA_HEADERS", "STRIP_PARAM",
+                 "IGNORE_SSL_TOOLS", "SERVER_URL_OVERRIDE", "TOOL_WHITELIST", "TOOL_NAME_PREFIX",
+                 "TOOL_NAME_MAX_LENGTH", "TOOL_DISCOVERY_MODE"):
+        monkeypatch.delenv(name, raising=False)
+    yield
+    install_config(None)
+
+
+def test_from_env_precomputes_request_headers():
+    config = RuntimeConfig.from_env({
+        "API_KEY": "secret",
+        "API_AUTH_TYPE": "Token",
+        "EXTRA_HEADERS": '["X-A: 1", "X-B: 2"]',
+        "STRIP_PARAM": "token",
+        "IGNORE_SSL_TOOLS": "yes",
+    })
+    assert dict(config.auth_headers) == {"Authorization": "Token secret"}
+    assert dict(config.request_headers) == {"Authorization": "Token secret", "X-A": "1", "X-B": "2"}
+    assert config.strip_param == "token"
+    assert config.verify_ssl_tools is False
+    # EXTRA_HEADERS wins over the auth header, as before.
+    config = RuntimeConfig.from_env({"API_KEY": "secret", "EXTRA_HEADERS": "Authorization: Basic abc"})
+    assert dict(config.request_headers) == {"Authorization": "Basic abc"}
+    assert "secret" not in repr(config)
+
+
+def test_snapshot_is_immutable():
+    config = RuntimeConfig.from_env({"API_KEY": "secret"})
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.api_key = "other"
+    with pytest.raises(TypeError):
+        config.request_headers["X-A"] = "1"
+
+
+def test_current_config_follows_the_environment_until_installed(monkeypatch):
+    monkeypatch.setenv("API_KEY", "one")
+    first = current_config()
+    assert current_config() is first
+    monkeypatch.setenv("API_KEY", "two")
+    assert handle_auth({}) == {"Authorization": "Bearer two"}
+
+    installed = reload_config()
+    monkeypatch.setenv("API_KEY", "three")
+    monkeypatch.setenv("EXTRA_HEADERS", "X-A: 1")
+    assert current_config() is installed
+    assert handle_auth({}) == {"Authorization": "Bearer two"}
+    assert get_additional_headers() == {}
+
+    reload_config()
+    assert handle_auth({}) == {"Authorization": "Bearer three"}
+    assert get_additional_headers() == {"X-A": "1"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("module", [server_lowlevel, handlers])
+async def test_dispatcher_uses_the_installed_snapshot(monkeypatch, module):
+    # test_resources swaps server_lowlevel.types for a stub module.
+    monkeypatch.setattr(module, "types", types)
+    monkeypatch.setattr(module, "openapi_spec_data", SPEC)
+    install_registry(openapi.build_registry(SPEC))
+    calls = []
+
+    async def fake_request(method, url, **kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(text="[]", headers={"content-type": "application/json"}, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(module.http_client, "request", fake_request)
+    install_config(RuntimeConfig(api_key="secret", extra_headers={"X-A": "1"}, strip_param="token",
+                                 verify_ssl_tools=False))
+    monkeypatch.setenv("API_KEY", "ignored")
+
+    request = SimpleNamespace(params=SimpleNamespace(name="get_pets", arguments={"token": "t", "tag": "cat"}))
+    await module.dispatcher_handler(request)
+    [call] = calls
+    assert call["headers"] == {"Authorization": "Bearer secret", "X-A": "1"}
+    assert call["params"] == {"tag": "cat"}
+    assert call["verify"] is False
+    # The request got its own copy.
+    assert call["headers"] is not current_config().request_headers
+
+
+@pytest.mark.asyncio
+async def test_reload_config_moves_registered_tools_to_a_new_server_url(monkeypatch):
+    monkeypatch.setattr(server_lowlevel, "types", types)
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", SPEC)
+    monkeypatch.setenv("SERVER_URL_OVERRIDE", "https://old.example.com/v1/")
+    reload_config()
+    install_registry(openapi.build_registry(SPEC))
+    urls = []
+
+    async def fake_request(method, url, **kwargs):
+        urls.append(url)
+        return SimpleNamespace(text="[]", headers={"content-type": "application/json"}, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(server_lowlevel.http_client, "request", fake_request)
+    request = SimpleNamespace(params=SimpleNamespace(name="get_pets", arguments={}))
+    await server_lowlevel.dispatcher_handler(request)
+    monkeypatch.setenv("SERVER_URL_OVERRIDE", "ftp://ignored, https://new.example.com")
+    reload_config()
+    await server_lowlevel.dispatcher_handler(request)
+    monkeypatch.delenv("SERVER_URL_OVERRIDE")
+    reload_config()
+    await server_lowlevel.dispatcher_handler(request)
+    assert urls == ["https://old.example.com/v1/pets", "https://new.example.com/pets", "https://api.example.com/pets"]
@@ -0,0 +1,108 @@
+"""Single-flight coalescing of identical concurrent GET tool calls."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from mcp import types
+
+from mcp_openapi_proxy import openapi, server_lowlevel
+from mcp_openapi_proxy.coalesce import SingleFlight, request_key
+from mcp_openapi_proxy.config import RuntimeConfig, install_config
+from mcp_openapi_proxy.registry import install_registry
+
+SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com"}],
+    "paths": {
+        "/users/{id}": {"get": {"summary": "Get a user",
+                                "parameters": [{"name": "id", "in": "path", "required": True}]}},
+        "/users": {"post": {"summary": "Create a user"}},
+    },
+}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE",
+                 "TOOL_DISCOVERY_MODE"):
+        monkeypatch.delenv(name, raising=False)
+    # test_resources swaps server_lowlevel.types for a stub module.
+    monkeypatch.setattr(server_lowlevel, "types", types)
+    monkeypatch.setattr(server_lowlevel, "_single_flight", SingleFlight())
+    install_registry(openapi.build_registry(SPEC))
+    calls = []
+
+    async def fake_request(method, url, **kwargs):
+        calls.append((method, url))
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(text='{"id": 1}', headers={"content-type": "application/json"},
+                               raise_for_status=lambda: None)
+
+    monkeypatch.setattr(server_lowlevel.http_client, "request", fake_request)
+    yield calls
+    install_config(None)
+
+
+async def _burst(name, arguments_list):
+    return await asyncio.gather(*(server_lowlevel._call_operation(name, args) for args in arguments_list))
+
+
+@pytest.mark.asyncio
+async def test_identical_gets_share_one_request(upstream):
+    install_config(RuntimeConfig())
+    results = await _burst("get_users_by_id", [{"id": 1}] * 5 + [{"id": 2}])
+    assert sorted(upstream) == [("GET", "https://api.example.com/users/1"), ("GET", "https://api.example.com/users/2")]
+    assert all(result is results[0] for result in results[:5])
+    assert server_lowlevel.single_flight_stats() == {"leaders": 2, "coalesced": 4, "in_flight": 0}
+
+    await _burst("get_users_by_id", [{"id": 1}] * 2)  # nothing is cached once the leader is done
+    assert len(upstream) == 3
+
+
+@pytest.mark.asyncio
+async def test_opt_out_and_non_get_calls_are_not_coalesced(upstream):
+    install_config(RuntimeConfig(single_flight_exclude=("get_users_*",)))
+    await _burst("get_users_by_id", [{"id": 1}] * 3)
+    install_config(RuntimeConfig())
+    await _burst("post_users", [{"name": "a"}] * 3)
+    assert len(upstream) == 6
+    assert server_lowlevel.single_flight_stats()["coalesced"] == 0
+
+
+def test_key_separates_auth_identities():
+    key = request_key("GET", "https://a.example/x", {"b": 1, "a": 2}, {"Authorization": "Bearer 1"})
+    assert key == request_key("GET", "https://a.example/x", {"a": 2, "b": 1}, {"Authorization": "Bearer 1"})
+    assert key != request_key("GET", "https://a.example/x", {"a": 2, "b": 1}, {"Authorization": "Bearer 2"})
+
+
+@pytest.mark.asyncio
+async def test_followers_share_errors_and_survive_a_cancelled_leader():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def failing():
+        started.set()
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream broke")
+
+    leader = asyncio.ensure_future(flight.run("k", failing))
+    await started.wait()
+    with pytest.raises(ValueError):
+        await flight.run("k", failing)
+    with pytest.raises(ValueError):
+        await leader
+
+    started.clear()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "fresh"
+
+    leader = asyncio.ensure_future(flight.run("k", slow))
+    await started.wait()
+    follower = asyncio.ensure_future(flight.run("k", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == "fresh"
+    assert flight.stats() == {"leaders": 3, "coalesced": 2, "in_flight": 0}
@@ -0,0 +1,113 @@
+"""Background spec refresh: stale-while-revalidate with an atomic registry
+swap and tools/list_changed notifications."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_openapi_proxy import http_client, server_lowlevel
+from mcp_openapi_proxy.registry import current_registry
+
+
+def _spec(base_url, *paths):
+    return {
+        "openapi": "3.0.0",
+        "servers": [{"url": base_url}],
+        "paths": {path: {"get": {"summary": path}} for path in paths},
+    }
+
+
+class _Session:
+    def __init__(self):
+        self.notified = 0
+
+    async def send_tool_list_changed(self):
+        self.notified += 1
+
+
+@pytest.fixture
+def spec_file(monkeypatch, tmp_path):
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(_spec("https://v1.example.com", "/a")))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("OPENAPI_SPEC_URL", f"file://{path}")
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(server_lowlevel, "ENABLE_TOOLS", True)
+    monkeypatch.setattr(server_lowlevel, "CAPABILITIES_TOOLS", True)
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", None)
+    monkeypatch.setattr(server_lowlevel, "_spec_load_error", None)
+    monkeypatch.setattr(server_lowlevel, "_spec_load_lock", None)
+    monkeypatch.setattr(server_lowlevel, "_registry_from_snapshot", False)
+    monkeypatch.setattr(server_lowlevel, "_spec_key", None)
+    monkeypatch.setattr(server_lowlevel, "_sessions", server_lowlevel.weakref.WeakSet())
+    return path
+
+
+@pytest.mark.asyncio
+async def test_unchanged_spec_keeps_registry(spec_file):
+    await server_lowlevel.ensure_spec_loaded()
+    before = current_registry()
+    session = _Session()
+    server_lowlevel._sessions.add(session)
+    assert await server_lowlevel.refresh_spec() is False
+    assert current_registry() is before
+    assert session.notified == 0
+
+
+@pytest.mark.asyncio
+async def test_changed_spec_swaps_registry_and_notifies(spec_file):
+    await server_lowlevel.ensure_spec_loaded()
+    session = _Session()
+    server_lowlevel._sessions.add(session)
+    spec_file.write_text(json.dumps(_spec("https://v1.example.com", "/a", "/b")))
+    assert await server_lowlevel.refresh_spec() is True
+    assert sorted(current_registry().names()) == ["get_a", "get_b"]
+    assert sorted(t.name for t in current_registry().tools) == ["get_a", "get_b"]
+    assert session.notified == 1
+
+
+@pytest.mark.asyncio
+async def test_no_notification_without_list_changed_capability(spec_file, monkeypatch):
+    monkeypatch.setattr(server_lowlevel, "CAPABILITIES_TOOLS", False)
+    await server_lowlevel.ensure_spec_loaded()
+    session = _Session()
+    server_lowlevel._sessions.add(session)
+    spec_file.write_text(json.dumps(_spec("https://v1.example.com", "/b")))
+    assert await server_lowlevel.refresh_spec() is True
+    assert session.notified == 0
+
+
+@pytest.mark.asyncio
+async def test_broken_spec_keeps_current_tools(spec_file):
+    await server_lowlevel.ensure_spec_loaded()
+    before = current_registry()
+    spec_file.write_text("{not json")
+    assert await server_lowlevel.refresh_spec() is False
+    assert current_registry() is before
+
+
+@pytest.mark.asyncio
+async def test_in_flight_call_keeps_its_plan(spec_file, monkeypatch):
+    await server_lowlevel.ensure_spec_loaded()
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", {"paths": {}})
+    started, release = asyncio.Event(), asyncio.Event()
+    urls = []
+
+    async def fake_request(method, url, **kwargs):
+        urls.append(url)
+        started.set()
+        await release.wait()
+        return SimpleNamespace(text='{"ok": true}', headers={}, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(http_client, "request", fake_request)
+    request = SimpleNamespace(params=SimpleNamespace(name="get_a", arguments={}))
+    call = asyncio.create_task(server_lowlevel.dispatcher_handler(request))
+    await started.wait()
+    spec_file.write_text(json.dumps(_spec("https://v2.example.com", "/a")))
+    assert await server_lowlevel.refresh_spec() is True
+    release.set()
+    await call
+    await server_lowlevel.dispatcher_handler(request)
+    assert urls == ["https://v1.example.com/a", "https://v2.example.com/a"]
@@ -0,0 +1,117 @@
+"""Conditional revalidation (ETag / Last-Modified) of cached remote specs."""
+import http.server
+import json
+import os
+import threading
+
+import pytest
+
+from mcp_openapi_proxy import utils
+
+SPEC = {"openapi": "3.0.0", "paths": {f"/r{i}": {"get": {"summary": "x" * 200}} for i in range(200)}}
+BODY = json.dumps(SPEC).encode()
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+class _Stub(http.server.ThreadingHTTPServer):
+    def __init__(self, etag=True, last_modified=True):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.use_etag = etag
+        self.use_last_modified = last_modified
+        self.body = BODY
+        self.bytes_sent = 0
+        self.requests = []
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        etag = f'"{len(server.body)}-{hash(server.body) & 0xffff}"'
+        if server.use_etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        if server.use_last_modified and not server.use_etag and self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(server.body)))
+        if server.use_etag:
+            self.send_header("ETag", etag)
+        if server.use_last_modified:
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(server.body)
+        server.bytes_sent += len(server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_factory(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setenv("OPENAPI_SPEC_CACHE_TTL_SECONDS", "3600")
+    servers = []
+
+    def make(**kwargs):
+        server = _Stub(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_address[1]}/spec.json"
+
+    yield make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_etag_revalidation_skips_body(stub_factory):
+    server, url = stub_factory()
+    assert utils.fetch_openapi_spec(url) == SPEC
+    assert server.bytes_sent == len(BODY)
+    assert utils.fetch_openapi_spec(url) == SPEC
+    assert utils.fetch_openapi_spec(url) == SPEC
+    assert server.bytes_sent == len(BODY), "304 responses must not resend the spec"
+    assert server.requests[-1]["If-None-Match"]
+
+
+def test_last_modified_revalidation(stub_factory):
+    server, url = stub_factory(etag=False)
+    utils.fetch_openapi_spec(url)
+    assert utils.fetch_openapi_spec(url) == SPEC
+    assert server.bytes_sent == len(BODY)
+    assert server.requests[-1]["If-Modified-Since"] == LAST_MODIFIED
+
+
+def test_changed_spec_is_downloaded_again(stub_factory):
+    server, url = stub_factory()
+    utils.fetch_openapi_spec(url)
+    server.body = json.dumps({"openapi": "3.0.0", "paths": {}}).encode()
+    assert utils.fetch_openapi_spec(url) == {"openapi": "3.0.0", "paths": {}}
+    assert server.bytes_sent == len(BODY) + len(server.body)
+
+
+def test_no_validators_without_matching_cache(stub_factory):
+    server, url = stub_factory()
+    utils.fetch_openapi_spec(url)
+    # A cache body that no longer matches the recorded hash is not trusted
+    # for revalidation: the next fetch is unconditional.
+    with open(utils._spec_cache_path(url), "w") as f:
+        f.write("{}")
+    assert utils.fetch_openapi_spec(url) == SPEC
+    assert "If-None-Match" not in server.requests[-1]
+    assert server.bytes_sent == 2 * len(BODY)
+
+
+def test_not_modified_restarts_ttl(stub_factory):
+    server, url = stub_factory()
+    utils.fetch_openapi_spec(url)
+    path = utils._spec_cache_path(url)
+    os.utime(path, (0, 0))
+    utils.fetch_openapi_spec(url)
+    assert os.path.getmtime(path) > 0
+    assert server.bytes_sent == len(BODY)
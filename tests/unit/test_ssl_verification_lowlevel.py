@@ -2,12 +2,12 @@
 """Tests that IGNORE_SSL_TOOLS controls SSL verification in low-level mode tool calls."""
 import unittest
 import os
-import requests
 import asyncio
 from types import SimpleNamespace
 from mcp_openapi_proxy.handlers import register_functions
 from mcp_openapi_proxy.server_lowlevel import tools, dispatcher_handler
 import mcp_openapi_proxy.utils as utils
+from mcp_openapi_proxy import http_client
 
 
 class TestSslVerificationLowLevel(unittest.TestCase):
@@ -55,33 +55,34 @@ class TestSslVerificationLowLevel(unittest.TestCase):
         dummy_request = SimpleNamespace(
             params=SimpleNamespace(name=tool_name, arguments={})
         )
-        original_request = requests.request
+        original_request = http_client.request
         captured = {}
 
-        def dummy_request_fn(method=None, url=None, **kwargs):
+        async def dummy_request_fn(method=None, url=None, **kwargs):
             captured.update(kwargs)
             captured["method"] = method
             captured["url"] = url
 
             class DummyResponse:
                 text = "{}"
+                headers = {}
 
                 def raise_for_status(self):
                     pass
 
             return DummyResponse()
 
-        requests.request = dummy_request_fn
+        http_client.request = dummy_request_fn
         try:
             asyncio.run(dispatcher_handler(dummy_request))  # type: ignore
         finally:
-            requests.request = original_request
+            http_client.request = original_request
         return captured
 
     def test_ssl_verification_enabled_by_default(self):
         os.environ.pop("IGNORE_SSL_TOOLS", None)
         captured = self._call_tool_and_capture_kwargs()
-        self.assertIn("verify", captured, "Expected verify kwarg to be passed to requests.request")
+        self.assertIn("verify", captured, "Expected verify kwarg to be passed to the upstream client")
         self.assertTrue(captured["verify"], "SSL verification should be enabled by default")
 
     def test_ignore_ssl_tools_disables_verification(self):
@@ -0,0 +1,97 @@
+"""Name -> (Tool, plan) index built at registration (registry.py)."""
+import pytest
+from types import SimpleNamespace
+
+from mcp_openapi_proxy import openapi, server_lowlevel
+from mcp_openapi_proxy.registry import ToolRegistry, current_registry, install_registry
+
+SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com"}],
+    "paths": {
+        "/users": {"get": {"summary": "List users"}, "post": {"summary": "Create user"}},
+        "/users/{id}": {"get": {"summary": "Get user"}},
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def _clean_env(monkeypatch):
+    monkeypatch.delenv("SERVER_URL_OVERRIDE", raising=False)
+    monkeypatch.delenv("TOOL_WHITELIST", raising=False)
+    monkeypatch.delenv("TOOL_NAME_PREFIX", raising=False)
+
+
+def test_registration_installs_index():
+    tools = openapi.register_functions(SPEC)
+    registry = current_registry()
+    assert len(registry) == len(tools) == 3
+    assert list(registry.names()) == [t.name for t in tools]
+    entry = registry.get("get_users_by_id")
+    assert entry.tool.name == "get_users_by_id"
+    assert entry.plan.method == "GET"
+    assert "post_users" in registry
+    assert registry.get("nope") is None
+
+
+def test_reregistration_replaces_index():
+    openapi.register_functions(SPEC)
+    old = current_registry()
+    openapi.register_functions({"servers": [{"url": "https://x"}], "paths": {"/ping": {"get": {}}}})
+    assert current_registry() is not old
+    assert list(current_registry().names()) == ["get_ping"]
+    # The old index is untouched, so in-flight calls holding it stay valid.
+    assert "get_users" in old
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_does_not_scan_spec_on_miss(monkeypatch):
+    openapi.register_functions(SPEC)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("lookup_operation_details must not run on the call path")
+
+    monkeypatch.setattr(openapi, "lookup_operation_details", fail)
+    monkeypatch.setattr(server_lowlevel, "lookup_operation_details", fail)
+    request = SimpleNamespace(params=SimpleNamespace(name="missing_tool", arguments={}))
+    result = await server_lowlevel.dispatcher_handler(request)
+    assert result.content[0].text == "Unknown function requested"
+
+
+def test_install_registry_swaps_reference():
+    registry = ToolRegistry()
+    install_registry(registry)
+    assert current_registry() is registry
+    assert registry.tools == []
+
+
+def test_tools_are_built_on_first_use():
+    registry = openapi.build_registry(SPEC)
+    assert not any(registry.get(name).built for name in registry.names())
+    tool, plan = registry.get("get_users_by_id")
+    assert tool.inputSchema["required"] == ["id"]
+    assert plan.path == "/users/{id}"
+    assert [name for name in registry.names() if registry.get(name).built] == ["get_users_by_id"]
+    # Memoized: the same object every time, including via the full list.
+    assert registry.get("get_users_by_id").tool is tool
+    assert registry.tools[2] is tool
+    assert all(registry.get(name).built for name in registry.names())
+
+
+@pytest.mark.asyncio
+async def test_call_does_not_build_schema(monkeypatch):
+    registry = openapi.build_registry(SPEC)
+    install_registry(registry)
+
+    calls = []
+
+    async def fake_request(method, url, **kwargs):
+        calls.append(url)
+        return SimpleNamespace(text="[]", headers={"content-type": "application/json"}, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(server_lowlevel.http_client, "request", fake_request)
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", SPEC)
+    request = SimpleNamespace(params=SimpleNamespace(name="get_users", arguments={}))
+    await server_lowlevel.dispatcher_handler(request)
+    assert calls == ["https://api.example.com/users"]
+    assert not registry.get("get_users").built
@@ -0,0 +1,82 @@
+"""Cursor pagination of tools/list (TOOLS_LIST_PAGE_SIZE)."""
+from types import SimpleNamespace
+
+import pytest
+from mcp import types
+from mcp.shared.exceptions import McpError
+
+from mcp_openapi_proxy import openapi, server_lowlevel
+from mcp_openapi_proxy.registry import install_registry
+
+SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com"}],
+    "paths": {f"/items{i}": {"get": {"summary": f"Item {i}"}} for i in range(7)},
+}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("TOOLS_LIST_PAGE_SIZE", "3")
+    # test_resources swaps server_lowlevel.types for a stub module.
+    monkeypatch.setattr(server_lowlevel, "types", types)
+    monkeypatch.setattr(server_lowlevel, "openapi_spec_data", SPEC)
+    registry = openapi.build_registry(SPEC)
+    install_registry(registry)
+    return registry
+
+
+def _request(cursor=None):
+    return SimpleNamespace(params=SimpleNamespace(cursor=cursor))
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_every_tool_in_order(registry):
+    names, cursor, pages = [], None, 0
+    while True:
+        result = await server_lowlevel.list_tools(_request(cursor))
+        names.extend(tool.name for tool in result.tools)
+        pages += 1
+        cursor = result.nextCursor
+        if cursor is None:
+            break
+    assert pages == 3
+    assert names == list(registry.names())
+
+
+@pytest.mark.asyncio
+async def test_pages_are_built_once_per_registry(registry):
+    first = await server_lowlevel.list_tools(_request())
+    assert await server_lowlevel.list_tools(_request()) is first
+    # Only the listed page's tools were built.
+    assert [registry.get(name).built for name in registry.names()] == [True] * 3 + [False] * 4
+    install_registry(openapi.build_registry(SPEC))
+    assert await server_lowlevel.list_tools(_request()) is not first
+
+
+@pytest.mark.asyncio
+async def test_cursor_survives_an_identical_tool_list(registry):
+    first = await server_lowlevel.list_tools(_request())
+    install_registry(openapi.build_registry(SPEC))
+    second = await server_lowlevel.list_tools(_request(first.nextCursor))
+    assert [tool.name for tool in second.tools] == list(registry.names())[3:6]
+
+
+@pytest.mark.asyncio
+async def test_stale_and_invalid_cursors_are_rejected(registry):
+    first = await server_lowlevel.list_tools(_request())
+    install_registry(openapi.build_registry(dict(SPEC, paths={"/other": {"get": {}}})))
+    with pytest.raises(McpError, match="Stale"):
+        await server_lowlevel.list_tools(_request(first.nextCursor))
+    with pytest.raises(McpError, match="Invalid"):
+        await server_lowlevel.list_tools(_request("not-a-cursor"))
+
+
+@pytest.mark.asyncio
+async def test_page_size_zero_lists_everything(registry, monkeypatch):
+    monkeypatch.setenv("TOOLS_LIST_PAGE_SIZE", "0")
+    result = await server_lowlevel.list_tools(SimpleNamespace(params=None))
+    assert len(result.tools) == 7
+    assert result.nextCursor is None
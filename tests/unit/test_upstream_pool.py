@@ -0,0 +1,142 @@
+"""Upstream connection pool: keep-alive reuse per origin, idle reaping and
+pool stats."""
+import asyncio
+import http.server
+import threading
+
+import httpx
+import pytest
+
+from mcp_openapi_proxy.http_client import PoolConfig, UpstreamPool, origin_of
+
+
+class _KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_GET(self):
+        if self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/x")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    _KeepAliveHandler.connections = 0
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_origin_of():
+    assert origin_of("https://API.example.com:8443/v1/x?y=1") == "https://api.example.com:8443"
+    assert origin_of("http://a.example/b") == "http://a.example"
+
+
+def test_pool_config_from_env(monkeypatch):
+    monkeypatch.setenv("UPSTREAM_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("UPSTREAM_KEEPALIVE_EXPIRY", "2.5")
+    monkeypatch.setenv("UPSTREAM_IDLE_REAP_SECONDS", "bogus")
+    config = PoolConfig.from_env()
+    assert config.max_connections == 7
+    assert config.keepalive_expiry == 2.5
+    assert config.idle_reap_seconds == PoolConfig().idle_reap_seconds
+
+
+def test_async_calls_reuse_one_connection(upstream):
+    pool = UpstreamPool(PoolConfig())
+
+    async def run():
+        for _ in range(5):
+            response = await pool.request("GET", f"{upstream}/x")
+            assert response.status_code == 200
+        stats = pool.stats()
+        await pool.aclose()
+        return stats
+
+    stats = asyncio.run(run())
+    assert _KeepAliveHandler.connections == 1
+    origin = origin_of(upstream)
+    assert stats["origins"][origin]["open"] == 1
+    assert stats["origins"][origin]["idle"] == 1
+    assert stats["waiting"] == 0
+
+
+def test_redirects_are_followed(upstream):
+    # requests followed redirects by default; httpx only does when asked to.
+    pool = UpstreamPool(PoolConfig())
+
+    async def run():
+        response = await pool.request("GET", f"{upstream}/moved")
+        await pool.aclose()
+        return response
+
+    for response in (asyncio.run(run()), pool.request_sync("GET", f"{upstream}/moved")):
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+        assert response.url.path == "/x"
+    pool.close_sync()
+
+
+def test_sync_calls_reuse_one_connection(upstream):
+    pool = UpstreamPool(PoolConfig())
+    for _ in range(5):
+        assert pool.request_sync("GET", f"{upstream}/x").status_code == 200
+    assert _KeepAliveHandler.connections == 1
+    assert pool.stats()["open"] == 1
+    pool.close_sync()
+    assert pool.stats()["open"] == 0
+
+
+def test_idle_pools_are_reaped(upstream):
+    pool = UpstreamPool(PoolConfig(idle_reap_seconds=0.01))
+
+    async def run():
+        await pool.request("GET", f"{upstream}/x")
+        await asyncio.sleep(0.05)
+        reaped = await pool.reap_idle()
+        return reaped, pool.stats()
+
+    reaped, stats = asyncio.run(run())
+    assert reaped == 1
+    assert stats["open"] == 0 and stats["origins"] == {}
+
+
+def test_clients_close_with_their_event_loop(upstream):
+    pool = UpstreamPool(PoolConfig())
+
+    async def run():
+        await pool.request("GET", f"{upstream}/x")
+        return pool._async_entry((origin_of(upstream), True)).client
+
+    first = asyncio.run(run())
+    assert first.is_closed  # closed as asyncio.run shut its loop down
+    second = asyncio.run(run())
+    assert second is not first and second.is_closed
+    assert _KeepAliveHandler.connections == 2
+
+
+def test_stats_without_httpcore_internals():
+    pool = UpstreamPool(PoolConfig())
+    entry = pool._sync_entry(("https://api.example.com", True))  # counted as in flight
+    entry.client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+    assert pool.stats()["origins"]["https://api.example.com"] == {"open": 1, "idle": 0, "waiting": 0, "in_flight": 1}
@@ -0,0 +1,124 @@
+"""Upstream retries: transient failures, idempotency rules, Retry-After and
+the retry budget, against a local flaky stub."""
+import asyncio
+import http.server
+import threading
+import time
+
+import pytest
+
+from mcp_openapi_proxy.http_client import PoolConfig, UpstreamPool
+from mcp_openapi_proxy.retry import RetryBudget, RetryPolicy, retry_after_seconds
+
+FAST = RetryPolicy(backoff=0.01, max_backoff=0.05)
+
+
+class _FlakyHandler(http.server.BaseHTTPRequestHandler):
+    """Plays ``script`` one step per request (then answers 200): a status
+    code, optionally with a Retry-After value, or "reset" to drop the
+    connection without answering."""
+
+    protocol_version = "HTTP/1.1"
+    script = []
+    seen = []
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        type(self).seen.append((self.command, self.headers.get("Idempotency-Key")))
+        step = type(self).script.pop(0) if type(self).script else 200
+        if step == "reset":
+            self.close_connection = True
+            return
+        status, retry_after = step if isinstance(step, tuple) else (step, None)
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header("Retry-After", retry_after)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def flaky():
+    _FlakyHandler.script = []
+    _FlakyHandler.seen = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FlakyHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_transient_failures_are_retried(flaky):
+    pool = UpstreamPool(PoolConfig(), FAST)
+    _FlakyHandler.script = [502, "reset"]
+    assert pool.request_sync("GET", f"{flaky}/x").status_code == 200
+    assert len(_FlakyHandler.seen) == 3
+    assert pool.stats()["retry_budgets"][flaky]["retries"] == 2
+
+    _FlakyHandler.script = [503, 503, 503, 503]
+    assert pool.request_sync("GET", f"{flaky}/x").status_code == 503  # out of attempts
+    assert _FlakyHandler.script == [503]
+    pool.close_sync()
+
+    async def call():
+        try:
+            return await pool.request("GET", f"{flaky}/x")
+        finally:
+            await pool.aclose()
+
+    _FlakyHandler.script = [504]
+    assert asyncio.run(call()).status_code == 200
+
+
+def test_non_idempotent_calls_need_an_idempotency_key(flaky):
+    _FlakyHandler.script = [502]
+    pool = UpstreamPool(PoolConfig(), FAST)
+    assert pool.request_sync("POST", f"{flaky}/x", json={}).status_code == 502
+    assert _FlakyHandler.seen == [("POST", None)]
+
+    _FlakyHandler.seen = []
+    _FlakyHandler.script = [502, 502]
+    pool = UpstreamPool(PoolConfig(), RetryPolicy(backoff=0.01, idempotency_header="Idempotency-Key"))
+    assert pool.request_sync("POST", f"{flaky}/x", json={}).status_code == 200
+    keys = {key for _, key in _FlakyHandler.seen}
+    assert len(_FlakyHandler.seen) == 3 and len(keys) == 1 and None not in keys
+    pool.close_sync()
+
+
+def test_retry_after_is_honored_within_the_time_cap(flaky):
+    pool = UpstreamPool(PoolConfig(), FAST)
+    _FlakyHandler.script = [(503, "0.3")]
+    start = time.monotonic()
+    assert pool.request_sync("GET", f"{flaky}/x").status_code == 200
+    assert time.monotonic() - start >= 0.3
+
+    # Asked to wait longer than the call may take: the 429 is the answer.
+    _FlakyHandler.script = [(429, "120")]
+    assert pool.request_sync("GET", f"{flaky}/x").status_code == 429
+    pool.close_sync()
+
+
+def test_retry_budget_caps_retries():
+    budget = RetryBudget(ratio=0.5, reserve=2)
+    assert [budget.withdraw() for _ in range(3)] == [True, True, False]
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+    assert budget.stats() == {"balance": 0.0, "retries": 3, "denied": 2}
+
+
+def test_backoff_and_retry_after_parsing():
+    policy = RetryPolicy(backoff=0.1, max_backoff=1.0)
+    delays = policy.delays()
+    assert all(0.1 <= next(delays) <= 1.0 for _ in range(100))
+    assert retry_after_seconds("2") == 2.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds("soon") is None
@@ -0,0 +1,156 @@
+"""Upstream request deadlines: connect / read / total timeouts, per-tool
+overrides, and timeouts surfacing as structured tool errors."""
+import asyncio
+import gzip
+import http.server
+import json
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+from mcp import types
+
+from mcp_openapi_proxy import openapi, server_lowlevel
+from mcp_openapi_proxy.config import RuntimeConfig, install_config
+from mcp_openapi_proxy.http_client import DeadlineExceeded, PoolConfig, UpstreamPool, UpstreamTimeouts
+from mcp_openapi_proxy.registry import install_registry
+
+
+@pytest.fixture
+def silent_upstream():
+    """Accepts connections and reads requests, but never answers."""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    held = []
+
+    def accept():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            held.append(conn)
+
+    threading.Thread(target=accept, daemon=True).start()
+    yield f"http://127.0.0.1:{listener.getsockname()[1]}"
+    listener.close()
+    for conn in held:
+        conn.close()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/gzip":
+            body = gzip.compress(b'{"ok": true}')
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        # A body trickled out a byte at a time: every read completes well
+        # within the read timeout, the whole never ends in time.
+        self.send_response(200)
+        self.send_header("Content-Length", "200")
+        self.end_headers()
+        try:
+            for _ in range(200):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                time.sleep(0.05)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def trickling_upstream():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_timeouts_resolve_per_tool():
+    config = RuntimeConfig.from_env({
+        "UPSTREAM_READ_TIMEOUT": "5",
+        "UPSTREAM_TIMEOUT": "0",
+        "TOOL_TIMEOUTS": "get_reports=120, get_pets=oops",
+    })
+    assert config.timeouts == UpstreamTimeouts(connect=10.0, read=5.0, total=None)
+    assert config.timeouts_for("get_reports", {"x-timeout": 1}).total == 120.0
+    assert config.timeouts_for("get_pets") is config.timeouts
+    assert config.timeouts_for("get_pets", {"x-timeout": 2}).total == 2.0
+    assert config.timeouts_for("get_pets", {"x-timeout": {"read": 1, "connect": 0}}) == UpstreamTimeouts(
+        connect=None, read=1.0, total=None)
+    assert config.timeouts_for("get_pets", {"x-timeout": {"bogus": 1}}) is config.timeouts
+
+    config = RuntimeConfig.from_env({"TOOL_TIMEOUTS": '{"get_pets": {"read": 2}}'})
+    assert config.timeouts_for("get_pets") == UpstreamTimeouts(read=2.0)
+
+
+@pytest.mark.asyncio
+async def test_silent_upstream_is_a_structured_tool_error(silent_upstream, monkeypatch):
+    for name in ("TOOL_WHITELIST", "TOOL_NAME_PREFIX", "TOOL_NAME_MAX_LENGTH", "SERVER_URL_OVERRIDE",
+                 "TOOL_DISCOVERY_MODE"):
+        monkeypatch.delenv(name, raising=False)
+    # test_resources swaps server_lowlevel.types for a stub module.
+    monkeypatch.setattr(server_lowlevel, "types", types)
+    spec = {"openapi": "3.0.0", "servers": [{"url": silent_upstream}],
+            "paths": {"/pets": {"get": {"summary": "List pets", "x-timeout": {"read": 0.3}}}}}
+    install_registry(openapi.build_registry(spec))
+    install_config(RuntimeConfig(timeouts=UpstreamTimeouts(connect=1, read=30, total=30)))
+    try:
+        start = time.monotonic()
+        result = await server_lowlevel._call_operation("get_pets", {})
+        elapsed = time.monotonic() - start
+    finally:
+        install_config(None)
+
+    assert elapsed < 5
+    assert result.isError is True
+    error = json.loads(result.content[0].text)
+    assert (error["type"], error["tool"], error["phase"], error["timeout_seconds"]) == (
+        "upstream_timeout", "get_pets", "read", 0.3)
+
+
+def test_total_deadline_bounds_a_trickling_body(trickling_upstream):
+    pool = UpstreamPool(PoolConfig())
+    timeouts = UpstreamTimeouts(connect=1, read=1, total=0.5)
+
+    async def call():
+        try:
+            await pool.request("GET", f"{trickling_upstream}/slow", timeouts=timeouts)
+        finally:
+            await pool.aclose()
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(call())
+    assert time.monotonic() - start < 3
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        pool.request_sync("GET", f"{trickling_upstream}/slow", timeouts=timeouts)
+    assert time.monotonic() - start < 3
+
+    # Within the deadline the streamed sync path still decodes the body.
+    response = pool.request_sync("GET", f"{trickling_upstream}/gzip", timeouts=timeouts)
+    assert response.json() == {"ok": True}
+    pool.close_sync()
+
+
+def test_silent_upstream_read_timeout_sync(silent_upstream):
+    pool = UpstreamPool(PoolConfig())
+    with pytest.raises(httpx.ReadTimeout):
+        pool.request_sync("GET", f"{silent_upstream}/x", timeouts=UpstreamTimeouts(read=0.3, total=None))
+    pool.close_sync()
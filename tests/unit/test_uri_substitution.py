@@ -6,7 +6,6 @@ from unittest.mock import patch
 from mcp_openapi_proxy.openapi import register_functions
 from mcp_openapi_proxy.server_lowlevel import dispatcher_handler
 from mcp_openapi_proxy.server_fastmcp import list_functions
-import requests
 from types import SimpleNamespace
 
 DUMMY_SPEC = {
@@ -48,7 +47,7 @@ def mock_requests(monkeypatch):
             def raise_for_status(self):
                 pass
         return MockResponse(url)
-    monkeypatch.setattr(requests, "request", mock_request)
+    monkeypatch.setattr("mcp_openapi_proxy.http_client.request_sync", mock_request)
 
 def to_namespace(obj):
     from types import SimpleNamespace
@@ -31,10 +31,9 @@ def test_normalize_tool_name():
 def test_detect_response_type_json():
     content, msg = detect_response_type('{"key": "value"}')
     assert content.type == "text"
-    # The content.text should now be the stringified JSON
+    # Valid JSON bodies are forwarded verbatim, without a decode/re-encode
     assert content.text == '{"key": "value"}'
-    # The message indicates it was JSON but stringified
-    assert "JSON response (stringified)" in msg
+    assert "JSON response (passthrough)" in msg
 
 def test_detect_response_type_text():
     content, msg = detect_response_type("plain text")
@@ -28,3 +28,29 @@ def test_is_tool_whitelisted_slash_still_works(monkeypatch):
     assert is_tool_whitelisted("/ipam/ip-addresses/{id}")
     assert not is_tool_whitelisted("/ipam/ip-ranges")
     monkeypatch.delenv("TOOL_WHITELIST", raising=False)
+
+
+def test_whitelist_matcher_is_compiled_once_per_value(monkeypatch):
+    from mcp_openapi_proxy.utils import whitelist_matcher
+    monkeypatch.setenv("TOOL_WHITELIST", "/foo,/bar/{id}")
+    matcher = whitelist_matcher()
+    assert whitelist_matcher() is matcher
+    monkeypatch.setenv("TOOL_WHITELIST", "/baz")
+    changed = whitelist_matcher()
+    assert changed is not matcher
+    assert changed.matches("/baz/1") and not changed.matches("/foo")
+
+
+def test_whitelist_matcher_mixes_prefixes_and_templates():
+    from mcp_openapi_proxy.utils import WhitelistMatcher
+    matcher = WhitelistMatcher(" /users/ , /repos/{owner}/{repo}, /a.b(c) ,/orgs/{org}/teams")
+    assert matcher.matches("users/42/")
+    assert matcher.matches("/repos/me/proj/issues")
+    assert not matcher.matches("/repos/me")
+    assert matcher.matches("/a.b(c).list")
+    assert not matcher.matches("/a.bxc")
+    assert matcher.matches("/orgs/acme/teams")
+    assert not matcher.matches("/orgs/acme/teamsx")
+    # Only separators: set, but no entries, so nothing is allowed.
+    assert not WhitelistMatcher(",").matches("/users")
+    assert WhitelistMatcher("").matches("/anything")